@@ -706,27 +706,22 @@ def framework_summary() -> dict:
     _ensure_initialized()
     summary = {}
 
-    # Framework health
+    # Framework + gate health (shared snapshot; only stale components re-run)
     try:
-        from shared.health_monitor import full_health_check
+        from shared.health_snapshot import COMPONENT_GATE_PERF, get_snapshot
 
         sid = _resolve_session_id("")
-        health = full_health_check(sid)
+        health = get_snapshot(sid)
         summary["health_score"] = health.get("overall_score", "?")
         summary["health_status"] = health.get("status", "unknown")
-    except Exception:
-        summary["health_score"] = "unavailable"
-
-    # Gate health
-    try:
-        from shared.gate_health import get_gate_health_report
 
-        gate_report = get_gate_health_report()
+        gate_report = health["components"][COMPONENT_GATE_PERF]["data"]
         summary["gate_health_score"] = gate_report.get("health_score", "?")
         summary["gates_tracked"] = gate_report.get("gate_count", 0)
         summary["gates_degraded"] = len(gate_report.get("degraded_gates", []))
     except Exception:
-        summary["gate_health_score"] = "unavailable"
+        summary.setdefault("health_score", "unavailable")
+        summary.setdefault("gate_health_score", "unavailable")
 
     # Circuit breaker
     try:
@@ -1079,6 +1074,7 @@ def tool_predictions(recent_tools: str = "", top_k: int = 5) -> dict:
         from shared.tool_patterns import (
             predict_next_tool,
             detect_unusual_sequence,
+            get_transition_model,
             get_workflow_templates,
             summarize_patterns,
         )
@@ -1090,6 +1086,14 @@ def tool_predictions(recent_tools: str = "", top_k: int = 5) -> dict:
                 {"tool": t, "probability": round(p, 3)} for t, p in predictions
             ]
 
+            # Recency-weighted n-gram prediction (incremental, persisted)
+            likely = get_transition_model().most_likely_next(tools_list)
+            if likely:
+                result["next_tool"] = {
+                    "tool": likely[0],
+                    "probability": round(likely[1], 3),
+                }
+
             # Anomaly detection
             anomaly = detect_unusual_sequence(tools_list)
             if anomaly:
@@ -1853,8 +1857,7 @@ def fix_effectiveness(error_type: str = "") -> dict:
         query_best_strategy,
         get_success_rate,
         get_archive_stats,
-        ARCHIVE_PATH,
-        _read_rows,
+        get_strategy_breakdown,
     )
 
     stats = get_archive_stats()
@@ -1873,21 +1876,7 @@ def fix_effectiveness(error_type: str = "") -> dict:
             result["best_strategy_success_rate"] = round(get_success_rate(best), 3)
 
         # Build per-strategy breakdown for this error type
-        rows = _read_rows(ARCHIVE_PATH)
-        needle = error_type.lower()
-        strat_stats = {}
-        for row in rows:
-            et = row.get("error_type", "")
-            if needle not in et.lower():
-                continue
-            strat = row.get("fix_strategy", "").strip()
-            if not strat:
-                continue
-            if strat not in strat_stats:
-                strat_stats[strat] = {"total": 0, "successes": 0}
-            strat_stats[strat]["total"] += 1
-            if row.get("outcome") == "success":
-                strat_stats[strat]["successes"] += 1
+        strat_stats = get_strategy_breakdown(error_type)
 
         strategies = []
         for name, s in strat_stats.items():
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Benchmark: local ANN index (flat / IVF) vs SurrealDB HNSW KNN.
+
+Builds a synthetic clustered corpus, then measures recall@k against exact
+brute force and per-query latency for:
+  1. LocalANNIndex exact flat scan
+  2. LocalANNIndex IVF (nprobe lists)
+  3. SurrealDB HNSW over ws:// (only with --surreal and a reachable server)
+
+Reports p50/p95/p99 latencies and recall@k.
+
+Usage:
+    python3 benchmarks/benchmark_ann.py [--n 10000] [--dim 4096] [--surreal]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from shared.local_ann import LocalANNIndex
+
+SURREAL_URL = "ws://127.0.0.1:8822"
+BENCH_TABLE = "bench_ann"
+
+
+def make_corpus(n, dim, n_centers=64, seed=0):
+    """Clustered unit vectors — closer to real embeddings than pure noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_centers, dim)).astype(np.float32)
+    labels = rng.integers(0, n_centers, n)
+    data = centers[labels] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+
+def make_queries(data, n_queries, seed=1):
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(data.shape[0], n_queries, replace=False)
+    q = data[picks] + 0.1 * rng.standard_normal((n_queries, data.shape[1])).astype(
+        np.float32
+    )
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+
+def ground_truth(data, queries, k):
+    sims = queries @ data.T
+    return [set(np.argsort(-row)[:k].tolist()) for row in sims]
+
+
+def run(label, fn, queries, truth, k):
+    """Time fn(query) -> list of int ids and print latency + recall."""
+    latencies = []
+    hits = 0
+    for q, true_ids in zip(queries, truth):
+        t0 = time.perf_counter()
+        found = fn(q)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        hits += len(true_ids & set(found))
+    lat = sorted(latencies)
+    print(f"\n  {label} ({len(queries)} queries):")
+    print(f"    Mean:  {statistics.mean(lat):8.2f} ms")
+    print(f"    p50:   {statistics.median(lat):8.2f} ms")
+    print(f"    p95:   {lat[int(len(lat) * 0.95)]:8.2f} ms")
+    print(f"    p99:   {lat[min(len(lat) - 1, int(len(lat) * 0.99))]:8.2f} ms")
+    print(f"    recall@{k}: {hits / (len(queries) * k):.3f}")
+
+
+def surreal_search_fn(data, k):
+    """Load the corpus into a scratch SurrealDB table; return a query fn."""
+    from surrealdb import Surreal
+
+    db = Surreal(SURREAL_URL)
+    db.signin(
+        {
+            "username": os.environ.get("SURREAL_USER", "root"),
+            "password": os.environ.get("SURREAL_PASS", "root"),
+        }
+    )
+    db.use("memory", "bench")
+    db.query(f"REMOVE TABLE IF EXISTS {BENCH_TABLE}")
+    db.query(f"DEFINE TABLE {BENCH_TABLE} SCHEMALESS")
+    db.query(
+        f"DEFINE INDEX {BENCH_TABLE}_vec ON {BENCH_TABLE} FIELDS vector "
+        f"HNSW DIMENSION {data.shape[1]} TYPE F32 DIST COSINE EFC 150 M 12"
+    )
+    t0 = time.perf_counter()
+    for i, vec in enumerate(data):
+        db.query(f"UPSERT {BENCH_TABLE}:`{i}` SET vector = $v", {"v": vec.tolist()})
+    print(f"  SurrealDB load: {time.perf_counter() - t0:.1f}s")
+
+    def search(q):
+        rows = db.query(
+            f"SELECT id, vector::distance::knn() AS dist FROM {BENCH_TABLE} "
+            f"WHERE vector <|{k}, COSINE|> $vec ORDER BY dist ASC",
+            {"vec": q.tolist()},
+        )
+        return [int(str(r["id"].id)) for r in rows or []]
+
+    return search
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--n", type=int, default=10000)
+    ap.add_argument("--dim", type=int, default=4096)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--nprobe", type=int, default=8)
+    ap.add_argument("--surreal", action="store_true", help="also benchmark SurrealDB")
+    args = ap.parse_args()
+
+    print("=" * 60)
+    print(f"  Local ANN benchmark: n={args.n} dim={args.dim} k={args.k}")
+    print("=" * 60)
+
+    data = make_corpus(args.n, args.dim)
+    queries = make_queries(data, args.queries)
+    truth = ground_truth(data, queries, args.k)
+
+    with tempfile.TemporaryDirectory() as d:
+        idx = LocalANNIndex(d, dim=args.dim, nprobe=args.nprobe)
+        t0 = time.perf_counter()
+        idx.upsert([str(i) for i in range(args.n)], data)
+        idx.wait_for_training()
+        print(f"\n  Local index build: {time.perf_counter() - t0:.1f}s")
+        print(f"  {idx.stats()}")
+
+        def to_ints(hits):
+            return [int(i) for i, _ in hits]
+
+        run(
+            "Local flat (exact)",
+            lambda q: to_ints(idx.search(q, k=args.k, exact=True)),
+            queries,
+            truth,
+            args.k,
+        )
+        run(
+            f"Local IVF (nprobe={args.nprobe})",
+            lambda q: to_ints(idx.search(q, k=args.k)),
+            queries,
+            truth,
+            args.k,
+        )
+
+    if args.surreal:
+        try:
+            run(
+                "SurrealDB HNSW (ws://)",
+                surreal_search_fn(data, args.k),
+                queries,
+                truth,
+                args.k,
+            )
+        except Exception as e:
+            print(f"\n  SurrealDB benchmark skipped: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Benchmark: ConversationDAG ancestor index vs parent-pointer walk.
+
+Builds a synthetic DAG (default 100k nodes) made of long conversations that
+fork repeatedly, then measures per-call latency for:
+  1. get_ancestors via the segment/depth index (one range query)
+  2. the legacy parent walk (one SELECT per hop)
+  3. get_path (deep node -> its root)
+  4. lowest_common_ancestor between two forked leaves
+
+Reports p50/p95/p99 latencies and the mean chain length.
+
+Usage:
+    python3 benchmarks/benchmark_dag.py [--nodes 100000] [--fork-every 200] [--queries 200]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from shared.dag import ConversationDAG
+
+
+def build(dag, n_nodes, fork_every, seed=0):
+    """Grow conversations; every fork_every nodes, resume from a random past node."""
+    rng = random.Random(seed)
+    nodes = []
+    head = ""
+    for i in range(n_nodes):
+        if nodes and i % fork_every == 0:
+            head = rng.choice(nodes)
+        head = dag.add_node(head, "user" if i % 2 == 0 else "assistant", f"turn {i}")
+        nodes.append(head)
+    return nodes
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def run(label, fn, args_list):
+    latencies = []
+    sizes = []
+    for args in args_list:
+        t0 = time.perf_counter()
+        out = fn(*args)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        sizes.append(len(out) if isinstance(out, list) else 1)
+    print(
+        f"  {label:<28} p50={pct(latencies, 50):7.2f}ms  p95={pct(latencies, 95):7.2f}ms  "
+        f"p99={pct(latencies, 99):7.2f}ms  mean_len={statistics.mean(sizes):7.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=100000)
+    parser.add_argument("--fork-every", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        dag = ConversationDAG(os.path.join(d, "bench.db"))
+        t0 = time.perf_counter()
+        nodes = build(dag, args.nodes, args.fork_every)
+        build_s = time.perf_counter() - t0
+        segments = dag._db.execute("SELECT COUNT(*) FROM dag_segments").fetchone()[0]
+        print(
+            f"Built {args.nodes} nodes in {build_s:.1f}s "
+            f"({build_s / args.nodes * 1e6:.0f} µs/add_node), {segments} segments"
+        )
+
+        rng = random.Random(1)
+        # Bias toward the newest nodes: they have the deepest chains
+        picks = [nodes[-1 - rng.randrange(len(nodes) // 10)] for _ in range(args.queries)]
+        run("get_ancestors (index)", dag.get_ancestors, [(p,) for p in picks])
+        run("parent walk (legacy)", dag._walk_ancestors, [(p,) for p in picks])
+        roots = [(p, dag.get_ancestors(p)[0]["id"]) for p in picks]
+        run("get_path (leaf -> root)", dag.get_path, roots)
+        pairs = [(rng.choice(picks), rng.choice(picks)) for _ in range(args.queries)]
+        run(
+            "lowest_common_ancestor",
+            lambda a, b: dag.lowest_common_ancestor(a, b) or [],
+            pairs,
+        )
+        dag.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -252,50 +252,52 @@ def _extract_gate_effectiveness_suggestions():
 def _extract_git_context():
     """Extract current git state for session context priming.
 
+    The three git queries are independent, so they run as concurrent
+    subprocesses sharing one 5s budget.
+
     Returns dict with: branch, uncommitted_count, recent_commits (list of oneline strings).
     Returns None if not in a git repo or on error.
     """
     import subprocess
 
+    cwd = os.path.dirname(os.path.dirname(__file__))
+    commands = {
+        "branch": ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+        "status": ["git", "status", "--porcelain"],
+        "log": ["git", "log", "--oneline", "-5", "--no-decorate"],
+    }
+    procs = {}
     try:
-        cwd = os.path.dirname(os.path.dirname(__file__))
-
-        branch_result = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-            cwd=cwd,
-        )
-        if branch_result.returncode != 0:
+        for key, cmd in commands.items():
+            procs[key] = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                stdin=subprocess.DEVNULL,
+                text=True,
+                cwd=cwd,
+            )
+        deadline = time.monotonic() + 5
+        out = {}
+        for key, proc in procs.items():
+            stdout, _ = proc.communicate(timeout=max(0.0, deadline - time.monotonic()))
+            out[key] = (proc.returncode, stdout)
+
+        if out["branch"][0] != 0:
             return None
-        branch = branch_result.stdout.strip()
-
-        status_result = subprocess.run(
-            ["git", "status", "--porcelain"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-            cwd=cwd,
-        )
+        branch = out["branch"][1].strip()
+
+        status_rc, status_out = out["status"]
         uncommitted = (
-            len([l for l in status_result.stdout.strip().splitlines() if l.strip()])
-            if status_result.returncode == 0
+            len([l for l in status_out.strip().splitlines() if l.strip()])
+            if status_rc == 0
             else 0
         )
 
-        log_result = subprocess.run(
-            ["git", "log", "--oneline", "-5", "--no-decorate"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-            cwd=cwd,
-        )
+        log_rc, log_out = out["log"]
         commits = []
-        if log_result.returncode == 0:
-            commits = [
-                l.strip() for l in log_result.stdout.strip().splitlines() if l.strip()
-            ]
+        if log_rc == 0:
+            commits = [l.strip() for l in log_out.strip().splitlines() if l.strip()]
 
         return {
             "branch": branch,
@@ -304,6 +306,11 @@ def _extract_git_context():
         }
     except Exception:
         return None
+    finally:
+        for proc in procs.values():
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
 
 
 def _extract_gate_blocks():
@@ -0,0 +1,131 @@
+"""Dependency-aware boot step executor with per-step and overall deadlines.
+
+Boot steps (socket probes, daemon starts, memory injection, the Telegram L2
+subprocess, audit/state extraction, git) are mostly I/O-bound and
+independent, so they run on daemon threads as soon as their dependencies
+finish. Each step has its own time budget; the executor stops waiting at
+the overall deadline and hands back defaults for anything unfinished, so
+the dashboard renders from whatever is ready. Daemon threads never hold up
+interpreter exit.
+
+Public API:
+    BootStep(name, fn, deps=(), budget=5.0, default=None)
+    run_boot_steps(steps, deadline=8.0) -> (results, report)
+    format_step_report(report, total_ms) -> str
+"""
+
+import threading
+import time
+
+# Step outcomes recorded in the report
+OK = "ok"
+ERROR = "error"
+TIMEOUT = "timeout"
+SKIPPED = "skipped"
+
+
+class BootStep:
+    """One boot step: fn is called with each dependency's result as a kwarg."""
+
+    __slots__ = ("name", "fn", "deps", "budget", "default")
+
+    def __init__(self, name, fn, deps=(), budget=5.0, default=None):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.budget = budget
+        self.default = default
+
+
+def run_boot_steps(steps, deadline=8.0):
+    """Run steps concurrently in dependency order, bounded by deadline seconds.
+
+    Returns (results, report): results maps step name -> return value (or
+    the step's default on error/timeout/skip); report maps step name ->
+    {"status": ok|error|timeout|skipped, "ms": elapsed}. A step whose
+    dependency did not finish OK is skipped. Never raises for step failures.
+    """
+    by_name = {s.name: s for s in steps}
+    for s in steps:
+        for dep in s.deps:
+            if dep not in by_name:
+                raise ValueError(f"boot step {s.name!r} depends on unknown {dep!r}")
+
+    cond = threading.Condition()
+    results = {s.name: s.default for s in steps}
+    report = {}
+    started = {}  # name -> perf_counter at start
+    t0 = time.perf_counter()
+    end = t0 + deadline
+
+    def _run(step, kwargs):
+        status, value = OK, step.default
+        try:
+            value = step.fn(**kwargs)
+        except Exception:
+            status = ERROR
+        with cond:
+            # A step finishing after its budget already counts as timed out
+            if step.name not in report:
+                report[step.name] = {
+                    "status": status,
+                    "ms": round((time.perf_counter() - started[step.name]) * 1000, 1),
+                }
+                if status == OK:
+                    results[step.name] = value
+            cond.notify_all()
+
+    def _launch_ready():
+        """Start steps whose deps are settled; skip those with a failed dep."""
+        progressed = True
+        while progressed:
+            progressed = False
+            for step in steps:
+                if step.name in started or step.name in report:
+                    continue
+                if any(d not in report for d in step.deps):
+                    continue
+                if any(report[d]["status"] != OK for d in step.deps):
+                    report[step.name] = {"status": SKIPPED, "ms": 0.0}
+                    progressed = True
+                    continue
+                kwargs = {d: results[d] for d in step.deps}
+                started[step.name] = time.perf_counter()
+                threading.Thread(
+                    target=_run, args=(step, kwargs), name=f"boot-{step.name}", daemon=True
+                ).start()
+
+    with cond:
+        _launch_ready()
+        while len(report) < len(steps):
+            now = time.perf_counter()
+            # Expire running steps that overran their own budget
+            for name, t_start in started.items():
+                if name not in report and now - t_start >= by_name[name].budget:
+                    report[name] = {"status": TIMEOUT, "ms": round((now - t_start) * 1000, 1)}
+            _launch_ready()
+            if len(report) >= len(steps):
+                break
+            if now >= end:
+                for s in steps:
+                    if s.name not in report:
+                        ms = (now - started[s.name]) * 1000 if s.name in started else 0.0
+                        report[s.name] = {"status": TIMEOUT, "ms": round(ms, 1)}
+                break
+            wake = end
+            for name, t_start in started.items():
+                if name not in report:
+                    wake = min(wake, t_start + by_name[name].budget)
+            cond.wait(max(0.0, wake - now))
+    return results, report
+
+
+def format_step_report(report, total_ms):
+    """One-line summary: slowest steps first, non-OK outcomes flagged."""
+    parts = []
+    for name, info in sorted(report.items(), key=lambda kv: -kv[1]["ms"]):
+        label = f"{name} {info['ms']:.0f}ms"
+        if info["status"] != OK:
+            label += f" [{info['status']}]"
+        parts.append(label)
+    return f"[BOOT] Steps ({total_ms:.0f}ms wall): " + ", ".join(parts)
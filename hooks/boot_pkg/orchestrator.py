@@ -39,8 +39,12 @@ from boot_pkg.maintenance import (
     _rotate_audit_logs,
     sync_agent_models,
 )
+from boot_pkg.executor import BootStep, run_boot_steps, format_step_report
 from shared.context_compressor import compress_boot_state
 
+# Overall SessionStart budget for concurrent boot steps (seconds)
+BOOT_DEADLINE_S = 8.0
+
 try:
     from shared.ramdisk import ensure_ramdisk as _ramdisk_ensure, get_capture_queue
 
@@ -56,6 +60,249 @@ except ImportError:
     _HAS_GATE_HEALTH = False
 
 
+def _ensure_enforcer_daemon(cfg):
+    """Optionally start (or restart on code change) the enforcer daemon for fast gate checking."""
+    if cfg.get("enforcer_daemon", False):
+        _hooks_dir = os.path.join(CLAUDE_DIR, "hooks")
+        _daemon_path = os.path.join(_hooks_dir, "enforcer_daemon.py")
+        _sock_path = os.path.join(_hooks_dir, ".enforcer.sock")
+        _hash_path = os.path.join(_hooks_dir, ".enforcer_hash")
+        _pid_path = os.path.join(_hooks_dir, ".enforcer.pid")
+
+        # Hash gate/shared module mtimes to detect code changes
+        import hashlib as _hashlib
+
+        _mtimes = []
+        for _subdir in ("gates", "shared"):
+            _dirpath = os.path.join(_hooks_dir, _subdir)
+            if os.path.isdir(_dirpath):
+                for _fname in sorted(os.listdir(_dirpath)):
+                    if _fname.endswith(".py"):
+                        try:
+                            _st = os.stat(os.path.join(_dirpath, _fname))
+                            _mtimes.append(
+                                f"{_fname}:{_st.st_mtime_ns}:{_st.st_size}"
+                            )
+                        except OSError:
+                            pass
+        for _fname in ("enforcer.py", "enforcer_daemon.py"):
+            try:
+                _st = os.stat(os.path.join(_hooks_dir, _fname))
+                _mtimes.append(f"{_fname}:{_st.st_mtime_ns}:{_st.st_size}")
+            except OSError:
+                pass
+        _current_hash = _hashlib.md5("|".join(_mtimes).encode()).hexdigest()[:16]
+
+        _stored_hash = ""
+        try:
+            with open(_hash_path) as _f:
+                _stored_hash = _f.read().strip()
+        except OSError:
+            pass
+
+        # Ping daemon
+        _daemon_running = False
+        if os.path.exists(_sock_path):
+            try:
+                import socket as _sock
+
+                _s = _sock.socket(_sock.AF_UNIX, _sock.SOCK_STREAM)
+                _s.settimeout(1)
+                _s.connect(_sock_path)
+                _s.sendall(b'{"method":"ping"}\n')
+                _resp = _s.recv(1024)
+                _s.close()
+                _daemon_running = b"pong" in _resp
+            except Exception:
+                pass
+
+        _needs_restart = _daemon_running and _current_hash != _stored_hash
+        _needs_start = not _daemon_running
+
+        if _needs_restart:
+            try:
+                with open(_pid_path) as _f:
+                    _old_pid = int(_f.read().strip())
+                os.kill(_old_pid, 15)  # SIGTERM
+                time.sleep(0.5)
+            except (OSError, ValueError):
+                pass
+            _needs_start = True
+
+        if _needs_start and os.path.isfile(_daemon_path):
+            subprocess.Popen(
+                [sys.executable, _daemon_path],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+            time.sleep(0.3)
+            if _needs_restart:
+                print(
+                    "  [BOOT] Enforcer daemon restarted (code changed)",
+                    file=sys.stderr,
+                )
+            else:
+                print("  [BOOT] Enforcer daemon started", file=sys.stderr)
+        elif _daemon_running and not _needs_restart:
+            print(
+                "  [BOOT] Enforcer daemon already running (hash match)",
+                file=sys.stderr,
+            )
+
+        # Write current hash
+        try:
+            _tmp_hash = _hash_path + ".tmp"
+            with open(_tmp_hash, "w") as _f:
+                _f.write(_current_hash)
+            os.replace(_tmp_hash, _hash_path)
+        except OSError:
+            pass
+
+        # Register this session's parent PID for daemon auto-exit
+        try:
+            import socket as _sock
+
+            _s = _sock.socket(_sock.AF_UNIX, _sock.SOCK_STREAM)
+            _s.settimeout(2)
+            _s.connect(_sock_path)
+            _reg = json.dumps({"method": "register", "pid": os.getppid()}) + "\n"
+            _s.sendall(_reg.encode())
+            _s.recv(1024)
+            _s.close()
+        except Exception:
+            pass
+
+
+def _ensure_memory_server():
+    """Auto-start memory server (streamable-http, default transport) if not listening."""
+    _mem_server_path = os.path.join(CLAUDE_DIR, "hooks", "memory_server.py")
+    _mem_port = int(os.environ.get("MEMORY_SSE_PORT", "8742"))
+    if os.path.isfile(_mem_server_path):
+        _mem_running = False
+        try:
+            import socket as _sock
+
+            _s = _sock.socket(_sock.AF_INET, _sock.SOCK_STREAM)
+            _s.settimeout(1)
+            _s.connect(("127.0.0.1", _mem_port))
+            _s.close()
+            _mem_running = True
+        except Exception:
+            pass
+        if not _mem_running:
+            subprocess.Popen(
+                [sys.executable, _mem_server_path, "--port", str(_mem_port)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+            print(
+                f"  [BOOT] Memory server started (streamable-http, port {_mem_port})",
+                file=sys.stderr,
+            )
+        else:
+            print(
+                f"  [BOOT] Memory server already running (port {_mem_port})",
+                file=sys.stderr,
+            )
+
+
+def _batch_classify(cfg):
+    """Batch classification at session start (via memory_server UDS socket)."""
+    if cfg.get("memory_classify_mode") == "batch_start":
+        sys.path.insert(0, os.path.join(CLAUDE_DIR, "hooks"))
+        from shared.memory_socket import request as _socket_request
+
+        _result = _socket_request("batch_classify", params={"limit": 200})
+        _classified_batch = (
+            _result.get("classified", 0) if isinstance(_result, dict) else 0
+        )
+        print(
+            f"  [BOOT] Batch classified {_classified_batch} memories",
+            file=sys.stderr,
+        )
+
+
+def _query_telegram_l2(project_name, live_state):
+    """Telegram L2 memory: search Saved Messages for relevant context."""
+    _tg_hook = os.path.join(
+        CLAUDE_DIR, "integrations", "telegram-bot", "hooks", "on_session_start.py"
+    )
+    if not os.path.isfile(_tg_hook):
+        return []
+    _tg_query = f"{project_name} {live_state.get('feature', '')}"
+    _tg_result = subprocess.run(
+        [sys.executable, _tg_hook, _tg_query[:200]],
+        capture_output=True,
+        text=True,
+        timeout=10,
+        stdin=subprocess.DEVNULL,
+    )
+    if _tg_result.returncode == 0 and _tg_result.stdout.strip():
+        _tg_data = json.loads(_tg_result.stdout)
+        return _tg_data.get("results", [])[:3]
+    return []
+
+
+def _load_config():
+    """Read ~/.claude/config.json ({} when missing or unreadable)."""
+    try:
+        with open(os.path.join(CLAUDE_DIR, "config.json")) as _f:
+            cfg = json.load(_f)
+        return cfg if isinstance(cfg, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _boot_steps(cfg, live_state, project_name):
+    """Independent boot work as executor steps (name, budget, fallback value).
+
+    Only memory injection waits on another step (the UDS probe); everything
+    else starts immediately. Audit/state extraction runs before
+    reset_enforcement_state() because main() waits for the executor first.
+    """
+    return [
+        BootStep(
+            "worker_probe",
+            lambda: socket_available(retries=1, delay=0.1),
+            budget=2.0,
+            default=False,
+        ),
+        BootStep("enforcer_daemon", lambda: _ensure_enforcer_daemon(cfg), budget=5.0),
+        BootStep("memory_server", _ensure_memory_server, budget=3.0),
+        BootStep("batch_classify", lambda: _batch_classify(cfg), budget=5.0),
+        BootStep(
+            "memory_inject",
+            lambda worker_probe: (
+                inject_memories_via_socket(live_state) if worker_probe else []
+            ),
+            deps=("worker_probe",),
+            budget=4.0,
+            default=[],
+        ),
+        BootStep(
+            "telegram_l2",
+            lambda: _query_telegram_l2(project_name, live_state),
+            budget=10.0,
+            default=[],
+        ),
+        BootStep(
+            "gate_effectiveness",
+            _extract_gate_effectiveness_suggestions,
+            budget=3.0,
+            default=([], {}),
+        ),
+        BootStep("recent_errors", _extract_recent_errors, budget=2.0, default=[]),
+        BootStep("tool_activity", _extract_tool_activity, budget=2.0, default=(0, None)),
+        BootStep("test_status", _extract_test_status, budget=2.0),
+        BootStep("verification", _extract_verification_quality, budget=2.0),
+        BootStep("session_duration", _extract_session_duration, budget=2.0),
+        BootStep("gate_blocks", _extract_gate_blocks, budget=3.0, default=0),
+        BootStep("git_context", _extract_git_context, budget=5.0),
+    ]
+
+
 def main():
     # Bot subprocess sessions are lightweight — skip heavy boot
     if os.environ.get("TORUS_BOT_SESSION") == "1":
@@ -195,184 +442,30 @@ def main():
             ]
         )
 
-    # Check if UDS worker (memory_server.py) is available
-    _worker_available = False
-    try:
-        _worker_available = socket_available(retries=1, delay=0.1)
-    except Exception:
-        pass
-
-    # Optionally start enforcer daemon for fast gate checking
-    try:
-        _cfg_path = os.path.join(CLAUDE_DIR, "config.json")
-        _cfg = {}
-        if os.path.isfile(_cfg_path):
-            with open(_cfg_path) as _f:
-                _cfg = json.load(_f)
-        if _cfg.get("enforcer_daemon", False):
-            _hooks_dir = os.path.join(CLAUDE_DIR, "hooks")
-            _daemon_path = os.path.join(_hooks_dir, "enforcer_daemon.py")
-            _sock_path = os.path.join(_hooks_dir, ".enforcer.sock")
-            _hash_path = os.path.join(_hooks_dir, ".enforcer_hash")
-            _pid_path = os.path.join(_hooks_dir, ".enforcer.pid")
-
-            # Hash gate/shared module mtimes to detect code changes
-            import hashlib as _hashlib
-
-            _mtimes = []
-            for _subdir in ("gates", "shared"):
-                _dirpath = os.path.join(_hooks_dir, _subdir)
-                if os.path.isdir(_dirpath):
-                    for _fname in sorted(os.listdir(_dirpath)):
-                        if _fname.endswith(".py"):
-                            try:
-                                _st = os.stat(os.path.join(_dirpath, _fname))
-                                _mtimes.append(
-                                    f"{_fname}:{_st.st_mtime_ns}:{_st.st_size}"
-                                )
-                            except OSError:
-                                pass
-            for _fname in ("enforcer.py", "enforcer_daemon.py"):
-                try:
-                    _st = os.stat(os.path.join(_hooks_dir, _fname))
-                    _mtimes.append(f"{_fname}:{_st.st_mtime_ns}:{_st.st_size}")
-                except OSError:
-                    pass
-            _current_hash = _hashlib.md5("|".join(_mtimes).encode()).hexdigest()[:16]
-
-            _stored_hash = ""
-            try:
-                with open(_hash_path) as _f:
-                    _stored_hash = _f.read().strip()
-            except OSError:
-                pass
-
-            # Ping daemon
-            _daemon_running = False
-            if os.path.exists(_sock_path):
-                try:
-                    import socket as _sock
-
-                    _s = _sock.socket(_sock.AF_UNIX, _sock.SOCK_STREAM)
-                    _s.settimeout(1)
-                    _s.connect(_sock_path)
-                    _s.sendall(b'{"method":"ping"}\n')
-                    _resp = _s.recv(1024)
-                    _s.close()
-                    _daemon_running = b"pong" in _resp
-                except Exception:
-                    pass
-
-            _needs_restart = _daemon_running and _current_hash != _stored_hash
-            _needs_start = not _daemon_running
-
-            if _needs_restart:
-                try:
-                    with open(_pid_path) as _f:
-                        _old_pid = int(_f.read().strip())
-                    os.kill(_old_pid, 15)  # SIGTERM
-                    time.sleep(0.5)
-                except (OSError, ValueError):
-                    pass
-                _needs_start = True
-
-            if _needs_start and os.path.isfile(_daemon_path):
-                subprocess.Popen(
-                    [sys.executable, _daemon_path],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                    start_new_session=True,
-                )
-                time.sleep(0.3)
-                if _needs_restart:
-                    print(
-                        "  [BOOT] Enforcer daemon restarted (code changed)",
-                        file=sys.stderr,
-                    )
-                else:
-                    print("  [BOOT] Enforcer daemon started", file=sys.stderr)
-            elif _daemon_running and not _needs_restart:
-                print(
-                    "  [BOOT] Enforcer daemon already running (hash match)",
-                    file=sys.stderr,
-                )
-
-            # Write current hash
-            try:
-                _tmp_hash = _hash_path + ".tmp"
-                with open(_tmp_hash, "w") as _f:
-                    _f.write(_current_hash)
-                os.replace(_tmp_hash, _hash_path)
-            except OSError:
-                pass
-
-            # Register this session's parent PID for daemon auto-exit
-            try:
-                import socket as _sock
-
-                _s = _sock.socket(_sock.AF_UNIX, _sock.SOCK_STREAM)
-                _s.settimeout(2)
-                _s.connect(_sock_path)
-                _reg = json.dumps({"method": "register", "pid": os.getppid()}) + "\n"
-                _s.sendall(_reg.encode())
-                _s.recv(1024)
-                _s.close()
-            except Exception:
-                pass
-    except Exception:
-        pass  # Daemon startup is optional, never block boot
-
-    # Auto-start memory server (streamable-http, default transport)
-    try:
-        _mem_server_path = os.path.join(CLAUDE_DIR, "hooks", "memory_server.py")
-        _mem_port = int(os.environ.get("MEMORY_SSE_PORT", "8742"))
-        if os.path.isfile(_mem_server_path):
-            _mem_running = False
-            try:
-                import socket as _sock
-
-                _s = _sock.socket(_sock.AF_INET, _sock.SOCK_STREAM)
-                _s.settimeout(1)
-                _s.connect(("127.0.0.1", _mem_port))
-                _s.close()
-                _mem_running = True
-            except Exception:
-                pass
-            if not _mem_running:
-                subprocess.Popen(
-                    [sys.executable, _mem_server_path, "--port", str(_mem_port)],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                    start_new_session=True,
-                )
-                print(
-                    f"  [BOOT] Memory server started (streamable-http, port {_mem_port})",
-                    file=sys.stderr,
-                )
-            else:
-                print(
-                    f"  [BOOT] Memory server already running (port {_mem_port})",
-                    file=sys.stderr,
-                )
-    except Exception:
-        pass  # Memory server startup is optional, never block boot
-
-    # Batch classification at session start (via memory_server UDS socket)
-    try:
-        if _cfg.get("memory_classify_mode") == "batch_start":
-            sys.path.insert(0, os.path.join(CLAUDE_DIR, "hooks"))
-            from shared.memory_socket import request as _socket_request
-
-            _result = _socket_request("batch_classify", params={"limit": 200})
-            _classified_batch = (
-                _result.get("classified", 0) if isinstance(_result, dict) else 0
-            )
-            print(
-                f"  [BOOT] Batch classified {_classified_batch} memories",
-                file=sys.stderr,
-            )
-    except Exception:
-        pass  # Batch classification is non-fatal
+    # Run independent boot steps concurrently; the dashboard renders from
+    # whatever finished before the deadline (config.json boot_deadline_s)
+    _cfg = _load_config()
+    _boot_t0 = time.perf_counter()
+    _steps, _step_report = run_boot_steps(
+        _boot_steps(_cfg, live_state, project_name),
+        deadline=float(_cfg.get("boot_deadline_s", BOOT_DEADLINE_S)),
+    )
+    print(
+        format_step_report(_step_report, (time.perf_counter() - _boot_t0) * 1000),
+        file=sys.stderr,
+    )
+    _worker_available = bool(_steps["worker_probe"])
+    injected = _steps["memory_inject"] or []
+    tg_memories = _steps["telegram_l2"] or []
+    gate_suggestions, gate_overrides = _steps["gate_effectiveness"]
+    # Extracted BEFORE reset_enforcement_state() wipes them
+    recent_errors = _steps["recent_errors"]
+    tool_call_count, tool_summary = _steps["tool_activity"]
+    test_status = _steps["test_status"]
+    verification = _steps["verification"]
+    session_duration = _steps["session_duration"]
+    gate_blocks = _steps["gate_blocks"]
+    git_context = _steps["git_context"]
 
     # Watchdog: verify SurrealDB directory exists
     db_size_warning = None
@@ -386,59 +479,6 @@ def main():
     except OSError:
         pass
 
-    # Inject relevant memories (timeout-safe — socket may accept but worker stall)
-    injected = []
-    if _worker_available:
-        try:
-            injected = inject_memories_via_socket(live_state)
-        except Exception:
-            pass  # Memory injection failure must never crash boot
-
-    # Telegram L2 memory: search Saved Messages for relevant context
-    tg_memories = []
-    try:
-        _tg_hook = os.path.join(
-            CLAUDE_DIR, "integrations", "telegram-bot", "hooks", "on_session_start.py"
-        )
-        if os.path.isfile(_tg_hook):
-            _tg_query = f"{project_name} {live_state.get('feature', '')}"
-            _tg_result = subprocess.run(
-                [sys.executable, _tg_hook, _tg_query[:200]],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                stdin=subprocess.DEVNULL,
-            )
-            if _tg_result.returncode == 0 and _tg_result.stdout.strip():
-                _tg_data = json.loads(_tg_result.stdout)
-                tg_memories = _tg_data.get("results", [])[:3]
-    except Exception:
-        pass  # Telegram integration is optional
-
-    # Extract gate effectiveness suggestions + auto-tune overrides (self-evolving)
-    gate_suggestions, gate_overrides = _extract_gate_effectiveness_suggestions()
-
-    # Extract recent errors BEFORE reset_enforcement_state() wipes them
-    recent_errors = _extract_recent_errors()
-
-    # Extract tool activity from last session
-    tool_call_count, tool_summary = _extract_tool_activity()
-
-    # Extract test status from last session
-    test_status = _extract_test_status()
-
-    # Extract verification quality from last session
-    verification = _extract_verification_quality()
-
-    # Extract session duration from last session
-    session_duration = _extract_session_duration()
-
-    # Extract gate blocks from audit log
-    gate_blocks = _extract_gate_blocks()
-
-    # Extract git context for session priming
-    git_context = _extract_git_context()
-
     # Build dashboard
     dashboard = f"""
 +====================================================================+
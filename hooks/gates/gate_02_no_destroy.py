@@ -16,11 +16,11 @@ executed accidentally by an AI assistant.
 
 import os
 import re
-import shlex
 import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from shared.gate_result import GateResult
+from shared.shell_command import parse_command
 
 GATE_NAME = "GATE 2: NO DESTROY"
 
@@ -102,7 +102,7 @@ DANGEROUS_PATTERNS = [
 # too high; destructive payloads still caught by their own patterns e.g. rm -rf, git push --force).
 SAFE_EXCEPTIONS = [
     # source: handled by _source_is_safe() below (path validation with realpath)
-    # exec: handled by _exec_is_safe() below (shlex-based, not regex)
+    # exec: handled by _exec_is_safe() below (parsed argv, not regex)
     # DELETE FROM: allow targeted SQL deletes that include a WHERE clause
     ("DELETE FROM (SQL mass deletion)", r"\bDELETE\s+FROM\s+\S+\s+WHERE\b"),
     # git stash drop: allow dropping a specific numbered stash reference
@@ -121,23 +121,21 @@ def _is_safe_exception(command, description):
         if exc_desc == description and re.search(exc_pattern, command, re.IGNORECASE):
             return True
 
-    # Special case: exec interpreter hand-off (shlex-based tokenization)
+    # Special case: exec interpreter hand-off (parsed argv)
     if description == "exec (replace current process)":
         return _exec_is_safe(command)
 
     # Special case: <<< here-strings are safe when not feeding to a shell
+    # Handles: wc -w <<< "hello", grep -c "x" <<< "$var"
     if description == "heredoc execution (<<<)":
-        # Extract the command word immediately before <<<
-        # Handles: wc -w <<< "hello", grep -c "x" <<< "$var"
-        m = re.search(r"\b(\w+)\b[^|;&]*<<<", command)
-        if m and m.group(1).lower() not in ("bash", "sh", "zsh", "eval", "exec"):
-            return True
+        return _redirect_feeds_safe_program(
+            command, ("<<<",), {"bash", "sh", "zsh", "eval", "exec"}
+        )
 
     # Special case: << heredocs are safe when feeding to non-shell commands
+    # Safe: cat << EOF, wc << EOF, tee << EOF
+    # Dangerous: bash << EOF, sh << EOF, python3 << EOF
     if description == "heredoc input (<<)":
-        # Extract the command word before <<
-        # Safe: cat << EOF, wc << EOF, tee << EOF
-        # Dangerous: bash << EOF, sh << EOF, python3 << EOF
         DANGEROUS_HEREDOC_CMDS = {
             "bash",
             "sh",
@@ -151,9 +149,9 @@ def _is_safe_exception(command, description):
             "ruby",
             "perl",
         }
-        m = re.search(r"\b(\w+)\b[^|;&]*(?<!<)<<(?!<)", command)
-        if m and m.group(1).lower() not in DANGEROUS_HEREDOC_CMDS:
-            return True
+        return _redirect_feeds_safe_program(
+            command, ("<<", "<<-"), DANGEROUS_HEREDOC_CMDS
+        )
 
     # Special case: source with symlink validation
     if description == "source (execute script in current shell)":
@@ -162,50 +160,75 @@ def _is_safe_exception(command, description):
     return False
 
 
+def _redirect_feeds_safe_program(command, ops, dangerous):
+    """True if every command carrying one of the redirect ops runs a program
+    outside `dangerous` (and at least one such command exists)."""
+    found = False
+    for cmd in parse_command(command).commands:
+        if not any(r.op in ops for r in cmd.redirects):
+            continue
+        found = True
+        if cmd.program.lower() in dangerous or not cmd.program:
+            return False
+    return found
+
+
 def _rm_has_recursive_and_force(command):
     """Check if an rm command has both recursive and force flags anywhere in its arguments.
 
-    Uses shlex tokenization to handle flag ordering like: rm -r somedir -f
+    Walks the parsed argv of every simple command (including ones inside
+    substitutions and -c payloads) to handle flag ordering like: rm -r somedir -f
     """
-    try:
-        tokens = shlex.split(command)
-    except ValueError:
-        # If shlex can't parse it, fall back to simple split
-        tokens = command.split()
-
-    # Find rm commands (including with full path like /usr/bin/rm)
-    for i, token in enumerate(tokens):
-        basename = os.path.basename(token)
-        if basename != "rm":
-            continue
-        # Check remaining tokens for both -r/--recursive and -f/--force
-        rest = tokens[i + 1 :]
-        has_recursive = False
-        has_force = False
-        for arg in rest:
-            if arg == "--":
-                break  # End of flags
-            if arg.startswith("-") and not arg.startswith("--"):
-                # Short flags like -r, -f, -v, or combined like -rv
-                flags = arg[1:]
-                if "r" in flags:
+    for cmd in parse_command(command).commands:
+        tokens = cmd.argv
+        # Find rm invocations (including full paths like /usr/bin/rm, xargs rm)
+        for i, token in enumerate(tokens):
+            if os.path.basename(token) != "rm":
+                continue
+            # Check remaining arguments for both -r/--recursive and -f/--force
+            has_recursive = False
+            has_force = False
+            for arg in tokens[i + 1 :]:
+                if arg == "--":
+                    break  # End of flags
+                if arg.startswith("-") and not arg.startswith("--"):
+                    # Short flags like -r, -f, -v, or combined like -rv
+                    flags = arg[1:]
+                    if "r" in flags or "R" in flags:
+                        has_recursive = True
+                    if "f" in flags:
+                        has_force = True
+                elif arg == "--recursive":
                     has_recursive = True
-                if "f" in flags:
+                elif arg == "--force":
                     has_force = True
-            elif arg == "--recursive":
-                has_recursive = True
-            elif arg == "--force":
-                has_force = True
-        if has_recursive and has_force:
-            return True
+            if has_recursive and has_force:
+                return True
+    return False
+
+
+def _git_push_forces(command):
+    """Check if a git push carries a force flag, including combined short flags (-uf)."""
+    for cmd in parse_command(command).find("git"):
+        args = cmd.args
+        if "push" not in args:
+            continue
+        for arg in args[args.index("push") + 1 :]:
+            if arg == "--":
+                break
+            if arg == "--force" or arg.startswith("--force-with-lease"):
+                return True
+            if arg.startswith("-") and not arg.startswith("--") and "f" in arg[1:]:
+                return True
     return False
 
 
 def _exec_is_safe(command):
     """Check if an exec command is a safe interpreter hand-off.
 
-    Uses shlex tokenization to detect -c/-e flags and heredoc << anywhere
-    in the argument list, not just immediately after the interpreter name.
+    Uses the parsed argv to detect -c/-e flags anywhere in the argument list
+    (not just immediately after the interpreter name) and heredoc redirects.
+    Every exec in the command line must be a safe hand-off.
     This fixes the flag-interleaving bypass where 'exec python3 -W default -c "code"'
     would slip past a regex-based negative lookahead.
 
@@ -227,15 +250,13 @@ def _exec_is_safe(command):
     SAFE_MULTI_WORD = {("cargo", "run"), ("go", "run")}
     DANGEROUS_FLAGS = {"-c", "-e"}
 
-    try:
-        tokens = shlex.split(command)
-    except ValueError:
-        tokens = command.split()
-
-    for i, token in enumerate(tokens):
-        if token != "exec":
+    found = False
+    for cmd in parse_command(command).commands:
+        tokens = cmd.argv
+        if "exec" not in tokens:
             continue
-        rest = tokens[i + 1 :]
+        found = True
+        rest = tokens[tokens.index("exec") + 1 :]
         if not rest:
             return False
 
@@ -250,16 +271,14 @@ def _exec_is_safe(command):
             else:
                 return False
 
-        # Scan ALL remaining args for dangerous flags or heredoc input
+        # Scan ALL remaining args for dangerous flags, and refuse heredoc input
         for arg in rest[args_start:]:
             if arg in DANGEROUS_FLAGS:
                 return False
-            if arg.startswith("<<"):
-                return False
-
-        return True
+        if any(r.op in ("<<", "<<-", "<<<") for r in cmd.redirects):
+            return False
 
-    return False
+    return found
 
 
 def _source_is_safe(command):
@@ -290,40 +309,32 @@ def _source_is_safe(command):
         "/opt/",  # Optional packages
     ]
 
-    # Extract the path argument from the source command
-    m = re.search(r"\bsource\s+(\S+)", command)
-    if not m:
-        return False
-
-    source_path = m.group(1)
-    basename = os.path.basename(source_path)
-
-    # Check filename matches a known-safe name
-    if basename not in SAFE_FILENAMES:
-        return False
+    found = False
+    for cmd in parse_command(command).find("source"):
+        args = cmd.args
+        if not args:
+            return False
+        found = True
+        source_path = args[0]
 
-    # Resolve symlinks and validate the real path is in an allowed directory
-    try:
-        real_path = os.path.realpath(source_path)
-    except (OSError, ValueError):
-        return False
+        # Check filename matches a known-safe name
+        if os.path.basename(source_path) not in SAFE_FILENAMES:
+            return False
 
-    for prefix in ALLOWED_PREFIXES:
-        if real_path.startswith(prefix):
-            return True
+        # Resolve symlinks and validate the real path is in an allowed directory
+        try:
+            real_path = os.path.realpath(source_path)
+        except (OSError, ValueError):
+            return False
 
-    return False
+        if not any(real_path.startswith(prefix) for prefix in ALLOWED_PREFIXES):
+            return False
 
+    return found
 
-def _strip_data_args(command):
-    """Return command with quoted data arguments replaced by placeholders.
 
-    Uses shlex to identify quoted tokens that are arguments to non-shell
-    commands (git -m "msg", echo "text", grep "pattern"). Replaces them
-    with __DATA__ so pattern scanning only hits actual command tokens.
-    Only strips args to commands that cannot execute their arguments.
-    """
-    SHELL_CMDS = {
+_SHELL_CMDS = frozenset(
+    {
         "bash",
         "sh",
         "zsh",
@@ -336,43 +347,97 @@ def _strip_data_args(command):
         "ruby",
         "perl",
     }
-    try:
-        tokens = shlex.split(command)
-    except ValueError:
+)
+# Programs whose arguments are themselves run as a command or a program
+_EXEC_ARG_CMDS = frozenset(
+    {"awk", "gawk", "mawk", "nawk", "xargs", "parallel", "watch", "ssh"}
+)
+_DECLARATION_CMDS = frozenset({"export", "declare", "local", "readonly", "typeset"})
+
+
+def _runs_rest(program, words, i):
+    """True if words[i] starts arguments that `program` will execute.
+
+    Covers interpreters named anywhere in argv (timeout 5 sh -c ...), any
+    -c flag, find -exec/-ok, and git's alias.*=!cmd, bisect run and
+    rebase -x/--exec.
+    """
+    text = words[i].text
+    if os.path.basename(text) in _SHELL_CMDS | _EXEC_ARG_CMDS or text == "-c":
+        return True
+    if program == "find":
+        return text in ("-exec", "-execdir", "-ok", "-okdir")
+    if program == "git":
+        return (
+            text.startswith("alias.")
+            or text in ("-x", "--exec")
+            or text.startswith("--exec=")
+            or (text == "run" and i > 0 and words[i - 1].text == "bisect")
+        )
+    return False
+
+
+def _substitutions_in(word, substitutions):
+    """The outermost $(...)/`...` bodies inside word, as $(...) text."""
+    inside = [s for s in substitutions if s and s in word.raw]
+    outer = [s for s in inside if not any(s != o and s in o for o in inside)]
+    return ["$(" + s + ")" for s in outer]
+
+
+def _strip_data_args(command):
+    """Return command with quoted data arguments replaced by placeholders.
+
+    Uses the parsed command to identify quoted words that are arguments to
+    non-shell commands (git -m "msg", echo "text", grep "pattern"). Replaces
+    them with __DATA__ so pattern scanning only hits actual command tokens.
+    Only strips args to commands that cannot execute their arguments:
+    nothing from an interpreter name, -c, find -exec or git's alias/bisect
+    run/rebase -x onwards, and nothing at all for awk, xargs and the like.
+
+    Values that may be run later are never stripped: NAME=value words and
+    the arguments of declaration builtins (export c="rm -rf /"). When any
+    command's program is a parameter expansion ($c, "${c}") nothing is
+    stripped, since its text came from somewhere else in the line. A word
+    with command substitution keeps its $(...) parts visible.
+    """
+    parsed = parse_command(command)
+    if not parsed.ok:
         return command  # Malformed quoting — scan raw (safe default)
 
-    if not tokens:
+    if any(
+        "$" in cmd.words[cmd.program_index].raw
+        for cmd in parsed.commands
+        if cmd.program_index >= 0
+    ):
         return command
 
-    # If the pipeline feeds into a shell, "data" args are executable code — don't strip
-    for i, token in enumerate(tokens):
-        if token == "|" and i + 1 < len(tokens):
-            if os.path.basename(tokens[i + 1]) in SHELL_CMDS:
-                return command
-
-    # Find the base command (skip env vars, sudo, etc.)
-    cmd_base = None
-    for t in tokens:
-        if "=" not in t and t not in ("sudo", "env", "nice", "nohup", "time"):
-            cmd_base = os.path.basename(t)
-            break
-
-    # If the command is a shell, don't strip anything — all args could be code
-    if cmd_base and cmd_base in SHELL_CMDS:
-        return command
+    # A pipeline that runs a shell (echo 'x' | bash, bash -c "...") treats its
+    # "data" args as executable code — leave the whole pipeline unstripped
+    shell_pipelines = {
+        cmd.pipeline for cmd in parsed.commands if cmd.program in _SHELL_CMDS
+    }
 
-    # Rebuild command, replacing quoted multi-word tokens with placeholder
+    # Replace quoted multi-word arguments of top-level non-shell commands.
     result = command
-    for token in tokens:
-        # Only strip tokens that were quoted in the original (contain spaces
-        # or special chars that would require quoting)
-        if " " in token or any(c in token for c in ";&|<>()$`"):
-            # Replace the quoted form (single or double quotes)
-            for q in ('"', "'"):
-                quoted = f"{q}{token}{q}"
-                if quoted in result:
-                    result = result.replace(quoted, "__DATA__", 1)
-                    break
+    for cmd in parsed.commands:
+        if cmd.depth or cmd.pipeline in shell_pipelines:
+            continue
+        if cmd.program_index < 0 or cmd.program in _DECLARATION_CMDS | _EXEC_ARG_CMDS:
+            continue
+        words = cmd.words[cmd.program_index + 1 :]
+        for i, word in enumerate(words):
+            if _runs_rest(cmd.program, words, i):
+                break
+            if not word.quoted or word.is_assignment:
+                continue
+            token = word.text
+            if " " in token or any(c in token for c in ";&|<>()$`"):
+                if word.raw in result:
+                    placeholder = "__DATA__"
+                    if word.substituted:
+                        subs = _substitutions_in(word, parsed.substitutions)
+                        placeholder = " ".join([placeholder] + subs)
+                    result = result.replace(word.raw, placeholder, 1)
     return result
 
 
@@ -411,4 +476,12 @@ def check(tool_name, tool_input, state, event_type="PreToolUse"):
             gate_name=GATE_NAME,
         )
 
+    # Check for force push via combined short flags (e.g., git push -uf)
+    if _git_push_forces(command):
+        return GateResult(
+            blocked=True,
+            message=f"[{GATE_NAME}] BLOCKED: Detected 'git push with a force flag' in command. This is a destructive operation.",
+            gate_name=GATE_NAME,
+        )
+
     return GateResult(blocked=False, gate_name=GATE_NAME)
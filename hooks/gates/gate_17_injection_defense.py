@@ -27,6 +27,19 @@ Homoglyph detection (via _check_homoglyphs):
 - Specific Cyrillic/Greek->Latin confusable character mapping
 - Mixed-script text that appears ASCII but contains homoglyph substitutions
 
+Scanning cost (every large external tool result passes through here):
+- Each rule is probed over one case-folded copy of the text with a literal
+  leading token, so the regex engine skips ahead with a fast substring
+  search instead of trying every position under IGNORECASE. Rules are only
+  re-run in their original form for categories that hit (to report the
+  exact match).
+- Unicode checks are a no-op for ASCII text and one character-class search
+  each otherwise; homoglyph translation uses str.translate.
+- Results larger than _WINDOW_CHARS scan rules of bounded width in
+  overlapping windows; any rule whose match can be longer than the overlap
+  (\\s+, .*, {n,}) or that uses lookaround is scanned over the whole text,
+  so no match is lost at a window boundary.
+
 PostToolUse: scans tool result content.
 PreToolUse: scans tool input string fields for hidden payloads.
 Threat levels: critical/high -> warn (PostToolUse) / block (PreToolUse),
@@ -40,6 +53,11 @@ import os
 import re
 import sys
 
+try:
+    from re import _parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from shared.gate_result import GateResult
 
@@ -104,7 +122,7 @@ _OBFUSCATION_PATTERNS = [
     re.compile(
         r"\\u[0-9a-fA-F]{4}.*\\u[0-9a-fA-F]{4}.*ignore", re.IGNORECASE
     ),  # unicode escapes + injection
-    re.compile(r"(?:&#x?[0-9a-fA-F]+;){5,}"),  # excessive HTML entities
+    re.compile(r"&#x?[0-9a-fA-F]+;(?:&#x?[0-9a-fA-F]+;){4,}"),  # 5+ HTML entities
     re.compile(r"eval\s*\(\s*atob\s*\(", re.IGNORECASE),  # JS base64 decode
 ]
 
@@ -169,8 +187,11 @@ _CONFUSABLE_PATTERN = re.compile(
     r"[\u0400-\u04FF\u0370-\u03FF]"  # Cyrillic or Greek block
 )
 
-# Hex-encoded string pattern: sequences of \xNN or %NN
-_HEX_ENCODED_PATTERN = re.compile(r"(?:\\x[0-9a-fA-F]{2}){4,}|(?:%[0-9a-fA-F]{2}){4,}")
+# Hex-encoded string pattern: 4+ sequences of \xNN or %NN
+_HEX_ENCODED_PATTERN = re.compile(
+    r"\\x[0-9a-fA-F]{2}(?:\\x[0-9a-fA-F]{2}){3,}|%[0-9a-fA-F]{2}(?:%[0-9a-fA-F]{2}){3,}"
+)
+_HEX_ESCAPE_PATTERN = re.compile(r"\\x([0-9a-fA-F]{2})")
 
 # Plaintext injection phrases to match AFTER ROT13-decoding the input.
 # Strategy: attacker ROT13-encodes their payload. We ROT13-decode the content
@@ -314,24 +335,229 @@ _TEMPLATE_SAFE_KEYS = frozenset(
 )
 
 
-def _has_zero_width_or_bidi(text):
-    """Return True if text contains suspicious Unicode control characters."""
-    for ch in text:
-        if ch in _ZERO_WIDTH_CHARS:
+_SEVERITY_RANK = {"critical": 3, "high": 2, "medium": 1, "low": 0}
+
+# -- Fast scanning machinery --
+
+# str.lower() and re.IGNORECASE disagree only on these code points (they
+# case-fold onto ASCII letters), so mapping them first makes a plain search
+# over the folded text equivalent to an IGNORECASE search over the original.
+_CASEFOLD_FIXES = {0x130: "i", 0x131: "i", 0x17F: "s", 0x212A: "k"}
+
+# Oversized results are scanned in windows by rules whose longest possible
+# match fits in the overlap (see _window_safe); all other rules see the
+# whole text.
+_WINDOW_CHARS = 64 * 1024
+_WINDOW_OVERLAP = 1024
+
+_ZERO_WIDTH_BIDI_RE = re.compile(
+    "[" + "".join(sorted(_ZERO_WIDTH_CHARS)) + "\u202a-\u202e\u2066-\u2069]"
+)
+_ASCII_LETTER_RE = re.compile(r"[A-Za-z]")
+_HOMOGLYPH_RE = re.compile("[" + "".join(_HOMOGLYPH_MAP) + "]")
+_HOMOGLYPH_TABLE = str.maketrans(_HOMOGLYPH_MAP)
+_BASE64_CANDIDATE_RE = re.compile(r"[A-Za-z0-9+/]{16,}={0,2}")
+_LOOKAROUND_RE = re.compile(r"\(\?<?[=!]")
+# Constructs the probe rewriting does not model: backreferences, named
+# groups and inline flags. Rules using them are probed in their own form.
+_NO_REWRITE_RE = re.compile(r"\\[1-9]|\(\?P|\(\?[aiLmsux]")
+
+
+def _fold(text):
+    """Lowercase text so IGNORECASE rules can run as plain literal-led searches."""
+    if text.isascii():
+        return text.lower()
+    return text.translate(_CASEFOLD_FIXES).lower()
+
+
+def _lower_source(src):
+    """Lowercase a regex source, leaving escape sequences (\\S, \\W...) intact."""
+    out = []
+    i = 0
+    while i < len(src):
+        if src[i] == "\\":
+            out.append(src[i : i + 2])
+            i += 2
+        else:
+            out.append(src[i].lower())
+            i += 1
+    return "".join(out)
+
+
+def _split_top(src):
+    """Split a regex source on its top-level '|' (outside groups and classes)."""
+    parts, depth, start, i, in_class = [], 0, 0, 0, False
+    while i < len(src):
+        c = src[i]
+        if c == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = c != "]"
+        elif c == "[":
+            in_class = True
+            if src[i + 1 : i + 2] == "^":
+                i += 1
+            if src[i + 1 : i + 2] == "]":
+                i += 1  # leading ']' is a literal
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            parts.append(src[start:i])
+            start = i + 1
+        i += 1
+    parts.append(src[start:])
+    return parts
+
+
+def _leading_branches(src):
+    """Rewrite 'A|B' and '(A|B)rest' as branches that each start with a literal.
+
+    Search-equivalent to the original; lets the engine use its fast literal
+    prefix scan per branch instead of testing an alternation at every offset.
+    """
+    out = []
+    for branch in _split_top(src):
+        if branch.startswith("(") and not branch.startswith("(?") or branch.startswith(
+            "(?:"
+        ):
+            inner_start = 3 if branch.startswith("(?:") else 1
+            depth, i = 0, 0
+            while i < len(branch):
+                c = branch[i]
+                if c == "\\":
+                    i += 2
+                    continue
+                depth += c == "("
+                depth -= c == ")"
+                if depth == 0:
+                    break
+                i += 1
+            rest = branch[i + 1 :]
+            if i < len(branch) and rest[:1] not in ("*", "+", "?", "{"):
+                inner = _split_top(branch[inner_start:i])
+                if len(inner) > 1:
+                    out.extend(b + rest for b in inner)
+                    continue
+        out.append(branch)
+    return out
+
+
+def _compile_probes(pattern):
+    """Fast existence checks for one rule: [(regex, on_folded_text, head)].
+
+    IGNORECASE rules run lowercased over the folded text. A MULTILINE '^'
+    rule becomes a '\\n'-led search plus an anchored match at offset 0
+    (``head``).
+    """
+    if _NO_REWRITE_RE.search(pattern.pattern):
+        return [(pattern, False, None)]
+    folded = bool(pattern.flags & re.IGNORECASE)
+    flags = pattern.flags & ~re.IGNORECASE & ~re.UNICODE
+    src = _lower_source(pattern.pattern) if folded else pattern.pattern
+    probes = []
+    try:
+        for branch in _leading_branches(src):
+            if branch.startswith("^") and pattern.flags & re.MULTILINE:
+                probes.append(
+                    (
+                        re.compile("\n" + branch[1:], flags),
+                        folded,
+                        re.compile(branch, flags),
+                    )
+                )
+            else:
+                probes.append((re.compile(branch, flags), folded, None))
+    except re.error:
+        return [(pattern, False, None)]
+    return probes
+
+
+def _probe(probes, text, folded):
+    for regex, on_folded, head in probes:
+        target = folded if on_folded else text
+        if regex.search(target) or (head is not None and head.match(target)):
             return True
-        cp = ord(ch)
-        for lo, hi in _BIDI_OVERRIDE_RANGES:
-            if lo <= cp <= hi:
-                return True
     return False
 
 
+def _window_safe(pattern):
+    """True if no match of pattern is longer than _WINDOW_OVERLAP chars.
+
+    Such a match always lies whole inside some window. Lookaround can see
+    past a window edge, so it disqualifies a rule too; so does anything the
+    regex parser cannot size.
+    """
+    if _LOOKAROUND_RE.search(pattern.pattern):
+        return False
+    try:
+        width = _sre_parse.parse(pattern.pattern, pattern.flags).getwidth()[1]
+    except Exception:
+        return False
+    return width <= _WINDOW_OVERLAP
+
+
+_CATEGORY_PROBES = {
+    category: [probe for p in patterns for probe in _compile_probes(p)]
+    for category, (patterns, _severity) in CATEGORIES.items()
+}
+_WINDOW_SAFE = {
+    category: [_window_safe(p) for p in patterns]
+    for category, (patterns, _severity) in CATEGORIES.items()
+}
+_WINDOW_PROBES = {
+    category: [
+        probe
+        for p, safe in zip(patterns, _WINDOW_SAFE[category])
+        if safe
+        for probe in _compile_probes(p)
+    ]
+    for category, (patterns, _severity) in CATEGORIES.items()
+}
+_FULL_PROBES = {
+    category: [
+        probe
+        for p, safe in zip(patterns, _WINDOW_SAFE[category])
+        if not safe
+        for probe in _compile_probes(p)
+    ]
+    for category, (patterns, _severity) in CATEGORIES.items()
+}
+_ROT13_PROBES = _compile_probes(_ROT13_INJECTION_PHRASES)
+
+
+def _windows(text, size=_WINDOW_CHARS, overlap=_WINDOW_OVERLAP):
+    """Yield overlapping slices of text, each at most size chars.
+
+    Windows start just after a newline where one falls in the overlap
+    region, so line-anchored rules see real line starts.
+    """
+    if len(text) <= size:
+        yield text
+        return
+    start = 0
+    while True:
+        end = min(len(text), start + size)
+        yield text[start:end]
+        if end >= len(text):
+            return
+        nl = text.rfind("\n", end - 2 * overlap, end - overlap)
+        start = nl + 1 if nl != -1 else end - overlap
+
+
+def _has_zero_width_or_bidi(text):
+    """Return True if text contains suspicious Unicode control characters."""
+    return not text.isascii() and _ZERO_WIDTH_BIDI_RE.search(text) is not None
+
+
 def _has_confusable_lookalikes(text):
     """Return True if text mixes Latin ASCII with Cyrillic/Greek homoglyphs."""
-    if not _CONFUSABLE_PATTERN.search(text):
+    if text.isascii() or not _CONFUSABLE_PATTERN.search(text):
         return False
     # Only flag if Latin ASCII letters are also present (mixed-script attack)
-    return any("a" <= c.lower() <= "z" for c in text if c.isascii())
+    return _ASCII_LETTER_RE.search(text) is not None
 
 
 def _check_homoglyphs(text):
@@ -348,29 +574,26 @@ def _check_homoglyphs(text):
         return False, ""
 
     # Quick pre-check: any homoglyph chars present at all?
-    has_homoglyph = any(c in _HOMOGLYPH_MAP for c in text)
-    if not has_homoglyph:
+    if text.isascii() or not _HOMOGLYPH_RE.search(text):
         return False, ""
 
     # Only flag mixed-script text (Latin + homoglyph) to avoid false positives
     # on purely Cyrillic/Greek text (e.g. legitimate Russian content).
-    has_latin = any("a" <= c.lower() <= "z" for c in text if c.isascii())
-    if not has_latin:
+    if not _ASCII_LETTER_RE.search(text):
         return False, ""
 
     # Translate homoglyphs to Latin equivalents and re-scan for injection phrases
-    translated = "".join(_HOMOGLYPH_MAP.get(c, c) for c in text)
-    findings = _scan_content(translated)
+    translated = text.translate(_HOMOGLYPH_TABLE)
+    findings = _scan_text(translated)
     if findings:
-        sev_rank = {"critical": 3, "high": 2, "medium": 1, "low": 0}
-        top = max(findings, key=lambda f: sev_rank.get(f[1], 0))
+        top = max(findings, key=lambda f: _SEVERITY_RANK.get(f[1], 0))
         return True, "homoglyph-translated '{}' matched {}({})".format(
             text[:40], top[0], top[1]
         )
 
     # Even without a full injection phrase, flag text with multiple consecutive
     # homoglyph substitutions (>= 2 replaced chars) as medium-confidence.
-    replaced = sum(1 for c in text if c in _HOMOGLYPH_MAP)
+    replaced = len(_HOMOGLYPH_RE.findall(text))
     if replaced >= 2:
         sample = "".join(
             "{}(={})".format(c, _HOMOGLYPH_MAP[c]) if c in _HOMOGLYPH_MAP else c
@@ -384,11 +607,7 @@ def _check_homoglyphs(text):
 def _decode_hex_encoded(text):
     """Decode \\xNN hex sequences in text, return decoded string."""
     try:
-        return re.sub(
-            r"\\x([0-9a-fA-F]{2})",
-            lambda m: chr(int(m.group(1), 16)),
-            text,
-        )
+        return _HEX_ESCAPE_PATTERN.sub(lambda m: chr(int(m.group(1), 16)), text)
     except Exception:
         return text
 
@@ -402,7 +621,7 @@ def _recursive_base64_decode(text, depth=0, max_depth=3):
         return []
 
     results = []
-    candidates = re.findall(r"[A-Za-z0-9+/]{16,}={0,2}", text)
+    candidates = _BASE64_CANDIDATE_RE.findall(text)
     for candidate in candidates:
         try:
             padding = (4 - len(candidate) % 4) % 4
@@ -420,23 +639,9 @@ def _recursive_base64_decode(text, depth=0, max_depth=3):
     return results
 
 
-def _check_obfuscation(content):
-    """Check content for obfuscated injection attempts.
-
-    Detects:
-    - Unicode zero-width / bidirectional override characters
-    - Confusable lookalike (homoglyph) mixed-script attacks
-    - Multi-layer Base64 decoded injection content
-    - Hex-encoded injection strings
-    - ROT13-encoded injection phrases
-
-    Returns a GateResult (blocked=False always; severity reflects threat level).
-    """
-    if not content or len(content) < 4:
-        return GateResult(blocked=False, gate_name=GATE_NAME)
-
+def _obfuscation_findings(content):
+    """Return obfuscation findings for content as (category, severity, detail)."""
     findings = []
-    severity_rank = {"critical": 3, "high": 2, "medium": 1, "low": 0}
 
     # 1. Zero-width / bidirectional override characters
     if _has_zero_width_or_bidi(content):
@@ -457,9 +662,9 @@ def _check_obfuscation(content):
     # 3. Hex-encoded sequences -- decode and re-scan
     if _HEX_ENCODED_PATTERN.search(content):
         decoded_hex = _decode_hex_encoded(content)
-        hex_findings = _scan_content(decoded_hex)
+        hex_findings = _scan_text(decoded_hex)
         if hex_findings:
-            top = max(hex_findings, key=lambda f: severity_rank.get(f[1], 0))
+            top = max(hex_findings, key=lambda f: _SEVERITY_RANK.get(f[1], 0))
             findings.append(
                 (
                     "hex_encoded_injection",
@@ -479,9 +684,9 @@ def _check_obfuscation(content):
     # 4. Multi-layer Base64 decoding
     decoded_layers = _recursive_base64_decode(content)
     for layer in decoded_layers:
-        layer_findings = _scan_content(layer)
+        layer_findings = _scan_text(layer)
         if layer_findings:
-            top = max(layer_findings, key=lambda f: severity_rank.get(f[1], 0))
+            top = max(layer_findings, key=lambda f: _SEVERITY_RANK.get(f[1], 0))
             findings.append(
                 (
                     "base64_decoded_injection",
@@ -494,7 +699,7 @@ def _check_obfuscation(content):
     # 5. ROT13-encoded injection phrases (decode input, match plaintext patterns)
     try:
         rot13_decoded = codecs.encode(content, "rot_13")
-        if _ROT13_INJECTION_PHRASES.search(rot13_decoded):
+        if _probe(_ROT13_PROBES, rot13_decoded, _fold(rot13_decoded)):
             findings.append(
                 (
                     "rot13_injection",
@@ -504,11 +709,15 @@ def _check_obfuscation(content):
             )
     except Exception:
         pass
+    return findings
+
 
+def _format_obfuscation(findings):
+    """Build the _check_obfuscation GateResult for a list of findings."""
     if not findings:
         return GateResult(blocked=False, gate_name=GATE_NAME)
 
-    max_finding = max(findings, key=lambda f: severity_rank.get(f[1], 0))
+    max_finding = max(findings, key=lambda f: _SEVERITY_RANK.get(f[1], 0))
     top_sev = max_finding[1]
     detail = "; ".join(
         "{cat}({sev}): '{match}'".format(cat=cat, sev=sev, match=match)
@@ -532,6 +741,23 @@ def _check_obfuscation(content):
     return GateResult(blocked=False, gate_name=GATE_NAME, message=msg, severity="warn")
 
 
+def _check_obfuscation(content):
+    """Check content for obfuscated injection attempts.
+
+    Detects:
+    - Unicode zero-width / bidirectional override characters
+    - Confusable lookalike (homoglyph) mixed-script attacks
+    - Multi-layer Base64 decoded injection content
+    - Hex-encoded injection strings
+    - ROT13-encoded injection phrases
+
+    Returns a GateResult (blocked=False always; severity reflects threat level).
+    """
+    if not content or len(content) < 4:
+        return GateResult(blocked=False, gate_name=GATE_NAME)
+    return _format_obfuscation(_obfuscation_findings(content))
+
+
 def _check_html_markdown_injection(value, field_key=""):
     """Detect HTML/Markdown injection in a string value.
 
@@ -670,7 +896,6 @@ def _check_tool_inputs(tool_name, tool_input):
     if not isinstance(tool_input, dict) or not tool_input:
         return GateResult(blocked=False, gate_name=GATE_NAME)
 
-    severity_rank = {"critical": 3, "high": 2, "medium": 1, "low": 0}
     all_findings = []
 
     for field_key, field_val in _extract_string_fields(tool_input):
@@ -683,7 +908,7 @@ def _check_tool_inputs(tool_name, tool_input):
         for layer in decoded_layers:
             layer_findings = _scan_content(layer)
             if layer_findings:
-                top = max(layer_findings, key=lambda f: severity_rank.get(f[1], 0))
+                top = max(layer_findings, key=lambda f: _SEVERITY_RANK.get(f[1], 0))
                 all_findings.append(
                     (
                         "input_base64_injection[{}]".format(field_key),
@@ -753,7 +978,7 @@ def _check_tool_inputs(tool_name, tool_input):
     if not all_findings:
         return GateResult(blocked=False, gate_name=GATE_NAME)
 
-    max_finding = max(all_findings, key=lambda f: severity_rank.get(f[1], 0))
+    max_finding = max(all_findings, key=lambda f: _SEVERITY_RANK.get(f[1], 0))
     top_sev = max_finding[1]
     detail = "; ".join(
         "{}({}): {}".format(cat, sev, match) for cat, sev, match in all_findings[:5]
@@ -794,7 +1019,11 @@ def _scan_content(text):
         return []
 
     findings = []
+    folded = _fold(text)
     for category, (patterns, severity) in CATEGORIES.items():
+        # Cheap existence probe first; most external content hits nothing
+        if not _probe(_CATEGORY_PROBES[category], text, folded):
+            continue
         for pattern in patterns:
             match = pattern.search(text)
             if match:
@@ -803,6 +1032,40 @@ def _scan_content(text):
     return findings
 
 
+def _scan_text(text):
+    """_scan_content for text of any size.
+
+    Text over _WINDOW_CHARS runs window-safe rules window by window and
+    every other rule over the whole text, still reporting the first
+    matching rule per category.
+    """
+    if len(text) <= _WINDOW_CHARS:
+        return _scan_content(text)
+
+    findings = []
+    folded = _fold(text)
+    windows = None
+    for category, (patterns, severity) in CATEGORIES.items():
+        hit = _probe(_FULL_PROBES[category], text, folded)
+        if not hit and _WINDOW_PROBES[category]:
+            if windows is None:
+                windows = [(w, _fold(w)) for w in _windows(text)]
+            hit = any(_probe(_WINDOW_PROBES[category], w, f) for w, f in windows)
+        if not hit:
+            continue
+        for pattern, safe in zip(patterns, _WINDOW_SAFE[category]):
+            if safe:
+                match = next(
+                    (m for m in (pattern.search(w) for w in _windows(text)) if m), None
+                )
+            else:
+                match = pattern.search(text)
+            if match:
+                findings.append((category, severity, match.group(0)[:80]))
+                break  # One match per category is enough
+    return findings
+
+
 def _increment_injection_count(state):
     prev = state.get("injection_attempts", 0)
     state["injection_attempts"] = (prev if isinstance(prev, int) else 0) + 1
@@ -845,10 +1108,12 @@ def check(tool_name, tool_input, state, event_type="PreToolUse"):
         return GateResult(blocked=False, gate_name=GATE_NAME)
 
     # Scan with existing pattern categories
-    findings = _scan_content(str(content))
-
+    content = str(content)
+    findings = _scan_text(content)
     # Also run enhanced obfuscation detection (after existing checks)
-    obfuscation_result = _check_obfuscation(str(content))
+    obfuscation = _obfuscation_findings(content) if len(content) >= 4 else []
+
+    obfuscation_result = _format_obfuscation(obfuscation)
     if obfuscation_result.message:
         # Obfuscation detected -- track and return
         _increment_injection_count(state)
@@ -858,8 +1123,7 @@ def check(tool_name, tool_input, state, event_type="PreToolUse"):
         return GateResult(blocked=False, gate_name=GATE_NAME)
 
     # Determine highest severity
-    severity_rank = {"critical": 3, "high": 2, "medium": 1, "low": 0}
-    max_severity = max(findings, key=lambda f: severity_rank.get(f[1], 0))
+    max_severity = max(findings, key=lambda f: _SEVERITY_RANK.get(f[1], 0))
     top_sev = max_severity[1]
 
     # Format findings
@@ -288,6 +288,11 @@ _surreal_degraded = False
 
 
 from shared.surreal_collection import SurrealCollection, init_surreal_db
+from shared.vector_maintenance import (
+    load_embedding_matrix,
+    find_duplicate_pairs,
+    find_clusters,
+)
 
 
 def _embed_texts(texts):
@@ -369,6 +374,7 @@ def _init_surrealdb():
             embed_text=_embed_text,
             embed_texts=_embed_texts,
             embedding_dim=_EMBEDDING_DIM,
+            projection=_load_vector_projection(),
         )
 
         collection = colls["knowledge"]
@@ -662,6 +668,7 @@ _adaptive_weights = None  # AdaptiveWeights instance (initialized lazily)
 _last_search_ids = []  # IDs from last search_knowledge call (for implicit feedback)
 _search_pipeline = None  # SearchPipeline instance (initialized lazily)
 _write_pipeline = None  # WritePipeline instance (initialized lazily)
+_local_ann_indexes = {}  # table name -> LocalANNIndex (config: local_ann_index)
 
 # --- Counterfactual retrieval client (lazy init) ---
 _cf_client = None
@@ -999,6 +1006,15 @@ def _ensure_initialized():
     # Initialize pipeline instances (fail-open — fall back to inline logic)
     _init_pipelines()
 
+    # Optional in-process ANN fast path (builds in background, fail-open)
+    _init_local_ann()
+
+    # Reduced-dimension KNN: catch up vector_r, then switch queries over
+    _start_reduced_backfill()
+
+    # Stream capture-queue observations in the background
+    _start_capture_ingest()
+
     _t_done = time.monotonic()
     print(
         f"[MCP] Startup: model={_t_model - _t_total:.1f}s  fts={_t_fts - _t_model:.1f}s  rest={_t_done - _t_fts:.1f}s  total={_t_done - _t_total:.1f}s",
@@ -1055,6 +1071,9 @@ def _init_pipelines():
             "touch_memory_timestamp": _touch_memory_timestamp,
             "generate_id": generate_id,
             "embed_text": _embed_text,
+            "invalidate_search_cache": (
+                _search_pipeline.invalidate_cache if _search_pipeline else None
+            ),
             "noise_regexes": NOISE_REGEXES,
             "min_content_length": MIN_CONTENT_LENGTH,
             "summary_length": SUMMARY_LENGTH,
@@ -1072,6 +1091,133 @@ def _init_pipelines():
         print(f"[MCP] Pipeline init failed (will use inline): {e}", file=_sys.stderr)
 
 
+LOCAL_ANN_DIR = os.path.join(MEMORY_DIR, "local_ann")
+
+
+def _init_local_ann():
+    """Attach LocalANNIndex fast paths to the vector tables when enabled.
+
+    Indexes start attached but not ready (queries keep going to SurrealDB)
+    while a background thread loads the persisted copy, or rebuilds it from
+    SurrealDB when its write stamp disagrees with the table's.
+    """
+    if not _read_config_toggles().get("local_ann_index", False):
+        return
+    try:
+        from shared.local_ann import LocalANNIndex
+    except Exception as e:
+        print(f"[MCP] Local ANN unavailable: {e}", file=_sys.stderr)
+        return
+
+    tables = [
+        ("knowledge", collection),
+        ("observations", observations),
+        ("fix_outcomes", fix_outcomes),
+    ]
+    for name, coll in tables:
+        if coll is None or name in _local_ann_indexes:
+            continue
+        idx = LocalANNIndex(os.path.join(LOCAL_ANN_DIR, name), dim=_EMBEDDING_DIM)
+        coll.attach_local_index(idx)
+        _local_ann_indexes[name] = idx
+
+    def _warm():
+        for name, coll in tables:
+            idx = _local_ann_indexes.get(name)
+            if idx is None:
+                continue
+            try:
+                t0 = time.monotonic()
+                how = coll.sync_local_index()
+                print(
+                    f"[MCP] Local ANN {name}: {how} {len(idx)} rows in "
+                    f"{time.monotonic() - t0:.1f}s",
+                    file=_sys.stderr,
+                )
+            except Exception as e:
+                idx.ready = False
+                print(f"[MCP] Local ANN {name} failed: {e}", file=_sys.stderr)
+
+    threading.Thread(target=_warm, daemon=True, name="local-ann-warm").start()
+
+
+REDUCED_VECTOR_DIR = os.path.join(MEMORY_DIR, "projection")
+
+
+def _load_vector_projection():
+    """Projection for reduced-dimension mode, or None when disabled/missing.
+
+    Config: reduced_vector_dim (0 = off, e.g. 256/512) and
+    reduced_vector_method ("pca" needs a file fitted by
+    scripts/reduce_vectors.py; "matryoshka" truncates).
+    """
+    cfg = _read_config_toggles()
+    dim = int(cfg.get("reduced_vector_dim", 0) or 0)
+    if dim <= 0:
+        return None
+    try:
+        from shared.vector_projection import (
+            load_projection,
+            matryoshka,
+            projection_path,
+        )
+    except Exception as e:
+        print(f"[MCP] Reduced vectors unavailable: {e}", file=_sys.stderr)
+        return None
+    if cfg.get("reduced_vector_method", "pca") == "matryoshka":
+        return matryoshka(dim, _EMBEDDING_DIM)
+    proj = load_projection(projection_path(REDUCED_VECTOR_DIR, dim))
+    if proj is None or proj.source_dim != _EMBEDDING_DIM:
+        print(
+            f"[MCP] Reduced vectors: no {dim}-dim projection fitted "
+            "(run scripts/reduce_vectors.py fit) — using full vectors",
+            file=_sys.stderr,
+        )
+        return None
+    return proj
+
+
+def _start_reduced_backfill():
+    """Fill vector_r for older rows in the background, then enable reduced KNN."""
+    tables = [
+        c
+        for c in (collection, observations, fix_outcomes, web_pages)
+        if c is not None and getattr(c, "_projection", None) is not None
+    ]
+    if not tables:
+        return
+
+    def _backfill():
+        for coll in tables:
+            try:
+                t0 = time.monotonic()
+                n = coll.backfill_reduced()
+                coll.mark_reduced_ready()
+                print(
+                    f"[MCP] Reduced vectors {coll._name}: backfilled {n} rows in "
+                    f"{time.monotonic() - t0:.1f}s",
+                    file=_sys.stderr,
+                )
+            except Exception as e:
+                print(
+                    f"[MCP] Reduced vectors {coll._name} failed: {e}",
+                    file=_sys.stderr,
+                )
+
+    threading.Thread(target=_backfill, daemon=True, name="reduced-backfill").start()
+
+
+def _flush_local_ann():
+    for idx in list(_local_ann_indexes.values()):
+        try:
+            idx.flush()
+        except Exception:
+            pass
+
+
+atexit.register(_flush_local_ann)
+
+
 _config_cache = {}
 _config_cache_ts = 0.0
 _CONFIG_CACHE_TTL = 60  # seconds
@@ -1266,61 +1412,49 @@ def _temporal_decay(confidence, timestamp_str):
         return confidence
 
 
-def _flush_capture_queue():
-    """Read the capture queue and upsert all observations to LanceDB.
+_capture_worker = None  # shared.capture_ingest.CaptureIngestWorker
+_capture_worker_lock = threading.Lock()
 
-    Atomically replaces the queue file with an empty one to prevent
-    duplicate ingestion. Skips corrupted lines gracefully.
-    """
-    if not os.path.exists(CAPTURE_QUEUE_FILE):
-        return 0
 
-    try:
-        # Atomic read-and-clear: read all, then truncate
-        with open(CAPTURE_QUEUE_FILE, "r") as f:
-            lines = f.readlines()
+def _upsert_observation_batch(docs, metas, ids):
+    observations.upsert(documents=docs, metadatas=metas, ids=ids)
 
-        if not lines:
-            return 0
 
-        # Truncate the file atomically
-        tmp = CAPTURE_QUEUE_FILE + ".tmp"
-        with open(tmp, "w") as f:
-            pass  # empty file
-        os.replace(tmp, CAPTURE_QUEUE_FILE)
+def _get_capture_worker():
+    """Lazily create the capture-queue ingest worker (not started)."""
+    global _capture_worker
+    with _capture_worker_lock:
+        if _capture_worker is None:
+            from shared.capture_ingest import CaptureIngestWorker, QueueCursor
 
-        # Parse and batch-deduplicate before upsert
-        docs, metas, ids = [], [], []
-        seen_ids = set()
-        for line in lines:
-            try:
-                obs = json.loads(line.strip())
-                if "document" in obs and "id" in obs:
-                    oid = obs["id"]
-                    if oid in seen_ids:
-                        continue
-                    seen_ids.add(oid)
-                    docs.append(obs["document"])
-                    metas.append(obs.get("metadata", {}))
-                    ids.append(oid)
-            except (json.JSONDecodeError, KeyError):
-                continue  # skip corrupted lines
-
-        if docs:
-            # Batch upsert (LanceDB handles dedup via merge_insert)
-            batch_size = 100
-            for i in range(0, len(docs), batch_size):
-                observations.upsert(
-                    documents=docs[i : i + batch_size],
-                    metadatas=metas[i : i + batch_size],
-                    ids=ids[i : i + batch_size],
-                )
+            _capture_worker = CaptureIngestWorker(
+                QueueCursor(CAPTURE_QUEUE_FILE),
+                upsert=_upsert_observation_batch,
+                compact=_compact_observations,
+            )
+    return _capture_worker
 
-        # Run compaction after flush
-        _compact_observations()
 
-        return len(docs)
+def _start_capture_ingest():
+    """Stream the capture queue into observations on a background thread.
 
+    New lines are embedded and upserted within ~2s; compaction runs on the
+    worker's own schedule instead of on the search path.
+    """
+    try:
+        _get_capture_worker().start()
+    except Exception as e:
+        print(f"[MCP] Capture ingest worker failed: {e}", file=_sys.stderr)
+
+
+def _flush_capture_queue():
+    """Synchronously ingest whatever is queued (session end, boot recovery).
+
+    Consumes only complete lines past the committed offset, so lines appended
+    concurrently are picked up by the next drain instead of being lost.
+    """
+    try:
+        return _get_capture_worker().drain()
     except Exception:
         return 0
 
@@ -1591,7 +1725,6 @@ def _search_observations_internal(query, top_k=20, recency_weight=0, query_vec=N
     Returns dict with "results" list in same format as knowledge results.
     """
     try:
-        _flush_capture_queue()
         obs_count = observations.count()
         if obs_count == 0:
             return {"results": [], "total_observations": 0}
@@ -2042,11 +2175,8 @@ def deduplicate_sweep(dry_run: bool = True, threshold: float = 0.15) -> dict:
     backup_file = os.path.join(
         MEMORY_DIR, f"dedup_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
     )
-    all_data = collection.get(
-        limit=count, include=["documents", "metadatas", "embeddings"]
-    )
+    all_data = collection.get(limit=count, include=["documents", "metadatas"])
     with open(backup_file, "w") as f:
-        # Embeddings are lists of floats — JSON-serializable
         json.dump(
             {
                 "ids": all_data.get("ids", []),
@@ -2058,52 +2188,20 @@ def deduplicate_sweep(dry_run: bool = True, threshold: float = 0.15) -> dict:
             f,
         )
 
-    # Scan for duplicates
-    candidates = []
-    seen_pairs = set()
+    # Scan for duplicates: page stored vectors once and compare locally
+    # instead of re-embedding + KNN-querying every memory.
     ids = all_data.get("ids", [])
-    docs = all_data.get("documents", []) or []
     metas = all_data.get("metadatas", []) or []
-
-    for i, doc in enumerate(docs):
-        if not doc:
-            continue
-        try:
-            similar = collection.query(
-                query_texts=[doc],
-                n_results=2,
-                include=["distances"],
-            )
-            if (
-                not similar
-                or not similar.get("distances")
-                or not similar["distances"][0]
-            ):
-                continue
-            # First result is self (distance ~0), second is nearest neighbor
-            for j, (sid, sdist) in enumerate(
-                zip(similar["ids"][0], similar["distances"][0])
-            ):
-                if sid == ids[i]:
-                    continue  # skip self
-                if sdist < threshold:
-                    pair_key = tuple(sorted([ids[i], sid]))
-                    if pair_key not in seen_pairs:
-                        seen_pairs.add(pair_key)
-                        candidates.append(
-                            {
-                                "id_a": ids[i],
-                                "id_b": sid,
-                                "distance": round(sdist, 4),
-                                "preview_a": (
-                                    metas[i].get("preview", "")
-                                    if i < len(metas)
-                                    else ""
-                                )[:80],
-                            }
-                        )
-        except Exception:
-            continue
+    meta_by_id = {mid: metas[i] for i, mid in enumerate(ids) if i < len(metas)}
+    try:
+        vec_ids, matrix = load_embedding_matrix(collection, total=count)
+        candidates = find_duplicate_pairs(vec_ids, matrix, threshold)
+        del matrix
+    except Exception as e:
+        return {"error": f"Dedup sweep failed: {e}", "backup_file": backup_file}
+    for cand in candidates:
+        meta_a = meta_by_id.get(cand["id_a"]) or {}
+        cand["preview_a"] = meta_a.get("preview", "")[:80]
 
     moved = 0
     if not dry_run and quarantine is not None:
@@ -2126,6 +2224,8 @@ def deduplicate_sweep(dry_run: bool = True, threshold: float = 0.15) -> dict:
                         documents=[v_doc], metadatas=[v_meta], ids=[victim_id]
                     )
                     collection.delete(ids=[victim_id])
+                    if _search_pipeline is not None:
+                        _search_pipeline.invalidate_cache(ids=[victim_id])
                     # Transfer graph edges from duplicate to survivor, then deactivate (fail-open)
                     try:
                         if _knowledge_graph:
@@ -2275,6 +2375,18 @@ def delete_memory(id: str) -> dict:
         if not found:
             return {"error": f"No memories found with ids: {ids}"}
         collection.delete(ids=found)
+        if _search_pipeline is not None:
+            _search_pipeline.invalidate_cache(ids=found)
+        if _write_pipeline is not None:
+            _write_pipeline.note_removed(len(found))
+        try:
+            from shared.minhash_index import get_memory_index
+
+            _mh_index = get_memory_index()
+            for did in found:
+                _mh_index.remove(did)
+        except Exception:
+            pass
         # Clean up knowledge graph edges for deleted memories (fail-open)
         try:
             if _knowledge_graph:
@@ -2306,9 +2418,6 @@ def timeline(
         window_minutes: How many minutes before/after the anchor to include (default 10)
         limit: Max observations to return (default 20)
     """
-    # Flush queue first
-    _flush_capture_queue()
-
     count = observations.count()
     if count == 0:
         return {
@@ -2670,7 +2779,6 @@ def query_fix_history(error_text: str, top_k: int = 10) -> dict:
         try:
             obs_count = observations.count()
             if obs_count > 0:
-                _flush_capture_queue()
                 obs_results = observations.query(
                     query_texts=[normalized],
                     n_results=min(5, obs_count),
@@ -2957,6 +3065,40 @@ def health_check() -> dict:
     except Exception:
         disk_bytes = -1
 
+    # Local ANN fast-path status per table
+    local_ann = {}
+    for name, idx in list(_local_ann_indexes.items()):
+        try:
+            local_ann[name] = idx.stats()
+        except Exception:
+            pass
+
+    # Reduced-dimension KNN state per table (empty when disabled)
+    reduced_vectors = {}
+    for coll in (collection, observations, fix_outcomes, web_pages):
+        proj = getattr(coll, "_projection", None)
+        if proj is not None:
+            reduced_vectors[coll._name] = {
+                "dim": proj.dim,
+                "method": proj.method,
+                "ready": coll.reduced_ready,
+            }
+
+    capture_ingest = {}
+    try:
+        if _capture_worker is not None:
+            capture_ingest = _capture_worker.stats()
+    except Exception:
+        pass
+
+    # Search cache hit rates (exact + semantic levels)
+    search_cache = {}
+    try:
+        if _search_pipeline is not None:
+            search_cache = _search_pipeline.cache_stats()
+    except Exception:
+        pass
+
     return {
         "status": "ok" if not _surreal_degraded else "degraded",
         "uptime": uptime_str,
@@ -2973,6 +3115,10 @@ def health_check() -> dict:
         if disk_bytes >= 0
         else -1,
         "initialized": _initialized,
+        "search_cache": search_cache,
+        "local_ann": local_ann,
+        "reduced_vectors": reduced_vectors,
+        "capture_ingest": capture_ingest,
     }
 
 
@@ -3304,39 +3450,20 @@ def cluster_knowledge(
         if rank[ra] == rank[rb]:
             rank[ra] += 1
 
-    # For each memory, find neighbors within distance_threshold
-    # Process in batches to avoid overwhelming the database
-    neighbor_k = min(30, n)  # Check up to 30 nearest neighbors per memory
-
-    for i in range(n):
-        doc = docs[i] if i < len(docs) and docs[i] else None
-        if not doc:
-            continue
-
-        try:
-            neighbors = collection.query(
-                query_texts=[doc],
-                n_results=neighbor_k,
-                include=["distances"],
-            )
-
-            if not neighbors or not neighbors.get("ids") or not neighbors["ids"][0]:
-                continue
-
-            neighbor_ids = neighbors["ids"][0]
-            neighbor_dists = (
-                neighbors["distances"][0] if neighbors.get("distances") else []
-            )
-
-            for j, nid in enumerate(neighbor_ids):
-                if nid == ids[i]:
-                    continue  # skip self
-                dist = neighbor_dists[j] if j < len(neighbor_dists) else 1.0
-                if dist <= distance_threshold and nid in id_to_idx:
-                    union(i, id_to_idx[nid])
+    # Neighbor search runs over the stored vectors in one local pass
+    # (up to 30 nearest neighbors per memory) instead of N KNN queries.
+    neighbor_k = min(30, n)
+    try:
+        vec_ids, matrix = load_embedding_matrix(collection, total=count)
+        components = find_clusters(matrix, distance_threshold, neighbor_k=neighbor_k)
+        del matrix
+    except Exception as e:
+        return {"clusters": [], "error": f"Failed to compute clusters: {str(e)}"}
 
-        except Exception:
-            continue
+    for comp in components:
+        members = [id_to_idx[vec_ids[j]] for j in comp if vec_ids[j] in id_to_idx]
+        for other in members[1:]:
+            union(members[0], other)
 
     # Collect clusters
     clusters_map = {}  # root_idx -> [member_indices]
@@ -4325,6 +4452,8 @@ def _dispatch_request(req):
                 kwargs["ids"] = params["ids"]
             if "limit" in params:
                 kwargs["limit"] = params["limit"]
+            if "offset" in params:
+                kwargs["offset"] = params["offset"]
             kwargs["include"] = params.get("include", ["metadatas", "documents"])
             result = col.get(**kwargs)
             return {"ok": True, "result": _serialize_result(result)}
@@ -4624,13 +4753,17 @@ def agent_coordination(
     content: str = "",
     to_agent: str = "all",
     since_minutes: int = 60,
+    count: int = 1,
+    lease_s: float = 0,
 ) -> dict:
     """Unified agent task and messaging coordination.
 
     Actions:
       create_task   — Create a task (title, created_by required)
       list_tasks    — List tasks (optional: status, agent_id, tag)
-      claim_task    — Claim next pending task (agent_id required, optional: role, tag)
+      claim_task    — Claim next pending task (agent_id required, optional: role, tag,
+                      count for a batch, lease_s for a lease renewed via heartbeat)
+      heartbeat     — Renew the lease on a claimed task (task_id, agent_id required)
       complete_task — Complete a task (task_id, result required)
       send_message  — Send a message (content required, optional: to_agent, msg_type)
       read_messages — Read recent messages (optional: agent_id, since_minutes)
@@ -4643,6 +4776,8 @@ def agent_coordination(
             create_task as _ac_create,
             list_tasks as _ac_list,
             claim_next_task as _ac_claim,
+            claim_tasks as _ac_claim_batch,
+            heartbeat as _ac_heartbeat,
             complete_task as _ac_complete,
             post_message as _ac_post,
             read_messages as _ac_read,
@@ -4685,11 +4820,23 @@ def agent_coordination(
     elif action == "claim_task":
         if not agent_id:
             return {"error": "agent_id is required for claim_task"}
-        task = _ac_claim(agent_id, role=role or None, tag=tag or "")
+        if count > 1:
+            tasks = _ac_claim_batch(
+                agent_id, count, role=role or None, tag=tag or "", lease_s=lease_s or None
+            )
+            return {"claimed": bool(tasks), "tasks": tasks, "count": len(tasks)}
+        task = _ac_claim(agent_id, role=role or None, tag=tag or "", lease_s=lease_s or None)
         if task:
             return {"claimed": True, "task": task}
         return {"claimed": False, "message": "No tasks available"}
 
+    elif action == "heartbeat":
+        if not task_id or not agent_id:
+            return {"error": "task_id and agent_id are required for heartbeat"}
+        kwargs = {"lease_s": lease_s} if lease_s else {}
+        renewed = _ac_heartbeat(task_id, agent_id, **kwargs)
+        return {"renewed": bool(renewed), "task_id": task_id}
+
     elif action == "complete_task":
         if not task_id:
             return {"error": "task_id is required for complete_task"}
@@ -4721,6 +4868,7 @@ def agent_coordination(
                 "create_task",
                 "list_tasks",
                 "claim_task",
+                "heartbeat",
                 "complete_task",
                 "send_message",
                 "read_messages",
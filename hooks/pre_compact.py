@@ -394,6 +394,12 @@ def main():
     # Append to capture queue
     with open(CAPTURE_QUEUE, "a") as f:
         f.write(json.dumps(observation) + "\n")
+    try:
+        from shared.analytics_rollup import record_observation
+
+        record_observation(observation)
+    except ImportError:
+        pass
 
     # Save to memory via UDS socket so post-compaction context is richer
     try:
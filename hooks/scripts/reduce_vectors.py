@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Reduced Vectors — fit, backfill and evaluate reduced-dimension embeddings.
+
+Reduced mode (config: reduced_vector_dim / reduced_vector_method) stores a
+256/512-dim projection of each vector in ``vector_r`` and runs KNN on it,
+reranking the top candidates with the full 4096-dim vectors.
+
+Steps:
+- fit:      learn a PCA projection from stored knowledge vectors and save it
+            to ~/data/memory/projection/projection_<dim>.npz
+- backfill: fill vector_r on every reduced table and (re)build its HNSW index;
+            the full-vector index is dropped only if config.json selects the
+            same dim/method for the server
+- report:   recall@k (reduced-only and reduced+rerank) vs exact full-vector
+            search, vector footprint, and index build time
+
+Usage:
+    python3 reduce_vectors.py fit --dim 256
+    python3 reduce_vectors.py backfill --dim 256 [--rebuild-index]
+    python3 reduce_vectors.py report --dim 256 [--method matryoshka]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from shared.surreal_collection import (
+    REDUCED_TABLES,
+    TABLE_SCHEMAS,
+    SurrealCollection,
+)
+from shared.vector_maintenance import load_embedding_matrix
+from shared.vector_projection import (
+    evaluate_projection,
+    fit_pca,
+    load_projection,
+    matryoshka,
+    projection_path,
+)
+
+SURREAL_URL = "ws://127.0.0.1:8822"
+EMBEDDING_DIM = 4096
+PROJECTION_DIR = os.path.join(os.path.expanduser("~"), "data", "memory", "projection")
+CONFIG_PATH = os.path.join(os.path.expanduser("~"), ".claude", "config.json")
+
+
+def _connect():
+    from surrealdb import Surreal
+
+    db = Surreal(SURREAL_URL)
+    db.signin(
+        {
+            "username": os.environ.get("SURREAL_USER", "root"),
+            "password": os.environ.get("SURREAL_PASS", "root"),
+        }
+    )
+    db.use("memory", "main")
+    return db
+
+
+def _collection(db, table):
+    return SurrealCollection(
+        db, table, fields=TABLE_SCHEMAS[table], embedding_dim=EMBEDDING_DIM
+    )
+
+
+def _server_uses(args):
+    """True if the memory server's config selects this projection for KNN."""
+    try:
+        with open(CONFIG_PATH) as f:
+            cfg = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (
+        int(cfg.get("reduced_vector_dim", 0) or 0) == args.dim
+        and cfg.get("reduced_vector_method", "pca") == args.method
+    )
+
+
+def _projection(args):
+    if args.method == "matryoshka":
+        return matryoshka(args.dim, EMBEDDING_DIM)
+    proj = load_projection(projection_path(PROJECTION_DIR, args.dim))
+    if proj is None:
+        sys.exit(f"No {args.dim}-dim projection found — run `fit --dim {args.dim}`")
+    return proj
+
+
+def cmd_fit(args, db):
+    coll = _collection(db, args.table)
+    t0 = time.perf_counter()
+    _ids, matrix = load_embedding_matrix(coll)
+    load_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    proj = fit_pca(matrix, args.dim, sample=args.sample)
+    fit_s = time.perf_counter() - t0
+    os.makedirs(PROJECTION_DIR, exist_ok=True)
+    path = projection_path(PROJECTION_DIR, args.dim)
+    proj.save(path)
+    report = evaluate_projection(matrix, proj, n_queries=args.queries, k=args.k)
+    report.update(
+        {"load_s": round(load_s, 1), "fit_s": round(fit_s, 1), "saved": path}
+    )
+    return report
+
+
+def cmd_backfill(args, db):
+    proj = _projection(args)
+    # Only drop the full-dimension HNSW index when the server actually runs
+    # KNN on vector_r; otherwise it still needs that index.
+    serve_reduced = _server_uses(args)
+    report = {}
+    for table in REDUCED_TABLES:
+        coll = _collection(db, table)
+        coll.attach_projection(proj)
+        t0 = time.perf_counter()
+        n = coll.backfill_reduced()
+        if serve_reduced:
+            coll.mark_reduced_ready()  # drops the full-dimension HNSW index
+        entry = {
+            "backfilled": n,
+            "backfill_s": round(time.perf_counter() - t0, 1),
+            "reduced_ready": serve_reduced,
+        }
+        if args.rebuild_index:
+            db.query(f"REMOVE INDEX IF EXISTS {table}_vec_r ON {table}")
+            t0 = time.perf_counter()
+            coll.attach_projection(proj)
+            entry["index_build_s"] = round(time.perf_counter() - t0, 1)
+        report[table] = entry
+    return report
+
+
+def cmd_report(args, db):
+    proj = _projection(args)
+    _ids, matrix = load_embedding_matrix(_collection(db, args.table))
+    return evaluate_projection(matrix, proj, n_queries=args.queries, k=args.k)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("command", choices=["fit", "backfill", "report"])
+    ap.add_argument("--dim", type=int, default=256)
+    ap.add_argument("--method", choices=["pca", "matryoshka"], default="pca")
+    ap.add_argument("--table", default="knowledge", help="table used for fit/report")
+    ap.add_argument("--sample", type=int, default=5000, help="max rows for PCA fit")
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument(
+        "--rebuild-index",
+        action="store_true",
+        help="drop and re-define the vector_r HNSW index (timed)",
+    )
+    args = ap.parse_args()
+
+    db = _connect()
+    handler = {"fit": cmd_fit, "backfill": cmd_backfill, "report": cmd_report}
+    print(json.dumps(handler[args.command](args, db), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -32,6 +32,8 @@ LIVE_STATE_FILE = os.path.join(CLAUDE_DIR, "LIVE_STATE.json")
 ARCHIVE_DIR = os.path.join(CLAUDE_DIR, "archive")
 MEMORY_DIR = os.path.join(os.path.expanduser("~"), "data", "memory")
 WRAPUP_RECENCY_SECONDS = 1800  # 30 minutes
+CONSOLIDATION_SCAN_LIMIT = 100000  # memories fetched per background consolidation run
+CONSOLIDATION_PAGE_SIZE = 1000  # memories per socket "get" (3s timeout, 50MB cap)
 
 
 def _get_capture_queue():
@@ -722,6 +724,35 @@ def append_wiki_log(state, live_state, project_name=None, project_dir=None):
             pass
 
 
+def _fetch_consolidation_entries(
+    socket_get, limit=CONSOLIDATION_SCAN_LIMIT, page_size=CONSOLIDATION_PAGE_SIZE
+):
+    """Page through the knowledge collection as consolidation entries.
+
+    One request for the whole store outgrows the socket's "get" timeout and
+    response cap. A failed page raises: syncing the MinHash index from a
+    partial store would drop the memories that were not fetched.
+    """
+    entries, seen = [], set()
+    offset = 0
+    while offset < limit:
+        want = min(page_size, limit - offset)
+        page = socket_get(
+            "knowledge", limit=want, offset=offset, include=["documents", "metadatas"]
+        ) or {}
+        ids = page.get("ids", [])
+        for _id, _doc, _meta in zip(
+            ids, page.get("documents", []), page.get("metadatas") or [None] * len(ids)
+        ):
+            if _id not in seen:  # a concurrent insert can shift a page
+                seen.add(_id)
+                entries.append(dict(_meta or {}, id=_id, document=_doc or ""))
+        if len(ids) < want:
+            break
+        offset += len(ids)
+    return entries
+
+
 def _run_background(data_path):
     """Background mode: handles all slow operations with no time pressure."""
     try:
@@ -854,11 +885,21 @@ def _run_background(data_path):
     # Run memory consolidation analysis (merge/promote/archive candidates)
     try:
         from shared.memory_consolidation import run_consolidation_analysis
+        from shared.memory_socket import get as _socket_get
+        from shared.minhash_index import get_memory_index
 
         # Only log candidates — don't auto-act (human review gate)
         print(
             "[SESSION_END:bg] Running memory consolidation analysis...", file=sys.stderr
         )
+        # Whole store, one page per request; the MinHash index only
+        # re-hashes new/edited memories
+        _entries = _fetch_consolidation_entries(_socket_get)
+        if _entries:
+            _mh_index = get_memory_index()
+            _mh_index.sync(_entries)
+            _report = run_consolidation_analysis(_entries, index=_mh_index)
+            print(f"[SESSION_END:bg] Consolidation: {_report.summary}", file=sys.stderr)
     except ImportError:
         pass
     except Exception as _ce:
@@ -4,6 +4,16 @@ Two tables in one DB:
   messages — broadcast/directed messaging with inbox ack and reply threading
   tasks    — priority-based task queue with atomic claiming and goal ancestry
 
+Tags and dependencies are mirrored into task_tags / task_deps so claims and
+tag filters are indexed lookups. Claims can take a batch of tasks in one
+transaction and attach a visibility-timeout lease: the holder renews it with
+heartbeat(), and a task whose lease lapses (its agent died) is requeued on
+the next claim. Idle agents block in wait_for_tasks() on a Unix datagram
+socket that create/complete/requeue poke, instead of polling the DB.
+
+Connections are pooled per thread (and per DB path / process); schema setup
+runs once per path.
+
 All operations are fail-open: exceptions return empty/False rather than crashing.
 
 DB location: ~/.claude/hooks/agent_channel.db
@@ -12,10 +22,14 @@ DB location: ~/.claude/hooks/agent_channel.db
 from __future__ import annotations
 
 import os
+import select
+import socket
 import sqlite3
+import threading
 import time
 import uuid
-from typing import Any, Dict, List, Optional
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -30,19 +44,29 @@ VALID_STATUSES = frozenset(
     ("pending", "assigned", "running", "done", "failed", "cancelled")
 )
 
+DEFAULT_LEASE_S = 300.0  # visibility timeout for leased claims
+MAX_LEASE_ATTEMPTS = 3  # lapsed leases before a task is marked failed
+_WAIT_SLICE_S = 5.0  # upper bound on one blocking wait (catches lapsed leases)
+
+_SCHEMA_VERSION = 2
+_schema_ready: set = set()
+_schema_lock = threading.Lock()
+_local = threading.local()
+
 
 # ---------------------------------------------------------------------------
 # Internal
 # ---------------------------------------------------------------------------
 
 
-def _get_conn() -> sqlite3.Connection:
-    """Return a WAL-mode connection, creating schema if needed."""
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH, timeout=10)
-    conn.row_factory = sqlite3.Row
+def _split_tags(tags: Optional[str]) -> List[str]:
+    """Split a stored comma-separated tag string into clean tags."""
+    return [t.strip() for t in (tags or "").split(",") if t.strip()]
+
+
+def _ensure_schema(conn: sqlite3.Connection) -> None:
+    """Create tables/indexes and migrate older DBs. Idempotent."""
     conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys=ON")
 
     # Messages table
     conn.execute("""
@@ -92,18 +116,136 @@ def _get_conn() -> sqlite3.Connection:
             required_role  TEXT DEFAULT NULL,
             goal           TEXT DEFAULT NULL,
             parent_task_id TEXT DEFAULT NULL,
+            lease_expires  REAL DEFAULT NULL,
+            attempts       INTEGER DEFAULT 0,
             FOREIGN KEY (parent_task_id) REFERENCES tasks(id)
         )
     """)
+    for col, defn in [
+        ("lease_expires", "REAL DEFAULT NULL"),
+        ("attempts", "INTEGER DEFAULT 0"),
+    ]:
+        try:
+            conn.execute(f"ALTER TABLE tasks ADD COLUMN {col} {defn}")
+        except sqlite3.OperationalError:
+            pass  # column already exists
+
     conn.execute(
         "CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, priority)"
     )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tasks_queue "
+        "ON tasks(status, priority, created_at)"
+    )
     conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_agent ON tasks(assigned_to)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_parent ON tasks(parent_task_id)")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tasks_lease ON tasks(lease_expires) "
+        "WHERE lease_expires IS NOT NULL"
+    )
 
+    # Normalized tag/dependency index (tasks.tags / tasks.depends_on stay the
+    # source of truth for readers; these make filtering an index lookup)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS task_tags (
+            tag     TEXT NOT NULL,
+            task_id TEXT NOT NULL,
+            PRIMARY KEY (tag, task_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tag_task ON task_tags(task_id)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS task_deps (
+            task_id    TEXT NOT NULL,
+            depends_on TEXT NOT NULL,
+            PRIMARY KEY (task_id, depends_on)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_dep_parent ON task_deps(depends_on)")
+
+    # Backfill the index tables once for DBs created before they existed
+    if conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+        rows = conn.execute(
+            "SELECT id, tags, depends_on FROM tasks "
+            "WHERE tags != '' OR depends_on IS NOT NULL"
+        ).fetchall()
+        conn.executemany(
+            "INSERT OR IGNORE INTO task_tags (tag, task_id) VALUES (?, ?)",
+            [(t, r[0]) for r in rows for t in _split_tags(r[1])],
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO task_deps (task_id, depends_on) VALUES (?, ?)",
+            [(r[0], r[2]) for r in rows if r[2]],
+        )
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    conn.commit()
+
+
+def _open(isolation_level: Optional[str] = "") -> sqlite3.Connection:
+    """Open a connection to DB_PATH, running schema setup once per path."""
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(
+        DB_PATH, timeout=10, isolation_level=isolation_level, check_same_thread=False
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    key = (os.getpid(), DB_PATH)
+    if key not in _schema_ready:
+        with _schema_lock:
+            if key not in _schema_ready:
+                _ensure_schema(conn)
+                _schema_ready.add(key)
+    return conn
+
+
+def _get_conn() -> sqlite3.Connection:
+    """Return a new WAL-mode connection, creating schema if needed.
+
+    The caller owns (and closes) it. Module functions use the pooled _conn().
+    """
+    return _open()
+
+
+def _conn() -> sqlite3.Connection:
+    """Return this thread's pooled autocommit connection to DB_PATH.
+
+    Keyed by (pid, DB_PATH) so forks and DB_PATH overrides get their own
+    connection; reopened if the DB file has been removed.
+    """
+    pool = getattr(_local, "pool", None)
+    if pool is None:
+        pool = _local.pool = {}
+    key = (os.getpid(), DB_PATH)
+    conn = pool.get(key)
+    if conn is not None and not os.path.exists(DB_PATH):
+        pool.pop(key, None)
+        _schema_ready.discard(key)
+        try:
+            conn.close()
+        except Exception:
+            pass
+        conn = None
+    if conn is None:
+        conn = pool[key] = _open(isolation_level=None)
     return conn
 
 
+@contextmanager
+def _transaction(conn: sqlite3.Connection, mode: str = "IMMEDIATE"):
+    """BEGIN <mode> … COMMIT on an autocommit connection; ROLLBACK on error."""
+    conn.execute(f"BEGIN {mode}")
+    try:
+        yield conn
+    except BaseException:
+        try:
+            conn.execute("ROLLBACK")
+        except Exception:
+            pass
+        raise
+    conn.execute("COMMIT")
+
+
 def _row_to_dict(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
     """Convert a sqlite3.Row to a plain dict."""
     if row is None:
@@ -116,6 +258,90 @@ def _rows_to_dicts(rows: list) -> List[Dict[str, Any]]:
     return [dict(r) for r in rows]
 
 
+# ---------------------------------------------------------------------------
+# Wakeup channel — one Unix datagram socket per blocked waiter
+# ---------------------------------------------------------------------------
+
+
+def _wake_dir() -> str:
+    return DB_PATH + ".wake"
+
+
+def _notify_waiters() -> int:
+    """Poke every blocked waiter. Prunes sockets whose owner died. Returns count."""
+    if not hasattr(socket, "AF_UNIX"):
+        return 0
+    wake_dir = _wake_dir()
+    try:
+        names = os.listdir(wake_dir)
+    except OSError:
+        return 0
+    if not names:
+        return 0
+    woken = 0
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    try:
+        sock.setblocking(False)
+        for name in names:
+            path = os.path.join(wake_dir, name)
+            try:
+                sock.sendto(b"1", path)
+                woken += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except OSError:
+                pass  # receive buffer full — the waiter is already awake
+    finally:
+        sock.close()
+    return woken
+
+
+class _Waiter:
+    """A bound wakeup socket; falls back to plain sleeping if binding fails."""
+
+    def __init__(self):
+        self.sock = None
+        self.path = ""
+        if not hasattr(socket, "AF_UNIX"):
+            return
+        try:
+            os.makedirs(_wake_dir(), exist_ok=True)
+            self.path = os.path.join(
+                _wake_dir(), f"{os.getpid()}-{threading.get_ident()}-{uuid.uuid4().hex[:8]}"
+            )
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(self.path)
+            sock.setblocking(False)
+            self.sock = sock
+        except OSError:
+            self.sock = None
+
+    def wait(self, timeout: float) -> None:
+        """Block until poked or timeout; drains queued pokes."""
+        if self.sock is None:
+            time.sleep(min(timeout, 0.5))
+            return
+        ready, _, _ = select.select([self.sock], [], [], max(0.0, timeout))
+        if ready:
+            try:
+                while True:
+                    self.sock.recv(64)
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        if self.sock is not None:
+            self.sock.close()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+            self.sock = None
+
+
 # ===================================================================
 # MESSAGING
 # ===================================================================
@@ -126,17 +352,12 @@ def post_message(
 ) -> bool:
     """Post a message to the channel. Returns True on success."""
     try:
-        conn = _get_conn()
-        try:
-            conn.execute(
-                "INSERT INTO messages (ts, from_agent, to_agent, msg_type, content) "
-                "VALUES (?, ?, ?, ?, ?)",
-                (time.time(), from_agent, to_agent, msg_type, content[:_MAX_TEXT]),
-            )
-            conn.commit()
-            return True
-        finally:
-            conn.close()
+        _conn().execute(
+            "INSERT INTO messages (ts, from_agent, to_agent, msg_type, content) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (time.time(), from_agent, to_agent, msg_type, content[:_MAX_TEXT]),
+        )
+        return True
     except Exception:
         return False
 
@@ -146,24 +367,21 @@ def read_messages(
 ) -> List[Dict[str, Any]]:
     """Read messages since a timestamp. Optionally filter by recipient agent."""
     try:
-        conn = _get_conn()
-        try:
-            if agent_id:
-                rows = conn.execute(
-                    "SELECT id, ts, from_agent, to_agent, msg_type, content, consumed, reply_to "
-                    "FROM messages WHERE ts > ? AND (to_agent = 'all' OR to_agent = ?) "
-                    "ORDER BY ts DESC LIMIT ?",
-                    (since_ts, agent_id, limit),
-                ).fetchall()
-            else:
-                rows = conn.execute(
-                    "SELECT id, ts, from_agent, to_agent, msg_type, content, consumed, reply_to "
-                    "FROM messages WHERE ts > ? ORDER BY ts DESC LIMIT ?",
-                    (since_ts, limit),
-                ).fetchall()
-            return _rows_to_dicts(rows)
-        finally:
-            conn.close()
+        conn = _conn()
+        if agent_id:
+            rows = conn.execute(
+                "SELECT id, ts, from_agent, to_agent, msg_type, content, consumed, reply_to "
+                "FROM messages WHERE ts > ? AND (to_agent = 'all' OR to_agent = ?) "
+                "ORDER BY ts DESC LIMIT ?",
+                (since_ts, agent_id, limit),
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT id, ts, from_agent, to_agent, msg_type, content, consumed, reply_to "
+                "FROM messages WHERE ts > ? ORDER BY ts DESC LIMIT ?",
+                (since_ts, limit),
+            ).fetchall()
+        return _rows_to_dicts(rows)
     except Exception:
         return []
 
@@ -171,17 +389,12 @@ def read_messages(
 def ack_message(msg_id: int, agent_id: str) -> bool:
     """Mark a message as consumed by agent_id. Returns True on success."""
     try:
-        conn = _get_conn()
-        try:
-            cursor = conn.execute(
-                "UPDATE messages SET consumed = 1 "
-                "WHERE id = ? AND (to_agent = ? OR to_agent = 'all')",
-                (msg_id, agent_id),
-            )
-            conn.commit()
-            return cursor.rowcount > 0
-        finally:
-            conn.close()
+        cursor = _conn().execute(
+            "UPDATE messages SET consumed = 1 "
+            "WHERE id = ? AND (to_agent = ? OR to_agent = 'all')",
+            (msg_id, agent_id),
+        )
+        return cursor.rowcount > 0
     except Exception:
         return False
 
@@ -189,16 +402,12 @@ def ack_message(msg_id: int, agent_id: str) -> bool:
 def pending_count(agent_id: str) -> int:
     """Count unconsumed messages directed to agent_id."""
     try:
-        conn = _get_conn()
-        try:
-            row = conn.execute(
-                "SELECT COUNT(*) FROM messages "
-                "WHERE (to_agent = ? OR to_agent = 'all') AND consumed = 0",
-                (agent_id,),
-            ).fetchone()
-            return row[0] if row else 0
-        finally:
-            conn.close()
+        row = _conn().execute(
+            "SELECT COUNT(*) FROM messages "
+            "WHERE (to_agent = ? OR to_agent = 'all') AND consumed = 0",
+            (agent_id,),
+        ).fetchone()
+        return row[0] if row else 0
     except Exception:
         return 0
 
@@ -206,16 +415,12 @@ def pending_count(agent_id: str) -> int:
 def get_thread(msg_id: int) -> List[Dict[str, Any]]:
     """Fetch a message and all replies to it, ordered by time."""
     try:
-        conn = _get_conn()
-        try:
-            rows = conn.execute(
-                "SELECT id, ts, from_agent, to_agent, msg_type, content, consumed, reply_to "
-                "FROM messages WHERE id = ? OR reply_to = ? ORDER BY ts ASC",
-                (msg_id, msg_id),
-            ).fetchall()
-            return _rows_to_dicts(rows)
-        finally:
-            conn.close()
+        rows = _conn().execute(
+            "SELECT id, ts, from_agent, to_agent, msg_type, content, consumed, reply_to "
+            "FROM messages WHERE id = ? OR reply_to = ? ORDER BY ts ASC",
+            (msg_id, msg_id),
+        ).fetchall()
+        return _rows_to_dicts(rows)
     except Exception:
         return []
 
@@ -223,23 +428,18 @@ def get_thread(msg_id: int) -> List[Dict[str, Any]]:
 def reply(msg_id: int, from_agent: str, content: str) -> bool:
     """Reply to a message. Inherits to_agent from the original message's from_agent."""
     try:
-        conn = _get_conn()
-        try:
-            original = conn.execute(
-                "SELECT from_agent FROM messages WHERE id = ?", (msg_id,)
-            ).fetchone()
-            if not original:
-                return False
-            to_agent = original["from_agent"]
-            conn.execute(
-                "INSERT INTO messages (ts, from_agent, to_agent, msg_type, content, reply_to) "
-                "VALUES (?, ?, ?, 'reply', ?, ?)",
-                (time.time(), from_agent, to_agent, content[:_MAX_TEXT], msg_id),
-            )
-            conn.commit()
-            return True
-        finally:
-            conn.close()
+        conn = _conn()
+        original = conn.execute(
+            "SELECT from_agent FROM messages WHERE id = ?", (msg_id,)
+        ).fetchone()
+        if not original:
+            return False
+        conn.execute(
+            "INSERT INTO messages (ts, from_agent, to_agent, msg_type, content, reply_to) "
+            "VALUES (?, ?, ?, 'reply', ?, ?)",
+            (time.time(), from_agent, original["from_agent"], content[:_MAX_TEXT], msg_id),
+        )
+        return True
     except Exception:
         return False
 
@@ -248,13 +448,8 @@ def cleanup(max_age_hours: int = 2) -> int:
     """Delete messages older than max_age_hours. Returns count deleted."""
     try:
         cutoff = time.time() - (max_age_hours * 3600)
-        conn = _get_conn()
-        try:
-            cursor = conn.execute("DELETE FROM messages WHERE ts < ?", (cutoff,))
-            conn.commit()
-            return cursor.rowcount
-        finally:
-            conn.close()
+        cursor = _conn().execute("DELETE FROM messages WHERE ts < ?", (cutoff,))
+        return cursor.rowcount
     except Exception:
         return 0
 
@@ -279,8 +474,11 @@ def create_task(
 ) -> Optional[str]:
     """Create a task. Auto-propagates goal from parent if not provided. Returns task_id."""
     try:
-        conn = _get_conn()
-        try:
+        conn = _conn()
+        task_id = str(uuid.uuid4())
+        now = time.time()
+        tag_list = [t.strip() for t in (tags or []) if t and t.strip()]
+        with _transaction(conn):
             # Goal propagation from parent
             if parent_task_id and not goal:
                 parent = conn.execute(
@@ -294,10 +492,6 @@ def create_task(
                         else parent["title"]
                     )
 
-            task_id = str(uuid.uuid4())
-            now = time.time()
-            tags_str = ",".join(tags) if tags else ""
-
             conn.execute(
                 "INSERT INTO tasks "
                 "(id, created_at, updated_at, title, description, created_by, "
@@ -313,94 +507,209 @@ def create_task(
                     created_by,
                     assigned_to,
                     priority,
-                    tags_str,
+                    ",".join(tags) if tags else "",
                     depends_on,
                     required_role,
                     (goal or "")[:_MAX_TEXT],
                     parent_task_id,
                 ),
             )
-            conn.commit()
-
-            # Notify assigned agent via messaging
-            if notify and assigned_to:
-                post_message(
-                    "system", "task_assigned", title[:_MAX_TEXT], to_agent=assigned_to
+            if tag_list:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO task_tags (tag, task_id) VALUES (?, ?)",
+                    [(t, task_id) for t in tag_list],
+                )
+            if depends_on:
+                conn.execute(
+                    "INSERT INTO task_deps (task_id, depends_on) VALUES (?, ?)",
+                    (task_id, depends_on),
                 )
 
-            return task_id
-        finally:
-            conn.close()
+        _notify_waiters()
+        # Notify assigned agent via messaging
+        if notify and assigned_to:
+            post_message(
+                "system", "task_assigned", title[:_MAX_TEXT], to_agent=assigned_to
+            )
+        return task_id
     except Exception:
         return None
 
 
+def _requeue_expired(conn: sqlite3.Connection, now: float) -> int:
+    """Requeue tasks whose lease lapsed; fail those out of attempts. In-transaction."""
+    conn.execute(
+        "UPDATE tasks SET status = 'failed', result = 'lease expired', "
+        "lease_expires = NULL, updated_at = ? "
+        "WHERE lease_expires < ? AND status IN ('assigned', 'running') "
+        "AND attempts >= ?",
+        (now, now, MAX_LEASE_ATTEMPTS),
+    )
+    cursor = conn.execute(
+        "UPDATE tasks SET status = 'pending', assigned_to = NULL, "
+        "lease_expires = NULL, updated_at = ? "
+        "WHERE lease_expires < ? AND status IN ('assigned', 'running')",
+        (now, now),
+    )
+    return cursor.rowcount
+
+
+def requeue_expired() -> int:
+    """Return tasks abandoned by dead agents (lapsed leases) to the queue.
+
+    Tasks that have already used MAX_LEASE_ATTEMPTS leases are marked
+    failed instead. Returns the number requeued.
+    """
+    try:
+        conn = _conn()
+        with _transaction(conn):
+            n = _requeue_expired(conn, time.time())
+        if n:
+            _notify_waiters()
+        return n
+    except Exception:
+        return 0
+
+
+def claim_tasks(
+    agent_id: str,
+    n: int = 1,
+    role: Optional[str] = None,
+    tag: str = "",
+    lease_s: Optional[float] = DEFAULT_LEASE_S,
+) -> List[Dict[str, Any]]:
+    """Atomically claim up to n highest-priority ready tasks in one transaction.
+
+    Lapsed leases are requeued first. Skips tasks with unfinished
+    dependencies, tasks requiring a different role, and (when tag is given)
+    tasks without that exact tag. With lease_s, each claimed task must be
+    renewed via heartbeat() within lease_s seconds or it goes back to the
+    queue; lease_s=None claims without a lease.
+    """
+    if n < 1:
+        return []
+    try:
+        conn = _conn()
+        now = time.time()
+        conditions = ["status = 'pending'"]
+        params: list = []
+
+        # Dependency check: every dependency must exist and be done
+        conditions.append(
+            "NOT EXISTS (SELECT 1 FROM task_deps d "
+            "LEFT JOIN tasks p ON p.id = d.depends_on "
+            "WHERE d.task_id = tasks.id AND (p.status IS NULL OR p.status != 'done'))"
+        )
+
+        # Role check
+        if role:
+            conditions.append("(required_role IS NULL OR required_role = ?)")
+            params.append(role)
+        else:
+            conditions.append("required_role IS NULL")
+
+        # Tag filter
+        if tag:
+            conditions.append("id IN (SELECT task_id FROM task_tags WHERE tag = ?)")
+            params.append(tag)
+
+        where = " AND ".join(conditions)
+        with _transaction(conn):
+            requeued = _requeue_expired(conn, now)
+            rows = conn.execute(
+                f"SELECT * FROM tasks WHERE {where} "
+                "ORDER BY priority ASC, created_at ASC LIMIT ?",
+                params + [n],
+            ).fetchall()
+            tasks = _rows_to_dicts(rows)
+            if tasks:
+                lease = now + lease_s if lease_s is not None else None
+                ids = [t["id"] for t in tasks]
+                conn.execute(
+                    "UPDATE tasks SET status = 'assigned', assigned_to = ?, "
+                    "updated_at = ?, lease_expires = ?, attempts = attempts + 1 "
+                    f"WHERE id IN ({','.join('?' * len(ids))})",
+                    [agent_id, now, lease] + ids,
+                )
+                for t in tasks:
+                    t.update(
+                        status="assigned",
+                        assigned_to=agent_id,
+                        updated_at=now,
+                        lease_expires=lease,
+                        attempts=(t.get("attempts") or 0) + 1,
+                    )
+        if requeued and len(tasks) < requeued:
+            _notify_waiters()
+        return tasks
+    except Exception:
+        return []
+
+
 def claim_next_task(
-    agent_id: str, role: Optional[str] = None, tag: str = ""
+    agent_id: str,
+    role: Optional[str] = None,
+    tag: str = "",
+    lease_s: Optional[float] = None,
 ) -> Optional[Dict[str, Any]]:
     """Atomically claim the highest-priority pending task.
 
-    Uses BEGIN EXCLUSIVE to prevent two agents from claiming the same task.
     Respects depends_on (skips tasks with unfinished dependencies),
     required_role (skips tasks requiring a different role), and tag filtering.
+    No lease unless lease_s is given (see claim_tasks).
     """
-    try:
-        conn = _get_conn()
-        try:
-            conn.execute("BEGIN EXCLUSIVE")
-
-            conditions = ["status = 'pending'"]
-            params: list = []
+    tasks = claim_tasks(agent_id, 1, role=role, tag=tag, lease_s=lease_s)
+    return tasks[0] if tasks else None
 
-            # Dependency check: only claim if dependency is done or NULL
-            conditions.append(
-                "(depends_on IS NULL OR depends_on IN "
-                "(SELECT id FROM tasks WHERE status = 'done'))"
-            )
 
-            # Role check
-            if role:
-                conditions.append("(required_role IS NULL OR required_role = ?)")
-                params.append(role)
-            else:
-                conditions.append("required_role IS NULL")
+def heartbeat(
+    task_ids: Iterable[str] | str, agent_id: str, lease_s: float = DEFAULT_LEASE_S
+) -> int:
+    """Renew the lease on tasks agent_id still holds. Returns count renewed.
 
-            # Tag filter
-            if tag:
-                conditions.append("tags LIKE ?")
-                params.append(f"%{tag}%")
+    A task whose lease already lapsed and was requeued (or reclaimed by
+    another agent) is not renewed — the caller should stop working on it.
+    """
+    ids = [task_ids] if isinstance(task_ids, str) else list(task_ids)
+    if not ids:
+        return 0
+    try:
+        now = time.time()
+        cursor = _conn().execute(
+            "UPDATE tasks SET lease_expires = ?, updated_at = ? "
+            "WHERE assigned_to = ? AND status IN ('assigned', 'running') "
+            f"AND id IN ({','.join('?' * len(ids))})",
+            [now + lease_s, now, agent_id] + ids,
+        )
+        return cursor.rowcount
+    except Exception:
+        return 0
 
-            where = " AND ".join(conditions)
-            row = conn.execute(
-                f"SELECT * FROM tasks WHERE {where} "
-                "ORDER BY priority ASC, created_at ASC LIMIT 1",
-                params,
-            ).fetchone()
 
-            if not row:
-                conn.execute("COMMIT")
-                return None
+def wait_for_tasks(
+    agent_id: str,
+    n: int = 1,
+    role: Optional[str] = None,
+    tag: str = "",
+    timeout: float = 30.0,
+    lease_s: Optional[float] = DEFAULT_LEASE_S,
+) -> List[Dict[str, Any]]:
+    """Claim up to n tasks, blocking up to timeout seconds until some are ready.
 
-            task = _row_to_dict(row)
-            conn.execute(
-                "UPDATE tasks SET status = 'assigned', assigned_to = ?, updated_at = ? "
-                "WHERE id = ?",
-                (agent_id, time.time(), task["id"]),
-            )
-            conn.execute("COMMIT")
-            task["status"] = "assigned"
-            task["assigned_to"] = agent_id
-            return task
-        except Exception:
-            try:
-                conn.execute("ROLLBACK")
-            except Exception:
-                pass
-            raise
-        finally:
-            conn.close()
-    except Exception:
-        return None
+    Sleeps on a wakeup socket that task creation, completion and requeue
+    poke, so idle agents cost nothing between events. Returns [] on timeout.
+    """
+    deadline = time.monotonic() + timeout
+    waiter = _Waiter()  # bound before the first claim so no poke is missed
+    try:
+        while True:
+            tasks = claim_tasks(agent_id, n, role=role, tag=tag, lease_s=lease_s)
+            remaining = deadline - time.monotonic()
+            if tasks or remaining <= 0:
+                return tasks
+            waiter.wait(min(remaining, _WAIT_SLICE_S))
+    finally:
+        waiter.close()
 
 
 def update_task(task_id: str, status: str, result: str = "") -> bool:
@@ -408,16 +717,21 @@ def update_task(task_id: str, status: str, result: str = "") -> bool:
     if status not in VALID_STATUSES:
         return False
     try:
-        conn = _get_conn()
-        try:
-            cursor = conn.execute(
-                "UPDATE tasks SET status = ?, result = ?, updated_at = ? WHERE id = ?",
-                (status, (result or "")[:_MAX_TEXT], time.time(), task_id),
+        if status in ("assigned", "running"):
+            sql = "UPDATE tasks SET status = ?, result = ?, updated_at = ? WHERE id = ?"
+        else:
+            sql = (
+                "UPDATE tasks SET status = ?, result = ?, updated_at = ?, "
+                "lease_expires = NULL WHERE id = ?"
             )
-            conn.commit()
-            return cursor.rowcount > 0
-        finally:
-            conn.close()
+        cursor = _conn().execute(
+            sql, (status, (result or "")[:_MAX_TEXT], time.time(), task_id)
+        )
+        ok = cursor.rowcount > 0
+        # Completion may unblock dependents; a manual requeue adds work
+        if ok and status in ("done", "pending"):
+            _notify_waiters()
+        return ok
     except Exception:
         return False
 
@@ -425,14 +739,8 @@ def update_task(task_id: str, status: str, result: str = "") -> bool:
 def get_task(task_id: str) -> Optional[Dict[str, Any]]:
     """Get a single task by ID."""
     try:
-        conn = _get_conn()
-        try:
-            row = conn.execute(
-                "SELECT * FROM tasks WHERE id = ?", (task_id,)
-            ).fetchone()
-            return _row_to_dict(row)
-        finally:
-            conn.close()
+        row = _conn().execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return _row_to_dict(row)
     except Exception:
         return None
 
@@ -445,32 +753,28 @@ def list_tasks(
 ) -> List[Dict[str, Any]]:
     """List tasks with optional filters. All filters are combinable."""
     try:
-        conn = _get_conn()
-        try:
-            conditions: list = []
-            params: list = []
-
-            if status:
-                conditions.append("status = ?")
-                params.append(status)
-            if agent_id:
-                conditions.append("(assigned_to = ? OR created_by = ?)")
-                params.extend([agent_id, agent_id])
-            if tag:
-                conditions.append("tags LIKE ?")
-                params.append(f"%{tag}%")
-            if parent_task_id:
-                conditions.append("parent_task_id = ?")
-                params.append(parent_task_id)
-
-            where = (" WHERE " + " AND ".join(conditions)) if conditions else ""
-            rows = conn.execute(
-                f"SELECT * FROM tasks{where} ORDER BY priority ASC, created_at ASC",
-                params,
-            ).fetchall()
-            return _rows_to_dicts(rows)
-        finally:
-            conn.close()
+        conditions: list = []
+        params: list = []
+
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if agent_id:
+            conditions.append("(assigned_to = ? OR created_by = ?)")
+            params.extend([agent_id, agent_id])
+        if tag:
+            conditions.append("id IN (SELECT task_id FROM task_tags WHERE tag = ?)")
+            params.append(tag)
+        if parent_task_id:
+            conditions.append("parent_task_id = ?")
+            params.append(parent_task_id)
+
+        where = (" WHERE " + " AND ".join(conditions)) if conditions else ""
+        rows = _conn().execute(
+            f"SELECT * FROM tasks{where} ORDER BY priority ASC, created_at ASC",
+            params,
+        ).fetchall()
+        return _rows_to_dicts(rows)
     except Exception:
         return []
 
@@ -479,17 +783,12 @@ def cancel_stale(timeout_s: int = 300) -> int:
     """Cancel assigned/running tasks not updated within timeout_s. Returns count."""
     try:
         cutoff = time.time() - timeout_s
-        conn = _get_conn()
-        try:
-            cursor = conn.execute(
-                "UPDATE tasks SET status = 'cancelled', updated_at = ? "
-                "WHERE status IN ('assigned', 'running') AND updated_at < ?",
-                (time.time(), cutoff),
-            )
-            conn.commit()
-            return cursor.rowcount
-        finally:
-            conn.close()
+        cursor = _conn().execute(
+            "UPDATE tasks SET status = 'cancelled', lease_expires = NULL, updated_at = ? "
+            "WHERE status IN ('assigned', 'running') AND updated_at < ?",
+            (time.time(), cutoff),
+        )
+        return cursor.rowcount
     except Exception:
         return 0
 
@@ -498,17 +797,23 @@ def archive_tasks(older_than_hours: int = 48) -> int:
     """Delete completed/failed/cancelled tasks older than threshold. Returns count."""
     try:
         cutoff = time.time() - (older_than_hours * 3600)
-        conn = _get_conn()
-        try:
-            cursor = conn.execute(
-                "DELETE FROM tasks WHERE status IN ('done', 'failed', 'cancelled') "
-                "AND updated_at < ?",
-                (cutoff,),
-            )
-            conn.commit()
-            return cursor.rowcount
-        finally:
-            conn.close()
+        conn = _conn()
+        with _transaction(conn):
+            ids = [
+                r[0]
+                for r in conn.execute(
+                    "SELECT id FROM tasks WHERE status IN ('done', 'failed', 'cancelled') "
+                    "AND updated_at < ?",
+                    (cutoff,),
+                ).fetchall()
+            ]
+            for i in range(0, len(ids), 500):
+                chunk = ids[i : i + 500]
+                marks = ",".join("?" * len(chunk))
+                conn.execute(f"DELETE FROM task_tags WHERE task_id IN ({marks})", chunk)
+                conn.execute(f"DELETE FROM task_deps WHERE task_id IN ({marks})", chunk)
+                conn.execute(f"DELETE FROM tasks WHERE id IN ({marks})", chunk)
+        return len(ids)
     except Exception:
         return 0
 
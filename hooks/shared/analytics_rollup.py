@@ -0,0 +1,561 @@
+"""Analytics rollups — shared/analytics_rollup.py
+
+Rolling-window aggregates behind the code hotspot and session analytics, so
+rank_files_by_risk(), get_session_summary() and compare_sessions() are
+answered without re-parsing audit logs, the capture queue and every state
+file on each call.
+
+Each source is folded in the way its lifecycle allows:
+
+- Audit trail (hooks/.audit_trail.jsonl) is append-only, so per-file gate
+  blocks and edit attempts are folded in from a checkpointed offset on each
+  read (inode and leading bytes detect a rewrite, which rebuilds).
+- The capture queue is drained, capped and rotated by the memory server, so
+  it cannot be tailed reliably. Its writers call record_observation() right
+  after appending; the store is seeded once from the queue when created.
+- Session state files are rewritten in place, so each one is re-parsed only
+  when its (inode, mtime, size) signature changes.
+
+Audit and queue counters are kept in hourly buckets. Hourly buckets older
+than COMPACT_AFTER_HOURS are merged into daily buckets and buckets older than
+RETENTION_DAYS expire, so window edges round outward to the containing hour
+(day, past the compaction horizon). Frustration signals are kept per prompt
+within the retention window since their trend depends on order.
+
+All functions are fail-open: on a store error they return None and callers
+fall back to scanning the raw sources.
+
+Public API
+----------
+  audit_event(entry)                    -> tuple | None
+  record_observation(obs)               -> None
+  file_rollup(lookback_days, now)       -> dict | None
+  queue_counts(session_id)              -> list[tuple] | None
+  frustration_scores(session_id)        -> list[float] | None
+  session_metrics(dirs, extract)        -> dict | None
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# ---------------------------------------------------------------------------
+# Paths and tuning
+# ---------------------------------------------------------------------------
+
+_HOOKS_DIR = os.path.join(os.path.expanduser("~"), ".claude", "hooks")
+
+# record_observation() runs on every tool call, so the store lives with the
+# other hot-path sidecars on the ramdisk when available. It is derived data:
+# a lost store is rebuilt from the audit trail and seeded from the queue.
+try:
+    from shared.ramdisk import get_state_dir
+
+    _STATE_DIR = get_state_dir()
+except Exception:
+    _STATE_DIR = _HOOKS_DIR
+_STORE_PATH = os.path.join(_STATE_DIR, ".analytics_rollup.db")
+
+try:
+    from shared.audit_log import AUDIT_TRAIL_PATH as _AUDIT_TRAIL
+except ImportError:
+    _AUDIT_TRAIL = os.path.join(_HOOKS_DIR, ".audit_trail.jsonl")
+
+try:
+    from shared.ramdisk import get_capture_queue
+
+    _CAPTURE_QUEUE = get_capture_queue()
+except Exception:
+    _CAPTURE_QUEUE = os.path.join(_HOOKS_DIR, ".capture_queue.jsonl")
+
+try:
+    from shared.gate_helpers import extract_file_path as _extract_file_path
+except ImportError:
+    _extract_file_path = None
+
+HOUR = 3600
+DAY = 86400
+COMPACT_AFTER_HOURS = 48
+RETENTION_DAYS = 31  # one more than the longest hotspot lookback
+QUEUE_SEED_LINES = 5000
+BUSY_TIMEOUT = 10.0  # seconds; readers may wait out a rebuild
+HOOK_BUSY_TIMEOUT = 0.1  # seconds; the tool-call path skips instead of stalling
+EDIT_TOOLS = ("Edit", "Write", "NotebookEdit")
+
+# table -> (key columns, {counter column: merge aggregate})
+_BUCKET_TABLES = {
+    "file_buckets": (
+        ("file_path",),
+        {"blocks": "SUM", "edits": "SUM", "last_block": "MAX"},
+    ),
+    "file_counts": (("file_path", "kind", "name"), {"blocks": "SUM"}),
+    "queue_buckets": (
+        ("session_id", "tool", "sentiment"),
+        {"entries": "SUM", "errors": "SUM"},
+    ),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS file_buckets (
+    span INTEGER, bucket INTEGER, file_path TEXT,
+    blocks INTEGER, edits INTEGER, last_block REAL,
+    PRIMARY KEY (span, bucket, file_path)
+);
+CREATE TABLE IF NOT EXISTS file_counts (
+    span INTEGER, bucket INTEGER, file_path TEXT, kind TEXT, name TEXT,
+    blocks INTEGER,
+    PRIMARY KEY (span, bucket, file_path, kind, name)
+);
+CREATE TABLE IF NOT EXISTS queue_buckets (
+    span INTEGER, bucket INTEGER, session_id TEXT, tool TEXT, sentiment TEXT,
+    entries INTEGER, errors INTEGER,
+    PRIMARY KEY (span, bucket, session_id, tool, sentiment)
+);
+CREATE TABLE IF NOT EXISTS frustration (ts REAL, session_id TEXT, score REAL);
+CREATE INDEX IF NOT EXISTS frustration_ts ON frustration (ts);
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY, signature TEXT, metrics TEXT
+);
+"""
+
+
+# ---------------------------------------------------------------------------
+# Entry parsing
+# ---------------------------------------------------------------------------
+
+
+def _entry_time(entry: dict) -> Optional[float]:
+    """Epoch seconds from a numeric or ISO-8601 timestamp/ts field."""
+    ts = entry.get("timestamp", entry.get("ts"))
+    if isinstance(ts, (int, float)) and not isinstance(ts, bool):
+        return float(ts)
+    if isinstance(ts, str) and ts:
+        try:
+            dt = datetime.fromisoformat(ts)
+        except ValueError:
+            return None
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    return None
+
+
+def audit_event(entry) -> Optional[Tuple[float, str, str, str, str]]:
+    """(ts, file_path, tool, gate, decision) for an audit entry naming a file.
+
+    The file comes from the entry's file_path field, or from tool_input for
+    older entries. Returns None for entries without a file or timestamp.
+    """
+    if not isinstance(entry, dict):
+        return None
+    ts = _entry_time(entry)
+    if ts is None:
+        return None
+    tool = entry.get("tool", "") or ""
+    fp = entry.get("file_path") or ""
+    if not fp and _extract_file_path is not None:
+        fp = _extract_file_path(entry.get("tool_input", {}), tool)
+    if not isinstance(fp, str) or not fp:
+        return None
+    return ts, fp, tool, entry.get("gate", "") or "", entry.get("decision", "") or ""
+
+
+def _hour(ts: float) -> int:
+    return int(ts) - int(ts) % HOUR
+
+
+# ---------------------------------------------------------------------------
+# Store plumbing
+# ---------------------------------------------------------------------------
+
+
+_schema_ready = set()  # (pid, store path) whose schema was created
+
+
+def _connect(timeout: float = BUSY_TIMEOUT) -> sqlite3.Connection:
+    key = (os.getpid(), _STORE_PATH)
+    if key not in _schema_ready:
+        os.makedirs(os.path.dirname(_STORE_PATH), exist_ok=True)
+    conn = sqlite3.connect(_STORE_PATH, timeout=timeout, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if key not in _schema_ready:
+            conn.executescript(_SCHEMA)
+            _schema_ready.add(key)
+    except BaseException:
+        conn.close()
+        raise
+    return conn
+
+
+def _transaction(conn: sqlite3.Connection, fn: Callable):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        result = fn()
+        conn.execute("COMMIT")
+        return result
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _meta_get(conn: sqlite3.Connection, key: str, default=None):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def _meta_set(conn: sqlite3.Connection, **values) -> None:
+    conn.executemany(
+        "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+        [(k, str(v)) for k, v in values.items()],
+    )
+
+
+def _upsert_sql(table: str) -> str:
+    keys, counters = _BUCKET_TABLES[table]
+    cols = ("span", "bucket") + keys + tuple(counters)
+    merges = [
+        f"{c} = MAX({c}, excluded.{c})" if agg == "MAX" else f"{c} = {c} + excluded.{c}"
+        for c, agg in counters.items()
+    ]
+    return (
+        f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))}) "
+        f"ON CONFLICT ({', '.join(cols[: 2 + len(keys)])}) DO UPDATE SET {', '.join(merges)}"
+    )
+
+
+def _compact(conn: sqlite3.Connection, now: float) -> None:
+    """Expire old buckets and merge hourly buckets past the horizon into days."""
+    expiry = now - RETENTION_DAYS * DAY
+    horizon = now - COMPACT_AFTER_HOURS * HOUR
+    for table, (keys, counters) in _BUCKET_TABLES.items():
+        conn.execute(f"DELETE FROM {table} WHERE bucket + span <= ?", (expiry,))
+        key_sql = ", ".join(keys)
+        aggs = ", ".join(f"{agg}({c})" for c, agg in counters.items())
+        rows = conn.execute(
+            f"SELECT bucket - bucket % {DAY}, {key_sql}, {aggs} FROM {table} "
+            f"WHERE span = {HOUR} AND bucket + span <= ? GROUP BY 1, {key_sql}",
+            (horizon,),
+        ).fetchall()
+        if rows:
+            conn.execute(
+                f"DELETE FROM {table} WHERE span = {HOUR} AND bucket + span <= ?",
+                (horizon,),
+            )
+            conn.executemany(_upsert_sql(table), [(DAY,) + tuple(r) for r in rows])
+    conn.execute("DELETE FROM frustration WHERE ts < ?", (expiry,))
+
+
+# ---------------------------------------------------------------------------
+# Audit trail -> per-file buckets
+# ---------------------------------------------------------------------------
+
+
+def _fold_audit(conn: sqlite3.Connection, lines: Iterable[bytes], now: float) -> None:
+    expiry = now - RETENTION_DAYS * DAY
+    files: Dict[tuple, list] = {}
+    counts: Counter = Counter()
+    for raw in lines:
+        try:
+            event = audit_event(json.loads(raw))
+        except (ValueError, UnicodeDecodeError):
+            continue
+        if event is None or event[0] < expiry:
+            continue
+        ts, fp, tool, gate, decision = event
+        is_block, is_edit = decision == "block", tool in EDIT_TOOLS
+        if not (is_block or is_edit):
+            continue
+        key = (_hour(ts), fp)
+        row = files.setdefault(key, [0, 0, 0.0])
+        if is_block:
+            row[0] += 1
+            row[2] = max(row[2], ts)
+            counts[key + ("gate", gate)] += 1
+            counts[key + ("tool", tool)] += 1
+        if is_edit:
+            row[1] += 1
+    conn.executemany(
+        _upsert_sql("file_buckets"), [(HOUR,) + k + tuple(v) for k, v in files.items()]
+    )
+    conn.executemany(
+        _upsert_sql("file_counts"), [(HOUR,) + k + (n,) for k, n in counts.items()]
+    )
+
+
+def _sync_audit(conn: sqlite3.Connection, source: str, now: float) -> None:
+    """Fold complete trail lines appended since the last sync."""
+    with open(source, "rb") as f:
+        st = os.fstat(f.fileno())
+        offset = int(_meta_get(conn, "audit_offset", "0"))
+        head = f.read(min(offset, 256)).hex()
+        if (
+            str(st.st_ino) != _meta_get(conn, "audit_inode")
+            or st.st_size < offset
+            or head != _meta_get(conn, "audit_head")
+        ):
+            # New or rewritten trail: rebuild from scratch
+            conn.execute("DELETE FROM file_buckets")
+            conn.execute("DELETE FROM file_counts")
+            offset = 0
+        if st.st_size > offset:
+            f.seek(offset)
+            lines = []
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # line still being written; pick it up next sync
+                offset += len(raw)
+                lines.append(raw)
+            _fold_audit(conn, lines, now)
+        f.seek(0)
+        head = f.read(min(offset, 256)).hex()
+        _meta_set(conn, audit_offset=offset, audit_inode=st.st_ino, audit_head=head)
+
+
+def file_rollup(lookback_days: int, now: Optional[float] = None) -> Optional[Dict[str, dict]]:
+    """Per-file block and edit counts for the last lookback_days.
+
+    Returns {file_path: {block_count, edit_count, blocks_by_gate,
+    blocks_by_tool, recent_block_time}} for files with any block or edit,
+    or None when there is no audit trail or the store cannot be used.
+    """
+    if not os.path.isfile(_AUDIT_TRAIL):
+        return None
+    now = time.time() if now is None else now
+    cutoff = now - lookback_days * DAY
+    try:
+        conn = _connect()
+        try:
+
+            def sync():
+                _sync_audit(conn, _AUDIT_TRAIL, now)
+                _compact(conn, now)
+
+            _transaction(conn, sync)
+            files: Dict[str, dict] = {}
+            for fp, blocks, edits, last in conn.execute(
+                "SELECT file_path, SUM(blocks), SUM(edits), MAX(last_block) "
+                "FROM file_buckets WHERE bucket + span > ? GROUP BY file_path",
+                (cutoff,),
+            ):
+                files[fp] = {
+                    "block_count": blocks,
+                    "edit_count": edits,
+                    "blocks_by_gate": {},
+                    "blocks_by_tool": {},
+                    "recent_block_time": last,
+                }
+            for fp, kind, name, n in conn.execute(
+                "SELECT file_path, kind, name, SUM(blocks) FROM file_counts "
+                "WHERE bucket + span > ? GROUP BY file_path, kind, name",
+                (cutoff,),
+            ):
+                if fp in files:
+                    files[fp][f"blocks_by_{kind}"][name] = n
+            return files
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error, ValueError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Capture queue -> per-session buckets and frustration signals
+# ---------------------------------------------------------------------------
+
+
+def _fold_queue(conn: sqlite3.Connection, observations: Iterable, now: float) -> None:
+    buckets: Counter = Counter()
+    errors: Counter = Counter()
+    signals = []
+    for obs in observations:
+        meta = obs.get("metadata") if isinstance(obs, dict) else None
+        if not isinstance(meta, dict):
+            meta = {}
+        ts = meta.get("session_time")
+        if not isinstance(ts, (int, float)) or isinstance(ts, bool):
+            ts = now
+        sid = meta.get("session_id", "") or ""
+        tool = meta.get("tool_name", "unknown") or ""
+        key = (_hour(ts), sid, tool, meta.get("sentiment", "neutral") or "")
+        buckets[key] += 1
+        if meta.get("has_error", "false") == "true":
+            errors[key] += 1
+        score = meta.get("frustration_score")
+        if tool == "UserPrompt" and score is not None:
+            try:
+                signals.append((ts, sid, float(score)))
+            except (TypeError, ValueError):
+                pass
+    conn.executemany(
+        _upsert_sql("queue_buckets"),
+        [(HOUR,) + k + (n, errors[k]) for k, n in buckets.items()],
+    )
+    conn.executemany("INSERT INTO frustration VALUES (?, ?, ?)", signals)
+
+
+def _seed_queue(conn: sqlite3.Connection, now: float) -> bool:
+    """Fold the current queue tail into a new store once; True if it did."""
+    if _meta_get(conn, "queue_seeded") is not None:
+        return False
+    observations = []
+    try:
+        with open(_CAPTURE_QUEUE, "rb") as f:
+            lines = f.readlines()[-QUEUE_SEED_LINES:]
+        for raw in lines:
+            try:
+                obs = json.loads(raw)
+            except (ValueError, UnicodeDecodeError):
+                continue
+            if isinstance(obs, dict):
+                observations.append(obs)
+    except OSError:
+        pass
+    _fold_queue(conn, observations, now)
+    _meta_set(conn, queue_seeded=now)
+    return True
+
+
+def record_observation(obs: dict) -> None:
+    """Fold one just-queued observation into the rollups. Never raises.
+
+    Runs on the tool-call path: if the store stays locked (e.g. by a
+    file_rollup() rebuild) for more than HOOK_BUSY_TIMEOUT, the observation
+    is left out of the rollups rather than stalling the call.
+    """
+    now = time.time()
+    try:
+        conn = _connect(HOOK_BUSY_TIMEOUT)
+        try:
+
+            def record():
+                # A new store is seeded from the queue, which already holds obs
+                if not _seed_queue(conn, now):
+                    _fold_queue(conn, [obs], now)
+
+            _transaction(conn, record)
+        finally:
+            conn.close()
+    except Exception:
+        pass
+
+
+def _read_queue(query: Callable) -> Optional[list]:
+    now = time.time()
+    try:
+        conn = _connect()
+        try:
+
+            def sync():
+                _seed_queue(conn, now)
+                _compact(conn, now)
+
+            _transaction(conn, sync)
+            return query(conn)
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error, ValueError):
+        return None
+
+
+def queue_counts(session_id: Optional[str] = None) -> Optional[List[tuple]]:
+    """(session_id, tool, sentiment, entries, errors) rows over the retention window."""
+    where, args = ("WHERE session_id = ?", (session_id,)) if session_id else ("", ())
+    return _read_queue(
+        lambda conn: conn.execute(
+            "SELECT session_id, tool, sentiment, SUM(entries), SUM(errors) "
+            f"FROM queue_buckets {where} GROUP BY 1, 2, 3",
+            args,
+        ).fetchall()
+    )
+
+
+def frustration_scores(session_id: Optional[str] = None) -> Optional[List[float]]:
+    """UserPrompt frustration scores in arrival order over the retention window."""
+    where, args = ("WHERE session_id = ?", (session_id,)) if session_id else ("", ())
+    return _read_queue(
+        lambda conn: [
+            row[0]
+            for row in conn.execute(
+                f"SELECT score FROM frustration {where} ORDER BY ts, rowid", args
+            )
+        ]
+    )
+
+
+# ---------------------------------------------------------------------------
+# Session state files -> per-session metrics
+# ---------------------------------------------------------------------------
+
+
+def session_metrics(
+    dirs: List[str], extract: Callable[[str, dict], dict]
+) -> Optional[Dict[str, dict]]:
+    """{session_id: extract(session_id, state)} for every state_<id>.json in dirs.
+
+    Earlier directories take precedence. Stored metrics are reused until a
+    file's signature changes; rows for vanished files are dropped.
+    """
+    found: Dict[str, tuple] = {}
+    for directory in dirs:
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            continue
+        for name in names:
+            if not (name.startswith("state_") and name.endswith(".json")) or ".tmp." in name:
+                continue
+            sid = name[len("state_") : -len(".json")]
+            if sid in found:
+                continue
+            fpath = os.path.join(directory, name)
+            try:
+                st = os.stat(fpath)
+            except OSError:
+                continue
+            found[sid] = (fpath, f"{st.st_ino}:{st.st_mtime_ns}:{st.st_size}")
+
+    try:
+        conn = _connect()
+        try:
+            stored = {
+                sid: (sig, metrics)
+                for sid, sig, metrics in conn.execute("SELECT * FROM sessions")
+            }
+            updates = []
+            for sid, (fpath, sig) in found.items():
+                if sid in stored and stored[sid][0] == sig:
+                    continue
+                metrics = None
+                try:
+                    with open(fpath) as fh:
+                        state = json.load(fh)
+                    if isinstance(state, dict):
+                        metrics = json.dumps(extract(sid, state))
+                except (OSError, ValueError):
+                    pass
+                updates.append((sid, sig, metrics))
+                stored[sid] = (sig, metrics)
+            gone = [(sid,) for sid in stored if sid not in found]
+            if updates or gone:
+
+                def write():
+                    conn.executemany("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)", updates)
+                    conn.executemany("DELETE FROM sessions WHERE session_id = ?", gone)
+
+                _transaction(conn, write)
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error, ValueError, TypeError):
+        return None
+    return {
+        sid: json.loads(stored[sid][1]) for sid in found if stored[sid][1] is not None
+    }
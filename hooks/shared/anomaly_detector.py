@@ -6,6 +6,12 @@ dominance (stuck loops), then determines whether escalation is needed.
 Also provides session-level behavioral drift detection: analyzes tool call
 patterns, gate block rates, error frequencies, and memory query gaps to
 surface anomalous session behavior.
+
+The history-based checks (compute_baseline, detect_anomalies,
+detect_rate_of_change) are one-shot wrappers over shared.metric_ring, which
+imports numpy and is loaded on first use so the per-tool-call behavioral
+checks stay light. Callers that sample continuously should keep a
+MetricRing and call its evaluate() instead of passing full histories.
 """
 
 import statistics as _statistics
@@ -30,18 +36,10 @@ def compute_baseline(
     if not history:
         return {}
 
-    window_data = history[-window:]
-    all_gates: set = set()
-    for snapshot in window_data:
-        all_gates.update(snapshot.keys())
-
-    baseline: Dict[str, float] = {}
-    n = len(window_data)
-    for gate in all_gates:
-        total = sum(snapshot.get(gate, 0.0) for snapshot in window_data)
-        baseline[gate] = total / n
+    from shared.metric_ring import MetricRing
 
-    return baseline
+    window_data = history[-window:]
+    return MetricRing.from_history(window_data).baseline(len(window_data))
 
 
 def _stddev(values: List[float]) -> float:
@@ -80,56 +78,10 @@ def detect_anomalies(
     if not baseline:
         return []
 
-    baseline_values = list(baseline.values())
-    mean_all = sum(baseline_values) / len(baseline_values)
-    std_all = _stddev(baseline_values)
-
-    # Per-gate stddev from history (more sensitive to individual gate anomalies)
-    per_gate_std: Dict[str, Tuple[float, float]] = {}
-    if history and len(history) >= 3:
-        all_gates = set()
-        for snap in history:
-            all_gates.update(snap.keys())
-        for gate in all_gates:
-            gate_vals = [snap.get(gate, 0.0) for snap in history]
-            gate_mean = sum(gate_vals) / len(gate_vals)
-            gate_std = _stddev(gate_vals)
-            per_gate_std[gate] = (gate_mean, gate_std)
-
-    anomalies = []
-    for gate, rate in current.items():
-        baseline_rate = baseline.get(gate, 0.0)
-        global_threshold = mean_all + threshold_sigma * std_all
-        global_triggered = rate > global_threshold and rate > baseline_rate
-
-        # Per-gate detection: rate exceeds gate's own mean + threshold * gate's own stddev
-        per_gate_triggered = False
-        if gate in per_gate_std:
-            g_mean, g_std = per_gate_std[gate]
-            if g_std > 0:
-                per_gate_triggered = rate > g_mean + threshold_sigma * g_std
-
-        if global_triggered or per_gate_triggered:
-            sigma = (rate - mean_all) / std_all if std_all > 0 else float("inf")
-            if global_triggered and per_gate_triggered:
-                method = "both"
-            elif global_triggered:
-                method = "global"
-            else:
-                method = "per_gate"
-            anomalies.append(
-                {
-                    "gate": gate,
-                    "current_rate": rate,
-                    "baseline_rate": baseline_rate,
-                    "delta": rate - baseline_rate,
-                    "sigma": sigma,
-                    "detection_method": method,
-                }
-            )
+    from shared.metric_ring import MetricRing
 
-    anomalies.sort(key=lambda x: x["delta"], reverse=True)
-    return anomalies
+    ring = MetricRing.from_history(history) if history and len(history) >= 3 else MetricRing()
+    return ring.detect_anomalies(current, baseline, threshold_sigma)
 
 
 def detect_stuck_loop(
@@ -231,33 +183,9 @@ def detect_rate_of_change(
     if len(history) < window + 1:
         return []
 
-    recent = history[-window:]
-    older = history[-(window * 2):-window] if len(history) >= window * 2 else history[:window]
-
-    all_gates: set = set()
-    for snap in recent + older:
-        all_gates.update(snap.keys())
-
-    results = []
-    for gate in all_gates:
-        recent_vals = [snap.get(gate, 0.0) for snap in recent]
-        older_vals = [snap.get(gate, 0.0) for snap in older]
-
-        recent_mean = sum(recent_vals) / len(recent_vals) if recent_vals else 0.0
-        older_mean = sum(older_vals) / len(older_vals) if older_vals else 0.0
-
-        roc = recent_mean - older_mean
-        if abs(roc) >= threshold:
-            results.append({
-                "gate": gate,
-                "rate_of_change": round(roc, 3),
-                "recent_mean": round(recent_mean, 3),
-                "older_mean": round(older_mean, 3),
-                "direction": "accelerating" if roc > 0 else "decelerating",
-            })
-
-    results.sort(key=lambda x: abs(x["rate_of_change"]), reverse=True)
-    return results
+    from shared.metric_ring import MetricRing
+
+    return MetricRing.from_history(history).rate_of_change(window, threshold)
 
 # ---------------------------------------------------------------------------
 # Session-level behavioral drift detection
@@ -0,0 +1,356 @@
+"""Capture Ingest — streaming ingestion of the observation capture queue.
+
+Hooks (tracker, user_prompt_capture, pre_compact) append one JSON line per
+observation to the capture queue. The memory server used to read the whole
+file, truncate it via a temp-file replace (losing any line appended between
+the read and the replace) and compact observations inline on the search path.
+
+This module consumes the queue incrementally instead:
+
+- QueueCursor keeps a committed byte offset for the active queue file
+  (with its inode and a fingerprint of its leading bytes) and for each
+  sealed segment, persisted next to the queue. Only complete lines are
+  consumed; a half-written tail is left for the next read.
+- Once the active file is fully consumed and larger than ``rotate_bytes``
+  it is renamed to a sealed segment. A writer that opened the old file just
+  before the rename still appends to the segment, so segments are drained
+  until EOF and only deleted after ``grace_seconds`` without modification.
+- A rewrite of the active file by someone else (e.g. the tracker's cap) resets
+  its offset to 0; recently ingested ids are remembered so re-read lines are
+  not embedded twice.
+- CaptureIngestWorker drains the cursor on a background thread every
+  ``max_latency`` seconds, upserting in batches, and runs compaction on its
+  own schedule. Offsets are committed only after a successful upsert, so a
+  failed batch is retried rather than dropped.
+
+Public API:
+    from shared.capture_ingest import QueueCursor, CaptureIngestWorker
+"""
+
+import collections
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+ROTATE_BYTES = 64 * 1024
+SEGMENT_GRACE_SECONDS = 5.0
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_LATENCY = 2.0  # seconds between background drains
+DEFAULT_COMPACT_INTERVAL = 600.0  # seconds between observation compactions
+RECENT_IDS = 5000  # ids remembered to skip re-read lines after a rewrite
+HEAD_BYTES = 128  # leading bytes fingerprinted to detect a replaced file
+
+
+class QueueCursor:
+    """Offset-tracked reader over a JSONL queue and its sealed segments."""
+
+    def __init__(
+        self,
+        path: str,
+        rotate_bytes: int = ROTATE_BYTES,
+        grace_seconds: float = SEGMENT_GRACE_SECONDS,
+    ):
+        self.path = path
+        self.state_path = path + ".offset"
+        self.rotate_bytes = rotate_bytes
+        self.grace_seconds = grace_seconds
+        self._active = {"ino": None, "offset": 0, "head": ""}
+        self._segments = {}  # sealed segment path -> committed offset
+        self._load_state()
+
+    # -- persistence ---------------------------------------------------------
+
+    def _load_state(self):
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            self._active = state.get("active", self._active)
+            self._segments = state.get("segments", {})
+        except (OSError, json.JSONDecodeError, AttributeError):
+            pass
+        # Segments sealed before a crash that never reached the state file
+        for seg in glob.glob(self.path + ".*.seg"):
+            self._segments.setdefault(seg, 0)
+
+    def _save_state(self):
+        tmp = self.state_path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump({"active": self._active, "segments": self._segments}, f)
+            os.replace(tmp, self.state_path)
+        except OSError:
+            pass
+
+    # -- reading -------------------------------------------------------------
+
+    @staticmethod
+    def _read_lines(path: str, offset: int, max_lines: int) -> Tuple[list, int]:
+        """Complete lines from offset; returns (lines, new_offset)."""
+        lines = []
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while len(lines) < max_lines:
+                raw = f.readline()
+                if not raw or not raw.endswith(b"\n"):
+                    break  # EOF or a line still being written
+                offset += len(raw)
+                lines.append(raw)
+        return lines, offset
+
+    @staticmethod
+    def _head(path: str, length: int) -> str:
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read(length)).hexdigest()
+
+    def _same_file(self, st) -> bool:
+        """True when the active file is the one the committed offset refers to.
+
+        Inode numbers are recycled after delete/replace, so the leading bytes
+        are compared too (they never change under append-only writes).
+        """
+        active = self._active
+        if st.st_ino != active["ino"] or st.st_size < active["offset"]:
+            return False
+        length = min(HEAD_BYTES, active["offset"])
+        return self._head(self.path, length) == active.get("head", "")
+
+    def read(self, max_lines: int = 500) -> Tuple[List[dict], dict]:
+        """Parse up to max_lines new entries.
+
+        Returns (entries, positions); pass positions to commit() once the
+        entries are safely stored. Corrupted lines are skipped.
+        """
+        raw_lines = []
+        positions = {"segments": {}, "active": None}
+
+        for seg in sorted(self._segments):
+            if len(raw_lines) >= max_lines:
+                break
+            try:
+                got, off = self._read_lines(
+                    seg, self._segments[seg], max_lines - len(raw_lines)
+                )
+            except FileNotFoundError:
+                positions["segments"][seg] = None
+                continue
+            raw_lines.extend(got)
+            positions["segments"][seg] = off
+
+        if len(raw_lines) < max_lines:
+            try:
+                st = os.stat(self.path)
+                offset = self._active["offset"] if self._same_file(st) else 0
+                got, off = self._read_lines(
+                    self.path, offset, max_lines - len(raw_lines)
+                )
+                raw_lines.extend(got)
+                positions["active"] = {
+                    "ino": st.st_ino,
+                    "offset": off,
+                    "head": self._head(self.path, min(HEAD_BYTES, off)),
+                }
+            except FileNotFoundError:
+                pass
+
+        entries = []
+        for raw in raw_lines:
+            try:
+                obs = json.loads(raw)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if isinstance(obs, dict):
+                entries.append(obs)
+        return entries, positions
+
+    def commit(self, positions: dict) -> None:
+        """Advance offsets, retire drained segments and rotate the active file."""
+        for seg, off in positions.get("segments", {}).items():
+            if off is None:
+                self._segments.pop(seg, None)
+            else:
+                self._segments[seg] = off
+        if positions.get("active") is not None:
+            self._active = positions["active"]
+
+        now = time.time()
+        for seg, off in list(self._segments.items()):
+            try:
+                st = os.stat(seg)
+            except FileNotFoundError:
+                self._segments.pop(seg, None)
+                continue
+            if off >= st.st_size and now - st.st_mtime >= self.grace_seconds:
+                try:
+                    os.remove(seg)
+                except OSError:
+                    continue
+                self._segments.pop(seg, None)
+
+        self._maybe_rotate()
+        self._save_state()
+
+    def _maybe_rotate(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if st.st_size < self.rotate_bytes or not self._same_file(st):
+            return
+        if self._active["offset"] < st.st_size:
+            return  # unread data: rotate after it is consumed
+        seg = f"{self.path}.{time.time_ns()}.seg"
+        try:
+            os.rename(self.path, seg)
+        except OSError:
+            return
+        # Late appends to the renamed file are picked up from this offset
+        self._segments[seg] = self._active["offset"]
+        self._active = {"ino": None, "offset": 0, "head": ""}
+
+    def pending_bytes(self) -> int:
+        """Bytes not yet consumed across the active file and segments."""
+        total = 0
+        for seg, off in self._segments.items():
+            try:
+                total += max(0, os.path.getsize(seg) - off)
+            except OSError:
+                pass
+        try:
+            st = os.stat(self.path)
+            off = self._active["offset"] if self._same_file(st) else 0
+            total += max(0, st.st_size - off)
+        except OSError:
+            pass
+        return total
+
+
+class CaptureIngestWorker:
+    """Background drain of a QueueCursor into a collection upsert.
+
+    Args:
+        cursor: QueueCursor over the capture queue.
+        upsert: Callable(documents, metadatas, ids) storing one batch.
+        compact: Optional callable run every ``compact_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        cursor: QueueCursor,
+        upsert: Callable,
+        compact: Optional[Callable] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_latency: float = DEFAULT_MAX_LATENCY,
+        compact_interval: float = DEFAULT_COMPACT_INTERVAL,
+    ):
+        self.cursor = cursor
+        self._upsert = upsert
+        self._compact = compact
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.compact_interval = compact_interval
+        self._recent = collections.OrderedDict()
+        self._lock = threading.Lock()  # one drain at a time
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self._last_compact = None
+        self.ingested = 0
+        self.errors = 0
+
+    def _remember(self, oid):
+        self._recent[oid] = None
+        if len(self._recent) > RECENT_IDS:
+            self._recent.popitem(last=False)
+
+    def drain(self) -> int:
+        """Ingest everything currently queued; returns rows upserted.
+
+        Stops at the first failed batch, leaving its offsets uncommitted so
+        the next drain retries it.
+        """
+        total = 0
+        with self._lock:
+            while True:
+                entries, positions = self.cursor.read(self.batch_size)
+                docs, metas, ids = [], [], []
+                for obs in entries:
+                    oid = obs.get("id")
+                    if "document" not in obs or not oid:
+                        continue
+                    if oid in self._recent or oid in ids:
+                        continue
+                    docs.append(obs["document"])
+                    metas.append(obs.get("metadata", {}))
+                    ids.append(oid)
+                if docs:
+                    try:
+                        self._upsert(docs, metas, ids)
+                    except Exception:
+                        self.errors += 1
+                        break
+                    for oid in ids:
+                        self._remember(oid)
+                    total += len(docs)
+                self.cursor.commit(positions)
+                if len(entries) < self.batch_size:
+                    break
+        self.ingested += total
+        return total
+
+    def maybe_compact(self, force: bool = False) -> bool:
+        if self._compact is None:
+            return False
+        now = time.monotonic()
+        if (
+            not force
+            and self._last_compact is not None
+            and now - self._last_compact < self.compact_interval
+        ):
+            return False
+        self._last_compact = now
+        try:
+            self._compact()
+        except Exception:
+            self.errors += 1
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.drain()
+                self.maybe_compact()
+            except Exception:
+                self.errors += 1
+            self._wake.wait(self.max_latency)
+            self._wake.clear()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, daemon=True, name="capture-ingest"
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def wake(self):
+        """Ask the background thread to drain now instead of at its next tick."""
+        self._wake.set()
+
+    def stats(self) -> dict:
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "ingested": self.ingested,
+            "errors": self.errors,
+            "pending_bytes": self.cursor.pending_bytes(),
+            "segments": len(self.cursor._segments),
+        }
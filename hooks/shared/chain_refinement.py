@@ -6,6 +6,10 @@ opportunities. Suggests refined approaches when the same error recurs.
 
 Design:
 - Pure functions over outcome data (no I/O, no side effects in core logic)
+- Each distinct error is normalized once into an ErrorSignature (stable
+  fingerprint + token shingles); outcomes are grouped into ErrorClusters
+  by fingerprint, and similar-error lookups probe a shingle index instead
+  of comparing against every outcome or lesson
 - Integrates with memory's fix_outcomes table for historical data
 - Fail-open: all public functions return empty/neutral on error
 
@@ -16,10 +20,18 @@ Public API:
     get_strategy_effectiveness(outcomes) -> Dict[str, StrategyStats]
     compute_chain_health(outcomes)      -> ChainHealth
     generate_failure_lessons(outcomes)  -> List[FailureLesson]
+    error_signature(error)              -> Optional[ErrorSignature]
+    ErrorClusterIndex.from_outcomes(outcomes)
+
+Persistent index across processes: shared.error_cluster_store.
 """
 
+import hashlib
+import re
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
 
 
 # ── Data containers ──────────────────────────────────────────────────────
@@ -156,9 +168,80 @@ MIN_IMPROVEMENT_DELTA = 0.15
 # Minimum failures before a lesson is generated (avoid noise)
 MIN_FAILURES_FOR_LESSON = 2
 
+# Errors at least this similar (see _error_similarity) count as the same error
+SIMILARITY_THRESHOLD = 0.4
+
+_SUCCESS_RESULTS = ("success", "resolved", "fixed")
+_FAILURE_RESULTS = ("failure", "failed", "unresolved")
+
 
 # ── Outcome parsing ─────────────────────────────────────────────────────
 
+_FILE_EXT = r"(?:py|js|ts|tsx|jsx|rs|go|java|rb|sh|c|cpp|h)"
+
+# (pattern, replacement) applied in order by _normalize_error
+_NORMALIZE_RULES = (
+    # Python traceback file references: File "path/file.py"
+    # Handles paths with spaces, commas, or other special chars inside quotes.
+    (re.compile(r'[Ff]ile\s+"[^"]*\.' + _FILE_EXT + '"'), "File <file>"),
+    # Bare file paths (any common extension)
+    (re.compile(r"/[\w/.-]+\." + _FILE_EXT), "<file>"),
+    # Line numbers
+    (re.compile(r"line \d+"), "line N"),
+    # Timestamps
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}"), "<ts>"),
+    # Hex addresses
+    (re.compile(r"0x[0-9a-fA-F]+"), "<addr>"),
+    # Numeric IDs (PIDs, ports, etc.) — standalone numbers of 4+ digits
+    (re.compile(r"\b\d{4,}\b"), "<num>"),
+    # Collapse whitespace
+    (re.compile(r"\s+"), " "),
+)
+
+
+@dataclass(frozen=True)
+class ErrorSignature:
+    """Normalized form of one error string, computed once per distinct error.
+
+    Attributes:
+        normalized:  The normalized error (see _normalize_error).
+        fingerprint: Stable hash of the normalized error; equal errors
+                     share a fingerprint across processes.
+        shingles:    Token set of the normalized error, the unit
+                     _error_similarity compares.
+    """
+    normalized: str
+    fingerprint: str
+    shingles: FrozenSet[str]
+
+
+def _shingles(normalized: str) -> FrozenSet[str]:
+    return frozenset(normalized.split())
+
+
+@lru_cache(maxsize=4096)
+def _signature(error: str) -> Optional[ErrorSignature]:
+    normalized = error
+    for pattern, replacement in _NORMALIZE_RULES:
+        normalized = pattern.sub(replacement, normalized)
+    normalized = normalized.strip().lower()
+    if not normalized:
+        return None
+    fingerprint = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+    return ErrorSignature(normalized, fingerprint, _shingles(normalized))
+
+
+def error_signature(error: str) -> Optional[ErrorSignature]:
+    """ErrorSignature of a raw error string, or None if it normalizes to ''.
+
+    Signatures are memoized per raw string, so outcomes repeating an error
+    pay for the regex normalization once.
+    """
+    if not error or not isinstance(error, str):
+        return None
+    return _signature(error)
+
+
 def _normalize_error(error: str) -> str:
     """Normalize an error string for grouping.
 
@@ -171,33 +254,8 @@ def _normalize_error(error: str) -> str:
     comma is consumed along with the quote rather than being left as a
     stray character that breaks downstream matching.
     """
-    if not error or not isinstance(error, str):
-        return ""
-    import re
-    # Remove Python traceback file references: File "path/file.py"
-    # Handles paths with spaces, commas, or other special chars inside quotes.
-    normalized = re.sub(
-        r'[Ff]ile\s+"[^"]*\.(?:py|js|ts|tsx|jsx|rs|go|java|rb|sh|c|cpp|h)"',
-        'File <file>',
-        error,
-    )
-    # Remove bare file paths (any common extension)
-    normalized = re.sub(
-        r'/[\w/.-]+\.(?:py|js|ts|tsx|jsx|rs|go|java|rb|sh|c|cpp|h)',
-        '<file>',
-        normalized,
-    )
-    # Remove line numbers
-    normalized = re.sub(r'line \d+', 'line N', normalized)
-    # Remove timestamps
-    normalized = re.sub(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}', '<ts>', normalized)
-    # Remove hex addresses
-    normalized = re.sub(r'0x[0-9a-fA-F]+', '<addr>', normalized)
-    # Remove numeric IDs (PIDs, ports, etc.) — standalone numbers of 4+ digits
-    normalized = re.sub(r'\b\d{4,}\b', '<num>', normalized)
-    # Collapse whitespace
-    normalized = re.sub(r'\s+', ' ', normalized).strip()
-    return normalized.lower()
+    signature = error_signature(error)
+    return signature.normalized if signature else ""
 
 
 def _extract_outcome_fields(outcome: dict) -> dict:
@@ -244,6 +302,20 @@ def _adaptive_min_recurrence(n_outcomes: int) -> int:
     return 7
 
 
+def shingle_similarity(size_a: int, size_b: int, overlap: int) -> float:
+    """_error_similarity from shingle-set sizes and their overlap count."""
+    if not size_a or not size_b or not overlap:
+        return 0.0
+    # For single- or two-token errors the overlap coefficient gives a
+    # better signal: a single shared token between two one-word errors
+    # gives jaccard = 0.5 (below the 0.4 threshold when union grows)
+    # but overlap-coefficient = 1.0, which correctly marks them as
+    # the same error class.
+    if max(size_a, size_b) <= 2:
+        return overlap / min(size_a, size_b)  # overlap coefficient >= jaccard
+    return overlap / (size_a + size_b - overlap)
+
+
 def _error_similarity(a: str, b: str) -> float:
     """Compute similarity between two normalised error strings.
 
@@ -254,27 +326,303 @@ def _error_similarity(a: str, b: str) -> float:
 
     Returns a float in [0.0, 1.0].
     """
-    words_a = set(a.split())
-    words_b = set(b.split())
-    if not words_a or not words_b:
-        return 0.0
-    intersection = words_a & words_b
-    if not intersection:
-        return 0.0
-    union = words_a | words_b
-    jaccard = len(intersection) / len(union)
+    words_a = _shingles(a)
+    words_b = _shingles(b)
+    return shingle_similarity(len(words_a), len(words_b), len(words_a & words_b))
 
-    # For single- or two-token errors the overlap coefficient gives a
-    # better signal: a single shared token between two one-word errors
-    # gives jaccard = 0.5 (below the 0.4 threshold when union grows)
-    # but overlap-coefficient = 1.0, which correctly marks them as
-    # the same error class.
-    max_tokens = max(len(words_a), len(words_b))
-    if max_tokens <= 2:
-        min_len = min(len(words_a), len(words_b))
-        return len(intersection) / min_len  # overlap coefficient >= jaccard
 
-    return jaccard
+class _ShinglePostings:
+    """Inverted index from shingle to the keys whose error contains it.
+
+    probe() only touches keys sharing a shingle with the query, so finding
+    similar errors costs the length of the query's posting lists rather
+    than a comparison against every indexed error.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, List[str]] = {}
+        self._sizes: Dict[str, int] = {}
+
+    def add(self, key: str, shingles: FrozenSet[str]) -> None:
+        if key in self._sizes:
+            return
+        self._sizes[key] = len(shingles)
+        for shingle in shingles:
+            self._postings.setdefault(shingle, []).append(key)
+
+    def probe(
+        self, shingles: FrozenSet[str], threshold: float = SIMILARITY_THRESHOLD,
+    ) -> Dict[str, float]:
+        """Key -> similarity for every indexed error at least threshold similar."""
+        overlap: Counter = Counter()
+        for shingle in shingles:
+            overlap.update(self._postings.get(shingle, ()))
+        similar = {}
+        for key, count in overlap.items():
+            similarity = shingle_similarity(len(shingles), self._sizes[key], count)
+            if similarity >= threshold:
+                similar[key] = similarity
+        return similar
+
+
+# ── Error clusters ───────────────────────────────────────────────────────
+
+@dataclass
+class ErrorCluster:
+    """All outcomes whose errors share one fingerprint.
+
+    Attributes:
+        error_pattern: The normalized error string.
+        fingerprint: ErrorSignature.fingerprint of error_pattern.
+        occurrence_count: Outcomes recorded with this error.
+        strategies: Strategy -> {attempts, successes, failures, first_seen},
+                    in order of first use (first_seen is the sequence
+                    number of the outcome that first used it).
+    """
+    error_pattern: str
+    fingerprint: str
+    occurrence_count: int = 0
+    strategies: Dict[str, dict] = field(default_factory=dict)
+
+    def recurring_pattern(self) -> RecurringPattern:
+        """This cluster summarized as a RecurringPattern."""
+        best_strategy = ""
+        best_rate = 0.0
+        total_successes = 0
+        for strat, data in self.strategies.items():
+            total_successes += data["successes"]
+            rate = data["successes"] / max(data["attempts"], 1)
+            if rate > best_rate:
+                best_rate = rate
+                best_strategy = strat
+
+        failure_rate = 1.0 - (total_successes / max(self.occurrence_count, 1))
+        return RecurringPattern(
+            error_pattern=self.error_pattern,
+            occurrence_count=self.occurrence_count,
+            strategies_tried=sorted(self.strategies.keys()),
+            best_strategy=best_strategy,
+            best_success_rate=round(best_rate, 4),
+            is_chronic=failure_rate > CHRONIC_FAILURE_THRESHOLD,
+        )
+
+    def lessons(self, min_failures: int = MIN_FAILURES_FOR_LESSON) -> List[FailureLesson]:
+        """FailureLessons for this error's ineffective strategies, in strategy order."""
+        error = self.error_pattern
+
+        # Best alternative strategy for this error pattern
+        best_strat = ""
+        best_rate = 0.0
+        for strat, data in self.strategies.items():
+            if data["attempts"] < MIN_ATTEMPTS_FOR_STATS:
+                continue
+            rate = data["successes"] / max(data["attempts"], 1)
+            if rate > best_rate:
+                best_rate = rate
+                best_strat = strat
+
+        lessons = []
+        for strategy, data in self.strategies.items():
+            failures = data["failures"]
+            successes = data["successes"]
+            attempts = data["attempts"]
+
+            if failures < min_failures:
+                continue
+
+            success_rate = successes / max(attempts, 1)
+            if success_rate >= INEFFECTIVE_THRESHOLD:
+                continue  # Strategy is not clearly ineffective
+
+            # Determine failure reason based on statistics
+            if successes == 0:
+                failure_reason = f"it has never succeeded ({failures} failures in {attempts} attempts)"
+            else:
+                failure_reason = (
+                    f"it succeeds only {success_rate:.0%} of the time "
+                    f"({successes}/{attempts} attempts)"
+                )
+
+            # Build lesson string
+            if best_strat and best_strat != strategy and best_rate > success_rate:
+                lesson_str = (
+                    f"When encountering [{error}], strategy [{strategy}] fails because "
+                    f"{failure_reason}. Try [{best_strat}] instead "
+                    f"(success rate: {best_rate:.0%})."
+                )
+                better_strategy = best_strat
+                better_success_rate = best_rate
+            else:
+                lesson_str = (
+                    f"When encountering [{error}], strategy [{strategy}] fails because "
+                    f"{failure_reason}. No proven alternative found yet -- "
+                    f"consider a novel approach."
+                )
+                better_strategy = ""
+                better_success_rate = 0.0
+
+            # Confidence: blend failure evidence with alternative quality
+            failure_evidence = min(1.0, failures / 10.0) ** 0.5
+            alt_quality = better_success_rate if better_strategy else 0.0
+            confidence = round(min(1.0, 0.5 * failure_evidence + 0.5 * alt_quality), 4)
+
+            lessons.append(FailureLesson(
+                error_pattern=error,
+                failed_strategy=strategy,
+                failure_count=failures,
+                success_count=successes,
+                better_strategy=better_strategy,
+                better_success_rate=round(better_success_rate, 4),
+                lesson=lesson_str,
+                confidence=confidence,
+            ))
+        return lessons
+
+
+def select_lesson(
+    candidates: Iterable[Tuple[float, FailureLesson]],
+    current_strategy: str = "",
+) -> Optional[FailureLesson]:
+    """Highest-scoring lesson among (similarity, lesson) candidates.
+
+    Candidates must come in lesson-list order (confidence descending);
+    the first of equally scored lessons wins.
+    """
+    best_match: Optional[FailureLesson] = None
+    best_score = 0.0
+
+    for similarity, lesson in candidates:
+        # Strategy match bonus: if the lesson warns about the current strategy
+        strategy_bonus = 0.2 if (current_strategy and lesson.failed_strategy == current_strategy) else 0.0
+
+        score = similarity * lesson.confidence + strategy_bonus
+        if score > best_score:
+            best_score = score
+            best_match = lesson
+
+    return best_match
+
+
+class ErrorClusterIndex:
+    """Outcomes grouped into ErrorClusters by error fingerprint.
+
+    Each outcome's error is normalized once on add(); lookups for a new
+    error probe the shingle postings of the clusters instead of comparing
+    against every recorded outcome or lesson. Build one with
+    from_outcomes() and pass it to suggest_refinement() to reuse it
+    across calls.
+    """
+
+    def __init__(self):
+        self.clusters: Dict[str, ErrorCluster] = {}
+        self.outcome_count = 0
+        self._postings = _ShinglePostings()
+        self._lessons: Optional[Tuple[int, List[FailureLesson], Dict[str, list]]] = None
+
+    @classmethod
+    def from_outcomes(cls, outcomes: Iterable[dict]) -> "ErrorClusterIndex":
+        index = cls()
+        for outcome in outcomes:
+            index.add(outcome)
+        return index
+
+    def add(self, outcome: dict) -> Optional[str]:
+        """Fold one fix_outcome in; returns its cluster fingerprint, if any."""
+        seq = self.outcome_count
+        self.outcome_count += 1
+        fields = _extract_outcome_fields(outcome)
+        signature = error_signature(fields.get("error", ""))
+        if signature is None:
+            return None
+        self._lessons = None
+
+        cluster = self.clusters.get(signature.fingerprint)
+        if cluster is None:
+            cluster = ErrorCluster(signature.normalized, signature.fingerprint)
+            self.clusters[signature.fingerprint] = cluster
+            self._postings.add(signature.fingerprint, signature.shingles)
+        cluster.occurrence_count += 1
+
+        strategy = fields.get("strategy", "")
+        if strategy:
+            data = cluster.strategies.get(strategy)
+            if data is None:
+                data = {"attempts": 0, "successes": 0, "failures": 0, "first_seen": seq}
+                cluster.strategies[strategy] = data
+            data["attempts"] += 1
+            result = fields.get("result", "")
+            if result in _SUCCESS_RESULTS:
+                data["successes"] += 1
+            elif result in _FAILURE_RESULTS:
+                data["failures"] += 1
+        return signature.fingerprint
+
+    def similar(self, error: str) -> Dict[str, float]:
+        """Fingerprint -> similarity of the clusters similar to a normalized error."""
+        return self._postings.probe(_shingles(error)) if error else {}
+
+    def recurring(self, min_recurrence: int = MIN_RECURRENCE) -> List[RecurringPattern]:
+        patterns = [
+            cluster.recurring_pattern()
+            for cluster in self.clusters.values()
+            if cluster.occurrence_count >= min_recurrence
+        ]
+        patterns.sort(key=lambda p: p.occurrence_count, reverse=True)
+        return patterns
+
+    def _lesson_table(self, min_failures: int) -> Tuple[List[FailureLesson], Dict[str, list]]:
+        if self._lessons is None or self._lessons[0] != min_failures:
+            ranked = []
+            for cluster in self.clusters.values():
+                for lesson in cluster.lessons(min_failures):
+                    first_seen = cluster.strategies[lesson.failed_strategy]["first_seen"]
+                    ranked.append((first_seen, lesson))
+            ranked.sort(key=lambda item: item[0])
+            ranked.sort(key=lambda item: item[1].confidence, reverse=True)
+            # Per cluster, (list position, lesson) for find_lesson()
+            by_cluster: Dict[str, list] = {}
+            for pos, (_, lesson) in enumerate(ranked):
+                fingerprint = error_signature(lesson.error_pattern).fingerprint
+                by_cluster.setdefault(fingerprint, []).append((pos, lesson))
+            self._lessons = (min_failures, [lesson for _, lesson in ranked], by_cluster)
+        return self._lessons[1], self._lessons[2]
+
+    def lessons(self, min_failures: int = MIN_FAILURES_FOR_LESSON) -> List[FailureLesson]:
+        """generate_failure_lessons() over the indexed outcomes."""
+        return list(self._lesson_table(min_failures)[0])
+
+    def find_lesson(
+        self,
+        error: str,
+        current_strategy: str = "",
+        min_failures: int = MIN_FAILURES_FOR_LESSON,
+    ) -> Optional[FailureLesson]:
+        """_find_lesson_for_error() against this index's lessons, by probe."""
+        by_cluster = self._lesson_table(min_failures)[1]
+        candidates = []
+        for fingerprint, similarity in self.similar(error).items():
+            for pos, lesson in by_cluster.get(fingerprint, ()):
+                candidates.append((pos, similarity, lesson))
+        candidates.sort(key=lambda item: item[0])
+        return select_lesson(((sim, lesson) for _, sim, lesson in candidates), current_strategy)
+
+    def strategy_results(self, error: str) -> Dict[str, dict]:
+        """Strategy -> {attempts, successes} over outcomes with errors similar
+        to a normalized error, in order of first use."""
+        merged: Dict[str, dict] = {}
+        for fingerprint in self.similar(error):
+            for strategy, data in self.clusters[fingerprint].strategies.items():
+                row = merged.get(strategy)
+                if row is None:
+                    row = merged[strategy] = {"attempts": 0, "successes": 0, "first_seen": data["first_seen"]}
+                row["attempts"] += data["attempts"]
+                row["successes"] += data["successes"]
+                row["first_seen"] = min(row["first_seen"], data["first_seen"])
+        ordered = sorted(merged.items(), key=lambda item: item[1]["first_seen"])
+        return {
+            strategy: {"attempts": row["attempts"], "successes": row["successes"]}
+            for strategy, row in ordered
+        }
 
 
 # ── Core analysis ────────────────────────────────────────────────────────
@@ -377,66 +725,7 @@ def detect_recurring_failures(
     if min_recurrence is None:
         min_recurrence = _adaptive_min_recurrence(len(outcomes))
 
-    error_data: Dict[str, dict] = {}
-
-    for outcome in outcomes:
-        fields = _extract_outcome_fields(outcome)
-        error = _normalize_error(fields.get("error", ""))
-        strategy = fields.get("strategy", "")
-        result = fields.get("result", "")
-
-        if not error:
-            continue
-
-        if error not in error_data:
-            error_data[error] = {
-                "count": 0,
-                "strategies": {},
-                "total_successes": 0,
-                "total_attempts": 0,
-            }
-
-        data = error_data[error]
-        data["count"] += 1
-        data["total_attempts"] += 1
-
-        if strategy:
-            if strategy not in data["strategies"]:
-                data["strategies"][strategy] = {"attempts": 0, "successes": 0}
-            data["strategies"][strategy]["attempts"] += 1
-
-            if result in ("success", "resolved", "fixed"):
-                data["strategies"][strategy]["successes"] += 1
-                data["total_successes"] += 1
-
-    patterns = []
-    for error, data in error_data.items():
-        if data["count"] < min_recurrence:
-            continue
-
-        # Find best strategy
-        best_strategy = ""
-        best_rate = 0.0
-        for strat, strat_data in data["strategies"].items():
-            rate = strat_data["successes"] / max(strat_data["attempts"], 1)
-            if rate > best_rate:
-                best_rate = rate
-                best_strategy = strat
-
-        failure_rate = 1.0 - (data["total_successes"] / max(data["total_attempts"], 1))
-
-        patterns.append(RecurringPattern(
-            error_pattern=error,
-            occurrence_count=data["count"],
-            strategies_tried=sorted(data["strategies"].keys()),
-            best_strategy=best_strategy,
-            best_success_rate=round(best_rate, 4),
-            is_chronic=failure_rate > CHRONIC_FAILURE_THRESHOLD,
-        ))
-
-    patterns.sort(key=lambda p: p.occurrence_count, reverse=True)
-    return patterns
-
+    return ErrorClusterIndex.from_outcomes(outcomes).recurring(min_recurrence)
 
 
 # ── ReasoningBank-style failure learning ─────────────────────────────────
@@ -472,116 +761,7 @@ def generate_failure_lessons(
     if not outcomes:
         return []
 
-    # Group outcomes by (normalized_error, strategy)
-    error_strategy_data: Dict[Tuple[str, str], dict] = {}
-
-    for outcome in outcomes:
-        fields = _extract_outcome_fields(outcome)
-        error = _normalize_error(fields.get("error", ""))
-        strategy = fields.get("strategy", "")
-        result = fields.get("result", "")
-
-        if not error or not strategy:
-            continue
-
-        key = (error, strategy)
-        if key not in error_strategy_data:
-            error_strategy_data[key] = {
-                "failures": 0,
-                "successes": 0,
-                "attempts": 0,
-            }
-
-        data = error_strategy_data[key]
-        data["attempts"] += 1
-        if result in ("failure", "failed", "unresolved"):
-            data["failures"] += 1
-        elif result in ("success", "resolved", "fixed"):
-            data["successes"] += 1
-
-    # For each error pattern, find the best alternative strategy
-    error_best_alt: Dict[str, Tuple[str, float]] = {}
-    error_all_strategies: Dict[str, Dict[str, dict]] = {}
-
-    for (error, strategy), data in error_strategy_data.items():
-        if error not in error_all_strategies:
-            error_all_strategies[error] = {}
-        error_all_strategies[error][strategy] = data
-
-    for error, strategies in error_all_strategies.items():
-        best_strat = ""
-        best_rate = 0.0
-        for strat, data in strategies.items():
-            if data["attempts"] < MIN_ATTEMPTS_FOR_STATS:
-                continue
-            rate = data["successes"] / max(data["attempts"], 1)
-            if rate > best_rate:
-                best_rate = rate
-                best_strat = strat
-        if best_strat:
-            error_best_alt[error] = (best_strat, best_rate)
-
-    # Generate lessons for ineffective strategies
-    lessons = []
-    for (error, strategy), data in error_strategy_data.items():
-        failures = data["failures"]
-        successes = data["successes"]
-        attempts = data["attempts"]
-
-        if failures < min_failures:
-            continue
-
-        success_rate = successes / max(attempts, 1)
-        if success_rate >= INEFFECTIVE_THRESHOLD:
-            continue  # Strategy is not clearly ineffective
-
-        # Determine failure reason based on statistics
-        if successes == 0:
-            failure_reason = f"it has never succeeded ({failures} failures in {attempts} attempts)"
-        else:
-            failure_reason = (
-                f"it succeeds only {success_rate:.0%} of the time "
-                f"({successes}/{attempts} attempts)"
-            )
-
-        # Build lesson string
-        best_alt = error_best_alt.get(error)
-        if best_alt and best_alt[0] != strategy and best_alt[1] > success_rate:
-            alt_name, alt_rate = best_alt
-            lesson_str = (
-                f"When encountering [{error}], strategy [{strategy}] fails because "
-                f"{failure_reason}. Try [{alt_name}] instead "
-                f"(success rate: {alt_rate:.0%})."
-            )
-            better_strategy = alt_name
-            better_success_rate = alt_rate
-        else:
-            lesson_str = (
-                f"When encountering [{error}], strategy [{strategy}] fails because "
-                f"{failure_reason}. No proven alternative found yet -- "
-                f"consider a novel approach."
-            )
-            better_strategy = ""
-            better_success_rate = 0.0
-
-        # Confidence: blend failure evidence with alternative quality
-        failure_evidence = min(1.0, failures / 10.0) ** 0.5
-        alt_quality = better_success_rate if better_strategy else 0.0
-        confidence = round(min(1.0, 0.5 * failure_evidence + 0.5 * alt_quality), 4)
-
-        lessons.append(FailureLesson(
-            error_pattern=error,
-            failed_strategy=strategy,
-            failure_count=failures,
-            success_count=successes,
-            better_strategy=better_strategy,
-            better_success_rate=round(better_success_rate, 4),
-            lesson=lesson_str,
-            confidence=confidence,
-        ))
-
-    lessons.sort(key=lambda l: l.confidence, reverse=True)
-    return lessons
+    return ErrorClusterIndex.from_outcomes(outcomes).lessons(min_failures)
 
 
 def _find_lesson_for_error(
@@ -606,27 +786,20 @@ def _find_lesson_for_error(
     if not error or not lessons:
         return None
 
-    best_match: Optional[FailureLesson] = None
-    best_score = 0.0
-
+    postings = _ShinglePostings()
     for lesson in lessons:
-        # Check error similarity
-        if error == lesson.error_pattern:
-            similarity = 1.0
-        else:
-            similarity = _error_similarity(error, lesson.error_pattern)
-            if similarity < 0.4:
-                continue
-
-        # Strategy match bonus: if the lesson warns about the current strategy
-        strategy_bonus = 0.2 if (current_strategy and lesson.failed_strategy == current_strategy) else 0.0
-
-        score = similarity * lesson.confidence + strategy_bonus
-        if score > best_score:
-            best_score = score
-            best_match = lesson
-
-    return best_match
+        postings.add(lesson.error_pattern, _shingles(lesson.error_pattern))
+    similar = postings.probe(_shingles(error))
+    if not similar:
+        return None
+    return select_lesson(
+        (
+            (similar[lesson.error_pattern], lesson)
+            for lesson in lessons
+            if lesson.error_pattern in similar
+        ),
+        current_strategy,
+    )
 
 
 def suggest_refinement(
@@ -634,6 +807,7 @@ def suggest_refinement(
     outcomes: List[dict],
     current_strategy: str = "",
     lessons: Optional[List[FailureLesson]] = None,
+    index: Optional[ErrorClusterIndex] = None,
 ) -> Optional[Refinement]:
     """Suggest a better strategy for handling a specific error.
 
@@ -652,6 +826,9 @@ def suggest_refinement(
         current_strategy: The strategy currently being considered.
         lessons: Pre-computed failure lessons (optional; generated if None
                  and outcomes has enough data).
+        index: ErrorClusterIndex over outcomes (optional; built from
+               outcomes if None). Reusing one makes repeated calls
+               index probes instead of scans over outcomes.
 
     Returns:
         A Refinement object if a better approach exists, None otherwise.
@@ -660,58 +837,37 @@ def suggest_refinement(
     if not normalized_error:
         return None
 
-    # ── ReasoningBank shortcut: check lessons first ──────────────────
-    if lessons is None and len(outcomes) >= MIN_FAILURES_FOR_LESSON * 2:
-        lessons = generate_failure_lessons(outcomes)
+    if index is None:
+        index = ErrorClusterIndex.from_outcomes(outcomes)
 
+    # ── ReasoningBank shortcut: check lessons first ──────────────────
+    lesson = None
     if lessons:
         lesson = _find_lesson_for_error(normalized_error, lessons, current_strategy)
-        if lesson and lesson.better_strategy and lesson.confidence >= 0.3:
-            if lesson.better_strategy != current_strategy:
-                return Refinement(
-                    error_pattern=normalized_error,
-                    current_strategy=current_strategy,
-                    suggested_strategy=lesson.better_strategy,
-                    reason=(
-                        f"Lesson learned: {lesson.failed_strategy} fails on this error "
-                        f"({lesson.failure_count} failures). "
-                        f"{lesson.better_strategy} has {lesson.better_success_rate:.0%} "
-                        f"success rate."
-                    ),
-                    confidence=lesson.confidence,
-                    evidence=[
-                        f"lesson: {lesson.lesson}",
-                        f"{lesson.failed_strategy}: {lesson.success_count} successes, "
-                        f"{lesson.failure_count} failures",
-                    ],
-                )
-
-    # ── Standard path: compute from outcomes directly ────────────────
-    # Group outcomes by strategy for this error pattern
-    strategy_results: Dict[str, dict] = {}
-
-    for outcome in outcomes:
-        fields = _extract_outcome_fields(outcome)
-        outcome_error = _normalize_error(fields.get("error", ""))
-        strategy = fields.get("strategy", "")
-        result = fields.get("result", "")
-
-        # Check if this outcome is for a similar error
-        if not strategy or not outcome_error:
-            continue
-
-        # Similarity: exact normalized match (best) or word overlap (fallback)
-        if normalized_error != outcome_error:
-            similarity = _error_similarity(normalized_error, outcome_error)
-            if similarity < 0.4:
-                continue
-
-        if strategy not in strategy_results:
-            strategy_results[strategy] = {"attempts": 0, "successes": 0}
+    elif lessons is None and index.outcome_count >= MIN_FAILURES_FOR_LESSON * 2:
+        lesson = index.find_lesson(normalized_error, current_strategy)
+    if lesson and lesson.better_strategy and lesson.confidence >= 0.3:
+        if lesson.better_strategy != current_strategy:
+            return Refinement(
+                error_pattern=normalized_error,
+                current_strategy=current_strategy,
+                suggested_strategy=lesson.better_strategy,
+                reason=(
+                    f"Lesson learned: {lesson.failed_strategy} fails on this error "
+                    f"({lesson.failure_count} failures). "
+                    f"{lesson.better_strategy} has {lesson.better_success_rate:.0%} "
+                    f"success rate."
+                ),
+                confidence=lesson.confidence,
+                evidence=[
+                    f"lesson: {lesson.lesson}",
+                    f"{lesson.failed_strategy}: {lesson.success_count} successes, "
+                    f"{lesson.failure_count} failures",
+                ],
+            )
 
-        strategy_results[strategy]["attempts"] += 1
-        if result in ("success", "resolved", "fixed"):
-            strategy_results[strategy]["successes"] += 1
+    # ── Standard path: compute from similar error clusters ───────────
+    strategy_results = index.strategy_results(normalized_error)
 
     if not strategy_results:
         return None
@@ -775,11 +931,13 @@ def suggest_refinement(
 
 def compute_chain_health(
     outcomes: List[dict],
+    recurring: Optional[List[RecurringPattern]] = None,
 ) -> ChainHealth:
     """Compute overall health metrics for the causal chain system.
 
     Args:
         outcomes: List of fix_outcome dicts.
+        recurring: detect_recurring_failures(outcomes), if already computed.
 
     Returns:
         ChainHealth with composite score and recommendations.
@@ -806,7 +964,8 @@ def compute_chain_health(
     diversity = len(strategies)
 
     # Recurring patterns
-    recurring = detect_recurring_failures(outcomes)
+    if recurring is None:
+        recurring = detect_recurring_failures(outcomes)
     chronic = sum(1 for p in recurring if p.is_chronic)
 
     # Trend: compare thirds for more granular trend detection
@@ -943,9 +1102,10 @@ def analyze_outcomes(
             summary: str (one-line plain text overview)
     """
     effectiveness = get_strategy_effectiveness(outcomes)
-    recurring = detect_recurring_failures(outcomes)
-    health = compute_chain_health(outcomes)
-    lessons = generate_failure_lessons(outcomes)
+    index = ErrorClusterIndex.from_outcomes(outcomes)
+    recurring = index.recurring(_adaptive_min_recurrence(len(outcomes)))
+    health = compute_chain_health(outcomes, recurring)
+    lessons = index.lessons()
 
     # Detect strategy combos (strategies that succeed together in chains)
     strategy_combos = _detect_strategy_combos(outcomes)
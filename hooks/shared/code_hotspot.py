@@ -4,7 +4,11 @@ Identifies high-risk files by cross-referencing gate audit data with file
 paths from tool_input.  Produces a ranked list of files by composite risk
 score: block_count * churn_factor * error_density.
 
-All functions are read-only, fail-open, and safe to call from any context.
+Per-file counts come from the audit trail rollups in shared.analytics_rollup
+(folded in incrementally, bucketed by hour/day), so repeated calls do not
+re-read audit logs.  Without a trail the daily audit files are scanned.
+
+All functions are fail-open and safe to call from any context.
 
 Public API
 ----------
@@ -30,6 +34,8 @@ import time
 from collections import Counter, defaultdict
 from typing import Dict, List
 
+from shared.analytics_rollup import audit_event, file_rollup
+
 
 # ---------------------------------------------------------------------------
 # Paths
@@ -59,11 +65,13 @@ except ImportError:
                 return val.strip()
         return ""
 
-def _scan_audit_entries(lookback_days: int = 7) -> List[dict]:
-    """Scan audit log files and return entries within the lookback window.
 
-    Returns a list of parsed audit entry dicts.  Silently skips
-    unparseable lines and missing files.
+def _scan_audit_entries(lookback_days: int = 7) -> List[tuple]:
+    """Scan audit log files and return file events within the lookback window.
+
+    Returns (ts, file_path, tool, gate, decision) tuples (see
+    analytics_rollup.audit_event).  Silently skips unparseable lines and
+    missing files.
     """
     if not os.path.isdir(AUDIT_DIR):
         return []
@@ -80,15 +88,41 @@ def _scan_audit_entries(lookback_days: int = 7) -> List[dict]:
                         entry = json.loads(line.strip())
                     except (json.JSONDecodeError, ValueError):
                         continue
-                    ts = entry.get("timestamp", entry.get("ts", 0))
-                    if isinstance(ts, (int, float)) and ts >= cutoff:
-                        entries.append(entry)
+                    event = audit_event(entry)
+                    if event is not None and event[0] >= cutoff:
+                        entries.append(event)
         except OSError:
             continue
 
     return entries
 
 
+def _scan_file_stats(lookback_days: int) -> Dict[str, dict]:
+    """Per-file block/edit stats from a raw scan (fallback for file_rollup)."""
+    file_data: Dict[str, dict] = defaultdict(lambda: {
+        "block_count": 0,
+        "blocks_by_gate": Counter(),
+        "blocks_by_tool": Counter(),
+        "edit_count": 0,
+        "recent_block_time": 0.0,
+    })
+
+    for ts, fp, tool_name, gate, decision in _scan_audit_entries(lookback_days):
+        if decision == "block":
+            data = file_data[fp]
+            data["block_count"] += 1
+            data["blocks_by_gate"][gate] += 1
+            data["blocks_by_tool"][tool_name] += 1
+            if ts > data["recent_block_time"]:
+                data["recent_block_time"] = ts
+
+        # Count all edit attempts (for error density calculation)
+        if tool_name in ("Edit", "Write", "NotebookEdit"):
+            file_data[fp]["edit_count"] += 1
+
+    return file_data
+
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
@@ -119,45 +153,13 @@ def analyze_file_blocks(
         analysis_window  : int (days)
     """
     lookback_days = max(1, min(30, lookback_days))
-    entries = _scan_audit_entries(lookback_days)
-
-    file_data: Dict[str, dict] = defaultdict(lambda: {
-        "block_count": 0,
-        "blocks_by_gate": Counter(),
-        "blocks_by_tool": Counter(),
-        "edit_count": 0,
-        "recent_block_time": 0.0,
-    })
-
-    total_blocks = 0
-
-    for entry in entries:
-        tool_input = entry.get("tool_input", {})
-        tool_name = entry.get("tool", "")
-        decision = entry.get("decision", "")
-        gate = entry.get("gate", "")
-
-        fp = extract_file_path(tool_input, tool_name)
-        if not fp:
-            continue
-
-        if decision == "block":
-            data = file_data[fp]
-            data["block_count"] += 1
-            data["blocks_by_gate"][gate] += 1
-            data["blocks_by_tool"][tool_name] += 1
-            ts = entry.get("timestamp", entry.get("ts", 0))
-            if isinstance(ts, (int, float)) and ts > data["recent_block_time"]:
-                data["recent_block_time"] = ts
-            total_blocks += 1
-
-        # Count all edit attempts (for error density calculation)
-        if tool_name in ("Edit", "Write", "NotebookEdit"):
-            file_data[fp]["edit_count"] += 1
+    file_data = file_rollup(lookback_days)
+    if file_data is None:
+        file_data = _scan_file_stats(lookback_days)
 
     # Filter and format
     file_blocks = []
-    for fp, data in sorted(file_data.items(), key=lambda kv: kv[1]["block_count"], reverse=True):
+    for fp, data in sorted(file_data.items(), key=lambda kv: (-kv[1]["block_count"], kv[0])):
         if data["block_count"] < min_blocks:
             continue
         file_blocks.append({
@@ -171,7 +173,7 @@ def analyze_file_blocks(
 
     return {
         "file_blocks": file_blocks,
-        "total_blocks": total_blocks,
+        "total_blocks": sum(data["block_count"] for data in file_data.values()),
         "total_files": len(file_blocks),
         "analysis_window": lookback_days,
     }
@@ -4,6 +4,16 @@
 Mirrors Claude Code's conversation as a parallel DAG with branching support.
 Schema matches go_sdk_agent's dag.go: nodes + branches tables.
 
+Ancestor index: every node carries ``depth`` (hops from its root) and ``seg``,
+the linear segment it belongs to. A node that extends its parent's segment
+tip joins that segment; any other child (a fork) opens a new segment whose
+``lineage`` lists the ancestor segments and the deepest depth taken from
+each. The ancestors of a node are therefore a handful of (seg, depth <= d)
+index ranges, fetched in one query; path and lowest-common-ancestor lookups
+reduce to comparing two lineages. The index is maintained in add_node
+(branch_from needs no work: the fork is recorded when its first child is
+added), and nodes written before it existed are backfilled on open.
+
 All public methods are fail-open — exceptions are caught and logged to stderr.
 """
 
@@ -97,8 +107,28 @@ CREATE TABLE IF NOT EXISTS embeddings (
 CREATE INDEX IF NOT EXISTS idx_edges_target ON node_edges(target_id);
 
 CREATE INDEX IF NOT EXISTS idx_emb_source ON embeddings(source_table, source_id);
+
+CREATE TABLE IF NOT EXISTS dag_segments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tip_depth INTEGER NOT NULL,
+    lineage TEXT NOT NULL DEFAULT '[]'
+);
 """
 
+_NODE_COLS = (
+    "id, parent_id, role, content, model, provider, timestamp, token_count, metadata"
+)
+
+# Ancestor rows of a node: one (seg, depth range) per lineage entry, driven by
+# json_each so the whole chain is a single statement over idx_nodes_seg_depth.
+_ANCESTORS_SQL = (
+    "SELECT n.id, n.parent_id, n.role, n.content, n.model, n.provider, "
+    "n.timestamp, n.token_count, n.metadata, n.depth "
+    "FROM json_each(?) AS j JOIN nodes n "
+    "ON n.seg = json_extract(j.value, '$[0]') "
+    "AND n.depth <= json_extract(j.value, '$[1]') AND n.depth >= ?"
+)
+
 
 def _gen_id(prefix="nd_"):
     return prefix + secrets.token_hex(8)
@@ -145,6 +175,9 @@ class ConversationDAG:
         # FTS5 full-text indexes + sync triggers
         self._init_fts5()
 
+        # Ancestor index (segment + depth per node)
+        self._init_ancestor_index()
+
         self._hooks = None
         self._branch_id = self._init_branch()
 
@@ -190,6 +223,141 @@ class ConversationDAG:
         except Exception as e:
             print(f"[DAG] FTS5 init failed: {e}", file=sys.stderr)  # falls back to LIKE
 
+    def _init_ancestor_index(self):
+        """Add seg/depth columns and index any nodes that predate them."""
+        for col in ("seg INTEGER", "depth INTEGER"):
+            try:
+                self._db.execute(f"ALTER TABLE nodes ADD COLUMN {col}")
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_nodes_seg_depth ON nodes(seg, depth)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_nodes_unplaced ON nodes(timestamp) "
+            "WHERE seg IS NULL"
+        )
+        self._db.commit()
+        try:
+            self.backfill_ancestor_index()
+        except Exception as e:
+            print(f"[DAG] ancestor index backfill failed: {e}", file=sys.stderr)
+
+    def _place(self, parent_id):
+        """Choose (seg, depth) for a new child of parent_id.
+
+        Extends the parent's segment when the parent is its tip; otherwise
+        opens a new segment. The tip check-and-advance is a single
+        conditional UPDATE, so concurrent writers cannot both extend it.
+        """
+        row = None
+        if parent_id:
+            row = self._db.execute(
+                "SELECT n.seg, n.depth, s.lineage FROM nodes n "
+                "JOIN dag_segments s ON s.id = n.seg WHERE n.id = ?",
+                (parent_id,),
+            ).fetchone()
+        if row is None:
+            # Root (or parent unknown): depth 0 in a fresh segment
+            cur = self._db.execute(
+                "INSERT INTO dag_segments (tip_depth, lineage) VALUES (0, '[]')"
+            )
+            return cur.lastrowid, 0
+        pseg, pdepth, plineage = row
+        extended = self._db.execute(
+            "UPDATE dag_segments SET tip_depth = tip_depth + 1 "
+            "WHERE id = ? AND tip_depth = ?",
+            (pseg, pdepth),
+        ).rowcount
+        if extended:
+            return pseg, pdepth + 1
+        lineage = json.loads(plineage) + [[pseg, pdepth]]
+        cur = self._db.execute(
+            "INSERT INTO dag_segments (tip_depth, lineage) VALUES (?, ?)",
+            (pdepth + 1, json.dumps(lineage)),
+        )
+        return cur.lastrowid, pdepth + 1
+
+    def backfill_ancestor_index(self):
+        """Place nodes without seg/depth (parents first). Returns count placed."""
+        rows = self._db.execute(
+            "SELECT id, parent_id FROM nodes WHERE seg IS NULL ORDER BY timestamp"
+        ).fetchall()
+        if not rows:
+            return 0
+        pending = dict(rows)
+        placed = 0
+        for nid, _ in rows:
+            # Place the unplaced ancestors of nid first, oldest first
+            chain = []
+            cur = nid
+            while cur in pending and cur not in chain:
+                chain.append(cur)
+                cur = pending[cur]
+            for node in reversed(chain):
+                seg, depth = self._place(pending.pop(node))
+                self._db.execute(
+                    "UPDATE nodes SET seg = ?, depth = ? WHERE id = ?",
+                    (seg, depth, node),
+                )
+                placed += 1
+        self._db.commit()
+        return placed
+
+    def _locate(self, node_ids):
+        """{node_id: (seg, depth, full lineage)} for indexed nodes.
+
+        The full lineage ends with the node's own [seg, depth] entry.
+        """
+        ids = list(node_ids)
+        placeholders = ",".join("?" * len(ids))
+        rows = self._db.execute(
+            f"SELECT n.id, n.seg, n.depth, s.lineage FROM nodes n "
+            f"JOIN dag_segments s ON s.id = n.seg WHERE n.id IN ({placeholders})",
+            ids,
+        ).fetchall()
+        return {
+            nid: (seg, depth, json.loads(lineage) + [[seg, depth]])
+            for nid, seg, depth, lineage in rows
+        }
+
+    def _chain(self, node_id, lineage, min_depth=0):
+        """Ancestor rows of node_id (oldest first) from one indexed query.
+
+        Rows are re-linked through parent_id in memory, so a gap (e.g. an
+        archived ancestor) ends the chain exactly like the parent walk did.
+        """
+        rows = self._db.execute(
+            _ANCESTORS_SQL, (json.dumps(lineage), min_depth)
+        ).fetchall()
+        by_id = {r[0]: r for r in rows}
+        chain = []
+        cur = node_id
+        while cur in by_id:
+            row = by_id.pop(cur)
+            chain.append(row)
+            cur = row[1]
+        chain.reverse()
+        return chain
+
+    def _walk_ancestors(self, node_id):
+        """Parent-pointer walk; fallback for nodes missing from the index."""
+        ancestors = []
+        cur = node_id
+        seen = set()
+        while cur and cur not in seen:
+            seen.add(cur)
+            row = self._db.execute(
+                f"SELECT {_NODE_COLS} FROM nodes WHERE id = ?",
+                (cur,),
+            ).fetchone()
+            if not row:
+                break
+            ancestors.append(self._row_to_dict(row))
+            cur = row[1]  # parent_id
+        ancestors.reverse()
+        return ancestors
+
     def _init_branch(self):
         """Pick or create the active branch."""
         row = self._db.execute("SELECT COUNT(*) FROM branches").fetchone()
@@ -237,9 +405,11 @@ class ConversationDAG:
         if subproject:
             meta["subproject"] = subproject
         meta_json = json.dumps(meta)
+        seg, depth = self._place(parent_id)
         self._db.execute(
             "INSERT INTO nodes (id, parent_id, role, content, model, provider, "
-            "timestamp, token_count, metadata) VALUES (?,?,?,?,?,?,?,?,?)",
+            "timestamp, token_count, metadata, seg, depth) "
+            "VALUES (?,?,?,?,?,?,?,?,?,?,?)",
             (
                 nid,
                 parent_id,
@@ -250,6 +420,8 @@ class ConversationDAG:
                 ts,
                 token_count,
                 meta_json,
+                seg,
+                depth,
             ),
         )
         self._db.execute(
@@ -299,23 +471,13 @@ class ConversationDAG:
         }
 
     def get_ancestors(self, node_id):
-        """Walk parent chain to root, return in chronological order (oldest first)."""
-        ancestors = []
-        cur = node_id
-        seen = set()
-        while cur and cur not in seen:
-            seen.add(cur)
-            row = self._db.execute(
-                "SELECT id, parent_id, role, content, model, provider, "
-                "timestamp, token_count, metadata FROM nodes WHERE id = ?",
-                (cur,),
-            ).fetchone()
-            if not row:
-                break
-            ancestors.append(self._row_to_dict(row))
-            cur = row[1]  # parent_id
-        ancestors.reverse()
-        return ancestors
+        """Return the ancestor chain to root in chronological order (oldest first)."""
+        if not node_id:
+            return []
+        loc = self._locate([node_id]).get(node_id)
+        if loc is None:
+            return self._walk_ancestors(node_id)
+        return [self._row_to_dict(r[:9]) for r in self._chain(node_id, loc[2])]
 
     def prompt_from(self, node_id):
         """Build message list from ancestor chain."""
@@ -691,51 +853,38 @@ class ConversationDAG:
         """Return the ancestor path between two nodes, if one exists.
 
         Checks both directions: from_id upward to to_id, and to_id upward
-        to from_id.  Uses a recursive CTE to walk the parent chain.
-        Returns an ordered list of node dicts (from_id first, to_id last),
-        or [] if no direct ancestor path exists.  Fail-open.
+        to from_id. Ancestry is decided from the two lineages and the path
+        is one indexed range query. Returns an ordered list of node dicts
+        (from_id first, to_id last), or [] if no direct ancestor path
+        exists. Fail-open.
         """
         try:
             if from_id == to_id:
                 node = self.get_node(from_id)
                 return [node] if node else []
 
-            def _ancestors_cte(start, stop):
-                rows = self._db.execute(
-                    """
-                    WITH RECURSIVE anc(id, parent_id, role, content, model,
-                                       provider, timestamp, token_count,
-                                       metadata, depth) AS (
-                        SELECT id, parent_id, role, content, model,
-                               provider, timestamp, token_count, metadata, 0
-                        FROM nodes WHERE id = ?
-                        UNION ALL
-                        SELECT n.id, n.parent_id, n.role, n.content, n.model,
-                               n.provider, n.timestamp, n.token_count,
-                               n.metadata, a.depth + 1
-                        FROM nodes n
-                        JOIN anc a ON n.id = a.parent_id
-                        WHERE a.parent_id != ''
-                    )
-                    SELECT id, parent_id, role, content, model,
-                           provider, timestamp, token_count, metadata, depth
-                    FROM anc
-                    ORDER BY depth
-                    """,
-                    (start,),
-                ).fetchall()
-                chain = [self._row_to_dict(r[:9]) for r in rows]
-                ids = [n["id"] for n in chain]
-                if stop not in ids:
+            locs = self._locate([from_id, to_id])
+            if len(locs) < 2:
+                return []
+
+            def _descend(lower, upper):
+                # Path lower -> upper when upper is an ancestor of lower
+                useg, udepth, _ = locs[upper]
+                if not any(
+                    seg == useg and udepth <= max_depth
+                    for seg, max_depth in locs[lower][2]
+                ):
                     return []
-                cut = ids.index(stop)
-                return chain[: cut + 1]
+                chain = self._chain(lower, locs[lower][2], min_depth=udepth)
+                if not chain or chain[0][0] != upper:
+                    return []  # broken chain (archived node in between)
+                return [self._row_to_dict(r[:9]) for r in reversed(chain)]
 
-            path = _ancestors_cte(from_id, to_id)
+            path = _descend(from_id, to_id)
             if path:
                 return path
 
-            path_rev = _ancestors_cte(to_id, from_id)
+            path_rev = _descend(to_id, from_id)
             if path_rev:
                 path_rev.reverse()
                 return path_rev
@@ -745,6 +894,33 @@ class ConversationDAG:
             print(f"[dag] get_path error: {exc}", file=sys.stderr)
             return []
 
+    def lowest_common_ancestor(self, a_id, b_id):
+        """Return the deepest node that is an ancestor of both (or None).
+
+        A node counts as its own ancestor. Fail-open.
+        """
+        try:
+            locs = self._locate([a_id, b_id])
+            if a_id not in locs or b_id not in locs:
+                return None
+            common = None
+            for (sa, da), (sb, db) in zip(locs[a_id][2], locs[b_id][2]):
+                if sa != sb:
+                    break
+                common = (sa, min(da, db))
+                if da != db:
+                    break  # lineages diverge inside this segment
+            if common is None:
+                return None
+            row = self._db.execute(
+                f"SELECT {_NODE_COLS} FROM nodes WHERE seg = ? AND depth = ?",
+                common,
+            ).fetchone()
+            return self._row_to_dict(row) if row else None
+        except Exception as exc:
+            print(f"[dag] lowest_common_ancestor error: {exc}", file=sys.stderr)
+            return None
+
     # --- Stats & Metrics (Task #13) ---
 
     def get_stats(self):
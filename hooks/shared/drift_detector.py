@@ -2,11 +2,17 @@
 
 Compares current gate fire rate vectors against baselines using cosine
 similarity to detect meaningful shifts in gate behavior over time.
+
+DriftBaseline prepares a baseline once (aligned vector and norm) so that
+repeated checks against the same baseline only vectorise the current rates;
+shared.metric_ring caches one per ring until its next sample.
 """
 
 import math
 from typing import Dict
 
+import numpy as np
+
 
 def cosine_similarity(vec_a: Dict[str, float], vec_b: Dict[str, float]) -> float:
     """Cosine similarity between two sparse vectors (0.0–1.0).
@@ -42,6 +48,44 @@ def should_alert(drift_score: float, threshold: float = 0.3) -> bool:
     return drift_score > threshold
 
 
+class DriftBaseline:
+    """A baseline rate vector prepared once for repeated drift checks."""
+
+    def __init__(self, baseline: Dict[str, float]):
+        self.baseline = dict(baseline)
+        self.gates = sorted(self.baseline)
+        self._vec = np.array([self.baseline[g] for g in self.gates], dtype=float)
+        self._norm = float(np.sqrt(self._vec @ self._vec))
+
+    def similarity(self, current: Dict[str, float]) -> float:
+        """cosine_similarity(current, baseline) against the cached vector."""
+        if not current and not self.baseline:
+            return 1.0
+        cur = np.fromiter(current.values(), dtype=float, count=len(current))
+        mag = float(np.sqrt(cur @ cur))
+        if mag == 0.0 or self._norm == 0.0:
+            return 0.0
+        aligned = np.array([current.get(g, 0.0) for g in self.gates], dtype=float)
+        return max(0.0, min(1.0, float(aligned @ self._vec) / (mag * self._norm)))
+
+    def score(self, current: Dict[str, float]) -> float:
+        """detect_drift(current, baseline): 1 - similarity."""
+        return 1.0 - self.similarity(current)
+
+    def report(self, current: Dict[str, float], threshold: float = 0.3) -> Dict:
+        """gate_drift_report(current, baseline) against the cached vector."""
+        drift_score = self.score(current)
+        all_gates = set(current) | set(self.baseline)
+        return {
+            "drift_score": drift_score,
+            "alert": should_alert(drift_score, threshold),
+            "per_gate_deltas": {
+                gate: current.get(gate, 0.0) - self.baseline.get(gate, 0.0)
+                for gate in sorted(all_gates)
+            },
+        }
+
+
 def gate_drift_report(
     current: Dict[str, float],
     baseline: Dict[str, float],
@@ -54,17 +98,4 @@ def gate_drift_report(
           - alert: bool (True if drift exceeds default threshold 0.3)
           - per_gate_deltas: dict mapping gate name → (current - baseline)
     """
-    drift_score = detect_drift(current, baseline)
-    alert = should_alert(drift_score)
-
-    all_gates = set(current) | set(baseline)
-    per_gate_deltas = {
-        gate: current.get(gate, 0.0) - baseline.get(gate, 0.0)
-        for gate in sorted(all_gates)
-    }
-
-    return {
-        "drift_score": drift_score,
-        "alert": alert,
-        "per_gate_deltas": per_gate_deltas,
-    }
+    return DriftBaseline(baseline).report(current)
@@ -0,0 +1,300 @@
+"""Error cluster store — shared/error_cluster_store.py
+
+Persistent counterpart of chain_refinement.ErrorClusterIndex, so lesson
+lookup for a new error stays an index probe after thousands of recorded
+fix outcomes instead of regenerating lessons from the full outcome list.
+
+Each outcome is folded in once (keyed by its id, or a hash of its content
+when it has none): its error is normalized to an ErrorSignature, counted
+into the cluster for that fingerprint, and the cluster's shingles are
+written to an inverted index. Lessons depend only on their own cluster's
+strategy counts, so they are stored per fingerprint and rebuilt only for
+clusters touched by an ingest.
+
+find_lesson() probes the shingle index for clusters similar to the error
+and scores only their lessons; results match chain_refinement's
+_find_lesson_for_error() over generate_failure_lessons() of the same
+outcomes.
+
+All functions are fail-open: on a store error they return None.
+
+Public API
+----------
+  ingest_outcomes(outcomes)                 -> int | None
+  find_lesson(error, current_strategy)      -> FailureLesson | None
+  recurring_failures(min_recurrence)        -> list[RecurringPattern] | None
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+from dataclasses import asdict
+from typing import Callable, Dict, Iterable, List, Optional
+
+from shared.chain_refinement import (
+    MIN_FAILURES_FOR_LESSON,
+    SIMILARITY_THRESHOLD,
+    _FAILURE_RESULTS,
+    _SUCCESS_RESULTS,
+    ErrorCluster,
+    FailureLesson,
+    RecurringPattern,
+    _adaptive_min_recurrence,
+    _extract_outcome_fields,
+    error_signature,
+    select_lesson,
+    shingle_similarity,
+)
+
+_STORE_PATH = os.path.join(os.path.expanduser("~"), ".claude", "hooks", ".error_clusters.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS outcomes (key TEXT PRIMARY KEY, fingerprint TEXT);
+CREATE TABLE IF NOT EXISTS clusters (
+    fingerprint TEXT PRIMARY KEY, pattern TEXT,
+    shingle_count INTEGER, occurrences INTEGER, first_seen INTEGER
+);
+CREATE TABLE IF NOT EXISTS strategies (
+    fingerprint TEXT, strategy TEXT,
+    attempts INTEGER, successes INTEGER, failures INTEGER, first_seen INTEGER,
+    PRIMARY KEY (fingerprint, strategy)
+);
+CREATE TABLE IF NOT EXISTS shingles (
+    shingle TEXT, fingerprint TEXT,
+    PRIMARY KEY (shingle, fingerprint)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS lessons (
+    fingerprint TEXT, strategy TEXT, first_seen INTEGER,
+    confidence REAL, lesson TEXT,
+    PRIMARY KEY (fingerprint, strategy)
+);
+"""
+
+# ---------------------------------------------------------------------------
+# Store plumbing
+# ---------------------------------------------------------------------------
+
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(_STORE_PATH, timeout=10, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _transaction(conn: sqlite3.Connection, fn: Callable):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        result = fn()
+        conn.execute("COMMIT")
+        return result
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _read(query: Callable):
+    try:
+        conn = _connect()
+        try:
+            return query(conn)
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error, ValueError):
+        return None
+
+
+def _outcome_key(outcome: dict) -> str:
+    if outcome.get("id"):
+        return f"id:{outcome['id']}"
+    blob = json.dumps(outcome, sort_keys=True, default=str)
+    return "sha1:" + hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def _load_cluster(conn: sqlite3.Connection, fingerprint: str) -> Optional[ErrorCluster]:
+    row = conn.execute(
+        "SELECT pattern, occurrences FROM clusters WHERE fingerprint = ?", (fingerprint,)
+    ).fetchone()
+    if row is None:
+        return None
+    cluster = ErrorCluster(row[0], fingerprint, row[1])
+    for strategy, attempts, successes, failures, first_seen in conn.execute(
+        "SELECT strategy, attempts, successes, failures, first_seen FROM strategies "
+        "WHERE fingerprint = ? ORDER BY first_seen",
+        (fingerprint,),
+    ):
+        cluster.strategies[strategy] = {
+            "attempts": attempts,
+            "successes": successes,
+            "failures": failures,
+            "first_seen": first_seen,
+        }
+    return cluster
+
+
+# ---------------------------------------------------------------------------
+# Ingest
+# ---------------------------------------------------------------------------
+
+
+def _fold(conn: sqlite3.Connection, outcomes: Iterable[dict]) -> int:
+    row = conn.execute("SELECT value FROM meta WHERE key = 'seq'").fetchone()
+    seq = int(row[0]) if row else 0
+    touched = set()
+    added = 0
+    for outcome in outcomes:
+        if not isinstance(outcome, dict):
+            continue
+        fields = _extract_outcome_fields(outcome)
+        signature = error_signature(fields.get("error", ""))
+        fingerprint = signature.fingerprint if signature else ""
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO outcomes VALUES (?, ?)", (_outcome_key(outcome), fingerprint)
+        )
+        if not cur.rowcount:
+            continue  # already folded in
+        added += 1
+        seq += 1
+        if signature is None:
+            continue
+
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO clusters VALUES (?, ?, ?, 0, ?)",
+            (fingerprint, signature.normalized, len(signature.shingles), seq),
+        )
+        if cur.rowcount:
+            conn.executemany(
+                "INSERT OR IGNORE INTO shingles VALUES (?, ?)",
+                [(shingle, fingerprint) for shingle in signature.shingles],
+            )
+        conn.execute(
+            "UPDATE clusters SET occurrences = occurrences + 1 WHERE fingerprint = ?",
+            (fingerprint,),
+        )
+        strategy = fields.get("strategy", "")
+        if strategy:
+            result = fields.get("result", "")
+            conn.execute(
+                "INSERT INTO strategies VALUES (?, ?, 1, ?, ?, ?) "
+                "ON CONFLICT (fingerprint, strategy) DO UPDATE SET "
+                "attempts = attempts + 1, successes = successes + excluded.successes, "
+                "failures = failures + excluded.failures",
+                (
+                    fingerprint,
+                    strategy,
+                    int(result in _SUCCESS_RESULTS),
+                    int(result in _FAILURE_RESULTS),
+                    seq,
+                ),
+            )
+            touched.add(fingerprint)
+
+    for fingerprint in touched:
+        cluster = _load_cluster(conn, fingerprint)
+        conn.execute("DELETE FROM lessons WHERE fingerprint = ?", (fingerprint,))
+        conn.executemany(
+            "INSERT INTO lessons VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    fingerprint,
+                    lesson.failed_strategy,
+                    cluster.strategies[lesson.failed_strategy]["first_seen"],
+                    lesson.confidence,
+                    json.dumps(asdict(lesson)),
+                )
+                for lesson in cluster.lessons(MIN_FAILURES_FOR_LESSON)
+            ],
+        )
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('seq', ?)", (str(seq),))
+    return added
+
+
+def ingest_outcomes(outcomes: Iterable[dict]) -> Optional[int]:
+    """Fold fix_outcome dicts into the store; returns how many were new.
+
+    Outcomes already ingested (same id, or same content when there is no
+    id) are skipped, so callers may pass the full outcome history each time.
+    """
+    try:
+        conn = _connect()
+        try:
+            return _transaction(conn, lambda: _fold(conn, outcomes))
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error, ValueError, TypeError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+
+def _similar(conn: sqlite3.Connection, error: str) -> Dict[str, float]:
+    """Fingerprint -> similarity for clusters similar to a normalized error."""
+    shingles = sorted(set(error.split()))
+    similar = {}
+    for fingerprint, overlap, shingle_count in conn.execute(
+        "SELECT s.fingerprint, COUNT(*), c.shingle_count "
+        "FROM shingles s JOIN clusters c ON c.fingerprint = s.fingerprint "
+        "WHERE s.shingle IN (SELECT value FROM json_each(?)) GROUP BY s.fingerprint",
+        (json.dumps(shingles),),
+    ):
+        similarity = shingle_similarity(len(shingles), shingle_count, overlap)
+        if similarity >= SIMILARITY_THRESHOLD:
+            similar[fingerprint] = similarity
+    return similar
+
+
+def find_lesson(error: str, current_strategy: str = "") -> Optional[FailureLesson]:
+    """Most relevant stored lesson for a raw error, or None.
+
+    Also None when the store cannot be used; callers then fall back to
+    chain_refinement over their outcome list.
+    """
+    signature = error_signature(error)
+    if signature is None:
+        return None
+
+    def query(conn):
+        similar = _similar(conn, signature.normalized)
+        if not similar:
+            return None
+        rows = conn.execute(
+            "SELECT fingerprint, lesson FROM lessons "
+            "WHERE fingerprint IN (SELECT value FROM json_each(?)) "
+            "ORDER BY confidence DESC, first_seen",
+            (json.dumps(list(similar)),),
+        ).fetchall()
+        candidates = (
+            (similar[fingerprint], FailureLesson(**json.loads(blob)))
+            for fingerprint, blob in rows
+        )
+        return select_lesson(candidates, current_strategy)
+
+    return _read(query)
+
+
+def recurring_failures(min_recurrence: Optional[int] = None) -> Optional[List[RecurringPattern]]:
+    """detect_recurring_failures() over every ingested outcome, or None."""
+
+    def query(conn):
+        threshold = min_recurrence
+        if threshold is None:
+            (total,) = conn.execute("SELECT COUNT(*) FROM outcomes").fetchone()
+            threshold = _adaptive_min_recurrence(total)
+        fingerprints = [
+            fingerprint
+            for (fingerprint,) in conn.execute(
+                "SELECT fingerprint FROM clusters WHERE occurrences >= ? "
+                "ORDER BY occurrences DESC, first_seen",
+                (threshold,),
+            )
+        ]
+        return [_load_cluster(conn, fp).recurring_pattern() for fp in fingerprints]
+
+    return _read(query)
@@ -7,19 +7,32 @@ rates.
 File: hooks/.experience_archive.csv
 Columns: timestamp, error_type, gate_id, fix_strategy, outcome, file, duration_s
 
+The CSV stays the append-only record. Queries are answered from a SQLite
+index next to it (hooks/.experience_archive.db) holding pre-aggregated
+attempt/success counters keyed by normalized (lowercased) error type and
+strategy. The index remembers how many CSV bytes it has consumed, so each
+sync folds in only appended rows; the first sync against an existing CSV is
+the one-time import, and a truncated/replaced CSV is re-imported. Results
+are memoized per process until the CSV grows, so repeated strategy lookups
+on the error-handling path cost one stat().
+
 Design constraints:
 - Thread-safe writes via fcntl file locking (LOCK_EX).
 - Fail-open: all public functions swallow exceptions so they cannot interfere
   with gate enforcement.
 - atomic tmp-then-rename writes are NOT used here because we append rows; the
   lock ensures only one writer at a time.
-- query functions read the whole CSV under a shared lock (LOCK_SH) so they
-  never see a half-written row.
+- the index reads the CSV tail under a shared lock (LOCK_SH) so it never
+  sees a half-written row. Lock order is always CSV, then SQLite.
 """
 
 import csv
 import fcntl
+import io
+import json
 import os
+import sqlite3
+import threading
 from datetime import datetime, timezone
 from typing import Dict, List, Tuple
 
@@ -39,6 +52,42 @@ OUTCOME_FAILURE = "failure"
 OUTCOME_PARTIAL = "partial"
 _VALID_OUTCOMES = {OUTCOME_SUCCESS, OUTCOME_FAILURE, OUTCOME_PARTIAL}
 
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    error_key  TEXT NOT NULL,
+    strategy   TEXT NOT NULL,
+    total      INTEGER NOT NULL DEFAULT 0,
+    successes  INTEGER NOT NULL DEFAULT 0,
+    first_seen INTEGER NOT NULL,
+    PRIMARY KEY (error_key, strategy)
+);
+CREATE TABLE IF NOT EXISTS strategies (
+    strategy   TEXT PRIMARY KEY,
+    total      INTEGER NOT NULL DEFAULT 0,
+    successes  INTEGER NOT NULL DEFAULT 0,
+    first_seen INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS error_types (
+    error_type TEXT PRIMARY KEY
+);
+"""
+
+_EMPTY_STATS = {
+    "total_rows": 0,
+    "unique_errors": 0,
+    "unique_strategies": 0,
+    "overall_success_rate": 0.0,
+    "top_strategies": [],
+}
+
+# Per-archive in-process state: {csv_path: {"conn", "sig", "memo"}}
+_indexes: Dict[str, dict] = {}
+_indexes_lock = threading.Lock()
+
 
 # ── Internal helpers ───────────────────────────────────────────────────────────
 
@@ -77,6 +126,137 @@ def _read_rows(path: str) -> List[Dict[str, str]]:
     return rows
 
 
+def _index_path(path: str) -> str:
+    """SQLite index location for a CSV archive (same name, .db suffix)."""
+    return os.path.splitext(path)[0] + ".db"
+
+
+def _meta_get(conn: sqlite3.Connection, key: str, default: str = "") -> str:
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def _ingest_rows(conn: sqlite3.Connection, rows: List[Dict[str, str]], seq: int) -> int:
+    """Fold CSV rows into the aggregate tables. Returns the next row sequence."""
+    total_success = int(_meta_get(conn, "total_success", "0"))
+    for row in rows:
+        seq += 1
+        raw_et = row.get("error_type") or ""
+        et = raw_et.strip()
+        strat = (row.get("fix_strategy") or "").strip()
+        won = 1 if row.get("outcome") == OUTCOME_SUCCESS else 0
+        if et:
+            conn.execute("INSERT OR IGNORE INTO error_types VALUES (?)", (et,))
+        if not strat:
+            continue
+        total_success += won
+        conn.execute(
+            "INSERT INTO strategies (strategy, total, successes, first_seen) "
+            "VALUES (?, 1, ?, ?) ON CONFLICT(strategy) DO UPDATE SET "
+            "total = total + 1, successes = successes + excluded.successes",
+            (strat, won, seq),
+        )
+        conn.execute(
+            "INSERT INTO attempts (error_key, strategy, total, successes, first_seen) "
+            "VALUES (?, ?, 1, ?, ?) ON CONFLICT(error_key, strategy) DO UPDATE SET "
+            "total = total + 1, successes = successes + excluded.successes",
+            (raw_et.lower(), strat, won, seq),
+        )
+    conn.executemany(
+        "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+        [("total_rows", str(seq)), ("total_success", str(total_success))],
+    )
+    return seq
+
+
+def _sync_index(conn: sqlite3.Connection, path: str) -> None:
+    """Import CSV rows appended since the last sync (all rows the first time)."""
+    with open(path, "rb") as f:
+        fcntl.flock(f, fcntl.LOCK_SH)
+        try:
+            st = os.fstat(f.fileno())
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                offset = int(_meta_get(conn, "offset", "0"))
+                header = json.loads(_meta_get(conn, "header", "null"))
+                head = f.read(min(offset, 256)).hex()
+                if (
+                    str(st.st_ino) != _meta_get(conn, "inode")
+                    or st.st_size < offset
+                    or head != _meta_get(conn, "head")
+                ):
+                    # New or rewritten CSV: rebuild from scratch
+                    for table in ("meta", "attempts", "strategies", "error_types"):
+                        conn.execute(f"DELETE FROM {table}")
+                    offset, header = 0, None
+                if st.st_size > offset:
+                    f.seek(offset)
+                    data = f.read(st.st_size - offset)
+                    records = list(csv.reader(io.StringIO(data.decode("utf-8"), newline="")))
+                    if header is None and records:
+                        # Same convention as csv.DictReader: first row is the header
+                        header = records.pop(0)
+                    rows = [dict(zip(header, r)) for r in records if r] if header else []
+                    _ingest_rows(conn, rows, int(_meta_get(conn, "total_rows", "0")))
+                    offset += len(data)
+                f.seek(0)
+                head = f.read(min(offset, 256)).hex()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                    [
+                        ("offset", str(offset)),
+                        ("inode", str(st.st_ino)),
+                        ("header", json.dumps(header)),
+                        ("head", head),
+                    ],
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _index(path: str):
+    """Return (conn, memo) for an up-to-date index of path, or None if empty.
+
+    The memo dict caches query results and is cleared whenever the CSV
+    changes; while it does not, this is a single stat().
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if st.st_size == 0:
+        return None
+    sig = (st.st_ino, st.st_size, st.st_mtime_ns)
+    with _indexes_lock:
+        state = _indexes.get(path)
+        if state is None:
+            conn = sqlite3.connect(
+                _index_path(path), timeout=10, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_INDEX_SCHEMA)
+            state = _indexes[path] = {"conn": conn, "sig": None, "memo": {}, "lock": threading.Lock()}
+    with state["lock"]:
+        if state["sig"] != sig:
+            _sync_index(state["conn"], path)
+            state["memo"] = {}
+            state["sig"] = sig
+        return state["conn"], state["memo"]
+
+
+def _strategy_counts(conn: sqlite3.Connection, needle: str) -> List[Tuple[str, int, int]]:
+    """(strategy, total, successes) over error types containing needle, in first-seen order."""
+    return conn.execute(
+        "SELECT strategy, SUM(total), SUM(successes) FROM attempts "
+        "WHERE instr(error_key, ?) > 0 GROUP BY strategy ORDER BY MIN(first_seen)",
+        (needle,),
+    ).fetchall()
+
+
 # ── Public API ─────────────────────────────────────────────────────────────────
 
 def record_fix(
@@ -124,6 +304,12 @@ def record_fix(
                 writer.writerow(row)
             finally:
                 fcntl.flock(f, fcntl.LOCK_UN)
+
+        # Fold the new row into the index now (after the CSV lock is released)
+        try:
+            _index(path)
+        except Exception:
+            pass
         return True
 
     except Exception:
@@ -144,39 +330,28 @@ def query_best_strategy(error_type: str) -> str:
         The strategy name string, or "" if no relevant history found.
     """
     try:
-        rows = _read_rows(ARCHIVE_PATH)
-        if not rows:
+        idx = _index(ARCHIVE_PATH)
+        if idx is None:
             return ""
+        conn, memo = idx
 
         needle = error_type.lower()
-
-        # Aggregate per strategy: {strategy: [total, successes]}
-        stats: Dict[str, List[int]] = {}
-        for row in rows:
-            et = row.get("error_type", "")
-            if needle not in et.lower():
-                continue
-            strat = row.get("fix_strategy", "").strip()
-            if not strat:
-                continue
-            outcome = row.get("outcome", "")
-            if strat not in stats:
-                stats[strat] = [0, 0]  # [total, successes]
-            stats[strat][0] += 1
-            if outcome == OUTCOME_SUCCESS:
-                stats[strat][1] += 1
-
-        if not stats:
-            return ""
-
-        # Sort by (success_rate DESC, total_attempts DESC)
-        def _rank(item: Tuple[str, List[int]]) -> Tuple[float, int]:
-            _, (total, successes) = item
-            rate = successes / total if total > 0 else 0.0
-            return (rate, total)
-
-        best = max(stats.items(), key=_rank)
-        return best[0]
+        key = ("best", needle)
+        if key in memo:
+            return memo[key]
+
+        stats = _strategy_counts(conn, needle)
+        best = ""
+        if stats:
+            # Sort by (success_rate DESC, total_attempts DESC); ties keep first seen
+            def _rank(item: Tuple[str, int, int]) -> Tuple[float, int]:
+                _, total, successes = item
+                rate = successes / total if total > 0 else 0.0
+                return (rate, total)
+
+            best = max(stats, key=_rank)[0]
+        memo[key] = best
+        return best
 
     except Exception:
         return ""
@@ -193,27 +368,41 @@ def get_success_rate(strategy: str) -> float:
         or if data cannot be read.
     """
     try:
-        rows = _read_rows(ARCHIVE_PATH)
-        if not rows:
+        idx = _index(ARCHIVE_PATH)
+        if idx is None:
             return 0.0
+        conn, _ = idx
 
-        total = 0
-        successes = 0
-        for row in rows:
-            if row.get("fix_strategy", "").strip() != strategy:
-                continue
-            total += 1
-            if row.get("outcome", "") == OUTCOME_SUCCESS:
-                successes += 1
-
-        if total == 0:
+        row = conn.execute(
+            "SELECT total, successes FROM strategies WHERE strategy = ?", (strategy,)
+        ).fetchone()
+        if not row or row[0] == 0:
             return 0.0
-        return successes / total
+        return row[1] / row[0]
 
     except Exception:
         return 0.0
 
 
+def get_strategy_breakdown(error_type: str) -> Dict[str, Dict[str, int]]:
+    """Per-strategy {"total", "successes"} for error types containing error_type.
+
+    Same case-insensitive substring match as query_best_strategy; strategies
+    are in the order they were first recorded.
+    """
+    try:
+        idx = _index(ARCHIVE_PATH)
+        if idx is None:
+            return {}
+        conn, _ = idx
+        return {
+            strat: {"total": total, "successes": successes}
+            for strat, total, successes in _strategy_counts(conn, error_type.lower())
+        }
+    except Exception:
+        return {}
+
+
 def get_archive_stats() -> dict:
     """Return aggregate statistics about the experience archive.
 
@@ -225,67 +414,49 @@ def get_archive_stats() -> dict:
         top_strategies:  list  — up to 5 strategies sorted by success_rate desc
     """
     try:
-        rows = _read_rows(ARCHIVE_PATH)
-        if not rows:
-            return {
-                "total_rows": 0,
-                "unique_errors": 0,
-                "unique_strategies": 0,
-                "overall_success_rate": 0.0,
-                "top_strategies": [],
-            }
-
-        error_types = set()
-        strategies: Dict[str, List[int]] = {}  # {strategy: [total, successes]}
-        total_success = 0
-
-        for row in rows:
-            et = row.get("error_type", "").strip()
-            strat = row.get("fix_strategy", "").strip()
-            outcome = row.get("outcome", "")
-
-            if et:
-                error_types.add(et)
-            if strat:
-                if strat not in strategies:
-                    strategies[strat] = [0, 0]
-                strategies[strat][0] += 1
-                if outcome == OUTCOME_SUCCESS:
-                    strategies[strat][1] += 1
-                    total_success += 1
-
-        overall_rate = total_success / len(rows) if rows else 0.0
+        idx = _index(ARCHIVE_PATH)
+        if idx is None:
+            return dict(_EMPTY_STATS, top_strategies=[])
+        conn, memo = idx
+        if "stats" in memo:
+            cached = memo["stats"]
+            return dict(cached, top_strategies=[dict(s) for s in cached["top_strategies"]])
+
+        total_rows = int(_meta_get(conn, "total_rows", "0"))
+        if not total_rows:
+            return dict(_EMPTY_STATS, top_strategies=[])
+        total_success = int(_meta_get(conn, "total_success", "0"))
+        unique_errors = conn.execute("SELECT COUNT(*) FROM error_types").fetchone()[0]
+        strategies = conn.execute(
+            "SELECT strategy, total, successes FROM strategies ORDER BY first_seen"
+        ).fetchall()
 
         # Build top strategies list
         ranked = sorted(
             [
                 {
                     "strategy": s,
-                    "total": v[0],
-                    "successes": v[1],
-                    "success_rate": round(v[1] / v[0], 3) if v[0] > 0 else 0.0,
+                    "total": total,
+                    "successes": successes,
+                    "success_rate": round(successes / total, 3) if total > 0 else 0.0,
                 }
-                for s, v in strategies.items()
+                for s, total, successes in strategies
             ],
             key=lambda x: (-float(x["success_rate"]), -int(x["total"])),  # type: ignore[operator]
         )
 
-        return {
-            "total_rows": len(rows),
-            "unique_errors": len(error_types),
+        stats = {
+            "total_rows": total_rows,
+            "unique_errors": unique_errors,
             "unique_strategies": len(strategies),
-            "overall_success_rate": round(overall_rate, 3),
+            "overall_success_rate": round(total_success / total_rows, 3),
             "top_strategies": ranked[:5],
         }
+        memo["stats"] = stats
+        return dict(stats, top_strategies=[dict(s) for s in stats["top_strategies"]])
 
     except Exception:
-        return {
-            "total_rows": 0,
-            "unique_errors": 0,
-            "unique_strategies": 0,
-            "overall_success_rate": 0.0,
-            "top_strategies": [],
-        }
+        return dict(_EMPTY_STATS, top_strategies=[])
 
 
 # ── Module smoke test ──────────────────────────────────────────────────────────
@@ -16,6 +16,20 @@ Data sources
 - ~/.claude/hooks/audit/YYYY-MM-DD.jsonl    (per-decision audit trail)
 - ~/.claude/hooks/.audit_trail.jsonl         (persistent append trail)
 
+Incremental store
+-----------------
+GateCorrelator does not rescan the audit history on every report. All four
+analyses reduce to running counters (per-pair co-occurrence and block
+agreement, per-gate tool-call counts, per-chain count/gap/block totals,
+per-(gate, tool) fires and blocks), which _CorrelationAggregates maintains
+one entry at a time. ~/.claude/hooks/.gate_correlation.db persists those
+counters together with a checkpoint into .audit_trail.jsonl (inode, byte
+offset, head bytes) and the small in-flight state (the open tool-call group
+and each session's chain window), so a report folds in only the lines
+appended since the last one. A truncated or replaced trail is re-imported.
+The list-based functions below run the same aggregator over an in-memory
+list, and are used directly when no trail exists.
+
 Typical usage
 -------------
     from shared.gate_correlator import GateCorrelator
@@ -28,6 +42,7 @@ Typical usage
 import gzip
 import json
 import os
+import sqlite3
 from collections import defaultdict
 from datetime import datetime
 from typing import Dict, Iterator, List, Optional, Set, Tuple
@@ -40,6 +55,7 @@ _HOOKS_DIR = os.path.join(os.path.expanduser("~"), ".claude", "hooks")
 _EFFECTIVENESS_FILE = os.path.join(_HOOKS_DIR, ".gate_data", ".gate_effectiveness.json")
 _AUDIT_TRAIL = os.path.join(_HOOKS_DIR, ".audit_trail.jsonl")
 _AUDIT_DIR = os.path.join(_HOOKS_DIR, "audit")
+_STORE_PATH = os.path.join(_HOOKS_DIR, ".gate_correlation.db")
 
 # Window (seconds) within which gate B is considered chained after gate A
 CHAIN_WINDOW_SECONDS = 5.0
@@ -131,6 +147,24 @@ def _normalize_gate(name: str) -> str:
 # ---------------------------------------------------------------------------
 
 
+def _parse_entry(raw) -> Optional[dict]:
+    """Decode one JSONL audit line (str or bytes), normalising its gate name.
+
+    Returns None for blank, malformed or non-object lines.
+    """
+    raw = raw.strip()
+    if not raw:
+        return None
+    try:
+        entry = json.loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    if not isinstance(entry, dict):
+        return None
+    entry["gate"] = _normalize_gate(entry.get("gate", ""))
+    return entry
+
+
 def _iter_audit_entries(max_entries: int = 50_000) -> Iterator[dict]:
     """Yield audit log entries from all available sources.
 
@@ -156,22 +190,14 @@ def _iter_audit_entries(max_entries: int = 50_000) -> Iterator[dict]:
                 for raw in fh:
                     if count >= max_entries:
                         return
-                    raw = raw.strip()
-                    if not raw:
-                        continue
-                    try:
-                        entry = json.loads(raw)
-                    except json.JSONDecodeError:
-                        continue
-                    if not isinstance(entry, dict):
+                    entry = _parse_entry(raw)
+                    if entry is None:
                         continue
                     entry_id = entry.get("id")
                     if entry_id:
                         if entry_id in seen_ids:
                             continue
                         seen_ids.add(entry_id)
-                    raw_gate = entry.get("gate", "")
-                    entry["gate"] = _normalize_gate(raw_gate)
                     count += 1
                     yield entry
         except (IOError, OSError, gzip.BadGzipFile):
@@ -270,6 +296,133 @@ def _group_by_tool_call(entries: List[dict]) -> List[List[dict]]:
     return groups
 
 
+# ---------------------------------------------------------------------------
+# Streaming aggregation (shared by the list functions and the store)
+# ---------------------------------------------------------------------------
+
+
+class _CorrelationAggregates:
+    """Running counters behind all four analyses, fed one entry at a time.
+
+    Entries must arrive in timestamp order: the audit trail is appended in
+    that order, and the list-based functions sort first. Tool calls are
+    grouped with the same rule as _group_by_tool_call, and each entry is
+    chained to the earlier entries of its session that are still inside
+    ``chain_window`` seconds.
+
+    The state that spans entries is the open tool-call group plus each
+    session's recent entries. ``pending()`` and ``restore()`` round-trip
+    that state through JSON, so the persistent store can resume mid-stream.
+    """
+
+    def __init__(self, chain_window: float = CHAIN_WINDOW_SECONDS) -> None:
+        self.chain_window = chain_window
+        self.entries = 0
+        self.cooc: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.agree: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.groups: Dict[str, int] = defaultdict(int)
+        self.fires: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.blocks: Dict[Tuple[str, str], int] = defaultdict(int)
+        # (from_gate, to_gate) -> [count, gap_ms_sum, a_blocks, both_blocks]
+        self.chains: Dict[Tuple[str, str], list] = {}
+        self.chain_tools: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        # Open tool call: [session_id, tool, last_ts, {gate: blocked}]
+        self._group: Optional[list] = None
+        # Chain session key -> [[ts, gate, blocked], ...] oldest first
+        self._recent: Dict[str, List[list]] = {}
+
+    def add(self, entry: dict) -> None:
+        """Fold one audit entry into the counters."""
+        ts = _ts_float(entry)
+        gate = entry.get("gate", "")
+        tool = entry.get("tool", "")
+        blocked = entry.get("decision") == "block"
+        self.entries += 1
+
+        session = entry.get("session_id", "")
+        group = self._group
+        if group is None or ts - group[2] > 1.0 or session != group[0] or tool != group[1]:
+            self.close_group()
+            group = self._group = [session, tool, ts, {}]
+        group[2] = ts
+        if not gate:
+            return
+        group[3][gate] = group[3].get(gate, False) or blocked
+
+        self.fires[(gate, tool or "")] += 1
+        if blocked:
+            self.blocks[(gate, tool or "")] += 1
+
+        recent = self._recent.setdefault(entry.get("session_id", "__global__"), [])
+        expired = 0
+        while expired < len(recent) and ts - recent[expired][0] > self.chain_window:
+            expired += 1
+        del recent[:expired]
+        for a_ts, a_gate, a_blocked in recent:
+            if a_gate == gate or ts < a_ts:
+                continue
+            stats = self.chains.get((a_gate, gate))
+            if stats is None:
+                stats = self.chains[(a_gate, gate)] = [0, 0.0, 0, 0]
+            stats[0] += 1
+            stats[1] += (ts - a_ts) * 1000.0
+            if a_blocked:
+                stats[2] += 1
+                if blocked:
+                    stats[3] += 1
+            if tool:
+                self.chain_tools[(a_gate, gate, tool)] += 1
+        recent.append([ts, gate, blocked])
+
+    def close_group(self) -> None:
+        """Count the open tool-call group (call once the stream has ended)."""
+        group, self._group = self._group, None
+        if not group:
+            return
+        gates = list(group[3].items())
+        for i, (gate_a, blocked_a) in enumerate(gates):
+            self.groups[gate_a] += 1
+            for gate_b, blocked_b in gates[i + 1 :]:
+                key = (min(gate_a, gate_b), max(gate_a, gate_b))
+                self.cooc[key] += 1
+                if blocked_a == blocked_b:
+                    self.agree[key] += 1
+
+    def pending(self) -> dict:
+        """JSON-safe in-flight state; sessions idle past the chain window are dropped."""
+        newest = max((r[-1][0] for r in self._recent.values() if r), default=0.0)
+        recent = {
+            s: r for s, r in self._recent.items() if r and newest - r[-1][0] <= self.chain_window
+        }
+        return {"group": self._group, "recent": recent}
+
+    def restore(self, pending: dict) -> None:
+        """Resume from a pending() snapshot."""
+        self._group = pending.get("group")
+        self._recent = pending.get("recent") or {}
+
+    def gate_counts(self, target_tool: Optional[str] = None) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Per-gate (fires, blocks), optionally restricted to one tool."""
+        gate_fires: Dict[str, int] = defaultdict(int)
+        gate_blocks: Dict[str, int] = defaultdict(int)
+        for (gate, tool), n in self.fires.items():
+            if not target_tool or tool == target_tool:
+                gate_fires[gate] += n
+                gate_blocks[gate] += self.blocks.get((gate, tool), 0)
+        return gate_fires, gate_blocks
+
+
+def _aggregate(
+    entries: List[dict], chain_window: float = CHAIN_WINDOW_SECONDS
+) -> _CorrelationAggregates:
+    """Run the aggregator over an in-memory entry list (any order)."""
+    agg = _CorrelationAggregates(chain_window)
+    for entry in sorted(entries, key=_ts_float):
+        agg.add(entry)
+    agg.close_group()
+    return agg
+
+
 # ---------------------------------------------------------------------------
 # Feature 1: Co-occurrence matrix
 # ---------------------------------------------------------------------------
@@ -289,19 +442,7 @@ def build_cooccurrence_matrix(
     Returns:
         Dict mapping (gate_a, gate_b) -> co-occurrence count.
     """
-    groups = _group_by_tool_call(entries)
-    counts: Dict[Tuple[str, str], int] = defaultdict(int)
-
-    for group in groups:
-        unique_gates: List[str] = list(
-            dict.fromkeys(e.get("gate", "") for e in group if e.get("gate"))
-        )
-        for i, gate_a in enumerate(unique_gates):
-            for gate_b in unique_gates[i + 1 :]:
-                key = (min(gate_a, gate_b), max(gate_a, gate_b))
-                counts[key] += 1
-
-    return dict(counts)
+    return dict(_aggregate(entries).cooc)
 
 
 def cooccurrence_summary(matrix: Dict[Tuple[str, str], int]) -> List[dict]:
@@ -348,89 +489,34 @@ def detect_gate_chains(
           - avg_gap_ms: float  (mean milliseconds between A and B)
           - example_tool: str  (most common tool associated with the chain)
     """
-    sorted_entries = sorted(
-        entries, key=lambda e: (e.get("session_id", ""), _ts_float(e))
-    )
-
-    by_session: Dict[str, List[dict]] = defaultdict(list)
-    for e in sorted_entries:
-        by_session[e.get("session_id", "__global__")].append(e)
+    return _chain_rows(_aggregate(entries, window_seconds), min_count)
 
-    chain_gaps: Dict[Tuple[str, str], List[float]] = defaultdict(list)
-    chain_tools: Dict[Tuple[str, str], List[str]] = defaultdict(list)
 
-    for session_entries in by_session.values():
-        for i, a_entry in enumerate(session_entries):
-            a_gate = a_entry.get("gate", "")
-            a_ts = _ts_float(a_entry)
-            if not a_gate:
-                continue
-            for b_entry in session_entries[i + 1 :]:
-                b_ts = _ts_float(b_entry)
-                gap = b_ts - a_ts
-                if gap > window_seconds:
-                    break
-                if gap < 0:
-                    continue
-                b_gate = b_entry.get("gate", "")
-                if not b_gate or b_gate == a_gate:
-                    continue
-                key = (a_gate, b_gate)
-                chain_gaps[key].append(gap * 1000.0)
-                chain_tools[key].append(b_entry.get("tool", ""))
-
-    # Track block decisions for conditional probability
-    chain_blocks: Dict[Tuple[str, str], List[Tuple[bool, bool]]] = defaultdict(list)
-    for session_entries in by_session.values():
-        for i, a_entry in enumerate(session_entries):
-            a_gate = a_entry.get("gate", "")
-            a_ts = _ts_float(a_entry)
-            a_blocked = a_entry.get("decision") == "block"
-            if not a_gate:
-                continue
-            for b_entry in session_entries[i + 1 :]:
-                b_ts = _ts_float(b_entry)
-                gap = b_ts - a_ts
-                if gap > window_seconds:
-                    break
-                if gap < 0:
-                    continue
-                b_gate = b_entry.get("gate", "")
-                if not b_gate or b_gate == a_gate:
-                    continue
-                b_blocked = b_entry.get("decision") == "block"
-                chain_blocks[(a_gate, b_gate)].append((a_blocked, b_blocked))
+def _chain_rows(agg: _CorrelationAggregates, min_count: int) -> List[dict]:
+    """Turn aggregated chain counters into detect_gate_chains() rows."""
+    tools_by_chain: Dict[Tuple[str, str], Dict[str, int]] = defaultdict(dict)
+    for (from_gate, to_gate, tool), n in agg.chain_tools.items():
+        tools_by_chain[(from_gate, to_gate)][tool] = n
 
     results = []
-    for (from_gate, to_gate), gaps in chain_gaps.items():
-        if len(gaps) < min_count:
+    for (from_gate, to_gate), (count, gap_ms, a_blocks, both_blocks) in agg.chains.items():
+        if count < min_count:
             continue
-        tool_counts: Dict[str, int] = defaultdict(int)
-        for t in chain_tools[(from_gate, to_gate)]:
-            if t:
-                tool_counts[t] += 1
+        tool_counts = tools_by_chain.get((from_gate, to_gate), {})
         example_tool = (
             max(tool_counts, key=tool_counts.__getitem__) if tool_counts else ""
         )
 
-        # P(B blocks | A blocks) — conditional block probability
-        decisions = chain_blocks.get((from_gate, to_gate), [])
-        a_blocks = [(a, b) for a, b in decisions if a]
-        cond_prob = (
-            sum(1 for _, b in a_blocks if b) / max(len(a_blocks), 1)
-            if a_blocks
-            else None
-        )
-
         entry = {
             "from_gate": from_gate,
             "to_gate": to_gate,
-            "count": len(gaps),
-            "avg_gap_ms": round(sum(gaps) / len(gaps), 1),
+            "count": count,
+            "avg_gap_ms": round(gap_ms / count, 1),
             "example_tool": example_tool,
         }
-        if cond_prob is not None:
-            entry["cond_block_prob"] = round(cond_prob, 4)
+        # P(B blocks | A blocks) — conditional block probability
+        if a_blocks:
+            entry["cond_block_prob"] = round(both_blocks / a_blocks, 4)
         results.append(entry)
 
     results.sort(key=lambda r: r["count"], reverse=True)
@@ -472,70 +558,48 @@ def detect_redundant_gates(
           - cooccurrence_count: int
           - note: str
     """
-    groups = _group_by_tool_call(entries)
+    return _redundancy_rows(_aggregate(entries), min_cooccurrence, jaccard_threshold)
 
-    gate_group_indices: Dict[str, Set[int]] = defaultdict(set)
-    gate_decisions: Dict[str, Dict[int, str]] = defaultdict(dict)
 
-    for idx, group in enumerate(groups):
-        for entry in group:
-            g = entry.get("gate", "")
-            if not g:
-                continue
-            gate_group_indices[g].add(idx)
-            current = gate_decisions[g].get(idx, "pass")
-            decision = entry.get("decision", "pass")
-            priority = {"block": 2, "warn": 1, "pass": 0}
-            if priority.get(decision, 0) > priority.get(current, 0):
-                gate_decisions[g][idx] = decision
-
-    all_gates = sorted(gate_group_indices.keys())
+def _redundancy_rows(
+    agg: _CorrelationAggregates, min_cooccurrence: int, jaccard_threshold: float
+) -> List[dict]:
+    """Turn aggregated pair counters into detect_redundant_gates() rows.
+
+    |A ∪ B| is |A| + |B| - |A ∩ B|, so per-gate tool-call counts and
+    per-pair joint counts are all the Jaccard needs.
+    """
     results = []
+    for (gate_a, gate_b), cooc in sorted(agg.cooc.items()):
+        if cooc < min_cooccurrence:
+            continue
 
-    for i, gate_a in enumerate(all_gates):
-        for gate_b in all_gates[i + 1 :]:
-            set_a = gate_group_indices[gate_a]
-            set_b = gate_group_indices[gate_b]
-            intersection = set_a & set_b
-            union = set_a | set_b
+        union = agg.groups[gate_a] + agg.groups[gate_b] - cooc
+        jaccard = cooc / union if union else 0.0
+        if jaccard < jaccard_threshold:
+            continue
 
-            cooc = len(intersection)
-            if cooc < min_cooccurrence:
-                continue
+        agreement_rate = agg.agree.get((gate_a, gate_b), 0) / cooc
 
-            jaccard = cooc / len(union) if union else 0.0
-            if jaccard < jaccard_threshold:
-                continue
+        if jaccard >= 0.95 and agreement_rate >= 0.95:
+            note = "Near-identical coverage and decisions — strong redundancy candidate"
+        elif jaccard >= 0.85 and agreement_rate >= 0.85:
+            note = "High overlap in coverage and decisions — possible redundancy"
+        elif jaccard >= 0.85:
+            note = "High coverage overlap but different decisions — complementary gates"
+        else:
+            note = "Moderate overlap"
 
-            dec_a = gate_decisions[gate_a]
-            dec_b = gate_decisions[gate_b]
-            agreed = sum(
-                1
-                for idx in intersection
-                if (dec_a.get(idx, "pass") == "block")
-                == (dec_b.get(idx, "pass") == "block")
-            )
-            agreement_rate = agreed / cooc if cooc > 0 else 0.0
-
-            if jaccard >= 0.95 and agreement_rate >= 0.95:
-                note = "Near-identical coverage and decisions — strong redundancy candidate"
-            elif jaccard >= 0.85 and agreement_rate >= 0.85:
-                note = "High overlap in coverage and decisions — possible redundancy"
-            elif jaccard >= 0.85:
-                note = "High coverage overlap but different decisions — complementary gates"
-            else:
-                note = "Moderate overlap"
-
-            results.append(
-                {
-                    "gate_a": gate_a,
-                    "gate_b": gate_b,
-                    "jaccard_similarity": round(jaccard, 4),
-                    "agreement_rate": round(agreement_rate, 4),
-                    "cooccurrence_count": cooc,
-                    "note": note,
-                }
-            )
+        results.append(
+            {
+                "gate_a": gate_a,
+                "gate_b": gate_b,
+                "jaccard_similarity": round(jaccard, 4),
+                "agreement_rate": round(agreement_rate, 4),
+                "cooccurrence_count": cooc,
+                "note": note,
+            }
+        )
 
     results.sort(key=lambda r: r["jaccard_similarity"], reverse=True)
     return results
@@ -597,6 +661,15 @@ def optimize_gate_order(
 
     if effectiveness_data is None:
         effectiveness_data = _load_effectiveness()
+    return _ordering_rows(gate_fires, gate_blocks, effectiveness_data)
+
+
+def _ordering_rows(
+    gate_fires: Dict[str, int],
+    gate_blocks: Dict[str, int],
+    effectiveness_data: Dict[str, Dict[str, int]],
+) -> List[dict]:
+    """Score and rank gates from per-gate fire/block counts (see optimize_gate_order)."""
 
     for raw_key, eff in effectiveness_data.items():
         canonical = _normalize_gate(raw_key)
@@ -675,6 +748,181 @@ def optimize_gate_order(
     return result
 
 
+# ---------------------------------------------------------------------------
+# Persistent incremental store
+# ---------------------------------------------------------------------------
+
+_STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS gate_groups (
+    gate   TEXT PRIMARY KEY,
+    groups INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS gate_pairs (
+    gate_a TEXT NOT NULL,
+    gate_b TEXT NOT NULL,
+    cooc   INTEGER NOT NULL,
+    agree  INTEGER NOT NULL,
+    PRIMARY KEY (gate_a, gate_b)
+);
+CREATE TABLE IF NOT EXISTS gate_fires (
+    gate   TEXT NOT NULL,
+    tool   TEXT NOT NULL,
+    fires  INTEGER NOT NULL,
+    blocks INTEGER NOT NULL,
+    PRIMARY KEY (gate, tool)
+);
+CREATE TABLE IF NOT EXISTS chains (
+    from_gate   TEXT NOT NULL,
+    to_gate     TEXT NOT NULL,
+    count       INTEGER NOT NULL,
+    gap_ms      REAL NOT NULL,
+    a_blocks    INTEGER NOT NULL,
+    both_blocks INTEGER NOT NULL,
+    PRIMARY KEY (from_gate, to_gate)
+);
+CREATE TABLE IF NOT EXISTS chain_tools (
+    from_gate TEXT NOT NULL,
+    to_gate   TEXT NOT NULL,
+    tool      TEXT NOT NULL,
+    count     INTEGER NOT NULL,
+    PRIMARY KEY (from_gate, to_gate, tool)
+);
+"""
+
+_STORE_TABLES = ("meta", "gate_groups", "gate_pairs", "gate_fires", "chains", "chain_tools")
+
+
+def _meta_get(conn: sqlite3.Connection, key: str, default: str = "") -> str:
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def _store_deltas(conn: sqlite3.Connection, agg: _CorrelationAggregates) -> None:
+    """Add an aggregator's counters (a delta over the stored totals) to the tables."""
+    conn.executemany(
+        "INSERT INTO gate_groups VALUES (?, ?) ON CONFLICT(gate) DO UPDATE SET "
+        "groups = groups + excluded.groups",
+        agg.groups.items(),
+    )
+    conn.executemany(
+        "INSERT INTO gate_pairs VALUES (?, ?, ?, ?) ON CONFLICT(gate_a, gate_b) DO UPDATE SET "
+        "cooc = cooc + excluded.cooc, agree = agree + excluded.agree",
+        [(a, b, n, agg.agree.get((a, b), 0)) for (a, b), n in agg.cooc.items()],
+    )
+    conn.executemany(
+        "INSERT INTO gate_fires VALUES (?, ?, ?, ?) ON CONFLICT(gate, tool) DO UPDATE SET "
+        "fires = fires + excluded.fires, blocks = blocks + excluded.blocks",
+        [(g, t, n, agg.blocks.get((g, t), 0)) for (g, t), n in agg.fires.items()],
+    )
+    conn.executemany(
+        "INSERT INTO chains VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(from_gate, to_gate) DO UPDATE SET "
+        "count = count + excluded.count, gap_ms = gap_ms + excluded.gap_ms, "
+        "a_blocks = a_blocks + excluded.a_blocks, both_blocks = both_blocks + excluded.both_blocks",
+        [(a, b, *stats) for (a, b), stats in agg.chains.items()],
+    )
+    conn.executemany(
+        "INSERT INTO chain_tools VALUES (?, ?, ?, ?) ON CONFLICT(from_gate, to_gate, tool) "
+        "DO UPDATE SET count = count + excluded.count",
+        [(a, b, t, n) for (a, b, t), n in agg.chain_tools.items()],
+    )
+
+
+def _sync_store(conn: sqlite3.Connection, source: str) -> None:
+    """Fold complete trail lines appended since the last sync (all lines the first time)."""
+    with open(source, "rb") as f:
+        st = os.fstat(f.fileno())
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            offset = int(_meta_get(conn, "offset", "0"))
+            head = f.read(min(offset, 256)).hex()
+            if (
+                str(st.st_ino) != _meta_get(conn, "inode")
+                or st.st_size < offset
+                or head != _meta_get(conn, "head")
+            ):
+                # New or rewritten trail: rebuild from scratch
+                for table in _STORE_TABLES:
+                    conn.execute(f"DELETE FROM {table}")
+                offset = 0
+            if st.st_size > offset:
+                agg = _CorrelationAggregates()
+                agg.restore(json.loads(_meta_get(conn, "pending", "{}")))
+                f.seek(offset)
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break  # line still being written; pick it up next sync
+                    offset += len(raw)
+                    entry = _parse_entry(raw)
+                    if entry is not None:
+                        agg.add(entry)
+                _store_deltas(conn, agg)
+                entries = int(_meta_get(conn, "entries", "0")) + agg.entries
+                conn.executemany(
+                    "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                    [("entries", str(entries)), ("pending", json.dumps(agg.pending()))],
+                )
+            f.seek(0)
+            head = f.read(min(offset, 256)).hex()
+            conn.executemany(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                [("offset", str(offset)), ("inode", str(st.st_ino)), ("head", head)],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def _load_store(conn: sqlite3.Connection) -> _CorrelationAggregates:
+    """Read stored totals back into an aggregator, counting the open tool call."""
+    agg = _CorrelationAggregates()
+    agg.entries = int(_meta_get(conn, "entries", "0"))
+    # rowid order is first-seen order, which the list functions use to break ties
+    for gate, n in conn.execute("SELECT gate, groups FROM gate_groups"):
+        agg.groups[gate] = n
+    for a, b, cooc, agree in conn.execute("SELECT * FROM gate_pairs ORDER BY rowid"):
+        agg.cooc[(a, b)] = cooc
+        agg.agree[(a, b)] = agree
+    for gate, tool, fires, blocks in conn.execute("SELECT * FROM gate_fires"):
+        agg.fires[(gate, tool)] = fires
+        agg.blocks[(gate, tool)] = blocks
+    for a, b, *stats in conn.execute("SELECT * FROM chains ORDER BY rowid"):
+        agg.chains[(a, b)] = stats
+    for a, b, tool, n in conn.execute("SELECT * FROM chain_tools ORDER BY rowid"):
+        agg.chain_tools[(a, b, tool)] = n
+    agg.restore(json.loads(_meta_get(conn, "pending", "{}")))
+    agg.close_group()
+    return agg
+
+
+def _store_aggregates(
+    source: Optional[str] = None, path: Optional[str] = None
+) -> Optional[_CorrelationAggregates]:
+    """Sync the store with the audit trail and return its totals.
+
+    Returns None when there is no trail to follow or the store cannot be
+    used; callers then fall back to scanning entries.
+    """
+    source = source or _AUDIT_TRAIL
+    if not os.path.isfile(source):
+        return None
+    try:
+        conn = sqlite3.connect(path or _STORE_PATH, timeout=10, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_STORE_SCHEMA)
+            _sync_store(conn, source)
+            return _load_store(conn)
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error, ValueError):
+        return None
+
+
 # ---------------------------------------------------------------------------
 # GateCorrelator: main public class
 # ---------------------------------------------------------------------------
@@ -683,13 +931,15 @@ def optimize_gate_order(
 class GateCorrelator:
     """Unified interface for gate correlation analysis.
 
-    Loads audit data once on construction (lazily, on first access).
+    Analyses are answered from the incremental store (synced with the audit
+    trail on first access). Without a trail, or once entries have been
+    loaded explicitly via load(), they are computed from the entry list.
     All analysis results are cached after first computation.
 
     Parameters
     ----------
     max_entries:
-        Maximum audit entries to load (default 50,000).
+        Maximum audit entries to load when scanning (default 50,000).
     """
 
     def __init__(self, max_entries: int = 50_000) -> None:
@@ -700,6 +950,7 @@ class GateCorrelator:
         self._chains: Optional[List[dict]] = None
         self._redundant: Optional[List[dict]] = None
         self._ordering: Optional[List[dict]] = None
+        self._aggregates: Optional[_CorrelationAggregates] = None
 
     def load(self) -> "GateCorrelator":
         """Eagerly load audit and effectiveness data from disk."""
@@ -718,8 +969,17 @@ class GateCorrelator:
     @property
     def effectiveness(self) -> Dict[str, Dict[str, int]]:
         if self._effectiveness is None:
-            self.load()
-        return self._effectiveness  # type: ignore[return-value]
+            self._effectiveness = _load_effectiveness()
+        return self._effectiveness
+
+    def _stats(self) -> _CorrelationAggregates:
+        """Aggregated counters from the store, or from a scan of self.entries."""
+        if self._aggregates is None:
+            if self._entries is None:
+                self._aggregates = _store_aggregates()
+            if self._aggregates is None:
+                self._aggregates = _aggregate(self.entries)
+        return self._aggregates
 
     def cooccurrence_matrix(self) -> Dict[Tuple[str, str], int]:
         """Return (cached) gate co-occurrence matrix.
@@ -729,7 +989,7 @@ class GateCorrelator:
             gates fired.  Keys are lexicographically sorted pairs.
         """
         if self._cooccurrence is None:
-            self._cooccurrence = build_cooccurrence_matrix(self.entries)
+            self._cooccurrence = dict(self._stats().cooc)
         return self._cooccurrence
 
     def gate_chains(
@@ -747,11 +1007,14 @@ class GateCorrelator:
             List of chain dicts sorted by count descending.
         """
         if self._chains is None:
-            self._chains = detect_gate_chains(
-                self.entries,
-                window_seconds=window_seconds,
-                min_count=min_count,
-            )
+            if window_seconds == self._stats().chain_window:
+                self._chains = _chain_rows(self._stats(), min_count)
+            else:
+                self._chains = detect_gate_chains(
+                    self.entries,
+                    window_seconds=window_seconds,
+                    min_count=min_count,
+                )
         return self._chains
 
     def redundant_gates(
@@ -769,10 +1032,8 @@ class GateCorrelator:
             List of redundancy dicts sorted by jaccard_similarity descending.
         """
         if self._redundant is None:
-            self._redundant = detect_redundant_gates(
-                self.entries,
-                min_cooccurrence=min_cooccurrence,
-                jaccard_threshold=jaccard_threshold,
+            self._redundant = _redundancy_rows(
+                self._stats(), min_cooccurrence, jaccard_threshold
             )
         return self._redundant
 
@@ -787,11 +1048,8 @@ class GateCorrelator:
             pinned, reason.
         """
         if self._ordering is None:
-            self._ordering = optimize_gate_order(
-                self.entries,
-                effectiveness_data=self.effectiveness,
-                target_tool=target_tool,
-            )
+            gate_fires, gate_blocks = self._stats().gate_counts(target_tool)
+            self._ordering = _ordering_rows(gate_fires, gate_blocks, self.effectiveness)
         return self._ordering
 
     def full_report(self, target_tool: Optional[str] = None) -> dict:
@@ -814,9 +1072,10 @@ class GateCorrelator:
         redundant = self.redundant_gates()
         ordering = self.optimize_gate_order(target_tool=target_tool)
         cooc_list = cooccurrence_summary(cooc)
+        analyzed = self._stats().entries
 
         lines = [
-            f"Gate Correlation Report  ({len(self.entries):,} audit entries)",
+            f"Gate Correlation Report  ({analyzed:,} audit entries)",
             "=" * 70,
         ]
 
@@ -863,7 +1122,7 @@ class GateCorrelator:
         lines.append("\n" + "=" * 70)
 
         return {
-            "entries_analyzed": len(self.entries),
+            "entries_analyzed": analyzed,
             "cooccurrence": cooc_list,
             "gate_chains": chains,
             "redundant_gates": redundant,
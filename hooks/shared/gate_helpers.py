@@ -17,6 +17,7 @@ Public API
   is_related_file(path_a, path_b)         -> bool
   safe_tool_input(tool_input)             -> dict
   extract_command(tool_input)             -> str
+  parsed_command(tool_input)              -> ParsedCommand
   is_edit_tool(tool_name)                 -> bool
   file_extension(file_path)               -> str
   elapsed_since(timestamp)                -> float
@@ -185,6 +186,20 @@ def extract_command(tool_input: dict) -> str:
     return cmd if isinstance(cmd, str) else ""
 
 
+def parsed_command(tool_input: dict):
+    """Structured form of a Bash tool_input's command (memoized, shared by gates).
+
+    Args:
+        tool_input: The tool_input dict.
+
+    Returns:
+        A shared.shell_command.ParsedCommand for the command string.
+    """
+    from shared.shell_command import parse_command
+
+    return parse_command(extract_command(tool_input))
+
+
 def is_edit_tool(tool_name: str) -> bool:
     """Check if the tool name is a file-editing tool.
 
@@ -377,6 +377,60 @@ def check_audit_health() -> dict:
 # Module-level cache for most recent full check (cleared by full_health_check)
 _last_report: dict = {}
 
+# Score per component status: ok=100, degraded=50, error=0
+_STATUS_SCORES = {"ok": 100, "degraded": 50, "error": 0}
+
+
+def score_components(components: dict) -> dict:
+    """Weight per-component results into the overall score and status.
+
+    Args:
+        components: {component_name: check result dict}; a missing
+            component counts as "error".
+
+    Returns:
+        {
+            "overall_score": 0-100,
+            "status": "healthy" | "degraded" | "critical",
+            "degraded_components": [...],
+            "fallback_suggestions": {...},
+        }
+    """
+    weighted_sum = 0
+    for comp, weight in _WEIGHTS.items():
+        comp_status = components.get(comp, {}).get("status", "error")
+        weighted_sum += _STATUS_SCORES.get(comp_status, 0) * weight
+
+    overall_score = weighted_sum // 100  # divide by sum-of-weights (100)
+
+    # Determine global status thresholds
+    if overall_score >= 80:
+        status = "healthy"
+    elif overall_score >= 40:
+        status = "degraded"
+    else:
+        status = "critical"
+
+    # Identify degraded/errored components
+    degraded = [
+        comp for comp in _WEIGHTS
+        if components.get(comp, {}).get("status", "error") in ("degraded", "error")
+    ]
+
+    # Build fallback suggestions for affected components
+    suggestions = {
+        comp: _FALLBACKS[comp]
+        for comp in degraded
+        if comp in _FALLBACKS
+    }
+
+    return {
+        "overall_score": overall_score,
+        "status": status,
+        "degraded_components": degraded,
+        "fallback_suggestions": suggestions,
+    }
+
 
 def full_health_check(session_id: str = "default") -> dict:
     """Run all component health checks and return a combined report.
@@ -425,64 +479,50 @@ def full_health_check(session_id: str = "default") -> dict:
         # Fallback to sequential on thread pool failure
         components = {name: fn() for name, fn in _check_fns.items()}
 
-    # Score each component: ok=100, degraded=50, error=0
-    _STATUS_SCORES = {"ok": 100, "degraded": 50, "error": 0}
-    weighted_sum = 0
-    for comp, weight in _WEIGHTS.items():
-        comp_status = components[comp].get("status", "error")
-        weighted_sum += _STATUS_SCORES.get(comp_status, 0) * weight
-
-    overall_score = weighted_sum // 100  # divide by sum-of-weights (100)
-
-    # Determine global status thresholds
-    if overall_score >= 80:
-        status = "healthy"
-    elif overall_score >= 40:
-        status = "degraded"
-    else:
-        status = "critical"
-
-    # Identify degraded/errored components
-    degraded = [
-        comp for comp in _WEIGHTS
-        if components[comp].get("status") in ("degraded", "error")
-    ]
-
-    # Build fallback suggestions for affected components
-    suggestions = {
-        comp: _FALLBACKS[comp]
-        for comp in degraded
-        if comp in _FALLBACKS
-    }
-
+    scored = score_components(components)
     duration_ms = round((time.monotonic() - t0) * 1000, 2)
 
     report = {
         "timestamp": time.time(),
         "session_id": session_id,
         "components": components,
-        "overall_score": overall_score,
-        "status": status,
-        "degraded_components": degraded,
-        "fallback_suggestions": suggestions,
+        **scored,
         "duration_ms": duration_ms,
     }
 
     _last_report = report
+
+    # A full check refreshes every component, so hand the results to the
+    # shared snapshot for consumers that only read it.
+    try:
+        from shared.health_snapshot import publish_results
+        publish_results(components, session_id)
+    except Exception:
+        pass  # Fail-open: publishing is best-effort
     return report
 
 
 def get_degraded_components() -> list:
     """Return the list of component names that are not in 'ok' state.
 
-    Uses the most recent full_health_check() result if available, otherwise
-    runs a fresh check with session_id="default".
+    Uses the most recent full_health_check() result if available, then the
+    published health snapshot, and only then runs a fresh check with
+    session_id="default".
 
     Returns:
         list of str, e.g. ["memory", "ramdisk"]
     """
     if _last_report:
         return list(_last_report.get("degraded_components", []))
+    try:
+        from shared.health_snapshot import read_snapshot, stale_components
+        snapshot = read_snapshot()
+        if snapshot.get("overall_score") is not None and not (
+            set(stale_components(snapshot)) & set(_WEIGHTS)
+        ):
+            return list(snapshot.get("degraded_components", []))
+    except Exception:
+        pass
     # No cached report — run a lightweight fresh check
     report = full_health_check("default")
     return list(report.get("degraded_components", []))
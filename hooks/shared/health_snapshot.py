@@ -0,0 +1,371 @@
+"""Cached framework health snapshot — shared/health_snapshot.py
+
+One producer keeps a compact health snapshot that every consumer reads,
+instead of each caller re-running the component checks (gate imports, a
+memory socket round trip, state parsing, ramdisk and audit probes).
+
+Each component is refreshed on its own cadence: when its result is older
+than its TTL, when a watched path changes (gate modules, the memory socket,
+the session state file, the audit directory), or when someone
+calls notify_change(). Every component entry records checked_at, so
+consumers can judge staleness themselves. The snapshot carries the weighted
+score from health_monitor.score_components() once all scored components
+have been checked. It is published with an atomic tmp-then-rename write to
+the state dir (tmpfs when the ramdisk is up).
+
+read_snapshot() never runs a check. It costs one stat() plus an in-process
+memo, so hook paths can ask for health as often as they like.
+get_snapshot() and refresh_snapshot() re-run only stale components and
+publish the result. full_health_check() publishes its fresh results, so an
+explicit full check also warms every reader.
+
+Snapshot layout:
+    {
+        "ts": <float>,                      # last publish
+        "overall_score": 0-100 | None,      # None until every scored component ran
+        "status": "healthy" | "degraded" | "critical" | "unknown",
+        "degraded_components": [...],
+        "fallback_suggestions": {...},
+        "components": {
+            "<name>": {"status", "checked_at", "ttl", "key", "sig", "dirty", "data"},
+        },
+    }
+
+Public API:
+    from shared.health_snapshot import (
+        read_snapshot, get_snapshot, refresh_snapshot, notify_change,
+        publish_results, stale_components, COMPONENT_GATE_PERF,
+    )
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from shared.health_monitor import (
+    COMPONENT_AUDIT,
+    COMPONENT_GATES,
+    COMPONENT_MEMORY,
+    COMPONENT_RAMDISK,
+    COMPONENT_STATE,
+    _WEIGHTS,
+    check_audit_health,
+    check_gates_health,
+    check_memory_health,
+    check_ramdisk_health,
+    check_state_health,
+    score_components,
+)
+
+_HOOKS_DIR = os.path.join(os.path.expanduser("~"), ".claude", "hooks")
+
+#: Gate performance summary (timings, SLA skips, circuit breakers) from gate_health.
+COMPONENT_GATE_PERF = "gate_perf"
+
+#: Seconds a component result stays fresh when nothing it watches changes.
+COMPONENT_TTLS: Dict[str, float] = {
+    COMPONENT_GATES: 600,
+    COMPONENT_MEMORY: 30,
+    COMPONENT_STATE: 15,
+    COMPONENT_RAMDISK: 60,
+    COMPONENT_AUDIT: 60,
+    COMPONENT_GATE_PERF: 60,
+}
+
+
+def _snapshot_path() -> str:
+    try:
+        from shared.ramdisk import get_state_dir
+        return os.path.join(get_state_dir(), ".health_snapshot.json")
+    except ImportError:
+        return os.path.join(_HOOKS_DIR, ".health_snapshot.json")
+
+
+SNAPSHOT_PATH = _snapshot_path()
+
+# In-process memo of the published file: {"sig": (ino, mtime_ns, size), "snapshot": dict}
+_memo: dict = {"sig": None, "snapshot": {}}
+_lock = threading.Lock()
+
+
+# ── Component plumbing ────────────────────────────────────────────────────────
+
+
+def _gate_perf_health() -> dict:
+    """Compact gate_health numbers (the full report keeps per-gate timings)."""
+    from shared.gate_health import get_gate_health_report
+
+    report = get_gate_health_report()
+    score = report.get("health_score", 0)
+    breakers = report.get("circuit_breakers", {})
+    return {
+        "health_score": score,
+        "gate_count": report.get("gate_count", 0),
+        "slow_gates": report.get("slow_gates", []),
+        "degraded_gates": report.get("degraded_gates", []),
+        "open_breakers": sorted(k for k, v in breakers.items() if v.get("state") == "OPEN"),
+        "status": "ok" if score >= 90 else "degraded" if score >= 50 else "error",
+    }
+
+
+def _ramdisk_usage() -> dict:
+    """Bytes on the tmpfs and audit bytes not yet mirrored to the disk backup."""
+    from shared.ramdisk import BACKUP_AUDIT_DIR, RAMDISK_DIR, TMPFS_AUDIT_DIR
+
+    used = 0
+    for dirpath, _dirnames, filenames in os.walk(RAMDISK_DIR):
+        for f in filenames:
+            try:
+                used += os.path.getsize(os.path.join(dirpath, f))
+            except OSError:
+                pass
+
+    def _dir_bytes(path: str, suffix: str = "") -> int:
+        total = 0
+        try:
+            names = os.listdir(path)
+        except OSError:
+            return 0
+        for f in names:
+            if f.endswith(suffix):
+                try:
+                    total += os.path.getsize(os.path.join(path, f))
+                except OSError:
+                    pass
+        return total
+
+    # Only .jsonl backups count (not .gz archives) for a fair comparison
+    lag = max(0, _dir_bytes(TMPFS_AUDIT_DIR) - _dir_bytes(BACKUP_AUDIT_DIR, ".jsonl"))
+    return {"used_bytes": used, "mirror_lag_bytes": lag}
+
+
+def _run_check(name: str, session_id: str) -> dict:
+    if name == COMPONENT_STATE:
+        return check_state_health(session_id)
+    if name == COMPONENT_RAMDISK:
+        data = check_ramdisk_health()
+        if data.get("ramdisk_available"):
+            data.update(_ramdisk_usage())
+        return data
+    return {
+        COMPONENT_GATES: check_gates_health,
+        COMPONENT_MEMORY: check_memory_health,
+        COMPONENT_AUDIT: check_audit_health,
+        COMPONENT_GATE_PERF: _gate_perf_health,
+    }[name]()
+
+
+def _watched_paths(name: str, session_id: str) -> List[str]:
+    """Paths whose mtime change makes a component's result stale early.
+
+    The ramdisk has none: its availability probe writes into RAMDISK_DIR,
+    so that directory's mtime moves on every process start.
+    """
+    try:
+        if name == COMPONENT_GATES:
+            return [os.path.join(_HOOKS_DIR, "gates")]
+        if name == COMPONENT_MEMORY:
+            from shared.memory_socket import SOCKET_PATH
+            return [SOCKET_PATH]
+        if name == COMPONENT_STATE:
+            from shared.state import state_file_for
+            return [state_file_for(session_id)]
+        if name == COMPONENT_AUDIT:
+            from shared.ramdisk import get_audit_dir
+            return [get_audit_dir()]
+    except (ImportError, OSError):
+        pass
+    return []
+
+
+def _signature(paths: Iterable[str]) -> list:
+    """[mtime_ns or None, ...]; a listing change bumps a directory's mtime."""
+    sig = []
+    for path in paths:
+        try:
+            sig.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            sig.append(None)
+    return sig
+
+
+def _key(name: str, session_id: str) -> str:
+    """Identity of a component result (state health is per session)."""
+    return session_id if name == COMPONENT_STATE else ""
+
+
+def _needs_refresh(name: str, entry: Optional[dict], session_id: str, now: float) -> bool:
+    if not isinstance(entry, dict) or entry.get("dirty"):
+        return True
+    if entry.get("key", "") != _key(name, session_id):
+        return True
+    if now - entry.get("checked_at", 0) >= entry.get("ttl", COMPONENT_TTLS.get(name, 0)):
+        return True
+    return entry.get("sig") != _signature(_watched_paths(name, session_id))
+
+
+def _entry(name: str, data: dict, session_id: str, checked_at: float) -> dict:
+    return {
+        "status": data.get("status", "error"),
+        "checked_at": checked_at,
+        "ttl": COMPONENT_TTLS.get(name, 60),
+        "key": _key(name, session_id),
+        "sig": _signature(_watched_paths(name, session_id)),
+        "dirty": False,
+        "data": data,
+    }
+
+
+# ── Publishing ────────────────────────────────────────────────────────────────
+
+
+def _finish(components: dict) -> dict:
+    """Assemble a snapshot, scoring it once every weighted component is present."""
+    snapshot = {"ts": time.time(), "components": components}
+    if all(comp in components for comp in _WEIGHTS):
+        snapshot.update(score_components({n: e["data"] for n, e in components.items()}))
+    else:
+        snapshot.update(
+            overall_score=None, status="unknown", degraded_components=[], fallback_suggestions={}
+        )
+    return snapshot
+
+
+def _publish(snapshot: dict) -> dict:
+    """Atomically replace the snapshot file and refresh the memo."""
+    path = SNAPSHOT_PATH
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp, path)
+        st = os.stat(path)
+        _memo["sig"] = (st.st_ino, st.st_mtime_ns, st.st_size)
+    except OSError:
+        _memo["sig"] = None  # not persisted; next read goes back to disk
+    _memo["snapshot"] = snapshot
+    return snapshot
+
+
+def read_snapshot() -> dict:
+    """Return the published snapshot without running any check ({} if none).
+
+    One stat(); the file is only parsed again after another process
+    publishes. Treat the result as read-only.
+    """
+    try:
+        st = os.stat(SNAPSHOT_PATH)
+    except OSError:
+        return {}
+    sig = (st.st_ino, st.st_mtime_ns, st.st_size)
+    if _memo["sig"] != sig:
+        try:
+            with open(SNAPSHOT_PATH) as f:
+                snapshot = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        _memo["snapshot"] = snapshot if isinstance(snapshot, dict) else {}
+        _memo["sig"] = sig
+    return _memo["snapshot"]
+
+
+def stale_components(snapshot: dict, now: Optional[float] = None) -> List[str]:
+    """Components missing from snapshot, marked dirty, or older than their TTL."""
+    now = time.time() if now is None else now
+    components = snapshot.get("components", {})
+    stale = []
+    for name, ttl in COMPONENT_TTLS.items():
+        entry = components.get(name)
+        if (
+            not isinstance(entry, dict)
+            or entry.get("dirty")
+            or now - entry.get("checked_at", 0) >= entry.get("ttl", ttl)
+        ):
+            stale.append(name)
+    return stale
+
+
+def refresh_snapshot(
+    session_id: str = "default",
+    components: Optional[Iterable[str]] = None,
+    force: bool = False,
+) -> dict:
+    """Re-run the stale components (all of `components` if force) and publish.
+
+    Args:
+        session_id: Session whose state file the state component checks.
+        components: Restrict to these component names (default: all).
+        force:      Re-run them even if still fresh.
+
+    Returns:
+        The current snapshot; unchanged (and not rewritten) if nothing was stale.
+    """
+    wanted = list(components) if components is not None else list(COMPONENT_TTLS)
+    with _lock:
+        current = dict(read_snapshot().get("components", {}))
+        now = time.time()
+        stale = [
+            name for name in wanted
+            if name in COMPONENT_TTLS
+            and (force or _needs_refresh(name, current.get(name), session_id, now))
+        ]
+        if not stale:
+            return read_snapshot()
+
+        results: Dict[str, dict] = {}
+        if len(stale) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=len(stale)) as executor:
+                futures = {n: executor.submit(_run_check, n, session_id) for n in stale}
+                for name, future in futures.items():
+                    try:
+                        results[name] = future.result(timeout=5)
+                    except Exception as exc:
+                        results[name] = {"status": "error", "error": str(exc)}
+        else:
+            try:
+                results[stale[0]] = _run_check(stale[0], session_id)
+            except Exception as exc:
+                results[stale[0]] = {"status": "error", "error": str(exc)}
+
+        # Re-read: another process may have published while the checks ran
+        merged = dict(read_snapshot().get("components", {}))
+        for name, data in results.items():
+            merged[name] = _entry(name, data, session_id, now)
+        return _publish(_finish(merged))
+
+
+def get_snapshot(session_id: str = "default") -> dict:
+    """Snapshot with every component fresh (re-runs only the stale ones)."""
+    return refresh_snapshot(session_id)
+
+
+def publish_results(results: Dict[str, dict], session_id: str = "default") -> dict:
+    """Fold freshly computed component results (e.g. from full_health_check) in."""
+    now = time.time()
+    with _lock:
+        merged = dict(read_snapshot().get("components", {}))
+        for name, data in results.items():
+            if name in COMPONENT_TTLS and isinstance(data, dict):
+                merged[name] = _entry(name, data, session_id, now)
+        return _publish(_finish(merged))
+
+
+def notify_change(*components: str) -> None:
+    """Mark components stale so the next refresh re-runs them (fail-open)."""
+    try:
+        with _lock:
+            snapshot = read_snapshot()
+            current = snapshot.get("components", {})
+            marked = {
+                name: dict(current[name], dirty=True)
+                for name in components
+                if isinstance(current.get(name), dict) and not current[name].get("dirty")
+            }
+            if marked:
+                _publish(_finish(dict(current, **marked)))
+    except Exception:
+        pass
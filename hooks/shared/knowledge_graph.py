@@ -3,6 +3,17 @@
 SQLite-backed graph storing entities and edges with Hebbian co-retrieval
 strengthening and spreading activation for enriched search.
 
+Edge strength decays lazily: the stored strength is the value at
+``last_activated`` and readers apply the half-life at read time, so no pass
+rewrites the edge table. Each edge also stores ``expires_at`` (when it decays
+below the prune threshold) so decay_edges() deletes only dying edges via an
+index range scan.
+
+Neighbor lookups go through an in-process adjacency cache. Writes made
+through this class evict the touched nodes and bump ``edge_version``; writes
+made by anything else (raw SQL on the connection, other processes) are
+detected via total_changes / PRAGMA data_version and clear the cache.
+
 Public API:
     from shared.knowledge_graph import KnowledgeGraph
 """
@@ -10,21 +21,79 @@ Public API:
 import math
 import os
 import sqlite3
+import time
+from collections import OrderedDict
 from itertools import combinations
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 _DEFAULT_DB_PATH = os.path.expanduser("~/data/memory/knowledge_graph.db")
+_DEFAULT_HALF_LIFE_HOURS = 168.0
+_PRUNE_THRESHOLD = 0.05
+_ADJ_CACHE_MAX = 20000  # cached adjacency lists (nodes)
+_IN_CHUNK = 400  # nodes per IN (...) query, below SQLite's variable limit
+
+
+def _decayed(strength, last_activated, now, half_life_hours):
+    """Strength after lazy exponential decay since last_activated."""
+    if strength is None:
+        return 0.0
+    age_hours = max(0.0, (now - float(last_activated or now)) / 3600)
+    return strength * math.pow(0.5, age_hours / half_life_hours)
+
+
+def _expiry(strength, last_activated, half_life_hours):
+    """Epoch seconds at which strength decays below the prune threshold."""
+    last = float(last_activated or 0.0)
+    if strength is None or strength <= _PRUNE_THRESHOLD:
+        return last
+    return last + half_life_hours * 3600 * math.log2(strength / _PRUNE_THRESHOLD)
+
+
+def _effective_weight(strength, pmi, co_count):
+    """PMI-weighted edge weight (raw strength for legacy edges)."""
+    co_count = co_count or 0
+    if co_count == 0 or pmi is None:
+        # Legacy edge (no PMI data yet) — use raw strength as fallback
+        return strength
+    if pmi > 0.0:
+        # PMI-weighted: clamp with tanh to keep effective in [0, strength]
+        return strength * math.tanh(pmi / 2.0)
+    # pmi <= 0.0: at-chance or anti-correlated — block this path
+    return 0.0
 
 
 class KnowledgeGraph:
     """SQLite-backed knowledge graph with Hebbian learning."""
 
-    def __init__(self, db_path: str = _DEFAULT_DB_PATH):
+    def __init__(
+        self,
+        db_path: str = _DEFAULT_DB_PATH,
+        half_life_hours: float = _DEFAULT_HALF_LIFE_HOURS,
+    ):
         if db_path != ":memory:":
             os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.half_life_hours = half_life_hours
         self._conn = sqlite3.connect(db_path)
         self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.create_function(
+            "kg_decay",
+            3,
+            lambda s, last, now: _decayed(s, last, now, self.half_life_hours),
+            deterministic=True,
+        )
+        self._conn.create_function(
+            "kg_expiry",
+            2,
+            lambda s, last: _expiry(s, last, self.half_life_hours),
+            deterministic=True,
+        )
         self._create_tables()
+        # Adjacency cache: node -> [(neighbor, strength, last_activated, pmi, co)]
+        self._adj: "OrderedDict[str, list]" = OrderedDict()
+        self._inactive = set()  # entities with salience <= 0 (hidden neighbors)
+        self.edge_version = 0
+        self._reload_inactive()
+        self._sync_change_markers()
 
     def _create_tables(self):
         self._conn.executescript("""
@@ -60,6 +129,63 @@ class KnowledgeGraph:
                 self._conn.commit()
             except Exception:
                 pass  # Column already exists
+        # Migration: expires_at for index-driven pruning under lazy decay
+        try:
+            self._conn.execute("ALTER TABLE edges ADD COLUMN expires_at REAL")
+        except Exception:
+            pass  # Column already exists
+        # Rows from before lazy decay had their strength decayed in place
+        # without moving last_activated, so the stored value is current:
+        # restart the decay clock now instead of decaying them again.
+        now = time.time()
+        self._conn.execute(
+            "UPDATE edges SET last_activated = ?, expires_at = kg_expiry(strength, ?) "
+            "WHERE expires_at IS NULL",
+            (now, now),
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_edges_expires ON edges(expires_at)"
+        )
+        self._conn.commit()
+
+    # --- Adjacency cache bookkeeping ---
+
+    def _data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _sync_change_markers(self):
+        self._seen_changes = self._conn.total_changes
+        self._seen_data_version = self._data_version()
+
+    def _reload_inactive(self):
+        self._inactive = {
+            r[0]
+            for r in self._conn.execute("SELECT name FROM entities WHERE salience <= 0")
+        }
+
+    def _check_external_writes(self):
+        """Drop cached state if the DB changed behind this object's back."""
+        if (
+            self._conn.total_changes != self._seen_changes
+            or self._data_version() != self._seen_data_version
+        ):
+            self._adj.clear()
+            self._reload_inactive()
+            self.edge_version += 1
+            self._sync_change_markers()
+
+    def _edges_written(self, nodes: Optional[Iterable[str]] = None):
+        """Record an edge write: evict touched nodes (None = everything)."""
+        if nodes is None:
+            self._adj.clear()
+        else:
+            for n in nodes:
+                self._adj.pop(n, None)
+        self.edge_version += 1
+        self._seen_changes = self._conn.total_changes
+
+    def _entities_written(self):
+        self._seen_changes = self._conn.total_changes
 
     # --- Entity operations ---
 
@@ -67,6 +193,7 @@ class KnowledgeGraph:
         self, name: str, entity_type: str = "Concept", salience: float = 0.5
     ):
         """Insert or update an entity, incrementing mention count."""
+        self._check_external_writes()
         self._conn.execute(
             """
             INSERT INTO entities (name, type, salience, mention_count)
@@ -79,6 +206,9 @@ class KnowledgeGraph:
             (name, entity_type, salience, salience),
         )
         self._conn.commit()
+        if salience > 0:
+            self._inactive.discard(name)
+        self._entities_written()
 
     def entity_count(self) -> int:
         row = self._conn.execute("SELECT COUNT(*) FROM entities").fetchone()
@@ -115,12 +245,13 @@ class KnowledgeGraph:
             f"FROM edges WHERE from_id IN ({placeholders}) OR to_id IN ({placeholders})",
             list(entity_ids) + list(entity_ids),
         ).fetchall()
+        now = time.time()
         return [
             {
                 "from_id": r[0],
                 "to_id": r[1],
                 "relation_type": r[2],
-                "strength": r[3],
+                "strength": _decayed(r[3], r[8], now, self.half_life_hours),
                 "activation_count": r[4],
                 "co_occurrence_count": r[5],
                 "pmi": r[6],
@@ -139,41 +270,61 @@ class KnowledgeGraph:
         relation_type: str = "co_occurs",
         strength: float = 0.1,
     ):
-        """Create or strengthen an edge between two entities."""
+        """Create or strengthen an edge between two entities.
+
+        Strengthening starts from the decayed strength, then restarts decay.
+        """
+        self._check_external_writes()
+        now = time.time()
         self._conn.execute(
             """
-            INSERT INTO edges (from_id, to_id, relation_type, strength, activation_count, co_occurrence_count)
-            VALUES (?, ?, ?, ?, 1, 1)
+            INSERT INTO edges (from_id, to_id, relation_type, strength, activation_count,
+                               co_occurrence_count, last_activated, expires_at)
+            VALUES (?1, ?2, ?3, ?4, 1, 1, ?5, kg_expiry(?4, ?5))
             ON CONFLICT(from_id, to_id, relation_type) DO UPDATE SET
-                strength = MIN(1.0, strength + ? * (1.0 - strength)),
+                strength = MIN(1.0, kg_decay(strength, last_activated, ?5)
+                    + ?4 * (1.0 - kg_decay(strength, last_activated, ?5))),
                 activation_count = activation_count + 1,
                 co_occurrence_count = co_occurrence_count + 1,
-                last_activated = strftime('%s','now')
+                last_activated = ?5
         """,
-            (from_name, to_name, relation_type, strength, strength),
+            (from_name, to_name, relation_type, strength, now),
         )
+        self._refresh_expiry([(from_name, to_name, relation_type)])
         self._conn.commit()
+        self._edges_written((from_name, to_name))
+
+    def _refresh_expiry(self, keys):
+        self._conn.executemany(
+            "UPDATE edges SET expires_at = kg_expiry(strength, last_activated) "
+            "WHERE from_id=? AND to_id=? AND relation_type=?",
+            keys,
+        )
 
     def get_edge_strength(
         self, from_id: str, to_id: str, relation_type: Optional[str] = None
     ) -> float:
-        """Get edge strength between two nodes. Checks both directions."""
+        """Get (decayed) edge strength between two nodes. Checks both directions."""
+        now = time.time()
         if relation_type:
             row = self._conn.execute(
-                "SELECT strength FROM edges WHERE from_id=? AND to_id=? AND relation_type=?",
-                (from_id, to_id, relation_type),
+                "SELECT kg_decay(strength, last_activated, ?) FROM edges "
+                "WHERE from_id=? AND to_id=? AND relation_type=?",
+                (now, from_id, to_id, relation_type),
             ).fetchone()
             if row:
                 return row[0]
             row = self._conn.execute(
-                "SELECT strength FROM edges WHERE from_id=? AND to_id=? AND relation_type=?",
-                (to_id, from_id, relation_type),
+                "SELECT kg_decay(strength, last_activated, ?) FROM edges "
+                "WHERE from_id=? AND to_id=? AND relation_type=?",
+                (now, to_id, from_id, relation_type),
             ).fetchone()
             return row[0] if row else 0.0
         else:
             row = self._conn.execute(
-                "SELECT MAX(strength) FROM edges WHERE (from_id=? AND to_id=?) OR (from_id=? AND to_id=?)",
-                (from_id, to_id, to_id, from_id),
+                "SELECT MAX(kg_decay(strength, last_activated, ?)) FROM edges "
+                "WHERE (from_id=? AND to_id=?) OR (from_id=? AND to_id=?)",
+                (now, from_id, to_id, to_id, from_id),
             ).fetchone()
             return row[0] if row and row[0] is not None else 0.0
 
@@ -193,6 +344,7 @@ class KnowledgeGraph:
         """
         if total_memories < 2:
             return
+        self._check_external_writes()
         try:
             row = self._conn.execute(
                 "SELECT co_occurrence_count FROM edges WHERE from_id=? AND to_id=? AND relation_type=?",
@@ -217,6 +369,7 @@ class KnowledgeGraph:
                 (pmi, from_name, to_name, relation_type),
             )
             self._conn.commit()
+            self._edges_written((from_name, to_name))
         except Exception:
             pass  # PMI computation failure is non-fatal
 
@@ -224,20 +377,28 @@ class KnowledgeGraph:
         """Hebbian: strengthen edges between all pairs of co-retrieved memories."""
         if len(memory_ids) < 2:
             return
+        self._check_external_writes()
+        now = time.time()
+        keys = []
         for a, b in combinations(memory_ids, 2):
             canonical = (min(a, b), max(a, b))
             self._conn.execute(
                 """
-                INSERT INTO edges (from_id, to_id, relation_type, strength, activation_count)
-                VALUES (?, ?, 'co_retrieved', 0.1, 1)
+                INSERT INTO edges (from_id, to_id, relation_type, strength, activation_count,
+                                   last_activated, expires_at)
+                VALUES (?1, ?2, 'co_retrieved', 0.1, 1, ?3, kg_expiry(0.1, ?3))
                 ON CONFLICT(from_id, to_id, relation_type) DO UPDATE SET
-                    strength = MIN(1.0, strength + 0.1 * (1.0 - strength)),
+                    strength = MIN(1.0, kg_decay(strength, last_activated, ?3)
+                        + 0.1 * (1.0 - kg_decay(strength, last_activated, ?3))),
                     activation_count = activation_count + 1,
-                    last_activated = strftime('%s','now')
+                    last_activated = ?3
             """,
-                canonical,
+                (*canonical, now),
             )
+            keys.append((*canonical, "co_retrieved"))
+        self._refresh_expiry(keys)
         self._conn.commit()
+        self._edges_written(memory_ids)
 
     # --- Memory link traversal (A-Mem interconnected network) ---
 
@@ -264,13 +425,14 @@ class KnowledgeGraph:
                 continue
 
             # Fetch neighbors via linked_memory edges (both directions)
+            now = time.time()
             rows = self._conn.execute(
-                "SELECT to_id, strength FROM edges "
+                "SELECT to_id, kg_decay(strength, last_activated, ?) FROM edges "
                 "WHERE from_id=? AND relation_type=? AND strength > 0 "
                 "UNION "
-                "SELECT from_id, strength FROM edges "
+                "SELECT from_id, kg_decay(strength, last_activated, ?) FROM edges "
                 "WHERE to_id=? AND relation_type=? AND strength > 0",
-                (node, relation_type, node, relation_type),
+                (now, node, relation_type, now, node, relation_type),
             ).fetchall()
 
             for neighbor_id, edge_strength in rows:
@@ -293,6 +455,7 @@ class KnowledgeGraph:
 
     def transfer_edges(self, from_entity: str, to_entity: str):
         """Transfer all edges from one entity to another (for dedup merge)."""
+        self._check_external_writes()
         # Repoint edges where from_entity is the source
         self._conn.execute(
             "UPDATE OR IGNORE edges SET from_id=? WHERE from_id=?",
@@ -307,20 +470,27 @@ class KnowledgeGraph:
             "DELETE FROM edges WHERE from_id=? OR to_id=?", (from_entity, from_entity)
         )
         self._conn.commit()
+        self._edges_written()  # every neighbor's list changed
 
     def remove_entity_edges(self, entity_name: str):
         """Remove all edges to/from an entity."""
+        self._check_external_writes()
         self._conn.execute(
             "DELETE FROM edges WHERE from_id=? OR to_id=?", (entity_name, entity_name)
         )
         self._conn.commit()
+        self._edges_written()
 
     def deactivate_entity(self, entity_name: str):
         """Set entity salience to 0 (soft delete for quarantine)."""
-        self._conn.execute(
+        self._check_external_writes()
+        cur = self._conn.execute(
             "UPDATE entities SET salience=0.0 WHERE name=?", (entity_name,)
         )
         self._conn.commit()
+        if cur.rowcount:
+            self._inactive.add(entity_name)
+        self._entities_written()
 
     # --- Spreading activation ---
 
@@ -407,110 +577,100 @@ class KnowledgeGraph:
         results.sort(key=lambda x: x["activation"], reverse=True)
         return results
 
-    def _get_neighbors(self, node: str) -> List[Tuple[str, float]]:
-        """Get all neighbors with effective edge weights (PMI-weighted or raw fallback).
-        Filters out deactivated entities (salience=0)."""
-        rows = self._conn.execute(
-            "SELECT e.to_id, e.strength, e.pmi, e.co_occurrence_count FROM edges e "
-            "LEFT JOIN entities ent ON ent.name = e.to_id "
-            "WHERE e.from_id=? AND e.strength > 0 AND COALESCE(ent.salience, 0.5) > 0 "
-            "UNION "
-            "SELECT e.from_id, e.strength, e.pmi, e.co_occurrence_count FROM edges e "
-            "LEFT JOIN entities ent ON ent.name = e.from_id "
-            "WHERE e.to_id=? AND e.strength > 0 AND COALESCE(ent.salience, 0.5) > 0",
-            (node, node),
-        ).fetchall()
-        result = []
-        for neighbor_name, strength, pmi, co_count in rows:
-            co_count = co_count or 0
-            if co_count == 0 or pmi is None:
-                # Legacy edge (no PMI data yet) — use raw strength as fallback
-                effective = strength
-            elif pmi > 0.0:
-                # PMI-weighted: clamp with tanh to keep effective in [0, strength]
-                effective = strength * math.tanh(pmi / 2.0)
-            else:
-                # pmi <= 0.0: at-chance or anti-correlated — block this path
-                effective = 0.0
-            result.append((neighbor_name, effective))
-        return result
+    def get_neighbors_many(
+        self, nodes: Iterable[str]
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """Neighbors with effective (decayed, PMI-weighted) weights for many nodes.
 
-    def _get_neighbors_batch(self, nodes):
-        """Batch neighbor lookup for multiple nodes. More efficient than per-node queries."""
+        Served from the adjacency cache; nodes not cached are fetched with one
+        IN (...) query per _IN_CHUNK nodes. Deactivated entities (salience=0)
+        are filtered out.
+        """
+        nodes = list(dict.fromkeys(n for n in nodes if n))
         if not nodes:
             return {}
+        self._check_external_writes()
+        missing = [n for n in nodes if n not in self._adj]
+        for i in range(0, len(missing), _IN_CHUNK):
+            self._fill_adjacency(missing[i : i + _IN_CHUNK])
+
+        now = time.time()
+        hl = self.half_life_hours
+        inactive = self._inactive
+        result = {}
+        for n in nodes:
+            rows = self._adj.get(n, [])
+            self._adj.move_to_end(n)
+            result[n] = [
+                (
+                    neighbor,
+                    _effective_weight(_decayed(strength, last, now, hl), pmi, co),
+                )
+                for neighbor, strength, last, pmi, co in rows
+                if neighbor not in inactive
+            ]
+        return result
+
+    def _fill_adjacency(self, nodes: List[str]):
         placeholders = ",".join("?" for _ in nodes)
         rows = self._conn.execute(
-            f"SELECT e.from_id, e.to_id, e.strength, e.pmi, e.co_occurrence_count FROM edges e "
-            f"LEFT JOIN entities ent ON ent.name = e.to_id "
-            f"WHERE e.from_id IN ({placeholders}) AND e.strength > 0 AND COALESCE(ent.salience, 0.5) > 0 "
+            f"SELECT from_id, to_id, strength, last_activated, pmi, co_occurrence_count "
+            f"FROM edges WHERE from_id IN ({placeholders}) AND strength > 0 "
             f"UNION "
-            f"SELECT e.to_id, e.from_id, e.strength, e.pmi, e.co_occurrence_count FROM edges e "
-            f"LEFT JOIN entities ent ON ent.name = e.from_id "
-            f"WHERE e.to_id IN ({placeholders}) AND e.strength > 0 AND COALESCE(ent.salience, 0.5) > 0",
-            list(nodes) + list(nodes),
+            f"SELECT to_id, from_id, strength, last_activated, pmi, co_occurrence_count "
+            f"FROM edges WHERE to_id IN ({placeholders}) AND strength > 0",
+            nodes + nodes,
         ).fetchall()
-        result = {n: [] for n in nodes}
-        for source, neighbor, strength, pmi, co_count in rows:
-            co_count = co_count or 0
-            if co_count == 0 or pmi is None:
-                effective = strength
-            elif pmi > 0.0:
-                effective = strength * math.tanh(pmi / 2.0)
-            else:
-                effective = 0.0
-            if source in result:
-                result[source].append((neighbor, effective))
-        return result
-
-    # --- Edge decay and pattern detection ---
+        fresh = {n: [] for n in nodes}
+        for source, neighbor, strength, last, pmi, co in rows:
+            if source in fresh:
+                fresh[source].append((neighbor, strength, last, pmi, co))
+        self._adj.update(fresh)
+        while len(self._adj) > _ADJ_CACHE_MAX:
+            self._adj.popitem(last=False)
 
-    def decay_edges(self, half_life_hours: float = 168.0) -> Dict:
-        """Apply time-based decay to all edges. Prune edges below 0.05.
+    def _get_neighbors(self, node: str) -> List[Tuple[str, float]]:
+        """Get all neighbors with effective edge weights (PMI-weighted or raw fallback).
+        Filters out deactivated entities (salience=0)."""
+        return self.get_neighbors_many([node]).get(node, [])
 
-        Uses SQL for bulk computation where possible.
-        Returns dict with 'decayed' and 'pruned' counts.
-        """
-        import time as _time
+    def _get_neighbors_batch(self, nodes):
+        """Batch neighbor lookup for multiple nodes (see get_neighbors_many)."""
+        return self.get_neighbors_many(nodes)
 
-        now = _time.time()
-        # Compute decay factor threshold: what age makes strength * factor < 0.05?
-        # For very old edges, prune directly via SQL
-        max_age_hours = half_life_hours * math.log2(1.0 / 0.05)  # ~4.3 half-lives
-        max_age_secs = max_age_hours * 3600
+    # --- Edge decay and pattern detection ---
 
-        # Prune edges older than max_age (they'd all decay below 0.05 anyway)
-        pruned = self._conn.execute(
-            "DELETE FROM edges WHERE (? - last_activated) > ?",
-            (now, max_age_secs),
-        ).rowcount
+    def decay_edges(self, half_life_hours: Optional[float] = None) -> Dict:
+        """Prune edges whose decayed strength has fallen below 0.05.
 
-        # Decay remaining edges in-memory (only those that survive the prune)
-        rows = self._conn.execute(
-            "SELECT from_id, to_id, relation_type, strength, last_activated FROM edges"
-        ).fetchall()
-        to_prune = []
-        to_update = []
-        for from_id, to_id, rel, strength, last_act in rows:
-            hours_since = max(0, (now - float(last_act)) / 3600)
-            factor = math.pow(0.5, hours_since / half_life_hours)
-            new_strength = strength * factor
-            if new_strength < 0.05:
-                to_prune.append((from_id, to_id, rel))
-            else:
-                to_update.append((new_strength, from_id, to_id, rel))
-        if to_prune:
-            self._conn.executemany(
-                "DELETE FROM edges WHERE from_id=? AND to_id=? AND relation_type=?",
-                to_prune,
-            )
-        if to_update:
-            self._conn.executemany(
-                "UPDATE edges SET strength=? WHERE from_id=? AND to_id=? AND relation_type=?",
-                to_update,
+        Decay itself is applied lazily at read time, so this only deletes
+        dying edges, found through the expires_at index. A half_life_hours
+        different from the graph's own falls back to a full scan.
+        Returns dict with 'decayed' (live edges under lazy decay) and
+        'pruned' counts.
+        """
+        self._check_external_writes()
+        now = time.time()
+        if half_life_hours is None or half_life_hours == self.half_life_hours:
+            pruned = self._conn.execute(
+                "DELETE FROM edges WHERE expires_at <= ?", (now,)
+            ).rowcount
+        else:
+            hl = half_life_hours
+            self._conn.create_function(
+                "kg_decay_hl",
+                3,
+                lambda s, last, t: _decayed(s, last, t, hl),
+                deterministic=True,
             )
+            pruned = self._conn.execute(
+                "DELETE FROM edges WHERE kg_decay_hl(strength, last_activated, ?) < ?",
+                (now, _PRUNE_THRESHOLD),
+            ).rowcount
         self._conn.commit()
-        return {"decayed": len(to_update), "pruned": pruned + len(to_prune)}
+        if pruned:
+            self._edges_written()
+        return {"decayed": self.edge_count(), "pruned": pruned}
 
     def get_high_activation_clusters(self, min_activation: int = 5) -> List[set]:
         """Find connected components of edges with activation_count >= threshold.
@@ -553,12 +713,31 @@ class KnowledgeGraph:
 
     def boost_entity_salience(self, names: List[str], delta: float = 0.1):
         """Boost salience for a list of entity names."""
+        self._check_external_writes()
         for name in names:
             self._conn.execute(
                 "UPDATE entities SET salience = MIN(1.0, salience + ?) WHERE name=?",
                 (delta, name),
             )
         self._conn.commit()
+        self._refresh_inactive(names)
+        self._entities_written()
+
+    def _refresh_inactive(self, names):
+        names = list(names)
+        if not names:
+            return
+        placeholders = ",".join("?" for _ in names)
+        dead = {
+            r[0]
+            for r in self._conn.execute(
+                f"SELECT name FROM entities WHERE name IN ({placeholders}) "
+                f"AND salience <= 0",
+                names,
+            )
+        }
+        self._inactive.difference_update(names)
+        self._inactive.update(dead)
 
     def normalize_entity_name(self, name: str) -> str:
         """Normalize entity name for consistent matching.
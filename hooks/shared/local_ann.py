@@ -0,0 +1,569 @@
+"""Local ANN Index — in-process IVF fast path beside SurrealDB HNSW.
+
+Every SurrealCollection.query() used to ship a 4096-float vector over the
+ws:// connection and wait for SurrealDB's KNN. Dedup checks, action patterns,
+counterfactual and decomposed sub-queries each paid that round-trip.
+
+LocalANNIndex keeps a copy of a table's vectors in a memory-mapped float16
+file plus ids, documents and metadata in process, and answers top-k and
+``where``-filtered queries locally:
+
+- Below ``train_threshold`` rows it is an exact flat scan.
+- Above it, a spherical k-means IVF (sqrt(n) lists) probes ``nprobe`` lists
+  and reranks candidates exactly in float32. Whenever the row count doubles,
+  the lists are retrained on a background thread and swapped in (and
+  persisted) when done; writes and searches are not held up meanwhile. Filtered queries that do not
+  fill k from the probed lists fall back to an exact scan over matching rows.
+
+SurrealDB remains the source of truth. The owning SurrealCollection mirrors
+upsert/update/delete into the index and records the table's write stamp on
+it; ``build_from_collection`` rebuilds the index from the database whenever
+the persisted copy's stamp disagrees or a mirrored write fails.
+
+Public API:
+    from shared.local_ann import LocalANNIndex, match_where
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_NPROBE = 8
+TRAIN_THRESHOLD = 1024  # rows before switching from flat scan to IVF
+KMEANS_ITERATIONS = 8
+_STATE_FILE = "state.json"
+_VECTORS_FILE = "vectors.f16"
+_CENTROIDS_FILE = "centroids.npy"
+_UNCLEAN_FILE = "unclean"  # present while in-memory state is ahead of disk
+
+_OPS = {
+    "$lt": lambda a, b: a < b,
+    "$lte": lambda a, b: a <= b,
+    "$gt": lambda a, b: a > b,
+    "$gte": lambda a, b: a >= b,
+    "$eq": lambda a, b: a == b,
+    "$ne": lambda a, b: a != b,
+}
+
+
+def match_where(meta: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a ChromaDB-style where dict against one metadata dict.
+
+    Mirrors SurrealCollection._translate_where: ``$and``/``$or`` lists,
+    per-field operator dicts ($lt, $lte, $gt, $gte, $eq, $ne) and plain
+    equality. Incomparable types never match.
+    """
+    if not where:
+        return True
+    for key, val in where.items():
+        if key == "$and":
+            if not all(match_where(meta, sub) for sub in val):
+                return False
+        elif key == "$or":
+            subs = [sub for sub in val if sub]
+            if subs and not any(match_where(meta, sub) for sub in subs):
+                return False
+        elif isinstance(val, dict):
+            field = meta.get(key)
+            for op, fn in _OPS.items():
+                if op not in val:
+                    continue
+                try:
+                    if field is None or not fn(field, val[op]):
+                        return False
+                except TypeError:
+                    return False
+        elif meta.get(key) != val:
+            return False
+    return True
+
+
+def _unit_rows(mat: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms < 1e-10] = 1.0
+    return mat / norms
+
+
+class LocalANNIndex:
+    """Memory-mapped float16 vector index with optional IVF partitioning."""
+
+    def __init__(
+        self,
+        directory: str,
+        dim: int = 4096,
+        nprobe: int = DEFAULT_NPROBE,
+        train_threshold: int = TRAIN_THRESHOLD,
+    ):
+        self.directory = directory
+        self.dim = dim
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self._lock = threading.RLock()
+        self._ids: List[Optional[str]] = []  # slot -> id (None = free)
+        self._docs: List[str] = []
+        self._metas: List[Dict[str, Any]] = []
+        self._slot_of: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._vectors: Optional[np.memmap] = None
+        self._capacity = 0
+        self._centroids: Optional[np.ndarray] = None
+        self._assign = np.zeros(0, dtype=np.int32)  # slot -> list (-1 = none)
+        self._lists: Dict[int, set] = {}
+        self._trained_at = 0
+        self._train_gen = 0  # bumped per train(); a stale train does not swap in
+        self._train_touched: Optional[set] = None  # slots written during train()
+        self._train_thread: Optional[threading.Thread] = None
+        self._epoch = 0  # bumped by _reset() so a train over old data is dropped
+        self._building = False
+        self._touched: set = set()  # ids written while a rebuild is running
+        self._dirty = False
+        self.stamp: Optional[str] = None  # table write stamp the index reflects
+        self.ready = False
+        os.makedirs(directory, exist_ok=True)
+
+    # ── Storage ───────────────────────────────────────────────────────────
+
+    @property
+    def _vec_path(self):
+        return os.path.join(self.directory, _VECTORS_FILE)
+
+    def _ensure_capacity(self, needed: int) -> None:
+        if needed <= self._capacity:
+            return
+        new_cap = max(1024, self._capacity * 2, needed)
+        if self._vectors is not None:
+            self._vectors.flush()
+            del self._vectors
+        with open(self._vec_path, "ab") as f:
+            f.truncate(new_cap * self.dim * 2)
+        self._vectors = np.memmap(
+            self._vec_path, dtype=np.float16, mode="r+", shape=(new_cap, self.dim)
+        )
+        self._assign = np.concatenate(
+            [self._assign, np.full(new_cap - self._capacity, -1, dtype=np.int32)]
+        )
+        self._capacity = new_cap
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def _mark_dirty(self) -> None:
+        """Flag unflushed changes; a crash before flush() forces a rebuild."""
+        if self._dirty:
+            return
+        self._dirty = True
+        try:
+            open(os.path.join(self.directory, _UNCLEAN_FILE), "w").close()
+        except OSError:
+            pass
+
+    def set_stamp(self, stamp: Optional[str]) -> None:
+        """Record the SurrealDB write stamp this index is in sync with."""
+        with self._lock:
+            if stamp != self.stamp:
+                self.stamp = stamp
+                self._mark_dirty()
+
+    # ── Mutation (mirrors SurrealCollection writes) ───────────────────────
+
+    def upsert(self, ids, vectors, metadatas=None, documents=None) -> None:
+        if not ids:
+            return
+        with self._lock:
+            if self._building:
+                self._touched.update(str(i) for i in ids)
+            self._upsert_rows(ids, vectors, metadatas, documents)
+            if not self._building:
+                self._maybe_retrain()
+
+    def _upsert_rows(self, ids, vectors, metadatas=None, documents=None) -> None:
+        for i, doc_id in enumerate(ids):
+            vec = vectors[i] if i < len(vectors) else None
+            if vec is None or len(vec) != self.dim:
+                self._delete_one(str(doc_id))
+                continue
+            meta = dict(metadatas[i]) if metadatas and i < len(metadatas) else {}
+            doc = documents[i] if documents and i < len(documents) else ""
+            slot = self._slot_of.get(str(doc_id))
+            if slot is None:
+                slot = self._free.pop() if self._free else len(self._ids)
+                if slot == len(self._ids):
+                    self._ids.append(None)
+                    self._docs.append("")
+                    self._metas.append({})
+                self._ensure_capacity(slot + 1)
+            unit = _unit_rows(np.asarray(vec, dtype=np.float32)[None, :])[0]
+            self._vectors[slot] = unit.astype(np.float16)
+            self._ids[slot] = str(doc_id)
+            self._docs[slot] = doc or ""
+            self._metas[slot] = meta
+            self._slot_of[str(doc_id)] = slot
+            self._assign_slot(slot, unit)
+        self._mark_dirty()
+
+    def update(self, doc_id, metadata=None, document=None, vector=None) -> None:
+        with self._lock:
+            slot = self._slot_of.get(str(doc_id))
+            if slot is None:
+                return
+            if metadata:
+                self._metas[slot].update(metadata)
+            if document is not None:
+                self._docs[slot] = document
+            if vector is not None and len(vector) == self.dim:
+                unit = _unit_rows(np.asarray(vector, dtype=np.float32)[None, :])[0]
+                self._vectors[slot] = unit.astype(np.float16)
+                self._assign_slot(slot, unit)
+            self._mark_dirty()
+
+    def delete(self, ids) -> None:
+        with self._lock:
+            for doc_id in ids or []:
+                if self._building:
+                    self._touched.add(str(doc_id))
+                self._delete_one(str(doc_id))
+            self._mark_dirty()
+
+    def _delete_one(self, doc_id: str) -> None:
+        slot = self._slot_of.pop(doc_id, None)
+        if slot is None:
+            return
+        self._unassign_slot(slot)
+        self._ids[slot] = None
+        self._docs[slot] = ""
+        self._metas[slot] = {}
+        self._free.append(slot)
+
+    # ── IVF partitioning ──────────────────────────────────────────────────
+
+    def _assign_slot(self, slot: int, unit: np.ndarray) -> None:
+        self._unassign_slot(slot)
+        if self._train_touched is not None:
+            self._train_touched.add(slot)
+        if self._centroids is None:
+            return
+        lst = int(np.argmax(self._centroids @ unit))
+        self._assign[slot] = lst
+        self._lists.setdefault(lst, set()).add(slot)
+
+    def _unassign_slot(self, slot: int) -> None:
+        if self._train_touched is not None:
+            self._train_touched.add(slot)
+        if slot >= self._capacity:
+            return
+        lst = int(self._assign[slot])
+        if lst >= 0:
+            self._lists.get(lst, set()).discard(slot)
+            self._assign[slot] = -1
+
+    def _live_slots(self) -> np.ndarray:
+        return np.fromiter(self._slot_of.values(), dtype=np.int64, count=len(self))
+
+    def _maybe_retrain(self) -> None:
+        """Start a background retrain once the index has doubled since the last.
+
+        Called with the lock held; the retrain itself only takes the lock to
+        snapshot its sample and to swap in the new centroids, so writers and
+        searches keep running against the old partitioning meanwhile.
+        """
+        n = len(self)
+        if n < self.train_threshold or self._train_thread is not None:
+            return
+        if self._centroids is None or n > 2 * self._trained_at:
+            self._train_thread = threading.Thread(
+                target=self._train_background, name="local-ann-train", daemon=True
+            )
+            self._train_thread.start()
+
+    def _train_background(self) -> None:
+        try:
+            self.train()
+            self.flush()
+        finally:
+            with self._lock:
+                self._train_thread = None
+
+    def wait_for_training(self, timeout: Optional[float] = None) -> None:
+        """Block until a background retrain (if any) has finished."""
+        thread = self._train_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def train(self, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> None:
+        """(Re)build IVF centroids with spherical k-means over live vectors.
+
+        k-means and the bulk reassignment run without the lock. Slots written
+        or deleted meanwhile are reassigned when the centroids are swapped
+        in; a rebuild (or a newer train) started meanwhile wins.
+        """
+        with self._lock:
+            self._train_gen += 1
+            gen, epoch = self._train_gen, self._epoch
+            slots = self._live_slots()
+            n = slots.size
+            if n < self.train_threshold:
+                self._centroids = None
+                self._lists = {}
+                self._assign[:] = -1
+                return
+            n_lists = int(min(1024, max(16, np.sqrt(n))))
+            rng = np.random.default_rng(seed)
+            sample_size = min(n, n_lists * 64)
+            sample = np.sort(rng.choice(slots, size=sample_size, replace=False))
+            data = self._vectors[sample].astype(np.float32)
+            vectors = self._vectors
+            self._train_touched = set()
+
+        centroids = data[rng.choice(sample_size, size=n_lists, replace=False)]
+        for _ in range(iterations):
+            labels = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, data)
+            counts = np.bincount(labels, minlength=n_lists)
+            empty = counts == 0
+            sums[empty] = data[rng.choice(sample_size, size=int(empty.sum()))]
+            centroids = _unit_rows(sums)
+        slots = np.sort(slots)
+        labels = self._labels(vectors, slots, centroids)
+
+        with self._lock:
+            if gen != self._train_gen or epoch != self._epoch:
+                return
+            touched = self._train_touched
+            self._train_touched = None
+            self._centroids = centroids
+            self._assign[:] = -1
+            self._lists = {}
+            for slot, lst in zip(slots.tolist(), labels.tolist()):
+                if slot in touched or self._ids[slot] is None:
+                    continue
+                self._assign[slot] = lst
+                self._lists.setdefault(lst, set()).add(slot)
+            for slot in touched:
+                if slot < len(self._ids) and self._ids[slot] is not None:
+                    self._assign_slot(slot, self._vectors[slot].astype(np.float32))
+            self._trained_at = n
+            self._mark_dirty()
+
+    @staticmethod
+    def _labels(vectors, slots: np.ndarray, centroids: np.ndarray, block: int = 4096) -> np.ndarray:
+        """Nearest centroid of each (sorted) slot, computed block by block."""
+        labels = np.empty(slots.size, dtype=np.int64)
+        for start in range(0, slots.size, block):
+            chunk = slots[start : start + block]
+            labels[start : start + block] = np.argmax(
+                vectors[chunk].astype(np.float32) @ centroids.T, axis=1
+            )
+        return labels
+
+    def _reassign_all(self, slots: np.ndarray) -> None:
+        self._assign[:] = -1
+        self._lists = {}
+        slots = np.sort(slots)
+        labels = self._labels(self._vectors, slots, self._centroids)
+        for slot, lst in zip(slots.tolist(), labels.tolist()):
+            self._assign[slot] = lst
+            self._lists.setdefault(lst, set()).add(slot)
+
+    # ── Query ─────────────────────────────────────────────────────────────
+
+    def search(self, vector, k: int = 5, where=None, exact: bool = False):
+        """Return [(id, distance)] for the k nearest rows (cosine distance)."""
+        q = np.asarray(vector, dtype=np.float32).ravel()
+        if q.shape[0] != self.dim:
+            return []
+        norm = float(np.linalg.norm(q))
+        if norm < 1e-10:
+            return []
+        q = q / norm
+        with self._lock:
+            if not self._slot_of:
+                return []
+            if exact or self._centroids is None:
+                cands = self._live_slots()
+            else:
+                probe = np.argsort(-(self._centroids @ q))[: self.nprobe]
+                cands = np.fromiter(
+                    (s for lst in probe for s in self._lists.get(int(lst), ())),
+                    dtype=np.int64,
+                )
+            if where:
+                cands = self._filter(cands, where)
+                if cands.size < k and not exact and self._centroids is not None:
+                    cands = self._filter(self._live_slots(), where)
+            if cands.size == 0:
+                return []
+            cands = np.sort(cands)
+            sims = self._vectors[cands].astype(np.float32) @ q
+            kk = min(k, cands.size)
+            top = np.argpartition(-sims, kk - 1)[:kk]
+            top = top[np.argsort(-sims[top])]
+            return [(self._ids[int(cands[t])], float(1.0 - sims[t])) for t in top]
+
+    def _filter(self, slots: np.ndarray, where) -> np.ndarray:
+        keep = [s for s in slots if match_where(self._metas[int(s)], where)]
+        return np.asarray(keep, dtype=np.int64)
+
+    def query(self, vector, n_results=5, include=None, where=None) -> dict:
+        """SurrealCollection.query()-shaped result from the local index."""
+        if include is None:
+            include = ["metadatas", "distances"]
+        with self._lock:
+            hits = self.search(vector, k=n_results, where=where)
+            slots = [self._slot_of.get(i) for i, _ in hits]
+            result = {"ids": [[i for i, _ in hits]]}
+            if "documents" in include:
+                result["documents"] = [[self._docs[s] for s in slots]]
+            if "distances" in include:
+                result["distances"] = [[d for _, d in hits]]
+            if "metadatas" in include:
+                result["metadatas"] = [[dict(self._metas[s]) for s in slots]]
+            if "embeddings" in include:
+                result["embeddings"] = [
+                    [self._vectors[s].astype(np.float32).tolist() for s in slots]
+                ]
+        return result
+
+    # ── Build / persist ───────────────────────────────────────────────────
+
+    def build_from_collection(self, collection, chunk_size: int = 500) -> int:
+        """Rebuild the index from a SurrealCollection (the source of truth).
+
+        The lock is only held per page, so mirrored writes keep flowing during
+        a rebuild. Ids written or deleted meanwhile are remembered and their
+        (older) page rows skipped, so a rebuild never resurrects stale data.
+        """
+        with self._lock:
+            self.ready = False
+            self._reset()
+            self._building = True
+            self._touched = set()
+        try:
+            offset = 0
+            while True:
+                page = collection.get(
+                    limit=chunk_size,
+                    offset=offset,
+                    include=["documents", "metadatas", "embeddings"],
+                )
+                ids = page.get("ids") or []
+                if not ids:
+                    break
+                vecs = page.get("embeddings") or []
+                metas = page.get("metadatas") or []
+                docs = page.get("documents") or []
+                with self._lock:
+                    keep = [i for i, mid in enumerate(ids) if mid not in self._touched]
+                    self._upsert_rows(
+                        [ids[i] for i in keep],
+                        [vecs[i] if i < len(vecs) else None for i in keep],
+                        [metas[i] if i < len(metas) else {} for i in keep],
+                        [docs[i] if i < len(docs) else "" for i in keep],
+                    )
+                offset += len(ids)
+                if len(ids) < chunk_size:
+                    break
+        finally:
+            with self._lock:
+                self._building = False
+                self._touched = set()
+        self.train()
+        with self._lock:
+            self.ready = True
+        self.flush()
+        return len(self)
+
+    def _reset(self) -> None:
+        self._epoch += 1
+        self._ids, self._docs, self._metas = [], [], []
+        self._slot_of, self._free = {}, []
+        self._centroids, self._lists = None, {}
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._vectors, self._capacity = None, 0
+        if os.path.exists(self._vec_path):
+            os.remove(self._vec_path)
+        self._trained_at = 0
+        self.stamp = None
+
+    def flush(self) -> None:
+        """Persist ids/docs/metadata and centroids; vectors are already mmapped."""
+        with self._lock:
+            if not self._dirty:
+                return
+            if self._vectors is not None:
+                self._vectors.flush()
+            state = {
+                "dim": self.dim,
+                "capacity": self._capacity,
+                "ids": self._ids,
+                "docs": self._docs,
+                "metas": self._metas,
+                "trained_at": self._trained_at,
+                "stamp": self.stamp,
+            }
+            tmp = os.path.join(self.directory, _STATE_FILE + ".tmp")
+            with open(tmp, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp, os.path.join(self.directory, _STATE_FILE))
+            cpath = os.path.join(self.directory, _CENTROIDS_FILE)
+            if self._centroids is not None:
+                np.save(cpath, self._centroids)
+            elif os.path.exists(cpath):
+                os.remove(cpath)
+            try:
+                os.remove(os.path.join(self.directory, _UNCLEAN_FILE))
+            except OSError:
+                pass
+            self._dirty = False
+
+    def load(self) -> bool:
+        """Load a persisted index. Returns False if absent or inconsistent.
+
+        Does not set ``ready``: the caller decides whether the loaded copy
+        still agrees with SurrealDB.
+        """
+        spath = os.path.join(self.directory, _STATE_FILE)
+        if os.path.exists(os.path.join(self.directory, _UNCLEAN_FILE)):
+            return False
+        try:
+            with open(spath) as f:
+                state = json.load(f)
+            if state.get("dim") != self.dim:
+                return False
+            capacity = int(state["capacity"])
+            if os.path.getsize(self._vec_path) < capacity * self.dim * 2:
+                return False
+        except (OSError, ValueError, KeyError):
+            return False
+        with self._lock:
+            self._vectors = np.memmap(
+                self._vec_path, dtype=np.float16, mode="r+", shape=(capacity, self.dim)
+            )
+            self._capacity = capacity
+            self._ids = state["ids"]
+            self._docs = state["docs"]
+            self._metas = state["metas"]
+            self._slot_of = {i: s for s, i in enumerate(self._ids) if i is not None}
+            self._free = [s for s, i in enumerate(self._ids) if i is None]
+            self._assign = np.full(capacity, -1, dtype=np.int32)
+            self._trained_at = state.get("trained_at", 0)
+            self.stamp = state.get("stamp")
+            cpath = os.path.join(self.directory, _CENTROIDS_FILE)
+            self._centroids = np.load(cpath) if os.path.exists(cpath) else None
+            if self._centroids is not None:
+                self._reassign_all(self._live_slots())
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "rows": len(self),
+                "capacity": self._capacity,
+                "ivf_lists": 0 if self._centroids is None else len(self._centroids),
+                "nprobe": self.nprobe,
+                "mmap_mb": round(self._capacity * self.dim * 2 / (1024 * 1024), 1),
+            }
@@ -9,6 +9,17 @@ Levels:
     weekly→ 0.33 (3+ accesses/week for 2+ weeks)
     full  → 0.1  (10+ total accesses)
 
+Storage is a small SQLite database instead of one JSON document rewritten
+on every save:
+    access_log(memory_id, ts)  append-only access events
+    ltp_state(memory_id PK, status, factor, total_accesses, last_access)
+Recording an access appends one row and upserts one state row, so its cost
+no longer grows with the number of tracked memories. Only the entries of
+touched memories are held in memory. A background compaction drops access
+events older than the 30-day evaluation window; LTP entries are only removed
+by an explicit prune_stale() (or compact(prune_stale_days=...)).
+A legacy JSON state file is imported on first open.
+
 Public API:
     from shared.ltp_tracker import LTPTracker
 """
@@ -16,8 +27,11 @@ Public API:
 import atexit
 import json
 import os
+import sqlite3
+import threading
 import time
-from typing import Dict, Optional
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
 
 # LTP status → decay factor multiplier (lower = slower decay)
 _DECAY_FACTORS: Dict[str, float] = {
@@ -27,63 +41,172 @@ _DECAY_FACTORS: Dict[str, float] = {
     "full": 0.1,
 }
 
-_DEFAULT_PATH = os.path.expanduser("~/.claude/data/memory/ltp_state.json")
+_DEFAULT_PATH = os.path.expanduser("~/.claude/data/memory/ltp_state.db")
+_LEGACY_JSON_PATH = os.path.expanduser("~/.claude/data/memory/ltp_state.json")
 
 # Number of accesses to accumulate before an automatic flush.
 _DEFAULT_BATCH_SIZE = 10
 
+_WINDOW_SECONDS = 30 * 86400  # access history kept for status evaluation
+_DEFAULT_COMPACT_INTERVAL = 3600.0
+_ENTRY_CACHE_MAX = 4096
+_SQLITE_HEADER = b"SQLite format 3\x00"
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS access_log (
+        memory_id TEXT NOT NULL,
+        ts REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_access_mem ON access_log(memory_id, ts);
+    CREATE INDEX IF NOT EXISTS idx_access_ts ON access_log(ts);
+    CREATE TABLE IF NOT EXISTS ltp_state (
+        memory_id TEXT PRIMARY KEY,
+        status TEXT NOT NULL DEFAULT 'none',
+        factor REAL NOT NULL DEFAULT 1.0,
+        total_accesses INTEGER NOT NULL DEFAULT 0,
+        last_access REAL NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS idx_ltp_rank ON ltp_state(factor, total_accesses DESC);
+    CREATE INDEX IF NOT EXISTS idx_ltp_last ON ltp_state(last_access);
+"""
+
+
+def _import_json_state(conn: sqlite3.Connection, state: dict):
+    """Load a legacy {memory_id: entry} JSON document into the tables."""
+    for mid, entry in state.items():
+        stamps = entry.get("access_timestamps", []) or []
+        status = entry.get("status", "none")
+        conn.executemany(
+            "INSERT INTO access_log (memory_id, ts) VALUES (?, ?)",
+            [(mid, float(t)) for t in stamps],
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO ltp_state VALUES (?, ?, ?, ?, ?)",
+            (
+                mid,
+                status,
+                _DECAY_FACTORS.get(status, 1.0),
+                entry.get("total_accesses", len(stamps)),
+                max(stamps) if stamps else 0.0,
+            ),
+        )
+    conn.commit()
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else None
+    except (json.JSONDecodeError, OSError, UnicodeDecodeError):
+        return None
+
 
 class LTPTracker:
     """Track memory access patterns and assign LTP protection levels.
 
-    Saves are batched for performance: the JSON file is written only when
-    (a) the LTP status of any memory changes, (b) ``batch_size`` accesses
-    have accumulated since the last save, or (c) ``flush()`` is called
-    explicitly.  An atexit handler and ``__del__`` ensure pending writes are
-    flushed on normal interpreter exit.
+    Writes are batched: pending accesses are committed when (a) the LTP
+    status of any memory changes, (b) ``batch_size`` accesses have
+    accumulated since the last commit, or (c) ``flush()`` is called
+    explicitly. An atexit handler and ``__del__`` flush pending writes on
+    normal interpreter exit.
     """
 
-    def __init__(self, db_path: str = _DEFAULT_PATH, batch_size: int = _DEFAULT_BATCH_SIZE):
+    def __init__(
+        self,
+        db_path: str = _DEFAULT_PATH,
+        batch_size: int = _DEFAULT_BATCH_SIZE,
+        compact_interval: float = _DEFAULT_COMPACT_INTERVAL,
+    ):
         self._path = db_path
         self._batch_size = batch_size
-        self._state: Dict[str, dict] = {}
-        self._dirty: bool = False
+        self._compact_interval = compact_interval
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._pending: List[Tuple[str, float]] = []  # appended, not yet committed
+        self._dirty_ids = set()
         self._accesses_since_save: int = 0
-        self._load()
+        self._last_compact = time.monotonic()
+        self._compacting = False
+        self._conn = self._open(db_path)
         atexit.register(self.flush)
 
-    def _load(self):
-        if os.path.exists(self._path):
-            try:
-                with open(self._path, "r") as f:
-                    self._state = json.load(f)
-            except (json.JSONDecodeError, OSError):
-                self._state = {}
+    # --- Storage ---
+
+    def _open(self, path: str) -> sqlite3.Connection:
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if path != ":memory:" and os.path.isfile(path):
+            with open(path, "rb") as f:
+                head = f.read(len(_SQLITE_HEADER))
+            if head and head != _SQLITE_HEADER:
+                # Pre-SQLite JSON state file at this path: convert it in place
+                tmp = path + ".tmp"
+                conn = sqlite3.connect(tmp)
+                conn.executescript(_SCHEMA)
+                _import_json_state(conn, _read_json(path) or {})
+                conn.close()
+                os.replace(tmp, path)
+        elif path == _DEFAULT_PATH and not os.path.exists(path):
+            legacy = _read_json(_LEGACY_JSON_PATH)
+            if legacy:
+                conn = sqlite3.connect(path)
+                conn.executescript(_SCHEMA)
+                _import_json_state(conn, legacy)
+                conn.close()
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        conn.commit()
+        return conn
 
     def _save(self):
-        """Write state to disk unconditionally and reset dirty tracking."""
-        try:
-            os.makedirs(os.path.dirname(self._path), exist_ok=True)
-            tmp = self._path + ".tmp"
-            with open(tmp, "w") as f:
-                json.dump(self._state, f)
-            os.replace(tmp, self._path)
-            self._dirty = False
-            self._accesses_since_save = 0
-        except OSError:
-            # Non-fatal: state is still in memory, will retry on next save
+        """Commit pending writes, then start a compaction if one is due."""
+        self._commit()
+        self._maybe_compact()
+
+    def _commit(self):
+        """Commit pending accesses and dirty state rows."""
+        with self._lock:
+            if not self._pending and not self._dirty_ids:
+                return
             try:
-                os.unlink(tmp)
-            except OSError:
-                pass
+                self._conn.executemany(
+                    "INSERT INTO access_log (memory_id, ts) VALUES (?, ?)",
+                    self._pending,
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO ltp_state VALUES (?, ?, ?, ?, ?)",
+                    [self._state_row(mid) for mid in self._dirty_ids],
+                )
+                self._conn.commit()
+                self._pending = []
+                self._dirty_ids.clear()
+                self._accesses_since_save = 0
+            except sqlite3.Error:
+                # Non-fatal: state is still in memory, will retry on next save
+                try:
+                    self._conn.rollback()
+                except sqlite3.Error:
+                    pass
+
+    def _state_row(self, memory_id: str) -> tuple:
+        entry = self._entries[memory_id]
+        stamps = entry["access_timestamps"]
+        return (
+            memory_id,
+            entry["status"],
+            _DECAY_FACTORS.get(entry["status"], 1.0),
+            entry["total_accesses"],
+            stamps[-1] if stamps else 0.0,
+        )
 
     def flush(self):
         """Persist any pending in-memory state to disk.
 
         Safe to call multiple times; no-ops when nothing is dirty.
         """
-        if self._dirty:
-            self._save()
+        self._commit()
 
     def __del__(self):
         try:
@@ -91,44 +214,79 @@ class LTPTracker:
         except Exception:
             pass
 
+    def _load_entries(self, memory_ids: List[str]) -> Dict[str, dict]:
+        """Fetch entries for ids not cached yet (one query per table)."""
+        cutoff = time.time() - _WINDOW_SECONDS
+        loaded = {
+            mid: {"access_timestamps": [], "status": "none", "total_accesses": 0}
+            for mid in memory_ids
+        }
+        for i in range(0, len(memory_ids), 400):
+            chunk = memory_ids[i : i + 400]
+            placeholders = ",".join("?" for _ in chunk)
+            for mid, status, total in self._conn.execute(
+                f"SELECT memory_id, status, total_accesses FROM ltp_state "
+                f"WHERE memory_id IN ({placeholders})",
+                chunk,
+            ):
+                loaded[mid]["status"] = status
+                loaded[mid]["total_accesses"] = total
+            for mid, ts in self._conn.execute(
+                f"SELECT memory_id, ts FROM access_log "
+                f"WHERE memory_id IN ({placeholders}) AND ts > ? ORDER BY ts",
+                chunk + [cutoff],
+            ):
+                loaded[mid]["access_timestamps"].append(ts)
+        return loaded
+
     def _ensure_entry(self, memory_id: str) -> dict:
-        if memory_id not in self._state:
-            self._state[memory_id] = {
-                "access_timestamps": [],
-                "status": "none",
-                "total_accesses": 0,
-            }
-        return self._state[memory_id]
+        entry = self._entries.get(memory_id)
+        if entry is None:
+            entry = self._load_entries([memory_id])[memory_id]
+            if len(self._entries) >= _ENTRY_CACHE_MAX:
+                if self._dirty_ids:
+                    self._commit()
+                self._entries.popitem(last=False)
+            self._entries[memory_id] = entry
+        else:
+            self._entries.move_to_end(memory_id)
+        return entry
+
+    # --- Recording and evaluation ---
 
     def record_access(self, memory_id: str) -> str:
         """Record an access and re-evaluate LTP status. Returns new status.
 
-        The file is written immediately only when the LTP status changes or
-        when ``batch_size`` accesses have accumulated.  Call ``flush()`` to
+        The access is committed immediately only when the LTP status changes
+        or when ``batch_size`` accesses have accumulated. Call ``flush()`` to
         force a write at any point.
         """
-        entry = self._ensure_entry(memory_id)
-        now = time.time()
-        entry["access_timestamps"].append(now)
-        entry["total_accesses"] = entry.get("total_accesses", 0) + 1
+        with self._lock:
+            entry = self._ensure_entry(memory_id)
+            now = time.time()
+            entry["access_timestamps"].append(now)
+            entry["total_accesses"] = entry.get("total_accesses", 0) + 1
 
-        # Prune timestamps older than 30 days to bound storage
-        cutoff = now - (30 * 86400)
-        entry["access_timestamps"] = [t for t in entry["access_timestamps"] if t > cutoff]
+            # Only the last 30 days matter for status evaluation
+            cutoff = now - _WINDOW_SECONDS
+            entry["access_timestamps"] = [
+                t for t in entry["access_timestamps"] if t > cutoff
+            ]
 
-        old_status = entry.get("status", "none")
-        new_status = self._evaluate_status(entry)
-        entry["status"] = new_status
+            old_status = entry.get("status", "none")
+            new_status = self._evaluate_status(entry)
+            entry["status"] = new_status
 
-        self._dirty = True
-        self._accesses_since_save += 1
+            self._pending.append((memory_id, now))
+            self._dirty_ids.add(memory_id)
+            self._accesses_since_save += 1
 
-        # Save immediately on status change (semantically significant) or
-        # when the batch threshold is reached.
-        if new_status != old_status or self._accesses_since_save >= self._batch_size:
-            self._save()
+            # Save immediately on status change (semantically significant) or
+            # when the batch threshold is reached.
+            if new_status != old_status or self._accesses_since_save >= self._batch_size:
+                self._save()
 
-        return new_status
+            return new_status
 
     def _evaluate_status(self, entry: dict) -> str:
         """Determine LTP level from access history."""
@@ -170,28 +328,121 @@ class LTPTracker:
         qualifying_weeks = sum(1 for c in week_counts.values() if c >= 3)
         return qualifying_weeks >= 2
 
+    # --- Compaction ---
+
+    def _maybe_compact(self):
+        if self._compacting or (
+            time.monotonic() - self._last_compact < self._compact_interval
+        ):
+            return
+        self._compacting = True
+        threading.Thread(target=self.compact, name="ltp-compact", daemon=True).start()
+
+    def compact(self, prune_stale_days: Optional[int] = None) -> Dict[str, int]:
+        """Drop access events outside the evaluation window.
+
+        LTP entries themselves are never deleted here unless the caller opts
+        in with ``prune_stale_days``, which also runs prune_stale() with that
+        age. Background compaction does not opt in.
+        """
+        try:
+            with self._lock:
+                self._commit()
+                cutoff = time.time() - _WINDOW_SECONDS
+                events = self._conn.execute(
+                    "DELETE FROM access_log WHERE ts <= ?", (cutoff,)
+                ).rowcount
+                self._conn.commit()
+            pruned = self.prune_stale(prune_stale_days) if prune_stale_days else 0
+            return {"events_dropped": events, "entries_pruned": pruned}
+        except sqlite3.Error:
+            return {"events_dropped": 0, "entries_pruned": 0}
+        finally:
+            self._last_compact = time.monotonic()
+            self._compacting = False
+
     def prune_stale(self, max_age_days: int = 90) -> int:
         """Remove entries for memories not accessed in max_age_days. Returns count removed."""
         cutoff = time.time() - (max_age_days * 86400)
-        to_remove = [
-            mid for mid, entry in self._state.items()
-            if entry.get("total_accesses", 0) < 10  # never prune full-LTP
-            and max(entry.get("access_timestamps", [0])) < cutoff
-        ]
-        for mid in to_remove:
-            del self._state[mid]
-        if to_remove:
-            self._save()
+        with self._lock:
+            self._commit()
+            # never prune full-LTP
+            to_remove = [
+                r[0]
+                for r in self._conn.execute(
+                    "SELECT memory_id FROM ltp_state "
+                    "WHERE last_access < ? AND total_accesses < 10",
+                    (cutoff,),
+                )
+            ]
+            for i in range(0, len(to_remove), 400):
+                chunk = to_remove[i : i + 400]
+                placeholders = ",".join("?" for _ in chunk)
+                self._conn.execute(
+                    f"DELETE FROM ltp_state WHERE memory_id IN ({placeholders})", chunk
+                )
+                self._conn.execute(
+                    f"DELETE FROM access_log WHERE memory_id IN ({placeholders})", chunk
+                )
+            if to_remove:
+                self._conn.commit()
+            for mid in to_remove:
+                self._entries.pop(mid, None)
         return len(to_remove)
 
+    # --- Queries ---
+
+    def get_states(self, memory_ids: Iterable[str]) -> Dict[str, dict]:
+        """State for these ids: {id: {status, decay_factor, total_accesses}}.
+
+        Reads only the requested rows; unknown ids report status "none".
+        """
+        ids = list(dict.fromkeys(m for m in memory_ids if m))
+        with self._lock:
+            missing = [m for m in ids if m not in self._entries]
+            loaded = self._load_entries(missing) if missing else {}
+            result = {}
+            for mid in ids:
+                entry = self._entries.get(mid) or loaded[mid]
+                status = entry.get("status", "none")
+                result[mid] = {
+                    "status": status,
+                    "decay_factor": _DECAY_FACTORS.get(status, 1.0),
+                    "total_accesses": entry.get("total_accesses", 0),
+                }
+        return result
+
+    def top_potentiated(self, n: int = 10) -> List[Tuple[str, str, int]]:
+        """Most potentiated memories as (id, status, total_accesses), best first."""
+        with self._lock:
+            self._commit()
+            return [
+                (r[0], r[1], r[2])
+                for r in self._conn.execute(
+                    "SELECT memory_id, status, total_accesses FROM ltp_state "
+                    "WHERE status != 'none' "
+                    "ORDER BY factor ASC, total_accesses DESC LIMIT ?",
+                    (n,),
+                )
+            ]
+
     def get_status(self, memory_id: str) -> str:
         """Get current LTP status for a memory."""
-        entry = self._state.get(memory_id)
-        if entry is None:
-            return "none"
-        return entry.get("status", "none")
+        with self._lock:
+            entry = self._entries.get(memory_id)
+            if entry is not None:
+                return entry.get("status", "none")
+            row = self._conn.execute(
+                "SELECT status FROM ltp_state WHERE memory_id=?", (memory_id,)
+            ).fetchone()
+        return row[0] if row else "none"
 
     def get_decay_factor(self, memory_id: str) -> float:
         """Get decay factor multiplier for a memory's LTP status."""
         status = self.get_status(memory_id)
         return _DECAY_FACTORS.get(status, 1.0)
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
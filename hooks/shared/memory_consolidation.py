@@ -4,6 +4,10 @@ Complements memory_maintenance.py (read-only analysis) with actionable
 consolidation operations. All functions return recommendations by default;
 no side effects unless explicitly requested.
 
+Merge candidates come from MinHash/LSH buckets (shared.minhash_index) and are
+confirmed with exact Jaccard, so a run can cover the whole store; small
+inputs are still compared pairwise.
+
 Public API:
     from shared.memory_consolidation import (
         find_merge_candidates, generate_merged_content,
@@ -17,6 +21,8 @@ import time
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
+from shared.minhash_index import MinHashIndex, word_set
+
 
 @dataclass
 class ConsolidationAction:
@@ -44,6 +50,7 @@ ARCHIVE_RELEVANCE = 0.15
 MERGE_SIMILARITY = 0.5  # Jaccard word overlap threshold
 MAX_MERGE_GROUP = 5
 MAX_ACTIONS_PER_TYPE = 50
+EXACT_PAIRWISE_MAX = 200  # below this many entries, compare every pair
 
 
 def _sentence_split(text):
@@ -55,9 +62,7 @@ def _sentence_split(text):
 
 def _word_set(text):
     """Extract lowercase word set from text."""
-    if not text:
-        return set()
-    return set(re.findall(r'\b\w{3,}\b', text.lower()))
+    return word_set(text)
 
 
 def _jaccard(a, b):
@@ -68,15 +73,44 @@ def _jaccard(a, b):
     return len(a & b) / len(union) if union else 0.0
 
 
-def find_merge_candidates(entries, threshold=MERGE_SIMILARITY):
+def _similar_pairs(entries, word_sets, threshold, index):
+    """Map entry position -> sorted positions of entries with Jaccard >= threshold."""
+    n = len(entries)
+    if index is None and n <= EXACT_PAIRWISE_MAX:
+        candidates = ((i, j) for i in range(n) for j in range(i + 1, n))
+    else:
+        if index is None:
+            index = MinHashIndex()
+        pos = {}
+        for i, e in enumerate(entries):
+            if word_sets[i]:
+                pos.setdefault(e["id"], i)
+                index.upsert(e["id"], e.get("document", "") or "")
+        candidates = (
+            (pos[a], pos[b]) for a, b in index.candidate_pairs(threshold, ids=list(pos))
+        )
+    neighbours = {}
+    for i, j in candidates:
+        if _jaccard(word_sets[i], word_sets[j]) >= threshold:
+            neighbours.setdefault(i, []).append(j)
+            neighbours.setdefault(j, []).append(i)
+    for lst in neighbours.values():
+        lst.sort()
+    return neighbours
+
+
+def find_merge_candidates(entries, threshold=MERGE_SIMILARITY, index=None):
     """Find groups of semantically similar memories to merge.
 
     Uses word overlap (Jaccard similarity) for lightweight grouping
-    without requiring embedding computation.
+    without requiring embedding computation. Large inputs (or any input
+    when a persistent MinHashIndex is given) only compare LSH candidate
+    pairs; cached signatures are reused for unchanged memories.
 
     Args:
         entries: List of dicts with 'id', 'document', 'tags' keys.
         threshold: Minimum Jaccard similarity to consider as merge candidate.
+        index: Optional shared.minhash_index.MinHashIndex to reuse.
 
     Returns:
         List of ConsolidationAction with action="merge".
@@ -86,24 +120,25 @@ def find_merge_candidates(entries, threshold=MERGE_SIMILARITY):
             return []
 
         # Precompute word sets
-        word_sets = [(e, _word_set(e.get("document", ""))) for e in entries]
+        word_sets = [_word_set(e.get("document", "")) for e in entries]
+        neighbours = _similar_pairs(entries, word_sets, threshold, index)
 
-        # Group by similarity (greedy clustering)
+        # Group by similarity (greedy clustering, in entry order)
         used = set()
         groups = []
-        for i, (ei, wi) in enumerate(word_sets):
-            if ei["id"] in used or not wi:
+        for i, ei in enumerate(entries):
+            if ei["id"] in used or not word_sets[i]:
                 continue
             group = [ei]
             used.add(ei["id"])
-            for j, (ej, wj) in enumerate(word_sets):
-                if i == j or ej["id"] in used or not wj:
+            for j in neighbours.get(i, ()):
+                ej = entries[j]
+                if i == j or ej["id"] in used:
                     continue
-                if _jaccard(wi, wj) >= threshold:
-                    group.append(ej)
-                    used.add(ej["id"])
-                    if len(group) >= MAX_MERGE_GROUP:
-                        break
+                group.append(ej)
+                used.add(ej["id"])
+                if len(group) >= MAX_MERGE_GROUP:
+                    break
             if len(group) >= 2:
                 groups.append(group)
 
@@ -256,16 +291,17 @@ def find_archive_candidates(entries, ltp_statuses=None):
         return []
 
 
-def run_consolidation_analysis(entries, ltp_statuses=None):
+def run_consolidation_analysis(entries, ltp_statuses=None, index=None):
     """Run full consolidation analysis. Returns ConsolidationReport.
 
     Read-only: all operations are recommendations, not side effects.
+    index: optional MinHashIndex passed through to find_merge_candidates.
     """
     t0 = time.monotonic()
     report = ConsolidationReport(timestamp=time.time())
 
     try:
-        report.merges = find_merge_candidates(entries)
+        report.merges = find_merge_candidates(entries, index=index)
         report.promotions = find_promotion_candidates(entries, ltp_statuses)
         report.archives = find_archive_candidates(entries, ltp_statuses)
 
@@ -174,13 +174,15 @@ def query(collection, query_texts, n_results=5, include=None):
     return request("query", collection=collection, params=params)
 
 
-def get(collection, ids=None, limit=None, include=None):
-    """Get entries by IDs or limit from a collection."""
+def get(collection, ids=None, limit=None, include=None, offset=None):
+    """Get entries by IDs, or a page of up to limit entries from offset."""
     params = {}
     if ids is not None:
         params["ids"] = ids
     if limit is not None:
         params["limit"] = limit
+    if offset is not None:
+        params["offset"] = offset
     if include is not None:
         params["include"] = include
     return request("get", collection=collection, params=params)
@@ -0,0 +1,323 @@
+"""Metric Ring — fixed-size numpy ring buffers over named metric series.
+
+The anomaly helpers in shared.anomaly_detector used to rebuild baselines,
+per-gate standard deviations and EMA trends from the full list of raw
+snapshots on every call. MetricRing keeps one column per metric (gate fire
+rate or any named rate) and maintains its statistics as samples arrive:
+
+- a ring of the last ``capacity`` snapshots, from which the windowed baseline
+  and rate-of-change read fixed-size slices,
+- Welford running mean/variance over every sample pushed,
+- an EMA per metric (same recurrence as anomaly_detector.compute_ema),
+
+so push() and every check cost O(metrics), however long the series gets.
+Metrics missing from a snapshot count as 0.0, as in the dict-based
+functions; a metric first seen later is back-filled with 0.0 samples.
+
+evaluate() is the batch entry point: anomalies, rate of change, trends and
+drift (against a DriftBaseline cached until the next push) for all metrics
+in one call. save()/load() persist a ring between hook processes.
+
+Public API:
+    from shared.metric_ring import MetricRing
+
+    ring = MetricRing.load(path)
+    report = ring.evaluate(snapshot)
+    ring.push(snapshot)
+    ring.save(path)
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from shared.drift_detector import DriftBaseline
+
+DEFAULT_CAPACITY = 256
+DEFAULT_WINDOW = 10
+DEFAULT_ALPHA = 0.3
+
+
+class MetricRing:
+    """Ring buffer of metric snapshots with online per-metric statistics.
+
+    Args:
+        capacity: Snapshots retained for windowed checks.
+        window:   Snapshots averaged by baseline().
+        alpha:    EMA smoothing factor (clamped to 0.01–1.0).
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        window: int = DEFAULT_WINDOW,
+        alpha: float = DEFAULT_ALPHA,
+    ):
+        self.capacity = max(1, int(capacity))
+        self.window = max(1, min(int(window), self.capacity))
+        self.alpha = max(0.01, min(1.0, float(alpha)))
+        self.names: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._buf = np.zeros((self.capacity, 0))
+        self._present = np.zeros((self.capacity, 0), dtype=bool)
+        self._pos = 0  # next slot to write
+        self._len = 0  # snapshots held (<= capacity)
+        self.count = 0  # snapshots pushed in total
+        self._mean = np.zeros(0)
+        self._m2 = np.zeros(0)
+        self._ema = np.zeros(0)
+        self._ema_first = np.zeros(0)
+        self._drift: Optional[DriftBaseline] = None
+
+    @classmethod
+    def from_history(cls, history: List[Dict[str, float]], **kwargs) -> "MetricRing":
+        """A ring holding all of history (oldest first)."""
+        kwargs.setdefault("capacity", max(len(history), 1))
+        ring = cls(**kwargs)
+        ring.extend(history)
+        return ring
+
+    # -- ingest --------------------------------------------------------------
+
+    def _grow(self, names: List[str]) -> None:
+        """Add columns for new metrics (their earlier samples are 0.0)."""
+        for name in names:
+            self._index[name] = len(self.names)
+            self.names.append(name)
+        extra = len(names)
+        self._buf = np.hstack([self._buf, np.zeros((self.capacity, extra))])
+        self._present = np.hstack(
+            [self._present, np.zeros((self.capacity, extra), dtype=bool)]
+        )
+        zeros = np.zeros(extra)
+        self._mean = np.concatenate([self._mean, zeros])
+        self._m2 = np.concatenate([self._m2, zeros])
+        self._ema = np.concatenate([self._ema, zeros])
+        self._ema_first = np.concatenate([self._ema_first, zeros])
+
+    def _columns(self, names: Iterable[str]) -> np.ndarray:
+        new = [n for n in names if n not in self._index]
+        if new:
+            self._grow(list(dict.fromkeys(new)))
+        return np.fromiter((self._index[n] for n in names), dtype=np.intp)
+
+    def push(self, snapshot: Dict[str, float]) -> None:
+        """Append one {metric: value} snapshot, updating all statistics."""
+        cols = self._columns(snapshot)
+        x = np.zeros(len(self.names))
+        x[cols] = np.fromiter(snapshot.values(), dtype=float, count=len(cols))
+        self._buf[self._pos] = x
+        self._present[self._pos] = False
+        self._present[self._pos, cols] = True
+        self._pos = (self._pos + 1) % self.capacity
+        self._len = min(self._len + 1, self.capacity)
+        self.count += 1
+
+        delta = x - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (x - self._mean)
+        if self.count == 1:
+            self._ema = x.copy()
+            self._ema_first = x.copy()
+        else:
+            self._ema = self.alpha * x + (1.0 - self.alpha) * self._ema
+        self._drift = None
+
+    def extend(self, snapshots: Iterable[Dict[str, float]]) -> None:
+        for snapshot in snapshots:
+            self.push(snapshot)
+
+    def _recent(self, n: int) -> np.ndarray:
+        """Ring slot indices of the last n snapshots, oldest first."""
+        n = min(n, self._len)
+        return (self._pos - n + np.arange(n)) % self.capacity
+
+    # -- statistics ----------------------------------------------------------
+
+    def baseline(self, window: Optional[int] = None) -> Dict[str, float]:
+        """Mean of each metric over the last ``window`` snapshots.
+
+        Like anomaly_detector.compute_baseline, only metrics present in one
+        of those snapshots are included.
+        """
+        rows = self._recent(window or self.window)
+        if not len(rows):
+            return {}
+        means = self._buf[rows].mean(axis=0)
+        seen = self._present[rows].any(axis=0)
+        return {self.names[i]: float(means[i]) for i in np.flatnonzero(seen)}
+
+    def stats(self) -> Dict[str, Tuple[float, float]]:
+        """Metric -> (mean, population stddev) over every sample pushed."""
+        if not self.count:
+            return {}
+        std = np.sqrt(np.maximum(self._m2 / self.count, 0.0))
+        return {n: (float(self._mean[i]), float(std[i])) for i, n in enumerate(self.names)}
+
+    # -- checks --------------------------------------------------------------
+
+    def detect_anomalies(
+        self,
+        current: Dict[str, float],
+        baseline: Optional[Dict[str, float]] = None,
+        threshold_sigma: float = 2.0,
+    ) -> List[Dict]:
+        """anomaly_detector.detect_anomalies against this ring.
+
+        The global check compares against ``baseline`` (default: the
+        windowed baseline); the per-gate check uses the running mean and
+        stddev once three or more samples have been pushed.
+        """
+        if baseline is None:
+            baseline = self.baseline()
+        if not baseline or not current:
+            return []
+
+        base = np.fromiter(baseline.values(), dtype=float, count=len(baseline))
+        mean_all = float(base.mean())
+        std_all = float(base.std())
+
+        gates = list(current)
+        rates = np.fromiter(current.values(), dtype=float, count=len(gates))
+        base_rates = np.array([baseline.get(g, 0.0) for g in gates], dtype=float)
+        global_hit = (rates > mean_all + threshold_sigma * std_all) & (rates > base_rates)
+
+        per_gate_hit = np.zeros(len(gates), dtype=bool)
+        if self.count >= 3:
+            cols = np.array([self._index.get(g, -1) for g in gates], dtype=np.intp)
+            known = cols >= 0
+            g_mean = np.where(known, self._mean[cols], 0.0)
+            g_std = np.where(known, np.sqrt(np.maximum(self._m2[cols] / self.count, 0.0)), 0.0)
+            per_gate_hit = known & (g_std > 0) & (rates > g_mean + threshold_sigma * g_std)
+
+        anomalies = []
+        for i in np.flatnonzero(global_hit | per_gate_hit):
+            gate = gates[i]
+            rate = current[gate]
+            baseline_rate = baseline.get(gate, 0.0)
+            if global_hit[i] and per_gate_hit[i]:
+                method = "both"
+            elif global_hit[i]:
+                method = "global"
+            else:
+                method = "per_gate"
+            anomalies.append(
+                {
+                    "gate": gate,
+                    "current_rate": rate,
+                    "baseline_rate": baseline_rate,
+                    "delta": rate - baseline_rate,
+                    "sigma": (rate - mean_all) / std_all if std_all > 0 else float("inf"),
+                    "detection_method": method,
+                }
+            )
+        anomalies.sort(key=lambda x: x["delta"], reverse=True)
+        return anomalies
+
+    def rate_of_change(self, window: int = 5, threshold: float = 2.0) -> List[Dict]:
+        """anomaly_detector.detect_rate_of_change over the retained snapshots."""
+        if self.count < window + 1:
+            return []
+        rows = self._recent(self._len)
+        recent = rows[-window:]
+        older = rows[-2 * window : -window] if len(rows) >= 2 * window else rows[:window]
+
+        recent_mean = self._buf[recent].mean(axis=0)
+        older_mean = self._buf[older].mean(axis=0)
+        roc = recent_mean - older_mean
+        seen = self._present[recent].any(axis=0) | self._present[older].any(axis=0)
+
+        results = [
+            {
+                "gate": self.names[i],
+                "rate_of_change": round(float(roc[i]), 3),
+                "recent_mean": round(float(recent_mean[i]), 3),
+                "older_mean": round(float(older_mean[i]), 3),
+                "direction": "accelerating" if roc[i] > 0 else "decelerating",
+            }
+            for i in np.flatnonzero(seen & (np.abs(roc) >= threshold))
+        ]
+        results.sort(key=lambda x: abs(x["rate_of_change"]), reverse=True)
+        return results
+
+    def trends(self, threshold: float = 0.2) -> Dict[str, Dict]:
+        """anomaly_detector.detect_trend for every metric, from the running EMA."""
+        if not self.count:
+            return {}
+        magnitude = (self._ema - self._ema_first) / np.maximum(np.abs(self._ema_first), 1e-9)
+        return {
+            name: {
+                "direction": "rising"
+                if magnitude[i] > threshold
+                else ("falling" if magnitude[i] < -threshold else "stable"),
+                "magnitude": float(magnitude[i]),
+                "ema_first": float(self._ema_first[i]),
+                "ema_last": float(self._ema[i]),
+            }
+            for i, name in enumerate(self.names)
+        }
+
+    def drift(self, current: Dict[str, float], threshold: float = 0.3) -> Dict:
+        """drift_detector.gate_drift_report against the windowed baseline."""
+        if self._drift is None:
+            self._drift = DriftBaseline(self.baseline())
+        return self._drift.report(current, threshold)
+
+    def evaluate(
+        self,
+        current: Dict[str, float],
+        threshold_sigma: float = 2.0,
+        roc_window: int = 5,
+        roc_threshold: float = 2.0,
+        trend_threshold: float = 0.2,
+        drift_threshold: float = 0.3,
+    ) -> Dict:
+        """Score every metric of ``current`` against the ring in one call.
+
+        Returns a dict with keys anomalies, rate_of_change, trends, drift
+        and samples (snapshots pushed so far). ``current`` is not pushed.
+        """
+        return {
+            "anomalies": self.detect_anomalies(current, threshold_sigma=threshold_sigma),
+            "rate_of_change": self.rate_of_change(roc_window, roc_threshold),
+            "trends": self.trends(trend_threshold),
+            "drift": self.drift(current, drift_threshold),
+            "samples": self.count,
+        }
+
+    # -- persistence ---------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """Atomically write the ring to path (an .npz archive)."""
+        tmp = f"{path}.tmp.{os.getpid()}"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                names=np.array(self.names, dtype=str),
+                params=np.array([self.capacity, self.window, self._pos, self._len, self.count]),
+                alpha=np.array(self.alpha),
+                buf=self._buf,
+                present=self._present,
+                mean=self._mean,
+                m2=self._m2,
+                ema=self._ema,
+                ema_first=self._ema_first,
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "MetricRing":
+        """Ring saved at path, or a new MetricRing(**kwargs) if unreadable."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                capacity, window, pos, length, count = (int(v) for v in data["params"])
+                ring = cls(capacity, window, float(data["alpha"]))
+                ring.names = [str(n) for n in data["names"]]
+                ring._index = {n: i for i, n in enumerate(ring.names)}
+                ring._pos, ring._len, ring.count = pos, length, count
+                for attr in ("buf", "present", "mean", "m2", "ema", "ema_first"):
+                    setattr(ring, f"_{attr}", data[attr].copy())
+            return ring
+        except (OSError, KeyError, ValueError):
+            return cls(**kwargs)
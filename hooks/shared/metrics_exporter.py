@@ -125,8 +125,8 @@ def export_prometheus(output_path: Optional[str] = None) -> str:
     # Health score
     lines += ["# HELP torus_health_score Framework health score (0-100)", "# TYPE torus_health_score gauge"]
     try:
-        from shared.health_monitor import full_health_check
-        lines.append(f"torus_health_score {full_health_check('default').get('overall_score', 0)}")
+        from shared.health_snapshot import get_snapshot
+        lines.append(f"torus_health_score {get_snapshot('default').get('overall_score') or 0}")
     except Exception:
         lines.append("torus_health_score 0")
     lines.append("")
@@ -179,8 +179,8 @@ def export_json() -> dict:
     tc_val  = next((e.get("value", 0) for e in all_m.get("session.tool_calls", {}).values()), 0)
 
     try:
-        from shared.health_monitor import full_health_check
-        health_score = full_health_check("default").get("overall_score", 0)
+        from shared.health_snapshot import get_snapshot
+        health_score = get_snapshot("default").get("overall_score") or 0
     except Exception:
         health_score = 0
 
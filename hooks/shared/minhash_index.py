@@ -0,0 +1,250 @@
+"""MinHash signatures + banded LSH for near-duplicate memory detection.
+
+Each memory's word set (lowercase words of 3+ chars, the same shingling
+memory_consolidation uses for Jaccard) is reduced to a fixed-size MinHash
+signature once, and the signature is persisted next to a content hash so it
+is only recomputed when the memory's text changes. Candidate pairs come from
+banded LSH buckets over those signatures: near-linear in the number of
+memories instead of comparing every pair. Bands/rows are chosen per query
+from the Jaccard threshold, so one stored signature serves any threshold.
+
+Candidates are approximate; callers verify them with exact Jaccard.
+
+Public API:
+    from shared.minhash_index import (
+        word_set, minhash_signature, estimate_jaccard, lsh_params,
+        MinHashIndex, get_memory_index,
+    )
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import zlib
+
+import numpy as np
+
+NUM_PERM = 128
+DEFAULT_INDEX_PATH = os.path.expanduser("~/.claude/hooks/.minhash_index.db")
+LSH_RECALL = 0.99  # target probability that a pair at the threshold is surfaced
+
+_WORD_RE = re.compile(r"\b\w{3,}\b")
+_PRIME = np.uint64((1 << 61) - 1)
+_MASK = np.uint64(0xFFFFFFFF)
+_EMPTY = np.uint32(0xFFFFFFFF)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS minhash_sigs (
+    id    TEXT PRIMARY KEY,
+    hash  TEXT NOT NULL,
+    sig   BLOB NOT NULL
+);
+"""
+
+_perm_cache = {}
+
+
+def word_set(text):
+    """Extract lowercase word set from text."""
+    if not text:
+        return set()
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def _permutations(num_perm):
+    """Fixed (a, b) coefficients for num_perm universal hash permutations."""
+    perms = _perm_cache.get(num_perm)
+    if perms is None:
+        rng = np.random.RandomState(0x5EED)
+        a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        perms = _perm_cache[num_perm] = (a, b)
+    return perms
+
+
+def minhash_signature(tokens, num_perm=NUM_PERM):
+    """MinHash signature (uint32[num_perm]) of a token set. Empty set -> all 0xFFFFFFFF."""
+    if not tokens:
+        return np.full(num_perm, _EMPTY, dtype=np.uint32)
+    hv = np.fromiter(
+        (zlib.crc32(t.encode("utf-8")) for t in tokens), dtype=np.uint64, count=len(tokens)
+    )
+    a, b = _permutations(num_perm)
+    phv = (np.outer(hv, a) + b) % _PRIME & _MASK
+    return phv.min(axis=0).astype(np.uint32)
+
+
+def estimate_jaccard(sig_a, sig_b):
+    """Estimated Jaccard similarity from two signatures of equal length."""
+    return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+
+def lsh_params(threshold, num_perm=NUM_PERM, recall=LSH_RECALL):
+    """(bands, rows) with the most rows per band that still surfaces a pair
+    at `threshold` with probability >= recall. More rows = fewer false
+    candidates; at least one row per band."""
+    threshold = min(max(threshold, 0.01), 1.0)
+    for rows in range(num_perm, 0, -1):
+        bands = num_perm // rows
+        if 1.0 - (1.0 - threshold ** rows) ** bands >= recall:
+            return bands, rows
+    return num_perm, 1
+
+
+def content_hash(text):
+    """Short stable hash of a memory's text (change detection)."""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()[:16]
+
+
+class MinHashIndex:
+    """Persistent id -> MinHash signature store with LSH candidate search.
+
+    path=None keeps everything in memory. Writes go straight to SQLite, so
+    an index shared between processes (the memory server writing, session
+    end consolidating) converges on the next sync().
+    """
+
+    def __init__(self, path=None, num_perm=NUM_PERM, tokenize=word_set):
+        self.num_perm = num_perm
+        self.tokenize = tokenize
+        self._lock = threading.Lock()
+        self._hashes = {}  # id -> content hash
+        self._sigs = {}  # id -> np.uint32[num_perm]
+        self._conn = None
+        if path:
+            try:
+                if path != ":memory:":
+                    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                self._conn = sqlite3.connect(path, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.executescript(_SCHEMA)
+                self._load()
+            except sqlite3.Error:
+                self._conn = None
+
+    def _load(self):
+        for mid, h, blob in self._conn.execute("SELECT id, hash, sig FROM minhash_sigs"):
+            sig = np.frombuffer(blob, dtype=np.uint32)
+            if len(sig) == self.num_perm:
+                self._hashes[mid] = h
+                self._sigs[mid] = sig
+
+    def __len__(self):
+        return len(self._sigs)
+
+    def __contains__(self, memory_id):
+        return memory_id in self._sigs
+
+    def ids(self):
+        return list(self._sigs)
+
+    def signature(self, memory_id):
+        return self._sigs.get(memory_id)
+
+    def upsert(self, memory_id, text, _commit=True):
+        """Index or re-index a memory. Returns False if its text is unchanged."""
+        h = content_hash(text)
+        with self._lock:
+            if self._hashes.get(memory_id) == h:
+                return False
+            sig = minhash_signature(self.tokenize(text), self.num_perm)
+            self._hashes[memory_id] = h
+            self._sigs[memory_id] = sig
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO minhash_sigs (id, hash, sig) VALUES (?, ?, ?)",
+                        (memory_id, h, sig.tobytes()),
+                    )
+                    if _commit:
+                        self._conn.commit()
+                except sqlite3.Error:
+                    pass
+        return True
+
+    def remove(self, memory_id):
+        """Drop a memory from the index. Returns True if it was present."""
+        with self._lock:
+            present = self._sigs.pop(memory_id, None) is not None
+            self._hashes.pop(memory_id, None)
+            if present and self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM minhash_sigs WHERE id = ?", (memory_id,))
+                    self._conn.commit()
+                except sqlite3.Error:
+                    pass
+        return present
+
+    def sync(self, entries):
+        """Make the index mirror entries (dicts with 'id', 'document').
+
+        Only new or edited memories are re-hashed. Returns (updated, removed).
+        """
+        live = {}
+        updated = 0
+        for e in entries:
+            mid = e.get("id")
+            if mid:
+                live[mid] = True
+                if self.upsert(mid, e.get("document", "") or "", _commit=False):
+                    updated += 1
+        stale = [mid for mid in list(self._sigs) if mid not in live]
+        with self._lock:
+            for mid in stale:
+                self._sigs.pop(mid, None)
+                self._hashes.pop(mid, None)
+            if self._conn is not None:
+                try:
+                    self._conn.executemany(
+                        "DELETE FROM minhash_sigs WHERE id = ?", [(m,) for m in stale]
+                    )
+                    self._conn.commit()
+                except sqlite3.Error:
+                    pass
+        return updated, len(stale)
+
+    def candidate_pairs(self, threshold, ids=None):
+        """Pairs (id_a, id_b) sharing at least one LSH bucket, id_a < id_b.
+
+        ids restricts the search to a subset; empty-text memories are skipped.
+        """
+        pool = [m for m in (ids if ids is not None else self._sigs) if m in self._sigs]
+        pool = [m for m in pool if (self._sigs[m] != _EMPTY).any()]
+        if len(pool) < 2:
+            return set()
+        sigs = np.stack([self._sigs[m] for m in pool])
+        bands, rows = lsh_params(threshold, self.num_perm)
+        pairs = set()
+        for band in range(bands):
+            chunk = np.ascontiguousarray(sigs[:, band * rows : (band + 1) * rows])
+            keys = chunk.view(np.dtype((np.void, chunk.dtype.itemsize * rows))).ravel()
+            _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+            if counts.max() < 2:
+                continue
+            order = np.argsort(inverse, kind="stable")
+            bounds = np.cumsum(counts)
+            start = 0
+            for end, count in zip(bounds, counts):
+                if count >= 2:
+                    members = [pool[k] for k in order[start:end]]
+                    for x in range(len(members)):
+                        for y in range(x + 1, len(members)):
+                            a, b = members[x], members[y]
+                            pairs.add((a, b) if a < b else (b, a))
+                start = end
+        return pairs
+
+
+_memory_index = None
+_memory_index_lock = threading.Lock()
+
+
+def get_memory_index(path=None):
+    """Process-wide persistent index for the knowledge collection."""
+    global _memory_index
+    with _memory_index_lock:
+        if _memory_index is None:
+            _memory_index = MinHashIndex(path or DEFAULT_INDEX_PATH)
+        return _memory_index
@@ -0,0 +1,251 @@
+"""Reranker — cached, deadline-bounded cross-encoder rerank with lexical fallback.
+
+The NIM cross-encoder used to be called synchronously (10s timeout) on every
+search, re-scoring the same (query, document) pairs on repeat queries and
+blocking the whole search whenever the endpoint was slow.
+
+Reranker adds three things around the remote scorer:
+
+- RerankScoreCache memoizes logits per (normalized query, document id,
+  document revision). The revision is a hash of the passage text, so an
+  edited memory is re-scored automatically.
+- Only unseen pairs are sent, in one batched request, on a background
+  thread. The caller waits at most ``deadline`` seconds; a late response
+  still lands in the cache so the next identical query is fully cached.
+- When remote scores are not all available in time, candidates are ranked
+  by lexical_scores(): BM25 over the candidates already in hand plus a
+  term-proximity bonus. Remote logits and lexical scores are never mixed.
+
+Public API:
+    from shared.reranker import Reranker, RerankScoreCache, lexical_scores
+"""
+
+import collections
+import hashlib
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_DEADLINE = 0.8  # seconds to wait for remote scores
+DEFAULT_CACHE_ENTRIES = 8192
+DEFAULT_CACHE_TTL = 3600.0
+MAX_PASSAGE_CHARS = 2000
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+PROXIMITY_WEIGHT = 0.5
+
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    return _WS_RE.sub(" ", (query or "").strip().lower())
+
+
+def passage_text(candidate: dict) -> str:
+    return (candidate.get("content") or candidate.get("preview") or "")[
+        :MAX_PASSAGE_CHARS
+    ]
+
+
+def revision(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8", "replace")).hexdigest()[:12]
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+class RerankScoreCache:
+    """LRU of cross-encoder scores keyed by (query, doc id, revision)."""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_ENTRIES, ttl_seconds=DEFAULT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data = collections.OrderedDict()  # key -> (score, stored_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, count: bool = True) -> Optional[float]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or time.time() - entry[1] > self.ttl_seconds:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += count
+                return None
+            self._data.move_to_end(key)
+            self.hits += count
+            return entry[0]
+
+    def put_many(self, items: Dict[tuple, float]) -> None:
+        now = time.time()
+        with self._lock:
+            for key, score in items.items():
+                self._data[key] = (score, now)
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+def _proximity(query_terms: set, doc_tokens: List[str]) -> float:
+    """1 / (1 + shortest span covering all matched query terms) in [0, 1]."""
+    positions = [(i, t) for i, t in enumerate(doc_tokens) if t in query_terms]
+    needed = {t for _, t in positions}
+    if len(needed) < 2:
+        return 0.0
+    best = len(doc_tokens)
+    counts = collections.Counter()
+    left = 0
+    for right in range(len(positions)):
+        counts[positions[right][1]] += 1
+        while len(counts) == len(needed):
+            span = positions[right][0] - positions[left][0]
+            best = min(best, span)
+            lt = positions[left][1]
+            counts[lt] -= 1
+            if not counts[lt]:
+                del counts[lt]
+            left += 1
+    return 1.0 / (1.0 + max(0, best - len(needed) + 1))
+
+
+def lexical_scores(query: str, texts: Sequence[str]) -> List[float]:
+    """BM25 (IDF from the candidate set) plus a term-proximity bonus."""
+    q_terms = set(_tokens(query))
+    docs = [_tokens(t) for t in texts]
+    if not q_terms or not docs:
+        return [0.0] * len(docs)
+    n = len(docs)
+    avg_len = sum(len(d) for d in docs) / n or 1.0
+    df = collections.Counter(t for d in docs for t in set(d) if t in q_terms)
+    idf = {t: math.log(1.0 + (n - df[t] + 0.5) / (df[t] + 0.5)) for t in q_terms}
+    scores = []
+    for d in docs:
+        tf = collections.Counter(t for t in d if t in q_terms)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * len(d) / avg_len)
+        bm25 = sum(idf[t] * f * (BM25_K1 + 1) / (f + norm) for t, f in tf.items())
+        scores.append(bm25 * (1.0 + PROXIMITY_WEIGHT * _proximity(q_terms, d)))
+    return scores
+
+
+class Reranker:
+    """Rerank the head of a candidate list with cached remote scores.
+
+    Args:
+        score_fn: Callable(query, passages) -> list of scores aligned with
+            passages (the remote cross-encoder). None = lexical only.
+        deadline: Seconds to wait for remote scores before falling back.
+    """
+
+    def __init__(
+        self,
+        score_fn: Optional[Callable[[str, List[str]], List[float]]],
+        deadline: float = DEFAULT_DEADLINE,
+        cache: Optional[RerankScoreCache] = None,
+    ):
+        self.score_fn = score_fn
+        self.deadline = deadline
+        self.cache = cache or RerankScoreCache()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rerank")
+        self._inflight = {}  # key -> Future, so concurrent repeats share a call
+        self._lock = threading.Lock()
+        self.remote_calls = 0
+        self.fallbacks = 0
+
+    def _score_remote(self, query: str, keys: List[tuple], texts: List[str]):
+        try:
+            scores = self.score_fn(query, texts)
+            if len(scores) == len(keys):
+                self.cache.put_many(dict(zip(keys, scores)))
+        finally:
+            with self._lock:
+                for k in keys:
+                    self._inflight.pop(k, None)
+
+    def scores(self, query: str, candidates: Sequence[dict]) -> Tuple[List[float], str]:
+        """Scores aligned with candidates and their source ("remote"/"lexical")."""
+        nq = normalize_query(query)
+        texts = [passage_text(c) for c in candidates]
+        keys = [(nq, str(c.get("id", "")), revision(t)) for c, t in zip(candidates, texts)]
+        # Empty passages are never sent; they rank last under remote scoring
+        empty = {i for i, t in enumerate(texts) if not t}
+        cached = [0.0 if i in empty else self.cache.get(k) for i, k in enumerate(keys)]
+
+        if self.score_fn is not None and any(s is None for s in cached):
+            waits = set()
+            send_keys, send_texts = [], []
+            with self._lock:
+                for k, t, s in zip(keys, texts, cached):
+                    if s is not None:
+                        continue
+                    fut = self._inflight.get(k)
+                    if fut is not None:
+                        waits.add(fut)
+                    elif k not in send_keys:
+                        send_keys.append(k)
+                        send_texts.append(t)
+                if send_keys:
+                    fut = self._executor.submit(
+                        self._score_remote, query, send_keys, send_texts
+                    )
+                    self.remote_calls += 1
+                    for k in send_keys:
+                        self._inflight[k] = fut
+                    waits.add(fut)
+            end = time.monotonic() + self.deadline
+            for fut in waits:
+                try:
+                    fut.result(timeout=max(0.0, end - time.monotonic()))
+                except FutureTimeout:
+                    break
+                except Exception:
+                    pass
+            cached = [
+                self.cache.get(k, count=False) if s is None else s
+                for k, s in zip(keys, cached)
+            ]
+
+        if self.score_fn is not None and all(s is not None for s in cached):
+            if empty and len(empty) < len(cached):
+                floor = min(s for i, s in enumerate(cached) if i not in empty) - 1.0
+                cached = [floor if i in empty else s for i, s in enumerate(cached)]
+            return cached, "remote"
+        self.fallbacks += 1
+        return lexical_scores(query, texts), "lexical"
+
+    def rerank(self, query: str, candidates: List[dict], rerank_k: int) -> List[dict]:
+        """Reorder candidates[:rerank_k] by score; the tail keeps its order."""
+        head = candidates[:rerank_k]
+        if not head:
+            return candidates
+        scores, source = self.scores(query, head)
+        order = sorted(range(len(head)), key=lambda i: scores[i], reverse=True)
+        reranked = []
+        for i in order:
+            head[i]["rerank_score"] = round(float(scores[i]), 4)
+            head[i]["rerank_source"] = source
+            reranked.append(head[i])
+        return reranked + candidates[rerank_k:]
+
+    def stats(self) -> dict:
+        return {
+            **self.cache.stats(),
+            "remote_calls": self.remote_calls,
+            "fallbacks": self.fallbacks,
+        }
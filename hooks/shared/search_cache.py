@@ -5,6 +5,16 @@ a session. Typical use: when Claude searches for the same concept
 multiple times during a fix cycle, this avoids redundant embedding
 computation (~30ms per search).
 
+Two levels:
+- SearchCache: exact key (lowercased query + params), LRU + TTL.
+- SemanticSearchCache: keyed by query embedding. A paraphrased query whose
+  vector is within `similarity_threshold` cosine of a cached one (same
+  params) reuses that result, skipping HyDE + KNN + rerank.
+
+Both levels evict in O(1) (OrderedDict LRU) and support selective
+invalidation: entries remember the memory ids and tags their results
+contain, so a write only drops the entries it can actually affect.
+
 Cache is purely in-memory (no persistence). Each memory_server process
 gets its own cache. TTL ensures staleness is bounded.
 
@@ -21,27 +31,113 @@ Usage:
 
     # Compute result
     result = expensive_search(query)
-    cache.put(key, result)
+    cache.put(key, result, ids=result_ids, tags=result_tags)
 
-    # Invalidate on write
+    # Invalidate on write (selective, or everything with no args)
+    cache.invalidate(ids=["abc"], tags=["type:fix"])
     cache.invalidate()
 """
 
 import hashlib
+import threading
 import time
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set
+
+try:
+    import numpy as np
+except ImportError:  # semantic level disabled without numpy
+    np = None
+
+# Tags present on nearly every memory — overlapping on these says nothing
+# about whether a cached result is affected, so they never trigger invalidation.
+BROAD_TAG_PREFIXES = ("project:", "subproject:", "area:")
+
+
+def result_ids_and_tags(result: Any):
+    """Collect memory ids and tags referenced by a search result dict."""
+    ids: Set[str] = set()
+    tags: Set[str] = set()
+    if not isinstance(result, dict):
+        return ids, tags
+    for entry in result.get("results", []) or []:
+        if not isinstance(entry, dict):
+            continue
+        if entry.get("id"):
+            ids.add(str(entry["id"]))
+        tags.update(_split_tags(entry.get("tags", "")))
+    return ids, tags
+
+
+def _split_tags(tags) -> Set[str]:
+    if not tags:
+        return set()
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    out = set()
+    for tag in tags:
+        tag = str(tag).strip().lower()
+        if tag and not tag.startswith(BROAD_TAG_PREFIXES):
+            out.add(tag)
+    return out
+
+
+class _DependencyIndex:
+    """Reverse index: memory id / tag -> cache keys whose results contain it."""
+
+    def __init__(self):
+        self._by_id: Dict[str, Set[Any]] = {}
+        self._by_tag: Dict[str, Set[Any]] = {}
+        self._deps: Dict[Any, tuple] = {}
+
+    def add(self, key, ids: Iterable[str], tags: Iterable[str]) -> None:
+        self.remove(key)
+        ids = frozenset(str(i) for i in ids or ())
+        tags = frozenset(_split_tags(list(tags or ())))
+        self._deps[key] = (ids, tags)
+        for i in ids:
+            self._by_id.setdefault(i, set()).add(key)
+        for t in tags:
+            self._by_tag.setdefault(t, set()).add(key)
+
+    def remove(self, key) -> None:
+        deps = self._deps.pop(key, None)
+        if deps is None:
+            return
+        for index, values in ((self._by_id, deps[0]), (self._by_tag, deps[1])):
+            for v in values:
+                keys = index.get(v)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del index[v]
+
+    def affected(self, ids=None, tags=None) -> Set[Any]:
+        keys: Set[Any] = set()
+        for i in ids or ():
+            keys |= self._by_id.get(str(i), set())
+        for t in _split_tags(tags):
+            keys |= self._by_tag.get(t, set())
+        return keys
+
+    def clear(self) -> None:
+        self._by_id.clear()
+        self._by_tag.clear()
+        self._deps.clear()
 
 
 class SearchCache:
-    """TTL-based in-memory cache for search results."""
+    """TTL-based in-memory LRU cache for search results."""
 
     def __init__(self, ttl_seconds: float = 120.0, max_entries: int = 200):
         self._ttl = ttl_seconds
         self._max_entries = max_entries
-        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._deps = _DependencyIndex()
         self._hits = 0
         self._misses = 0
         self._invalidations = 0
+        self._evictions = 0
 
     def make_key(self, query: str, **kwargs) -> str:
         """Build a stable cache key from query + params.
@@ -69,38 +165,71 @@ class SearchCache:
             self._misses += 1
             return None
         if time.monotonic() - entry["stored_at"] > self._ttl:
-            del self._cache[key]
+            self._drop(key)
             self._misses += 1
             return None
+        self._cache.move_to_end(key)
         self._hits += 1
         return entry["value"]
 
-    def put(self, key: str, value: Any) -> None:
+    def put(
+        self,
+        key: str,
+        value: Any,
+        ids: Optional[Iterable[str]] = None,
+        tags: Optional[Iterable[str]] = None,
+    ) -> None:
         """Store a result in the cache.
 
-        Evicts oldest entries if max_entries is exceeded.
+        Args:
+            ids/tags: Memory ids and tags the result depends on, for selective
+                invalidation. Derived from ``value["results"]`` when omitted.
+
+        Evicts the least recently used entry if max_entries is exceeded.
         """
-        # Evict if at capacity
-        if len(self._cache) >= self._max_entries:
-            self._evict_oldest()
+        if ids is None and tags is None:
+            ids, tags = result_ids_and_tags(value)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+        while len(self._cache) >= self._max_entries and key not in self._cache:
+            self._evict_lru()
         self._cache[key] = {
             "value": value,
             "stored_at": time.monotonic(),
         }
+        self._deps.add(key, ids or (), tags or ())
 
-    def invalidate(self) -> None:
-        """Clear the entire cache (call after remember_this or writes)."""
-        self._cache.clear()
+    def invalidate(self, ids=None, tags=None) -> int:
+        """Drop cached entries affected by a write.
+
+        With no arguments, clears the entire cache. Otherwise only entries whose
+        results contain one of ``ids`` or share one of ``tags`` are dropped.
+
+        Returns:
+            Number of entries removed.
+        """
         self._invalidations += 1
+        if ids is None and tags is None:
+            removed = len(self._cache)
+            self._cache.clear()
+            self._deps.clear()
+            return removed
+        affected = self._deps.affected(ids, tags)
+        for key in affected:
+            self._drop(key)
+        return len(affected)
+
+    def _drop(self, key: str) -> None:
+        self._cache.pop(key, None)
+        self._deps.remove(key)
 
-    def _evict_oldest(self) -> None:
-        """Remove the oldest 25% of entries."""
+    def _evict_lru(self) -> None:
+        """Remove the least recently used entry (O(1))."""
         if not self._cache:
             return
-        entries = sorted(self._cache.items(), key=lambda kv: kv[1]["stored_at"])
-        evict_count = max(1, len(entries) // 4)
-        for key, _ in entries[:evict_count]:
-            del self._cache[key]
+        key, _ = self._cache.popitem(last=False)
+        self._deps.remove(key)
+        self._evictions += 1
 
     def stats(self) -> dict:
         """Return cache statistics."""
@@ -113,7 +242,185 @@ class SearchCache:
             "max_entries": self._max_entries,
             "ttl_seconds": self._ttl,
             "invalidations": self._invalidations,
+            "evictions": self._evictions,
         }
 
     def __len__(self) -> int:
         return len(self._cache)
+
+
+class SemanticSearchCache:
+    """Second-level cache keyed by query embedding (cosine similarity).
+
+    Vectors live in one preallocated float32 matrix so a lookup is a single
+    matrix-vector product over at most ``max_entries`` rows. Results are only
+    reused for the same ``scope`` (top_k, mode, filters), never across them.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.92,
+        ttl_seconds: float = 300.0,
+        max_entries: int = 256,
+        invalidation_similarity: float = 0.6,
+    ):
+        self._threshold = similarity_threshold
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._invalidation_sim = invalidation_similarity
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._deps = _DependencyIndex()
+        self._free = list(range(max_entries - 1, -1, -1))
+        self._matrix = None  # (max_entries, dim) allocated on first put
+        self._active = None  # bool mask of occupied rows
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return np is not None and self._max_entries > 0
+
+    @staticmethod
+    def _unit(vector):
+        vec = np.asarray(vector, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vec))
+        if norm < 1e-10:
+            return None
+        return vec / norm
+
+    def _similarities(self, unit_vec):
+        if self._matrix is None or unit_vec.shape[0] != self._matrix.shape[1]:
+            return None
+        rows = np.flatnonzero(self._active)
+        if rows.size == 0:
+            return None
+        return rows, self._matrix[rows] @ unit_vec
+
+    def get(self, vector, scope: str = "") -> Optional[Any]:
+        """Return the result cached for the most similar query vector, or None."""
+        if not self.enabled or vector is None:
+            return None
+        unit = self._unit(vector)
+        with self._lock:
+            found = self._similarities(unit) if unit is not None else None
+            if found is not None:
+                rows, sims = found
+                now = time.monotonic()
+                for pos in np.argsort(-sims):
+                    if sims[pos] < self._threshold:
+                        break
+                    slot = int(rows[pos])
+                    entry = self._entries.get(slot)
+                    if entry is None or entry["scope"] != scope:
+                        continue
+                    if now - entry["stored_at"] > self._ttl:
+                        self._drop(slot)
+                        continue
+                    self._entries.move_to_end(slot)
+                    self._hits += 1
+                    return entry["value"]
+            self._misses += 1
+            return None
+
+    def put(
+        self,
+        vector,
+        value: Any,
+        scope: str = "",
+        ids: Optional[Iterable[str]] = None,
+        tags: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Cache ``value`` under the query embedding ``vector``."""
+        if not self.enabled or vector is None:
+            return
+        unit = self._unit(vector)
+        if unit is None:
+            return
+        if ids is None and tags is None:
+            ids, tags = result_ids_and_tags(value)
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != unit.shape[0]:
+                self._reset(unit.shape[0])
+            if not self._free:
+                self._evict_lru()
+            slot = self._free.pop()
+            self._matrix[slot] = unit
+            self._active[slot] = True
+            self._entries[slot] = {
+                "value": value,
+                "scope": scope,
+                "stored_at": time.monotonic(),
+            }
+            self._deps.add(slot, ids or (), tags or ())
+
+    def invalidate(self, ids=None, tags=None, vector=None) -> int:
+        """Drop entries a write can affect.
+
+        An entry is dropped when its results contain one of ``ids``, share one
+        of ``tags``, or when its query vector is within
+        ``invalidation_similarity`` of the written memory's ``vector`` (the new
+        memory would likely rank for that query). No arguments clears all.
+
+        Returns:
+            Number of entries removed.
+        """
+        with self._lock:
+            self._invalidations += 1
+            if ids is None and tags is None and vector is None:
+                removed = len(self._entries)
+                if self._matrix is not None:
+                    self._reset(self._matrix.shape[1])
+                return removed
+            affected = self._deps.affected(ids, tags)
+            if vector is not None and self.enabled:
+                unit = self._unit(vector)
+                found = self._similarities(unit) if unit is not None else None
+                if found is not None:
+                    rows, sims = found
+                    affected |= {int(s) for s in rows[sims >= self._invalidation_sim]}
+            for slot in affected:
+                self._drop(slot)
+            return len(affected)
+
+    def _reset(self, dim: int) -> None:
+        self._matrix = np.zeros((self._max_entries, dim), dtype=np.float32)
+        self._active = np.zeros(self._max_entries, dtype=bool)
+        self._entries.clear()
+        self._deps.clear()
+        self._free = list(range(self._max_entries - 1, -1, -1))
+
+    def _drop(self, slot: int) -> None:
+        if self._entries.pop(slot, None) is None:
+            return
+        self._deps.remove(slot)
+        self._active[slot] = False
+        self._free.append(slot)
+
+    def _evict_lru(self) -> None:
+        if not self._entries:
+            return
+        slot = next(iter(self._entries))
+        self._drop(slot)
+        self._evictions += 1
+
+    def stats(self) -> dict:
+        """Return cache statistics."""
+        total = self._hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / total if total > 0 else 0.0,
+            "cached": len(self._entries),
+            "max_entries": self._max_entries,
+            "ttl_seconds": self._ttl,
+            "similarity_threshold": self._threshold,
+            "invalidations": self._invalidations,
+            "evictions": self._evictions,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -9,15 +9,13 @@ Public API:
     from shared.search_pipeline import SearchPipeline
 """
 
-import json
 import os
-import subprocess
 import sys as _sys
 import re
 
 from shared.context_compressor import compress_results
 from shared.scoring_engine import ScoringContext, score_result
-from shared.search_cache import SearchCache
+from shared.search_cache import SearchCache, SemanticSearchCache
 
 
 def _derive_query_tags(query, results):
@@ -82,6 +80,10 @@ class SearchPipeline:
         self.config = config or {}
         self.h = helpers or {}
         self.cache = SearchCache(ttl_seconds=120, max_entries=200)
+        self.semantic_cache = SemanticSearchCache(
+            similarity_threshold=self.config.get("semantic_cache_threshold", 0.92)
+        )
+        self.reranker = None  # shared.reranker.Reranker, created on first use
 
     def search(
         self,
@@ -176,6 +178,32 @@ class SearchPipeline:
             self._touch_timestamp()
             return self._search_transcript(query, count, config)
 
+        # Semantic cache: a paraphrase of a recent query reuses its result
+        # (skips decomposition, KNN and rerank). Keyed on the raw query
+        # embedding, which is also the retrieval vector, so it is only
+        # computed when HyDE will not replace it with a hypothetical-document
+        # embedding (that would cost a second embedding call per miss).
+        _raw_query_vec = None
+        _sem_scope = f"{mode}|{top_k}|{match_all}|{memory_type}|{state_type}"
+        _embed_fn = h.get("embed_text")
+        if (
+            _embed_fn
+            and mode in ("semantic", "hybrid")
+            and not counterfactual
+            and config.get("semantic_cache", True)
+            and self.semantic_cache.enabled
+            and not self._hyde_applies(query, mode)
+        ):
+            try:
+                _raw_query_vec = _embed_fn(query)
+            except Exception:
+                _raw_query_vec = None
+            _sem_hit = self.semantic_cache.get(_raw_query_vec, scope=_sem_scope)
+            if _sem_hit is not None:
+                self.cache.put(_cache_key, _sem_hit)
+                self._touch_timestamp()
+                return _sem_hit
+
         # ── Step 1a: Query decomposition (split compound queries) ──
         if mode not in ("tags",):
             sub_queries = self._decompose_query(query)
@@ -212,9 +240,10 @@ class SearchPipeline:
         _where = _where or None
 
         # Embed once for all vector searches
-        _embed_fn = h.get("embed_text")
         _query_vec = None
-        if _embed_fn and mode in ("semantic", "hybrid", ""):
+        if _raw_query_vec is not None and not _hyde_doc:
+            _query_vec = _raw_query_vec
+        elif _embed_fn and mode in ("semantic", "hybrid", ""):
             try:
                 _query_vec = _embed_fn(_hyde_doc if _hyde_doc else query)
             except Exception:
@@ -299,29 +328,30 @@ class SearchPipeline:
         try:
             _ltp_factors = {}
             if self.ltp:
-                for entry in formatted:
-                    mem_id = entry.get("id", "")
-                    if mem_id:
-                        try:
-                            _ltp_factors[mem_id] = self.ltp.get_decay_factor(mem_id)
-                        except Exception:
-                            pass
+                try:
+                    _states = self.ltp.get_states(e.get("id", "") for e in formatted)
+                    _ltp_factors = {
+                        mid: st["decay_factor"] for mid, st in _states.items()
+                    }
+                except Exception:
+                    pass
 
             _graph_scores = {}
             if self.graph:
                 top_ids = {r.get("id") for r in formatted[:5] if r.get("id")}
-                for entry in formatted:
-                    mem_id = entry.get("id", "")
-                    if mem_id:
-                        try:
-                            neighbors = self.graph._get_neighbors(mem_id)
-                            if neighbors:
-                                neighbor_ids = {n[0] for n in neighbors}
-                                connected = len(neighbor_ids & top_ids - {mem_id})
-                                if connected > 0:
-                                    _graph_scores[mem_id] = connected * 0.03
-                        except Exception:
-                            pass
+                try:
+                    # One batched lookup (adjacency cache + single IN query)
+                    all_neighbors = self.graph.get_neighbors_many(
+                        entry.get("id", "") for entry in formatted
+                    )
+                except Exception:
+                    all_neighbors = {}
+                for mem_id, neighbors in all_neighbors.items():
+                    if neighbors:
+                        neighbor_ids = {n[0] for n in neighbors}
+                        connected = len(neighbor_ids & top_ids - {mem_id})
+                        if connected > 0:
+                            _graph_scores[mem_id] = connected * 0.03
 
             _ltp_blend = 0.3
             if self.adaptive:
@@ -478,63 +508,95 @@ class SearchPipeline:
             result["compressed_results"] = compress_results(formatted)
 
         self.cache.put(_cache_key, result)
+        if _raw_query_vec is not None:
+            self.semantic_cache.put(_raw_query_vec, result, scope=_sem_scope)
         return result
 
+    def invalidate_cache(self, ids=None, tags=None, vector=None):
+        """Drop cached results a write can affect (fail-open).
+
+        Args:
+            ids: Memory ids updated or deleted by the write.
+            tags: Tags of the written memory (str or list).
+            vector: Embedding of a newly stored memory, if available.
+        """
+        try:
+            if ids is None and tags is None and vector is None:
+                self.cache.invalidate()
+                self.semantic_cache.invalidate()
+                return
+            self.cache.invalidate(ids=ids or (), tags=tags or ())
+            self.semantic_cache.invalidate(ids=ids or (), tags=tags or (), vector=vector)
+        except Exception:
+            pass
+
+    def cache_stats(self):
+        """Exact + semantic cache statistics for health reporting."""
+        return {
+            "exact": self.cache.stats(),
+            "semantic": self.semantic_cache.stats(),
+            "rerank": self.reranker.stats() if self.reranker is not None else {},
+        }
+
     # ── Internal helpers ──────────────────────────────────────────────────
 
     def _rerank_nim(self, query, candidates, top_k):
-        """Rerank candidates using NVIDIA NIM cross-encoder. Fail-open."""
+        """Rerank candidates using NVIDIA NIM cross-encoder. Fail-open.
+
+        Scores are cached per (query, id, revision) and only unseen pairs
+        are sent; if the endpoint misses the rerank_deadline_ms budget the
+        head is ranked by a local BM25/proximity scorer instead.
+        """
         config = self.config
         if not config.get("nim_rerank", False):
             return candidates
         if len(candidates) <= 3:
             return candidates
-
-        rerank_k = min(len(candidates), max(top_k * 2, 30))
-        passages = []
-        for c in candidates[:rerank_k]:
-            text = c.get("content") or c.get("preview") or ""
-            if text:
-                passages.append({"text": text[:2000]})
-        if not passages:
+        if not config.get("nim_api_key", ""):
             return candidates
 
+        rerank_k = min(len(candidates), max(top_k * 2, 30))
         try:
-            import requests
+            if self.reranker is None:
+                from shared.reranker import Reranker
 
-            nim_key = config.get("nim_api_key", "")
-            if not nim_key:
-                return candidates
-            resp = requests.post(
-                "https://ai.api.nvidia.com/v1/retrieval/nvidia/llama-3_2-nv-rerankqa-1b-v2/reranking",
-                headers={
-                    "Authorization": f"Bearer {nim_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": "nvidia/llama-3.2-nv-rerankqa-1b-v2",
-                    "query": {"text": query},
-                    "passages": passages,
-                    "truncate": "END",
-                },
-                timeout=10,
-            )
-            resp.raise_for_status()
-            rankings = resp.json().get("rankings", [])
-            reranked = []
-            for r in sorted(rankings, key=lambda x: x.get("logit", 0), reverse=True):
-                idx = r.get("index", 0)
-                if idx < len(candidates):
-                    candidates[idx]["rerank_score"] = r.get("logit", 0)
-                    reranked.append(candidates[idx])
-            remaining = [c for c in candidates[rerank_k:]]
-            return reranked + remaining
+                self.reranker = Reranker(self._nim_rerank_scores)
+            self.reranker.deadline = config.get("rerank_deadline_ms", 800) / 1000.0
+            return self.reranker.rerank(query, candidates, rerank_k)
         except Exception as e:
             print(
                 f"[SearchPipeline] NIM rerank failed (fail-open): {e}", file=_sys.stderr
             )
             return candidates
 
+    def _nim_rerank_scores(self, query, passages):
+        """One batched NIM rerank call; logits aligned with passages."""
+        import requests
+
+        resp = requests.post(
+            "https://ai.api.nvidia.com/v1/retrieval/nvidia/llama-3_2-nv-rerankqa-1b-v2/reranking",
+            headers={
+                "Authorization": f"Bearer {self.config.get('nim_api_key', '')}",
+                "Content-Type": "application/json",
+            },
+            json={
+                "model": "nvidia/llama-3.2-nv-rerankqa-1b-v2",
+                "query": {"text": query},
+                "passages": [{"text": p} for p in passages],
+                "truncate": "END",
+            },
+            timeout=10,
+        )
+        resp.raise_for_status()
+        logits = [None] * len(passages)
+        for r in resp.json().get("rankings", []):
+            idx = r.get("index", -1)
+            if 0 <= idx < len(passages):
+                logits[idx] = r.get("logit", 0)
+        if any(v is None for v in logits):
+            raise ValueError("incomplete rerank response")
+        return logits
+
     def _expand_query(self, query):
         """Expand query with LLM-generated related terms. Groq primary, NIM fallback. Fail-open."""
         config = self.config
@@ -728,12 +790,18 @@ class SearchPipeline:
             "compressed_results": compress_results(all_results) if all_results else [],
         }
 
+    def _hyde_applies(self, query, mode):
+        """True when step 1c will try HyDE for this query and mode."""
+        return (
+            mode in ("semantic", "")
+            and bool(self.config.get("hyde", False))
+            and len(query.split()) <= 30
+        )
+
     def _hyde_generate(self, query):
         """Generate a hypothetical document for HyDE embedding. Fail-open."""
         config = self.config
-        if not config.get("hyde", False):
-            return None
-        if len(query.split()) > 30:
+        if not self._hyde_applies(query, ""):
             return None
 
         if not hasattr(self, "_hyde_cache"):
@@ -1019,38 +1087,26 @@ class SearchPipeline:
         if not _run:
             return 0
         try:
-            _tg_search = os.path.join(
-                os.path.expanduser("~"),
-                ".claude",
-                "integrations",
-                "telegram-bot",
-                "search.py",
-            )
-            if os.path.isfile(_tg_search):
-                _tg_result = subprocess.run(
-                    [_sys.executable, _tg_search, query, "--json", "--limit", "5"],
-                    capture_output=True,
-                    text=True,
-                    timeout=8,
-                    stdin=subprocess.DEVNULL,
-                )
-                if _tg_result.returncode == 0 and _tg_result.stdout.strip():
-                    _tg_data = json.loads(_tg_result.stdout)
-                    for tr in _tg_data.get("results", []):
-                        _bm25 = abs(float(tr.get("bm25", 0)))
-                        _relevance = min(1.0, _bm25 / 20.0) if _bm25 > 0 else 0.2
-                        formatted.append(
-                            {
-                                "id": f"tg_{tr.get('msg_id', '?')}",
-                                "preview": (tr.get("text", "")[:120] + "...")
-                                if len(tr.get("text", "")) > 120
-                                else tr.get("text", ""),
-                                "relevance": round(_relevance, 4),
-                                "source": "telegram_l3",
-                                "timestamp": tr.get("date", ""),
-                            }
-                        )
-                        count += 1
+            from shared.telegram_search import get_searcher
+
+            searcher = get_searcher()
+            if searcher is not None:
+                timeout = config.get("tg_l3_timeout_ms", 250) / 1000.0
+                for hit in searcher.iter_search(query, limit=5, timeout=timeout):
+                    _bm25 = abs(hit.bm25)
+                    _relevance = min(1.0, _bm25 / 20.0) if _bm25 > 0 else 0.2
+                    formatted.append(
+                        {
+                            "id": f"tg_{hit.msg_id or '?'}",
+                            "preview": (hit.text[:120] + "...")
+                            if len(hit.text) > 120
+                            else hit.text,
+                            "relevance": round(_relevance, 4),
+                            "source": "telegram_l3",
+                            "timestamp": hit.date,
+                        }
+                    )
+                    count += 1
         except Exception:
             pass
         return count
@@ -6,6 +6,11 @@ Analyses session patterns over time from multiple data sources:
 - Observation capture queue (.capture_queue.jsonl)
 - Per-session state files (state_<session_id>.json)
 
+Per-session state metrics, capture-queue counts and frustration signals are
+answered from the rolling-window rollups in shared.analytics_rollup (state
+files re-parsed only when they change, queue observations recorded as they
+are written); the raw loaders below remain as the fallback.
+
 Public API:
   get_session_summary(session_id=None) -> Dict
       Returns a rich dict of per-session (or aggregate) metrics drawn from
@@ -31,6 +36,8 @@ from collections import Counter
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
+from shared.analytics_rollup import frustration_scores, queue_counts, session_metrics
+
 
 # ── File-system paths ────────────────────────────────────────────────────────
 
@@ -153,6 +160,49 @@ def _load_all_state_files() -> Dict[str, Dict]:
     return result
 
 
+def _session_metrics_map() -> Dict[str, Dict]:
+    """Map session_id -> _state_session_metrics() for every live state file.
+
+    Served from the session rollup (only changed files are re-parsed);
+    duration_minutes is brought up to date on every call.
+    """
+    dirs = [_STATE_DIR] if _HOOKS_DIR == _STATE_DIR else [_STATE_DIR, _HOOKS_DIR]
+    metrics = session_metrics(dirs, _state_session_metrics)
+    if metrics is None:
+        return {
+            sid: _state_session_metrics(sid, state)
+            for sid, state in _load_all_state_files().items()
+        }
+    now = time.time()
+    for m in metrics.values():
+        start = m.get("session_start", 0)
+        m["duration_minutes"] = round((now - start) / 60.0, 2) if start > 0 else 0.0
+    return metrics
+
+
+def _capture_queue_counts(session_id: Optional[str] = None) -> List[Tuple]:
+    """(session_id, tool, sentiment, entries, errors) rows for the capture queue.
+
+    Served from the queue rollup (retention window); falls back to the queue
+    tail when the rollup store is unavailable.
+    """
+    rows = queue_counts(session_id)
+    if rows is not None:
+        return rows
+    entries: Counter = Counter()
+    errors: Counter = Counter()
+    for entry in _load_capture_queue():
+        meta = entry.get("metadata", {})
+        sid = meta.get("session_id", "")
+        if session_id and sid != session_id:
+            continue
+        key = (sid, meta.get("tool_name", "unknown"), meta.get("sentiment", "neutral"))
+        entries[key] += 1
+        if meta.get("has_error", "false") == "true":
+            errors[key] += 1
+    return [key + (n, errors[key]) for key, n in entries.items()]
+
+
 def _state_session_metrics(session_id: str, state: Dict) -> Dict[str, Any]:
     """Extract per-session metric fields from a loaded state dict.
 
@@ -241,19 +291,20 @@ def _state_session_metrics(session_id: str, state: Dict) -> Dict[str, Any]:
 
 def aggregate_frustration(session_id: Optional[str] = None) -> Dict[str, Any]:
     """Aggregate frustration scores from capture queue. Display as bands not decimals."""
-    queue = _load_capture_queue()
-    if session_id:
-        queue = [
-            e for e in queue if e.get("metadata", {}).get("session_id") == session_id
-        ]
-
-    scores = []
-    for entry in queue:
-        meta = entry.get("metadata", {})
-        if meta.get("tool_name") == "UserPrompt":
-            s = meta.get("frustration_score")
-            if s is not None:
-                scores.append(float(s))
+    scores = frustration_scores(session_id)
+    if scores is None:
+        queue = _load_capture_queue()
+        if session_id:
+            queue = [
+                e for e in queue if e.get("metadata", {}).get("session_id") == session_id
+            ]
+        scores = []
+        for entry in queue:
+            meta = entry.get("metadata", {})
+            if meta.get("tool_name") == "UserPrompt":
+                s = meta.get("frustration_score")
+                if s is not None:
+                    scores.append(float(s))
 
     if not scores:
         return {"band": "calm", "avg": 0.0, "trend": "stable", "count": 0}
@@ -307,9 +358,11 @@ def get_session_summary(
        across all sessions (since these are never reset).
     2. **.capture_queue.jsonl** — observation entries; used for sentiment
        distribution, error-rate, and per-session tool call counts derived
-       from the queue metadata.
+       from the queue metadata (via the queue rollup, which counts every
+       observation written within the retention window).
     3. **state_<session_id>.json** — per-session state; used for tool_distribution,
        total_tool_calls, warnings, files read/edited, memory usage, etc.
+       (via the session rollup, re-parsed only when a file changes).
 
     Args:
         session_id:
@@ -317,8 +370,7 @@ def get_session_summary(
             session only.  Pass ``None`` to return aggregate figures across all
             live sessions.
         include_capture_queue:
-            Whether to parse the capture queue (can be slow for large queues).
-            Defaults to True.
+            Whether to include capture queue stats.  Defaults to True.
 
     Returns:
         Dict with the following top-level keys:
@@ -389,20 +441,16 @@ def get_session_summary(
     )[:10]
 
     # --- 2. State files ---
-    all_states = _load_all_state_files()
-    all_session_metrics: List[Dict] = []
-    for sid, sdata in all_states.items():
-        # Skip test fixtures (state_test-* files)
-        if sid.startswith("test-"):
-            continue
-        all_session_metrics.append(_state_session_metrics(sid, sdata))
+    all_metrics = _session_metrics_map()
+    # Skip test fixtures (state_test-* files)
+    all_session_metrics: List[Dict] = [
+        m for sid, m in all_metrics.items() if not sid.startswith("test-")
+    ]
 
     # Find the specific session if requested
     target_state_metrics: Optional[Dict] = None
     if session_id is not None:
-        target_state = all_states.get(session_id)
-        if target_state is not None:
-            target_state_metrics = _state_session_metrics(session_id, target_state)
+        target_state_metrics = all_metrics.get(session_id)
     else:
         # For aggregate, pick the most recently started session as "current"
         if all_session_metrics:
@@ -413,35 +461,21 @@ def get_session_summary(
     # --- 3. Capture queue ---
     cq_stats: Dict[str, Any] = {}
     if include_capture_queue:
-        queue_entries = _load_capture_queue()
-        if session_id:
-            scoped = [
-                e
-                for e in queue_entries
-                if e.get("metadata", {}).get("session_id") == session_id
-            ]
-        else:
-            scoped = queue_entries
-
         tool_ctr: Counter = Counter()
         sentiment_ctr: Counter = Counter()
         error_count = 0
+        total_scoped = 0
         distinct_sessions: set = set()
-        for entry in scoped:
-            meta = entry.get("metadata", {})
-            tool_name = meta.get("tool_name", "unknown")
+        for sid_, tool_name, sentiment, count, errors in _capture_queue_counts(session_id):
+            total_scoped += count
             if tool_name:
-                tool_ctr[tool_name] += 1
-            sentiment = meta.get("sentiment", "neutral")
+                tool_ctr[tool_name] += count
             if sentiment:
-                sentiment_ctr[sentiment] += 1
-            if meta.get("has_error", "false") == "true":
-                error_count += 1
-            sid_ = meta.get("session_id", "")
+                sentiment_ctr[sentiment] += count
+            error_count += errors
             if sid_:
                 distinct_sessions.add(sid_)
 
-        total_scoped = len(scoped)
         cq_stats = {
             "entry_count": total_scoped,
             "tool_distribution": dict(tool_ctr.most_common()),
@@ -522,16 +556,9 @@ def compare_sessions(
     sid_a = str(session_a)
     sid_b = str(session_b)
 
-    all_states = _load_all_state_files()
-
-    def _get_metrics(sid: str) -> Optional[Dict]:
-        state = all_states.get(sid)
-        if state is None:
-            return None
-        return _state_session_metrics(sid, state)
-
-    m_a = _get_metrics(sid_a)
-    m_b = _get_metrics(sid_b)
+    all_metrics = _session_metrics_map()
+    m_a = all_metrics.get(sid_a)
+    m_b = all_metrics.get(sid_b)
 
     _NUMERIC_FIELDS = [
         "total_tool_calls",
@@ -0,0 +1,490 @@
+"""Shell command parser shared by the Bash-inspecting gates.
+
+Splits a Bash command string into simple commands: lists and pipelines
+(|, |&, &&, ||, ;, &, newlines), subshells, command and process
+substitutions ($(...), `...`, <(...), >(...)), redirections including
+heredoc / here-string bodies, and the -c payload of shell interpreters.
+Each simple command keeps its words (quote-removed text plus the raw
+source slice), leading assignments and redirects, so gates can test
+structured fields ("is there an rm whose flags include r and f") instead
+of re-tokenizing and regex-scanning the raw text.
+
+parse_command() is memoized on the command string: every gate inspecting
+the same tool call shares one ParsedCommand, and the result is immutable.
+
+This is a best-effort lexer, not a full Bash grammar. Control keywords
+are skipped when finding a command's program, arithmetic and parameter
+expansions stay in the word text, and unterminated quoting sets ok=False
+(the rest of the input becomes one word) so callers can fall back to the
+raw string.
+
+Public API:
+    from shared.shell_command import (
+        parse_command, ParsedCommand, SimpleCommand, Word, Redirect,
+    )
+"""
+
+import functools
+import os
+import re
+from dataclasses import dataclass, replace
+
+SHELL_PROGRAMS = frozenset({"bash", "sh", "zsh", "dash", "ksh"})
+WRAPPER_PROGRAMS = frozenset(
+    {"sudo", "env", "nice", "nohup", "time", "command", "builtin"}
+)
+# Wrapper options that consume the following word (sudo -u root cmd)
+_WRAPPER_VALUE_OPTS = {
+    "sudo": frozenset({"-u", "-g", "-C", "-D", "-h", "-p", "-r", "-t", "-U"}),
+    "env": frozenset({"-u", "-C", "-S"}),
+    "nice": frozenset({"-n"}),
+    "time": frozenset({"-f", "-o"}),
+}
+RESERVED_WORDS = frozenset(
+    {"!", "{", "}", "if", "then", "else", "elif", "fi", "do", "done",
+     "while", "until", "case", "esac", "function", "select"}
+)
+HEREDOC_OPS = frozenset({"<<", "<<-"})
+
+_MAX_PAYLOAD_DEPTH = 4  # bash -c "bash -c '...'" nesting followed
+_CACHE_SIZE = 256
+
+_REDIRECT_RE = re.compile(r"(\d*)(&>>|&>|<<<|<<-|<<|<>|<&|>&|>>|>\||<|>)")
+_ASSIGNMENT_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(\[[^\]]*\])?\+?=")
+_TOKEN_RE = re.compile(r"[\w-]+")
+_LIST_OPS = ("||", "&&", "|&", ";;", ";&", "|", ";", "&")
+_WORD_BREAK = frozenset(" \t\n;&|()<>")
+
+
+@dataclass(frozen=True)
+class Word:
+    """One shell word: text after quote removal, plus its raw source slice."""
+
+    text: str
+    raw: str
+    quoted: bool = False  # any quoting or escaping inside the word
+    substituted: bool = False  # contains $(...), `...` or a process substitution
+
+    @property
+    def is_assignment(self):
+        """True for a NAME=value (or NAME+=value, NAME[i]=value) word."""
+        return bool(_ASSIGNMENT_RE.match(self.raw))
+
+
+@dataclass(frozen=True)
+class Redirect:
+    """A redirection. body holds heredoc / here-string contents."""
+
+    op: str
+    fd: str = ""
+    target: str = ""
+    body: str = ""
+
+
+@dataclass(frozen=True)
+class SimpleCommand:
+    """One simple command (argv + redirects) within a parsed command line.
+
+    pipeline numbers the pipeline it belongs to (commands joined by | share
+    one); depth is 0 at top level and grows inside subshells, substitutions
+    and -c payloads; operator is the list operator that ended it.
+    """
+
+    words: tuple = ()
+    redirects: tuple = ()
+    pipeline: int = 0
+    depth: int = 0
+    operator: str = ""
+
+    @property
+    def argv(self):
+        return tuple(w.text for w in self.words)
+
+    @property
+    def assignments(self):
+        """Leading NAME=value words."""
+        out = []
+        for w in self.words:
+            if not w.is_assignment:
+                break
+            out.append(w.text)
+        return tuple(out)
+
+    @property
+    def program_index(self):
+        """Index in argv of the program actually run, or -1.
+
+        Skips assignments, control keywords and wrappers (sudo, env, nice,
+        nohup, time, command, builtin) along with the wrappers' own flags.
+        """
+        wrapper = None
+        skip_value = False
+        for i, w in enumerate(self.words):
+            text = w.text
+            if skip_value:
+                skip_value = False
+                continue
+            if w.is_assignment or text in RESERVED_WORDS:
+                continue
+            if wrapper is not None and text.startswith("-"):
+                skip_value = text in _WRAPPER_VALUE_OPTS.get(wrapper, ())
+                continue
+            if os.path.basename(text) in WRAPPER_PROGRAMS:
+                wrapper = os.path.basename(text)
+                continue
+            return i
+        return -1
+
+    @property
+    def program(self):
+        """Basename of the program run (see program_index), or ""."""
+        i = self.program_index
+        return os.path.basename(self.words[i].text) if i >= 0 else ""
+
+    @property
+    def args(self):
+        """argv after the program."""
+        i = self.program_index
+        return self.argv[i + 1 :] if i >= 0 else ()
+
+
+@dataclass(frozen=True)
+class ParsedCommand:
+    """Structured form of a whole Bash command string.
+
+    commands is flattened in source order: nested commands (subshells,
+    substitutions) follow the command containing them and -c payloads come
+    last, distinguished by depth.
+    """
+
+    source: str
+    commands: tuple = ()
+    substitutions: tuple = ()  # raw text inside $(...), `...`, <(...), >(...)
+    ok: bool = True
+
+    @property
+    def programs(self):
+        return frozenset(c.program for c in self.commands if c.program)
+
+    @functools.cached_property
+    def tokens(self):
+        """Lowercase word-character runs (with and without hyphens) of every
+        word, redirect target and body: the words a \\b-anchored regex over
+        the command text could match."""
+        found = set()
+        for cmd in self.commands:
+            texts = [w.text for w in cmd.words]
+            texts += [r.target for r in cmd.redirects] + [r.body for r in cmd.redirects]
+            for text in texts:
+                for run in _TOKEN_RE.findall(text.lower()):
+                    found.add(run)
+                    if "-" in run:
+                        found.update(run.split("-"))
+        found.discard("")
+        return frozenset(found)
+
+    def find(self, program):
+        """Commands (any depth) whose program basename is `program`."""
+        return [c for c in self.commands if c.program == program]
+
+
+class _Builder:
+    __slots__ = ("words", "redirects", "pipeline", "depth", "operator")
+
+    def __init__(self, pipeline, depth):
+        self.words = []
+        self.redirects = []  # dicts until bodies are known
+        self.pipeline = pipeline
+        self.depth = depth
+        self.operator = ""
+
+
+class _Parser:
+    def __init__(self, source):
+        self.s = source
+        self.n = len(source)
+        self.i = 0
+        self.ok = True
+        self.builders = []
+        self.substitutions = []
+        self.pending_heredocs = []
+        self._pipelines = 0
+
+    def _new_pipeline(self):
+        self._pipelines += 1
+        return self._pipelines - 1
+
+    # ── Lists ─────────────────────────────────────────────────────────────
+
+    def parse_list(self, depth, closer=None):
+        """Parse commands until closer (")" or "`") or end of input.
+
+        Returns False if a closer was expected but the input ran out.
+        """
+        s = self.s
+        cur = self._start(self._new_pipeline(), depth)
+        while self.i < self.n:
+            c = s[self.i]
+            if closer is not None and c == closer:
+                self.i += 1
+                return True
+            if c in " \t":
+                self.i += 1
+                continue
+            if c == "\\" and s.startswith("\\\n", self.i):
+                self.i += 2
+                continue
+            if c == "\n":
+                self.i += 1
+                cur.operator = cur.operator or "\n"
+                self._read_heredoc_bodies()
+                cur = self._start(self._new_pipeline(), depth)
+                continue
+            if c == "#":
+                nl = s.find("\n", self.i)
+                self.i = self.n if nl < 0 else nl
+                continue
+            if c in "<>" and s.startswith("(", self.i + 1):
+                cur.words.append(self._process_substitution(depth))
+                continue
+            m = _REDIRECT_RE.match(s, self.i)
+            if m:
+                self.i = m.end()
+                self._redirect(cur, m.group(1), m.group(2), depth, closer)
+                continue
+            op = next((o for o in _LIST_OPS if s.startswith(o, self.i)), None)
+            if op is not None:
+                self.i += len(op)
+                cur.operator = op
+                pipeline = cur.pipeline if op in ("|", "|&") else self._new_pipeline()
+                cur = self._start(pipeline, depth)
+                continue
+            if c == "(":
+                self.i += 1
+                if cur.words:  # name() function definition
+                    if s.startswith(")", self.i):
+                        self.i += 1
+                    continue
+                self.ok = self.parse_list(depth + 1, ")") and self.ok
+                continue
+            if c == ")":  # case pattern terminator or stray paren
+                self.i += 1
+                continue
+            cur.words.append(self._word(depth, closer))
+        return closer is None
+
+    def _start(self, pipeline, depth):
+        b = _Builder(pipeline, depth)
+        self.builders.append(b)
+        return b
+
+    # ── Redirects and heredocs ────────────────────────────────────────────
+
+    def _redirect(self, cur, fd, op, depth, closer):
+        s = self.s
+        while self.i < self.n and s[self.i] in " \t":
+            self.i += 1
+        target = None
+        if self.i < self.n and s[self.i] not in _WORD_BREAK:
+            target = self._word(depth, closer)
+        redirect = {"op": op, "fd": fd, "target": target.text if target else "", "body": ""}
+        if op == "<<<":
+            redirect["body"] = redirect["target"]
+        elif op in HEREDOC_OPS and target is not None:
+            self.pending_heredocs.append((redirect, target.text, op == "<<-"))
+        cur.redirects.append(redirect)
+
+    def _read_heredoc_bodies(self):
+        s = self.s
+        for redirect, delimiter, strip_tabs in self.pending_heredocs:
+            lines = []
+            while self.i < self.n:
+                nl = s.find("\n", self.i)
+                end = self.n if nl < 0 else nl
+                line = s[self.i : end]
+                self.i = end if nl < 0 else nl + 1
+                if (line.lstrip("\t") if strip_tabs else line) == delimiter:
+                    break
+                lines.append(line)
+            redirect["body"] = "\n".join(lines)
+        self.pending_heredocs = []
+
+    # ── Words ─────────────────────────────────────────────────────────────
+
+    def _word(self, depth, closer=None):
+        s = self.s
+        start = self.i
+        text = []
+        quoted = substituted = False
+        while self.i < self.n:
+            c = s[self.i]
+            if c in _WORD_BREAK or (c == "`" and closer == "`"):
+                break
+            if c == "\\":
+                if self.i + 1 < self.n:
+                    text.append(s[self.i + 1])
+                self.i += 2
+                quoted = True
+            elif c == "'":
+                end = s.find("'", self.i + 1)
+                if end < 0:
+                    self.ok = False
+                    end = self.n
+                text.append(s[self.i + 1 : end])
+                self.i = end + 1
+                quoted = True
+            elif c == '"':
+                quoted = True
+                substituted |= self._double_quoted(text, depth)
+            elif c == "$" and s.startswith("((", self.i + 1):
+                text.append(self._balanced(self.i + 1, "(", ")"))
+            elif c == "$" and s.startswith("(", self.i + 1):
+                text.append(self._substitution(depth, 2, ")"))
+                substituted = True
+            elif c == "$" and s.startswith("{", self.i + 1):
+                text.append(self._balanced(self.i + 1, "{", "}"))
+            elif c == "`":
+                text.append(self._substitution(depth, 1, "`"))
+                substituted = True
+            else:
+                text.append(c)
+                self.i += 1
+        self.i = min(self.i, self.n)
+        return Word("".join(text), s[start : self.i], quoted, substituted)
+
+    def _double_quoted(self, text, depth):
+        s = self.s
+        self.i += 1
+        substituted = False
+        while self.i < self.n:
+            c = s[self.i]
+            if c == '"':
+                self.i += 1
+                return substituted
+            if c == "\\" and self.i + 1 < self.n and s[self.i + 1] in '$`"\\\n':
+                text.append(s[self.i + 1])
+                self.i += 2
+            elif c == "$" and s.startswith("((", self.i + 1):
+                text.append(self._balanced(self.i + 1, "(", ")"))
+            elif c == "$" and s.startswith("(", self.i + 1):
+                text.append(self._substitution(depth, 2, ")"))
+                substituted = True
+            elif c == "$" and s.startswith("{", self.i + 1):
+                text.append(self._balanced(self.i + 1, "{", "}"))
+            elif c == "`":
+                text.append(self._substitution(depth, 1, "`"))
+                substituted = True
+            else:
+                text.append(c)
+                self.i += 1
+        self.ok = False
+        return substituted
+
+    def _substitution(self, depth, opener_len, closer):
+        """Parse $(...) / `...` in place; returns its raw text."""
+        start = self.i
+        self.i += opener_len
+        inner_start = self.i
+        closed = self.parse_list(depth + 1, closer)
+        self.ok = self.ok and closed
+        self.substitutions.append(self.s[inner_start : self.i - 1 if closed else self.i])
+        return self.s[start : self.i]
+
+    def _process_substitution(self, depth):
+        start = self.i
+        raw = self._substitution(depth, 2, ")")
+        return Word(raw, self.s[start : self.i], False, True)
+
+    def _balanced(self, pos, opener, closer):
+        """Skip ${...} / $((...)) at s[pos]; returns the raw text from the $."""
+        s = self.s
+        level = 0
+        j = pos
+        while j < self.n:
+            if s[j] == opener:
+                level += 1
+            elif s[j] == closer:
+                level -= 1
+                if level == 0:
+                    j += 1
+                    break
+            j += 1
+        else:
+            self.ok = False
+        raw = s[self.i : j]
+        self.i = j
+        return raw
+
+    # ── Result ────────────────────────────────────────────────────────────
+
+    def result(self):
+        if self.pending_heredocs:
+            self._read_heredoc_bodies()
+        commands = []
+        for b in self.builders:
+            if not b.words and not b.redirects:
+                continue
+            commands.append(
+                SimpleCommand(
+                    words=tuple(b.words),
+                    redirects=tuple(Redirect(**r) for r in b.redirects),
+                    pipeline=b.pipeline,
+                    depth=b.depth,
+                    operator=b.operator,
+                )
+            )
+        return commands
+
+
+def _payload(cmd):
+    """Script text a shell / eval command executes from its arguments, or None."""
+    program = cmd.program
+    args = cmd.args
+    if program == "eval":
+        return " ".join(args) or None
+    if program in SHELL_PROGRAMS:
+        for k, arg in enumerate(args):
+            if arg == "--":
+                break
+            if arg.startswith("-") and not arg.startswith("--") and "c" in arg[1:]:
+                return args[k + 1] if k + 1 < len(args) else None
+    return None
+
+
+def _parse(command, payload_depth):
+    parser = _Parser(command)
+    parser.parse_list(0)
+    commands = parser.result()
+    substitutions = list(parser.substitutions)
+    ok = parser.ok
+
+    if payload_depth < _MAX_PAYLOAD_DEPTH:
+        next_pipeline = max((c.pipeline for c in commands), default=-1) + 1
+        for cmd in list(commands):
+            script = _payload(cmd)
+            if not script:
+                continue
+            inner = _parse(script, payload_depth + 1)
+            for sub in inner.commands:
+                commands.append(
+                    replace(
+                        sub,
+                        depth=cmd.depth + 1 + sub.depth,
+                        pipeline=next_pipeline + sub.pipeline,
+                    )
+                )
+            next_pipeline += max((c.pipeline for c in inner.commands), default=-1) + 1
+            substitutions.extend(inner.substitutions)
+
+    return ParsedCommand(command, tuple(commands), tuple(substitutions), ok)
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def parse_command(command):
+    """Parse a Bash command string (memoized). Never raises."""
+    if not isinstance(command, str):
+        command = ""
+    try:
+        return _parse(command, 0)
+    except Exception:
+        return ParsedCommand(command, (), (), False)
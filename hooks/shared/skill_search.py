@@ -2,20 +2,29 @@
 """BM25 + optional NIM embedding hybrid search for Skill MCP v2.
 
 Provides three index classes:
-- BM25Index: keyword search via rank_bm25 (default, zero dependencies)
+- BM25Index: incremental keyword search (Okapi BM25, numpy scoring)
 - EmbeddingIndex: semantic search via NVIDIA NIM API (opt-in, no local model)
 - HybridSearch: combines both with configurable weights
 
 BM25 is the default. Pass use_embeddings=True to HybridSearch to enable
 NIM-based semantic search (requires nim_api_key in config.json).
+
+Incremental + persistent: adding, updating or removing a skill only touches
+that skill's postings (term -> doc slot/tf arrays, a column-sparse matrix
+scored with numpy). Pass index_path to persist term statistics, postings
+and embedding vectors (keyed by content hash) in SQLite, so a restart or a
+re-add of unchanged skill text costs neither re-tokenizing nor a NIM call.
+Scores match rank_bm25.BM25Okapi (k1=1.5, b=0.75, epsilon idf floor).
 """
 
+import hashlib
 import json
 import logging
 import os
+import re
+import sqlite3
 
 import numpy as np
-from rank_bm25 import BM25Okapi
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +44,52 @@ def _get_nim_api_key():
     return os.environ.get("NIM_API_KEY", "")
 
 
+_TOKEN_RE = re.compile(r"\w+(?:[-_]\w+)*")
+# Bumped whenever tokenize() changes; persisted postings from an older
+# tokenizer are dropped on load and rebuilt as skills are re-added.
+_TOKENIZER_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS skill_docs (
+    name TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS skill_postings (
+    term TEXT NOT NULL,
+    name TEXT NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_skill_postings_name ON skill_postings(name);
+CREATE TABLE IF NOT EXISTS skill_vectors (
+    hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    vec BLOB NOT NULL,
+    PRIMARY KEY (hash, model)
+) WITHOUT ROWID;
+"""
+
+
+def tokenize(text):
+    """Lowercase Unicode word tokens; punctuation is dropped, hyphen/underscore joins kept."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def content_hash(text):
+    return hashlib.sha1(text.encode("utf-8", "replace")).hexdigest()
+
+
+def _open_store(path):
+    """Open (creating if needed) the SQLite index store at path."""
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
 def _nim_embed(texts):
     """Embed texts via NVIDIA NIM API. Returns list of numpy arrays or None on failure."""
     import requests
@@ -68,85 +123,239 @@ def _nim_embed(texts):
 
 
 class BM25Index:
-    """Keyword search using BM25Okapi."""
-
-    def __init__(self):
-        self._names: list[str] = []
-        self._corpus: list[list[str]] = []
-        self._bm25: BM25Okapi | None = None
-        self._dirty = True
+    """Incremental Okapi BM25 keyword search over per-term posting arrays.
 
-    def add(self, name: str, text: str) -> None:
-        self._names.append(name)
-        self._corpus.append(text.lower().split())
-        self._dirty = True
+    Each document owns a slot; a term's postings are (slots, tf) numpy
+    arrays, so a query term is scored with one vectorized expression over
+    just the documents containing it. Removed slots are reused.
+    """
 
-    def _rebuild(self) -> None:
-        if self._corpus:
-            self._bm25 = BM25Okapi(self._corpus)
-        self._dirty = False
+    def __init__(self, path=None, k1=1.5, b=0.75, epsilon=0.25):
+        self.k1, self.b, self.epsilon = k1, b, epsilon
+        self._slot: dict[str, int] = {}
+        self._slot_names: list[str | None] = []
+        self._free: list[int] = []
+        self._hash: dict[str, str] = {}
+        self._doc_terms: dict[str, dict[str, int]] = {}
+        self._postings: dict[str, dict[int, int]] = {}
+        self._arrays: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self._doc_len = np.zeros(0, dtype=np.float64)
+        self._idf: dict[str, float] | None = None
+        self._conn = _open_store(path) if path else None
+        if self._conn is not None:
+            self._load()
+
+    def __len__(self):
+        return len(self._slot)
+
+    def _load(self) -> None:
+        (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        if version != _TOKENIZER_VERSION:
+            with self._conn:
+                self._conn.execute("DELETE FROM skill_postings")
+                self._conn.execute("DELETE FROM skill_docs")
+            self._conn.execute(f"PRAGMA user_version = {_TOKENIZER_VERSION}")
+        docs = self._conn.execute("SELECT name, hash FROM skill_docs").fetchall()
+        terms: dict[str, dict[str, int]] = {name: {} for name, _ in docs}
+        for term, name, tf in self._conn.execute(
+            "SELECT term, name, tf FROM skill_postings"
+        ):
+            if name in terms:
+                terms[name][term] = tf
+        for name, h in docs:
+            self._index(name, h, terms[name])
+
+    def _index(self, name: str, h: str, tfs: dict[str, int]) -> None:
+        slot = self._free.pop() if self._free else len(self._slot_names)
+        if slot == len(self._slot_names):
+            self._slot_names.append(name)
+            self._doc_len = np.append(self._doc_len, 0.0)
+        else:
+            self._slot_names[slot] = name
+        self._slot[name] = slot
+        self._hash[name] = h
+        self._doc_terms[name] = tfs
+        self._doc_len[slot] = sum(tfs.values())
+        for term, tf in tfs.items():
+            self._postings.setdefault(term, {})[slot] = tf
+            self._arrays.pop(term, None)
+        self._idf = None
+
+    def _unindex(self, name: str) -> None:
+        slot = self._slot.pop(name)
+        for term in self._doc_terms.pop(name):
+            posting = self._postings[term]
+            del posting[slot]
+            if not posting:
+                del self._postings[term]
+            self._arrays.pop(term, None)
+        del self._hash[name]
+        self._slot_names[slot] = None
+        self._doc_len[slot] = 0.0
+        self._free.append(slot)
+        self._idf = None
+
+    def add(self, name: str, text: str) -> bool:
+        """Add or update a document. Returns False if its text is unchanged."""
+        h = content_hash(text)
+        if self._hash.get(name) == h:
+            return False
+        if name in self._slot:
+            self._unindex(name)
+        tfs: dict[str, int] = {}
+        for tok in tokenize(text):
+            tfs[tok] = tfs.get(tok, 0) + 1
+        self._index(name, h, tfs)
+        if self._conn is not None:
+            with self._conn:
+                self._conn.execute("DELETE FROM skill_postings WHERE name=?", (name,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO skill_docs (name, hash, length) VALUES (?, ?, ?)",
+                    (name, h, sum(tfs.values())),
+                )
+                self._conn.executemany(
+                    "INSERT INTO skill_postings (term, name, tf) VALUES (?, ?, ?)",
+                    [(t, name, tf) for t, tf in tfs.items()],
+                )
+        return True
+
+    def remove(self, name: str) -> bool:
+        if name not in self._slot:
+            return False
+        self._unindex(name)
+        if self._conn is not None:
+            with self._conn:
+                self._conn.execute("DELETE FROM skill_postings WHERE name=?", (name,))
+                self._conn.execute("DELETE FROM skill_docs WHERE name=?", (name,))
+        return True
+
+    def names(self) -> list[str]:
+        return list(self._slot)
+
+    def _term_idf(self) -> dict[str, float]:
+        """BM25Okapi idf with negative values floored at epsilon * mean idf."""
+        if self._idf is None:
+            terms = list(self._postings)
+            if not terms:
+                self._idf = {}
+                return self._idf
+            n = len(self._slot)
+            df = np.fromiter((len(self._postings[t]) for t in terms), np.float64, len(terms))
+            idf = np.log(n - df + 0.5) - np.log(df + 0.5)
+            idf[idf < 0] = self.epsilon * idf.mean()
+            self._idf = dict(zip(terms, idf.tolist()))
+        return self._idf
+
+    def _posting_arrays(self, term: str) -> tuple[np.ndarray, np.ndarray]:
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            posting = self._postings[term]
+            arrays = (
+                np.fromiter(posting.keys(), np.intp, len(posting)),
+                np.fromiter(posting.values(), np.float64, len(posting)),
+            )
+            self._arrays[term] = arrays
+        return arrays
 
     def search(self, query: str, top_k: int = 5) -> list[tuple[str, float]]:
-        if not query.strip() or not self._corpus:
+        if not query.strip() or not self._slot:
+            return []
+        idf = self._term_idf()
+        avgdl = self._doc_len.sum() / len(self._slot) or 1.0
+        norm = self.k1 * (1 - self.b + self.b * self._doc_len / avgdl)
+        scores = np.zeros(len(self._slot_names))
+        for term in tokenize(query):
+            if term not in self._postings:
+                continue
+            slots, tf = self._posting_arrays(term)
+            scores[slots] += idf[term] * (tf * (self.k1 + 1) / (tf + norm[slots]))
+        hits = np.flatnonzero(scores > 0)
+        if not hits.size:
             return []
-        if self._dirty:
-            self._rebuild()
-        scores = self._bm25.get_scores(query.lower().split())
-        ranked = sorted(zip(self._names, scores), key=lambda x: -x[1])
-        return [(n, float(s)) for n, s in ranked[:top_k] if s > 0]
+        order = hits[np.argsort(-scores[hits], kind="stable")][:top_k]
+        return [(self._slot_names[i], float(scores[i])) for i in order]
 
 
 class EmbeddingIndex:
     """Semantic search via NVIDIA NIM API (nv-embed-v1, 4096-dim).
 
-    No local model — embeddings are computed via HTTP API call.
+    No local model — embeddings are computed via HTTP API call. Vectors are
+    cached by content hash (persisted when path is given), so only new or
+    changed skill text is sent for embedding.
     """
 
-    def __init__(self):
-        self._names: list[str] = []
-        self._texts: list[str] = []
-        self._embeddings: list[np.ndarray | None] = []
+    def __init__(self, path=None):
+        self._texts: dict[str, str] = {}
+        self._hash: dict[str, str] = {}
+        self._vectors: dict[str, np.ndarray] = {}  # content hash -> unit vector
+        self._matrix: tuple[list[str], np.ndarray] | None = None
+        self._conn = _open_store(path) if path else None
 
     def add(self, name: str, text: str) -> None:
-        self._names.append(name)
-        self._texts.append(text)
-        self._embeddings.append(None)
+        self._texts[name] = text
+        self._hash[name] = content_hash(text)
+        self._matrix = None
+
+    def remove(self, name: str) -> None:
+        if self._texts.pop(name, None) is not None:
+            del self._hash[name]
+            self._matrix = None
+
+    @staticmethod
+    def _unit(vec: np.ndarray) -> np.ndarray:
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
 
     def _ensure_embeddings(self) -> None:
-        pending = [
-            (i, self._texts[i])
-            for i in range(len(self._texts))
-            if self._embeddings[i] is None
-        ]
-        if not pending:
+        missing = {h for h in self._hash.values() if h not in self._vectors}
+        if missing and self._conn is not None:
+            rows = self._conn.execute(
+                "SELECT hash, vec FROM skill_vectors WHERE model=? AND hash IN ({})".format(
+                    ",".join("?" * len(missing))
+                ),
+                (_NIM_MODEL, *missing),
+            ).fetchall()
+            for h, blob in rows:
+                self._vectors[h] = np.frombuffer(blob, dtype=np.float32)
+                missing.discard(h)
+        if not missing:
             return
-        indices, texts = zip(*pending)
-        vecs = _nim_embed(list(texts))
+        pending = {}
+        for name, h in self._hash.items():
+            if h in missing:
+                pending.setdefault(h, self._texts[name])
+        hashes = list(pending)
+        vecs = _nim_embed([pending[h] for h in hashes])
         if vecs is None:
             return
-        for i, vec in zip(indices, vecs):
-            self._embeddings[i] = vec
+        for h, vec in zip(hashes, vecs):
+            self._vectors[h] = self._unit(vec.astype(np.float32))
+        if self._conn is not None:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO skill_vectors (hash, model, vec) VALUES (?, ?, ?)",
+                    [(h, _NIM_MODEL, self._vectors[h].tobytes()) for h in hashes],
+                )
+        self._matrix = None
 
     def search(self, query: str, top_k: int = 5) -> list[tuple[str, float]]:
         self._ensure_embeddings()
-        valid = [(n, e) for n, e in zip(self._names, self._embeddings) if e is not None]
-        if not valid:
+        if self._matrix is None:
+            names = [n for n, h in self._hash.items() if h in self._vectors]
+            if names:
+                self._matrix = (
+                    names,
+                    np.stack([self._vectors[self._hash[n]] for n in names]),
+                )
+        if self._matrix is None:
             return []
         query_vecs = _nim_embed([query])
         if query_vecs is None:
             return []
-        query_emb = query_vecs[0]
-        names = [n for n, _ in valid]
-        emb_matrix = np.stack([e for _, e in valid])
-        norms = np.linalg.norm(emb_matrix, axis=1, keepdims=True)
-        norms[norms == 0] = 1
-        emb_matrix = emb_matrix / norms
-        query_norm = np.linalg.norm(query_emb)
-        if query_norm > 0:
-            query_emb = query_emb / query_norm
-        scores = emb_matrix @ query_emb
-        ranked = sorted(zip(names, scores.tolist()), key=lambda x: -x[1])
-        return [(n, s) for n, s in ranked[:top_k]]
+        names, emb_matrix = self._matrix
+        scores = emb_matrix @ self._unit(query_vecs[0].astype(np.float32))
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [(names[i], float(scores[i])) for i in order]
 
 
 class HybridSearch:
@@ -161,9 +370,10 @@ class HybridSearch:
         bm25_weight: float = 0.4,
         embedding_weight: float = 0.6,
         use_embeddings: bool = False,
+        index_path: str | None = None,
     ):
-        self.bm25 = BM25Index()
-        self.embedding = EmbeddingIndex() if use_embeddings else None
+        self.bm25 = BM25Index(index_path)
+        self.embedding = EmbeddingIndex(index_path) if use_embeddings else None
         self.bm25_weight = bm25_weight
         self.embedding_weight = embedding_weight
 
@@ -172,6 +382,18 @@ class HybridSearch:
         if self.embedding is not None:
             self.embedding.add(name, text)
 
+    def remove(self, name: str) -> None:
+        self.bm25.remove(name)
+        if self.embedding is not None:
+            self.embedding.remove(name)
+
+    def sync(self, skills: dict[str, str]) -> None:
+        """Make the index hold exactly skills ({name: text}); unchanged text is free."""
+        for name in set(self.bm25.names()) - set(skills):
+            self.remove(name)
+        for name, text in skills.items():
+            self.add(name, text)
+
     def search(self, query: str, top_k: int = 5) -> list[tuple[str, float]]:
         if not query.strip():
             return []
@@ -3,10 +3,27 @@
 Replaces LanceCollection. Uses SurrealDB embedded (surrealkv://) backend.
 """
 
+import threading
+import uuid
+
 from surrealdb import RecordID
 
 _EMBEDDING_DIM = 4096
 
+# One row per table; its token changes on every write so a persisted local
+# ANN index can tell whether it still matches the table.
+STAMP_TABLE = "ann_stamp"
+# One row per reduced table: fingerprint of the projection its vector_r holds.
+PROJECTION_TABLE = "reduced_meta"
+
+# Tables that carry a reduced-dimension copy of their vector in reduced mode
+REDUCED_TABLES = ("knowledge", "observations", "fix_outcomes", "web_pages")
+REDUCED_FIELD = "vector_r"
+# Reduced-mode KNN over-fetches this many candidates per result (min 50)
+# before the exact full-vector rerank.
+RERANK_FACTOR = 5
+RERANK_MIN_CANDIDATES = 50
+
 TABLE_SCHEMAS = {
     "knowledge": {
         "text": "string",
@@ -89,8 +106,18 @@ TABLE_SCHEMAS = {
 
 
 def init_surreal_db(
-    db, embed_text=None, embed_texts=None, embedding_dim=_EMBEDDING_DIM
+    db, embed_text=None, embed_texts=None, embedding_dim=_EMBEDDING_DIM, projection=None
 ):
+    """Create table wrappers and indexes.
+
+    ``projection`` (shared.vector_projection.Projection) enables reduced mode
+    on REDUCED_TABLES: writes also store ``vector_r`` and an HNSW index is
+    defined over it. Queries switch to it once ``reduced_ready`` is set
+    (after backfill_reduced() has caught up old rows). Those tables keep full
+    vectors only for reranking: their full-dimension HNSW index is defined
+    only while rows still lack ``vector_r`` and is removed by
+    mark_reduced_ready().
+    """
     db.query(
         "DEFINE ANALYZER IF NOT EXISTS mem_analyzer "
         "TOKENIZERS blank,class FILTERS lowercase,snowball(english)"
@@ -107,7 +134,11 @@ def init_surreal_db(
             embedding_dim=embedding_dim,
             vector_field=vec_field,
         )
-        coll.init_indexes()
+        if projection is not None and table_name in REDUCED_TABLES:
+            coll.attach_projection(projection)
+            coll.init_indexes(full_vector_index=coll.pending_reduced() != 0)
+        else:
+            coll.init_indexes()
         collections[table_name] = coll
     return collections
 
@@ -132,6 +163,243 @@ class SurrealCollection:
         self._vector_field = vector_field
         self._meta_cols = set(self._fields.keys()) - {"id", "text", vector_field}
         self._initialized = False
+        self._local_index = None  # optional shared.local_ann.LocalANNIndex
+        self._projection = None  # optional shared.vector_projection.Projection
+        self.reduced_ready = False
+        # Serialises writes with their index mirror and stamp bump.
+        self._stamp_lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()
+        self._rebuilding = False
+        self._rebuild_pending = False
+
+    def attach_local_index(self, index):
+        """Mirror writes into an in-process ANN index and serve KNN from it.
+
+        SurrealDB stays the source of truth: the index is only consulted once
+        ``index.ready`` is set, and any local failure falls back to the DB.
+        A mirrored write that fails takes the index out of service and
+        rebuilds it in the background.
+        """
+        self._local_index = index
+
+    def _read_stamp(self):
+        try:
+            r = self._db.query(f"SELECT token FROM {STAMP_TABLE}:`{self._name}`")
+        except Exception:
+            return None
+        if r and isinstance(r, list) and isinstance(r[0], dict):
+            return r[0].get("token")
+        return None
+
+    def _bump_stamp(self):
+        """Give the table a fresh write stamp. Returns it, or None on failure."""
+        token = uuid.uuid4().hex
+        try:
+            self._db.query(
+                f"UPSERT {STAMP_TABLE}:`{self._name}` SET token = $tok", {"tok": token}
+            )
+        except Exception:
+            return None
+        return token
+
+    def _mirrored(self, ok):
+        """Bump the stamp after a write; advance or invalidate the local index.
+
+        Call with ``_stamp_lock`` held. An index without a stamp is being
+        loaded or rebuilt and is stamped when that finishes.
+        """
+        token = self._bump_stamp()
+        idx = self._local_index
+        if idx is None:
+            return
+        if not ok or token is None:
+            self._local_index_failed()
+        elif idx.stamp is not None:
+            idx.set_stamp(token)
+
+    def _local_index_failed(self):
+        """Stop serving from the local index and rebuild it in the background."""
+        idx = self._local_index
+        idx.ready = False
+        idx.set_stamp(None)
+        with self._rebuild_lock:
+            if self._rebuilding:
+                self._rebuild_pending = True
+                return
+            self._rebuilding = True
+        threading.Thread(
+            target=self._rebuild_local_index,
+            daemon=True,
+            name=f"local-ann-rebuild-{self._name}",
+        ).start()
+
+    def _rebuild_local_index(self):
+        """Rebuild until no mirror failure arrived mid-build (one at a time)."""
+        while True:
+            with self._rebuild_lock:
+                self._rebuild_pending = False
+            try:
+                self._build_local_index()
+            except Exception:
+                self._local_index.ready = False
+            with self._rebuild_lock:
+                if not self._rebuild_pending:
+                    self._rebuilding = False
+                    return
+
+    def _build_local_index(self):
+        idx = self._local_index
+        idx.build_from_collection(self)
+        with self._stamp_lock:
+            token = self._read_stamp() or self._bump_stamp()
+            if token is None:
+                idx.ready = False
+            else:
+                idx.set_stamp(token)
+        idx.flush()
+
+    def sync_local_index(self):
+        """Load the persisted local index, or rebuild it from this table.
+
+        The persisted copy is trusted only if its stamp equals the table's
+        current write stamp, so drift that leaves the row count unchanged
+        still forces a rebuild. Returns "loaded", "rebuilt", "failed", or
+        "rebuilding" when a background rebuild is already under way.
+        """
+        idx = self._local_index
+        with self._stamp_lock:
+            token = self._read_stamp()
+            if idx.load() and token is not None and idx.stamp == token:
+                idx.ready = True
+                return "loaded"
+            idx.ready = False
+            idx.set_stamp(None)
+        with self._rebuild_lock:
+            if self._rebuilding:
+                self._rebuild_pending = True
+                return "rebuilding"
+            self._rebuilding = True
+        self._rebuild_local_index()
+        return "rebuilt" if idx.ready else "failed"
+
+    def attach_projection(self, projection):
+        """Store a reduced copy of every vector and index it for KNN.
+
+        Queries keep using the full-vector index until ``reduced_ready`` is
+        set, so rows written before the projection existed stay reachable
+        until backfill_reduced() has filled them in.
+
+        If the table's ``vector_r`` was written by a different projection
+        (refit, other method or dim), every row's ``vector_r`` is cleared and
+        the index redefined, so the backfill re-projects the whole table.
+        """
+        self._projection = projection
+        self._ensure_table()
+        fingerprint = projection.fingerprint()
+        if self._stored_fingerprint() != fingerprint:
+            self.reduced_ready = False
+            self._db.query(
+                f"REMOVE INDEX IF EXISTS {self._name}_vec_r ON {self._name}"
+            )
+            self._db.query(f"UPDATE {self._name} SET {REDUCED_FIELD} = NONE")
+            self._db.query(
+                f"UPSERT {PROJECTION_TABLE}:`{self._name}` SET fingerprint = $fp",
+                {"fp": fingerprint},
+            )
+        self._db.query(
+            f"DEFINE INDEX IF NOT EXISTS {self._name}_vec_r ON {self._name} "
+            f"FIELDS {REDUCED_FIELD} HNSW DIMENSION {projection.dim} "
+            "TYPE F32 DIST COSINE EFC 150 M 12"
+        )
+
+    def _stored_fingerprint(self):
+        r = self._db.query(f"SELECT fingerprint FROM {PROJECTION_TABLE}:`{self._name}`")
+        if r and isinstance(r, list) and isinstance(r[0], dict):
+            return r[0].get("fingerprint")
+        return None
+
+    def _reduced(self, vec):
+        """Projected copy of vec, or None when it cannot be projected."""
+        try:
+            return self._projection.project_list(vec)
+        except Exception:
+            return None
+
+    def backfill_reduced(self, batch=500):
+        """Fill ``vector_r`` for rows written before reduced mode was enabled.
+
+        Returns the number of rows updated. Rows whose vector cannot be
+        projected (empty or wrong dimension) are skipped.
+        """
+        if self._projection is None:
+            return 0
+        vf = self._vector_field
+        done = 0
+        skipped = set()
+        while True:
+            try:
+                rows = self._db.query(
+                    f"SELECT id, {vf} FROM {self._name} "
+                    f"WHERE {REDUCED_FIELD} IS NONE LIMIT {batch + len(skipped)}"
+                )
+            except Exception:
+                break
+            rows = [r for r in rows or [] if self._extract_id(r) not in skipped]
+            if not rows:
+                break
+            for r in rows:
+                rid = self._extract_id(r)
+                red = self._reduced(r.get(vf) or [])
+                if red is None:
+                    skipped.add(rid)
+                    continue
+                self._db.query(
+                    f"UPDATE {self._name}:`{rid}` SET {REDUCED_FIELD} = $vr",
+                    {"vr": red},
+                )
+                done += 1
+        return done
+
+    def pending_reduced(self):
+        """Rows with a full-size vector but no ``vector_r`` yet (-1 if unknown)."""
+        try:
+            r = self._db.query(
+                f"SELECT count() FROM {self._name} WHERE {REDUCED_FIELD} IS NONE "
+                f"AND array::len({self._vector_field}) = {self._embedding_dim} GROUP ALL"
+            )
+        except Exception:
+            return -1
+        if r and isinstance(r, list):
+            return r[0].get("count", 0)
+        return 0
+
+    def mark_reduced_ready(self):
+        """Serve KNN from ``vector_r`` and drop the full-dimension HNSW index.
+
+        Call once backfill_reduced() has caught up. Full vectors stay stored
+        for reranking but are no longer indexed; should a reduced query
+        fail, the fallback KNN scans them without the index.
+        """
+        if self._projection is None:
+            return
+        self.reduced_ready = True
+        try:
+            self._db.query(f"REMOVE INDEX IF EXISTS {self._name}_vec ON {self._name}")
+        except Exception:
+            pass
+
+    def _stored_meta(self, meta):
+        """Metadata as stored by upsert (defaults for missing columns)."""
+        stored = {}
+        for col in self._meta_cols:
+            if col in meta:
+                stored[col] = meta[col]
+            else:
+                field_type = self._fields.get(col, "string")
+                stored[col] = (
+                    0 if field_type == "int" else 0.0 if field_type == "float" else ""
+                )
+        return stored
 
     def _ensure_table(self):
         if self._initialized:
@@ -139,17 +407,23 @@ class SurrealCollection:
         self._db.query(f"DEFINE TABLE IF NOT EXISTS {self._name} SCHEMALESS")
         self._initialized = True
 
-    def init_indexes(self):
+    def init_indexes(self, full_vector_index=True):
+        """Define the vector and full-text indexes.
+
+        ``full_vector_index=False`` skips the full-dimension HNSW index, for
+        reduced tables whose ``vector_r`` index already covers every row.
+        """
         self._ensure_table()
         vf = self._vector_field
         import time as _time
 
         for _attempt in range(3):
             try:
-                self._db.query(
-                    f"DEFINE INDEX IF NOT EXISTS {self._name}_vec ON {self._name} FIELDS {vf} "
-                    f"HNSW DIMENSION {self._embedding_dim} TYPE F32 DIST COSINE EFC 150 M 12"
-                )
+                if full_vector_index:
+                    self._db.query(
+                        f"DEFINE INDEX IF NOT EXISTS {self._name}_vec ON {self._name} FIELDS {vf} "
+                        f"HNSW DIMENSION {self._embedding_dim} TYPE F32 DIST COSINE EFC 150 M 12"
+                    )
                 if "text" in self._fields:
                     self._db.query(
                         "DEFINE ANALYZER IF NOT EXISTS mem_analyzer "
@@ -187,6 +461,16 @@ class SurrealCollection:
                 else [[0.0] * self._embedding_dim for _ in documents]
             )
 
+        with self._stamp_lock:
+            ok = False
+            try:
+                ok = self._upsert_rows(ids, documents, metadatas, vectors)
+            finally:
+                self._mirrored(ok)
+
+    def _upsert_rows(self, ids, documents, metadatas, vectors):
+        """Write rows and mirror them; False if any mirrored write failed."""
+        ok = True
         for i, doc_id in enumerate(ids):
             doc = documents[i] if i < len(documents) else ""
             vec = vectors[i] if i < len(vectors) else [0.0] * self._embedding_dim
@@ -195,6 +479,11 @@ class SurrealCollection:
             vf = self._vector_field
             params = {"vec": vec}
             set_clauses = [f"{vf} = $vec"]
+            if self._projection is not None:
+                reduced = self._reduced(vec)
+                if reduced is not None:
+                    params["vec_r"] = reduced
+                    set_clauses.append(f"{REDUCED_FIELD} = $vec_r")
             if "text" in self._fields:
                 params["text"] = doc
                 set_clauses.append("text = $text")
@@ -217,6 +506,18 @@ class SurrealCollection:
             set_str = ", ".join(set_clauses)
             self._db.query(f"UPSERT {self._name}:`{safe_id}` SET {set_str}", params)
 
+            if self._local_index is not None:
+                try:
+                    self._local_index.upsert(
+                        [safe_id],
+                        [vec],
+                        metadatas=[self._stored_meta(meta)],
+                        documents=[doc],
+                    )
+                except Exception:
+                    ok = False
+        return ok
+
     def get(
         self, ids=None, where=None, limit=None, offset=0, include=None, columns=None
     ):
@@ -261,37 +562,86 @@ class SurrealCollection:
         return result
 
     def update(self, ids=None, metadatas=None, documents=None):
+        """Merge metadata/documents into existing records in one round trip.
+
+        Several ids become one transaction of UPDATE statements with
+        per-record parameter names.
+        """
         if not ids:
             return
+        statements = []
+        params = {}
+        mirrored = []
         for i, doc_id in enumerate(ids):
             meta = metadatas[i] if metadatas and i < len(metadatas) else {}
             doc = documents[i] if documents and i < len(documents) else None
 
             set_parts = []
-            params = {}
+            vec = None
             for col, val in meta.items():
-                param_name = f"m_{col}"
+                param_name = f"m{i}_{col}"
                 params[param_name] = val
                 set_parts.append(f"{col} = ${param_name}")
 
             if doc is not None:
-                params["text"] = doc
-                set_parts.append("text = $text")
+                params[f"text{i}"] = doc
+                set_parts.append(f"text = $text{i}")
                 if self._embed_text:
-                    params["vec"] = self._embed_text(doc)
-                    set_parts.append("vector = $vec")
+                    vec = params[f"vec{i}"] = self._embed_text(doc)
+                    set_parts.append(f"vector = $vec{i}")
+                    if self._projection is not None:
+                        reduced = self._reduced(vec)
+                        if reduced is not None:
+                            params[f"vec_r{i}"] = reduced
+                            set_parts.append(f"{REDUCED_FIELD} = $vec_r{i}")
 
             if set_parts:
                 safe_id = str(doc_id).replace("'", "")
                 set_str = ", ".join(set_parts)
-                self._db.query(f"UPDATE {self._name}:`{safe_id}` SET {set_str}", params)
+                statements.append(f"UPDATE {self._name}:`{safe_id}` SET {set_str}")
+                mirrored.append((safe_id, meta, doc, vec))
+
+        if not statements:
+            return
+        with self._stamp_lock:
+            if len(statements) == 1:
+                self._db.query(statements[0], params)
+            else:
+                body = "; ".join(statements)
+                self._db.query(
+                    f"BEGIN TRANSACTION; {body}; COMMIT TRANSACTION;", params
+                )
+
+            ok = True
+            if self._local_index is not None:
+                for safe_id, meta, doc, vec in mirrored:
+                    try:
+                        self._local_index.update(
+                            safe_id, metadata=meta, document=doc, vector=vec
+                        )
+                    except Exception:
+                        ok = False
+            self._mirrored(ok)
 
     def delete(self, ids=None):
         if not ids:
             return
-        for doc_id in ids:
-            safe_id = str(doc_id).replace("'", "")
-            self._db.query(f"DELETE {self._name}:`{safe_id}`")
+        with self._stamp_lock:
+            ok = False
+            try:
+                for doc_id in ids:
+                    safe_id = str(doc_id).replace("'", "")
+                    self._db.query(f"DELETE {self._name}:`{safe_id}`")
+                ok = True
+                if self._local_index is not None:
+                    try:
+                        self._local_index.delete(
+                            [str(i).replace("'", "") for i in ids]
+                        )
+                    except Exception:
+                        ok = False
+            finally:
+                self._mirrored(ok)
 
     def query(
         self, query_texts=None, n_results=5, include=None, where=None, query_vector=None
@@ -308,22 +658,35 @@ class SurrealCollection:
                 else [0.0] * self._embedding_dim
             )
 
+        local = self._local_index
+        if local is not None and local.ready:
+            try:
+                return local.query(
+                    vector, n_results=n_results, include=include, where=where
+                )
+            except Exception:
+                pass  # fall through to SurrealDB KNN
+
         where_clause = ""
         if where:
             translated = self._translate_where(where)
             if translated:
                 where_clause = f"AND {translated}"
 
-        vf = self._vector_field
-        try:
-            rows = self._db.query(
-                f"SELECT *, vector::distance::knn() AS dist "
-                f"FROM {self._name} WHERE {vf} <|{n_results}, COSINE|> $vec "
-                f"{where_clause} ORDER BY dist ASC",
-                {"vec": vector},
-            )
-        except Exception:
-            rows = []
+        rows = None
+        if self._projection is not None and self.reduced_ready:
+            rows = self._reduced_query(vector, n_results, where_clause)
+        if rows is None:
+            vf = self._vector_field
+            try:
+                rows = self._db.query(
+                    f"SELECT *, vector::distance::knn() AS dist "
+                    f"FROM {self._name} WHERE {vf} <|{n_results}, COSINE|> $vec "
+                    f"{where_clause} ORDER BY dist ASC",
+                    {"vec": vector},
+                )
+            except Exception:
+                rows = []
 
         ids = [[self._extract_id(r) for r in rows]]
         result = {"ids": ids}
@@ -339,6 +702,36 @@ class SurrealCollection:
 
         return result
 
+    def _reduced_query(self, vector, n_results, where_clause):
+        """KNN over ``vector_r`` then exact rerank on the full vectors.
+
+        Returns rows sorted by full-vector cosine distance (``dist``), or
+        None to make the caller fall back to the full-vector index.
+        """
+        from shared.vector_projection import cosine_distances
+
+        reduced = self._reduced(vector)
+        if reduced is None:
+            return None
+        n_cand = max(n_results * RERANK_FACTOR, RERANK_MIN_CANDIDATES)
+        try:
+            rows = self._db.query(
+                f"SELECT * FROM {self._name} "
+                f"WHERE {REDUCED_FIELD} <|{n_cand}, COSINE|> $vec_r {where_clause}",
+                {"vec_r": reduced},
+            )
+        except Exception:
+            return None
+        rows = rows or []
+        if not rows:
+            return rows
+        vf = self._vector_field
+        dists = cosine_distances(vector, [r.get(vf) or [] for r in rows])
+        for r, d in zip(rows, dists):
+            r["dist"] = d
+        rows.sort(key=lambda r: r["dist"])
+        return rows[:n_results]
+
     def keyword_search(self, query_text, top_k=5):
         try:
             rows = self._db.query(
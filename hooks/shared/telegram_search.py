@@ -0,0 +1,194 @@
+"""Telegram Search — in-process FTS5 search over the Telegram bot message log.
+
+The L3 search cascade used to spawn ``integrations/telegram-bot/search.py``
+per query (interpreter startup + SQLite open + JSON round-trip, 8s timeout).
+This module queries the bot's ``msg_log.db`` directly from the memory server:
+
+- A small pool of warm read-only connections (``mode=ro``, ``query_only``)
+  is kept per database file. The FTS statement text never changes, so
+  sqlite3's per-connection statement cache keeps it prepared.
+- iter_search() streams typed TelegramHit rows. A progress handler
+  interrupts the running statement once the deadline passes or the cancel
+  event is set, so callers can enforce a tight budget themselves.
+- If the file is replaced (new inode) the pool is reopened on next use.
+
+Schema (owned by integrations/telegram-bot/db.py):
+    tg_fts(text, date, sender UNINDEXED, chat_id UNINDEXED, msg_id UNINDEXED)
+
+Public API:
+    from shared.telegram_search import TelegramHit, TelegramSearcher, get_searcher
+"""
+
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+TG_DB_PATH = os.path.join(
+    os.path.expanduser("~"), ".claude", "integrations", "telegram-bot", "msg_log.db"
+)
+DEFAULT_POOL_SIZE = 2
+DEFAULT_TIMEOUT = 0.25  # seconds
+_PROGRESS_OPS = 1000  # SQLite VM steps between deadline checks
+
+_SEARCH_SQL = (
+    "SELECT text, date, sender, chat_id, msg_id, rank FROM tg_fts "
+    "WHERE tg_fts MATCH ? ORDER BY rank LIMIT ?"
+)
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass(frozen=True)
+class TelegramHit:
+    """One FTS5 match; ``bm25`` is SQLite's rank (more negative = better)."""
+
+    text: str
+    date: str
+    sender: str
+    chat_id: int
+    msg_id: str
+    bm25: float
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into a safe FTS5 MATCH expression (AND of quoted terms).
+
+    Raw user text can contain FTS5 syntax (quotes, ``-``, ``:``, ``NEAR``)
+    that raises a syntax error; quoting each word keeps implicit-AND
+    semantics without that failure mode.
+    """
+    return " ".join(f'"{tok}"' for tok in _TOKEN_RE.findall(text or ""))
+
+
+class TelegramSearcher:
+    """Pooled read-only FTS5 searcher for one msg_log.db file."""
+
+    def __init__(self, db_path: str = TG_DB_PATH, pool_size: int = DEFAULT_POOL_SIZE):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self._pool = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._ino = None
+        self._opened = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False
+        )
+        conn.execute("PRAGMA query_only = 1")
+        return conn
+
+    def _reset_pool(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self._opened = 0
+
+    def _acquire(self) -> Optional[sqlite3.Connection]:
+        try:
+            ino = os.stat(self.db_path).st_ino
+        except OSError:
+            return None
+        with self._lock:
+            if ino != self._ino:
+                self._reset_pool()
+                self._ino = ino
+            try:
+                return self._pool.get_nowait()
+            except queue.Empty:
+                pass
+            if self._opened < self.pool_size:
+                self._opened += 1
+                try:
+                    return self._connect()
+                except sqlite3.Error:
+                    self._opened -= 1
+                    return None
+        # Pool exhausted: wait briefly for a connection to come back
+        try:
+            return self._pool.get(timeout=DEFAULT_TIMEOUT)
+        except queue.Empty:
+            return None
+
+    def _release(self, conn: sqlite3.Connection, ino):
+        conn.set_progress_handler(None, 0)
+        with self._lock:
+            if ino == self._ino:
+                self._pool.put(conn)
+                return
+        conn.close()  # belongs to a replaced file
+
+    def iter_search(
+        self,
+        query: str,
+        limit: int = 5,
+        timeout: float = DEFAULT_TIMEOUT,
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[TelegramHit]:
+        """Yield hits best-first until limit, deadline or cancellation.
+
+        Stops silently (no exception) when interrupted; rows already yielded
+        stay valid.
+        """
+        match = fts_query(query)
+        if not match or limit <= 0:
+            return
+        conn = self._acquire()
+        if conn is None:
+            return
+        ino = self._ino
+        deadline = time.monotonic() + timeout
+
+        def _interrupt():
+            return (cancel is not None and cancel.is_set()) or (
+                time.monotonic() > deadline
+            )
+
+        conn.set_progress_handler(_interrupt, _PROGRESS_OPS)
+        try:
+            cursor = conn.execute(_SEARCH_SQL, (match, limit))
+            for row in cursor:
+                if _interrupt():
+                    break
+                yield TelegramHit(
+                    text=row[0] or "",
+                    date=row[1] or "",
+                    sender=row[2] or "",
+                    chat_id=row[3],
+                    msg_id=row[4] or "",
+                    bm25=float(row[5] or 0.0),
+                )
+        except sqlite3.Error:
+            return  # interrupted, locked, or not a bot database
+        finally:
+            self._release(conn, ino)
+
+    def search(self, query: str, limit: int = 5, timeout: float = DEFAULT_TIMEOUT,
+               cancel: Optional[threading.Event] = None) -> List[TelegramHit]:
+        return list(self.iter_search(query, limit, timeout, cancel))
+
+    def close(self):
+        with self._lock:
+            self._reset_pool()
+            self._ino = None
+
+
+_searchers = {}
+_searchers_lock = threading.Lock()
+
+
+def get_searcher(db_path: str = TG_DB_PATH) -> Optional[TelegramSearcher]:
+    """Process-wide searcher for db_path, or None when the file is absent."""
+    if not os.path.isfile(db_path):
+        return None
+    with _searchers_lock:
+        searcher = _searchers.get(db_path)
+        if searcher is None:
+            searcher = _searchers[db_path] = TelegramSearcher(db_path)
+        return searcher
@@ -14,16 +14,28 @@ detect_unusual_sequence(recent, ...)     -> Optional[AnomalyReport]
 get_transition_matrix(queue_path)        -> Dict[str, Dict[str, float]]
 get_tool_stats(queue_path)               -> Dict[str, Dict]
 summarize_patterns(queue_path)           -> Dict
+TransitionModel(order, half_life_hours)  -> decayed n-gram next-tool model
+get_transition_model(queue_path, ...)    -> TransitionModel (persistent)
 
 All heavy work is lazy — nothing is loaded until you call a function
 that needs data.  Results are cached in module-level singletons so
-repeated calls within one process are cheap.  The cache is invalidated
-automatically when the queue file's mtime changes.
+repeated calls within one process are cheap.  When the queue file's
+mtime changes, only the bytes appended since the last read are parsed
+and folded into the cached sequences and chain; a truncated/rotated
+queue or out-of-order entries fall back to a full reload.
+
+TransitionModel is the streaming counterpart: it is updated per tool
+event, keeps exponentially time-decayed counts for contexts of up to
+``order`` previous tools, and answers "most likely next tool" in
+O(order) via a per-context running argmax.  snapshot()/restore() let a
+long-running daemon keep its counts across restarts.
 """
 
+import hashlib
 import json
 import math
 import os
+import threading
 import time
 from collections import defaultdict
 from dataclasses import dataclass, field
@@ -128,14 +140,17 @@ class MarkovChain:
 _chain_cache: Optional[MarkovChain] = None
 _sequences_cache: Optional[List[List[str]]] = None
 _cache_mtime: float = 0.0
+# Tail position of the cached queue: {path, ino, offset, max_time, splitter}
+_tail: Optional[Dict] = None
 
 
 def _invalidate_cache() -> None:
     """Clear all in-process caches (forces reload on next access)."""
-    global _chain_cache, _sequences_cache, _cache_mtime
+    global _chain_cache, _sequences_cache, _cache_mtime, _tail
     _chain_cache = None
     _sequences_cache = None
     _cache_mtime = 0.0
+    _tail = None
 
 
 def _queue_mtime(queue_path: str) -> float:
@@ -187,62 +202,103 @@ def load_sequences(
     if not os.path.exists(queue_path):
         return []
 
-    raw_entries: List[Dict] = []
-    try:
-        with open(queue_path, "r", encoding="utf-8", errors="replace") as fh:
-            for line in fh:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    obj = json.loads(line)
-                    if isinstance(obj, dict):
-                        raw_entries.append(obj)
-                except json.JSONDecodeError:
-                    continue
-    except (IOError, OSError):
+    raw_entries, _offset = _read_queue_entries(queue_path, complete_only=False)
+    if raw_entries is None:
         return []
 
     # Sort chronologically so time-gap detection works correctly
-    raw_entries.sort(key=lambda e: e.get("metadata", {}).get("session_time", 0))
+    raw_entries.sort(key=_entry_time)
+    splitter = _SequenceSplitter(skip_tools)
+    splitter.feed(raw_entries)
+    return splitter.sequences
+
+
+def _entry_time(entry: Dict) -> float:
+    return float(entry.get("metadata", {}).get("session_time", 0) or 0)
 
-    sequences: List[List[str]] = []
-    current_seq: List[str] = []
-    prev_session: str = ""
-    prev_time: float = 0.0
 
-    for entry in raw_entries:
-        meta = entry.get("metadata", {})
-        tool_name = meta.get("tool_name", "")
-        session_id = meta.get("session_id", "")
-        session_time = float(meta.get("session_time", 0))
+def _read_queue_entries(queue_path: str, offset: int = 0, complete_only: bool = True):
+    """Parse JSONL lines from ``offset``.
 
-        if not tool_name:
+    Returns ``(entries, end_offset)``; ``(None, offset)`` on I/O error.  With
+    ``complete_only`` a trailing line without a newline (a write still in
+    progress) is left for the next read.
+    """
+    try:
+        with open(queue_path, "rb") as fh:
+            fh.seek(offset)
+            data = fh.read()
+    except (IOError, OSError):
+        return None, offset
+    end = data.rfind(b"\n") + 1 if complete_only else len(data)
+    entries: List[Dict] = []
+    for line in data[:end].decode("utf-8", errors="replace").splitlines():
+        line = line.strip()
+        if not line:
             continue
-        if tool_name in skip_tools:
+        try:
+            obj = json.loads(line)
+            if isinstance(obj, dict):
+                entries.append(obj)
+        except json.JSONDecodeError:
             continue
+    return entries, offset + end
 
-        # Detect sequence boundary (session change or long idle gap)
-        new_session = session_id != prev_session
-        time_gap = (
-            bool(prev_time)
-            and (session_time - prev_time) >= _SESSION_BREAK_SECONDS
-        )
 
-        if (new_session or time_gap) and current_seq:
-            if len(current_seq) >= 2:
-                sequences.append(current_seq)
-            current_seq = []
+class _SequenceSplitter:
+    """Incremental form of the load_sequences() boundary rules.
 
-        current_seq.append(tool_name)
-        prev_session = session_id
-        prev_time = session_time
+    ``sequences`` always equals what load_sequences() would return for the
+    entries fed so far; feeding more entries (in time order) extends it in
+    place.  When ``chain`` is given, each accepted tool is also folded into
+    it exactly as build_markov_chain() would count it.
+    """
 
-    # Flush the last open sequence
-    if current_seq and len(current_seq) >= 2:
-        sequences.append(current_seq)
+    def __init__(self, skip_tools: Set[str]):
+        self.skip_tools = skip_tools
+        self.sequences: List[List[str]] = []
+        self.current: List[str] = []
+        self.prev_session = ""
+        self.prev_time = 0.0
+
+    def feed(self, entries: List[Dict], chain: Optional[MarkovChain] = None) -> None:
+        for entry in entries:
+            meta = entry.get("metadata", {})
+            tool_name = meta.get("tool_name", "")
+            session_id = meta.get("session_id", "")
+            session_time = float(meta.get("session_time", 0))
+
+            if not tool_name:
+                continue
+            if tool_name in self.skip_tools:
+                continue
+
+            # Detect sequence boundary (session change or long idle gap)
+            new_session = session_id != self.prev_session
+            time_gap = (
+                bool(self.prev_time)
+                and (session_time - self.prev_time) >= _SESSION_BREAK_SECONDS
+            )
 
-    return sequences
+            if (new_session or time_gap) and self.current:
+                # Sequences shorter than 2 never made it into the output
+                self.current = []
+
+            self.current.append(tool_name)
+            if len(self.current) == 2:
+                self.sequences.append(self.current)
+                if chain is not None:
+                    chain.sequence_count += 1
+                    chain.total_starts += 1
+                    chain.start_counts[self.current[0]] += 1
+                    chain.vocabulary.add(self.current[0])
+            if len(self.current) >= 2 and chain is not None:
+                src, dst = self.current[-2], self.current[-1]
+                chain.vocabulary.add(src)
+                chain.vocabulary.add(dst)
+                chain.transitions[src][dst] += 1
+            self.prev_session = session_id
+            self.prev_time = session_time
 
 
 # ---------------------------------------------------------------------------
@@ -733,24 +789,414 @@ def summarize_patterns(queue_path: str = _DEFAULT_QUEUE_PATH) -> Dict:
     }
 
 
+# ---------------------------------------------------------------------------
+# Streaming transition model (per-event updates, decayed n-gram counts)
+# ---------------------------------------------------------------------------
+
+_DEFAULT_MODEL_PATH = os.path.join(
+    os.path.expanduser("~"), ".claude", "hooks", ".tool_transitions.json"
+)
+
+# Longest context (number of previous tools) the model conditions on
+_MODEL_ORDER = 3
+
+# Counts halve after this long without reinforcement
+_MODEL_HALF_LIFE_HOURS = 168.0
+
+# Decayed observations a context needs before it is trusted over a shorter one
+_MODEL_MIN_SUPPORT = 2.0
+
+# Auto-snapshot after this many new events (get_transition_model)
+_MODEL_SNAPSHOT_EVERY = 50
+
+# Rebase stored weights once their exponent passes this (keeps floats finite)
+_MODEL_REBASE_EXPONENT = 512.0
+
+# Per-session contexts kept in memory
+_MODEL_MAX_SESSIONS = 256
+
+# Leading queue bytes fingerprinted to detect a replaced file (inodes recycle)
+_QUEUE_HEAD_BYTES = 128
+
+
+class TransitionModel:
+    """Time-decayed n-gram model of "which tool comes next".
+
+    Each context (tuple of up to ``order`` previous tools, plus the empty
+    context for overall frequency) owns a row of counts.  Decay is applied
+    lazily: an event at time ``t`` adds weight ``2 ** ((t - t0) / half_life)``
+    so older events shrink relative to newer ones without touching the
+    row.  Because weights only grow, each row's running argmax stays exact
+    and "most likely next tool" is O(order) backoff over dict lookups.
+
+    Sequence boundaries follow load_sequences(): a session change or a gap
+    of ``_SESSION_BREAK_SECONDS`` resets the context; skip tools are ignored.
+    """
+
+    def __init__(
+        self,
+        order: int = _MODEL_ORDER,
+        half_life_hours: float = _MODEL_HALF_LIFE_HOURS,
+        skip_tools: Optional[Set[str]] = None,
+    ):
+        self.order = max(1, int(order))
+        self.half_life = half_life_hours * 3600.0
+        self.skip_tools = (
+            skip_tools if skip_tools is not None else {"UserPrompt", "PreCompact"}
+        )
+        self.t0: Optional[float] = None
+        self.events = 0
+        # context tuple -> [scaled_total, {tool: scaled_count}, best_tool]
+        self._rows: Dict[Tuple[str, ...], list] = {}
+        # session_id -> [recent tools (<= order), last event time]
+        self._sessions: Dict[str, list] = {}
+        # queue path -> [inode, byte offset, head fingerprint, latest
+        # session_time folded] for ingest()
+        self._offsets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    # -- updates ----------------------------------------------------------
+
+    def _weight(self, ts: float) -> float:
+        if self.t0 is None:
+            self.t0 = ts
+        exponent = (ts - self.t0) / self.half_life
+        if exponent > _MODEL_REBASE_EXPONENT:
+            self._rebase(ts)
+            exponent = 0.0
+        return 2.0 ** exponent
+
+    def _rebase(self, ts: float) -> None:
+        """Move the weight origin to ``ts`` (rare; O(total counts))."""
+        scale = 2.0 ** (-(ts - self.t0) / self.half_life)
+        for row in self._rows.values():
+            row[0] *= scale
+            counts = row[1]
+            for tool in counts:
+                counts[tool] *= scale
+        self.t0 = ts
+
+    def observe(self, tool: str, session_id: str = "", ts: Optional[float] = None) -> None:
+        """Fold one tool event into the model."""
+        if not tool or tool in self.skip_tools:
+            return
+        ts = time.time() if ts is None else float(ts)
+        with self._lock:
+            sess = self._sessions.get(session_id)
+            if sess is None or ts - sess[1] >= _SESSION_BREAK_SECONDS:
+                sess = [[], ts]
+            history = sess[0]
+            w = self._weight(ts)
+            for k in range(0, min(self.order, len(history)) + 1):
+                ctx = tuple(history[len(history) - k :]) if k else ()
+                row = self._rows.get(ctx)
+                if row is None:
+                    row = self._rows[ctx] = [0.0, {}, tool]
+                counts = row[1]
+                counts[tool] = counts.get(tool, 0.0) + w
+                row[0] += w
+                if counts[tool] > counts.get(row[2], 0.0):
+                    row[2] = tool
+            history.append(tool)
+            del history[: -self.order]
+            sess[1] = ts
+            self._sessions.pop(session_id, None)
+            self._sessions[session_id] = sess  # most recent last
+            if len(self._sessions) > _MODEL_MAX_SESSIONS:
+                del self._sessions[next(iter(self._sessions))]
+            self.events += 1
+
+    def observe_entry(self, entry: Dict) -> None:
+        """Fold one capture-queue entry into the model."""
+        meta = entry.get("metadata", {}) if isinstance(entry, dict) else {}
+        ts = meta.get("session_time")
+        self.observe(
+            meta.get("tool_name", ""),
+            meta.get("session_id", ""),
+            float(ts) if ts else None,
+        )
+
+    @staticmethod
+    def _queue_head(queue_path: str, offset: int) -> str:
+        try:
+            with open(queue_path, "rb") as fh:
+                data = fh.read(min(_QUEUE_HEAD_BYTES, offset))
+        except OSError:
+            return ""
+        return hashlib.sha1(data).hexdigest()
+
+    def ingest(self, queue_path: str = _DEFAULT_QUEUE_PATH) -> int:
+        """Fold complete lines appended to ``queue_path`` since the last call.
+
+        A replaced or truncated queue (new inode, shorter file or different
+        leading bytes) is read from the start, skipping entries no newer than
+        the latest ``session_time`` already folded from it: the tracker's cap
+        rewrites the queue keeping its most recent lines, which must not be
+        counted twice.  Returns the number of entries folded in.
+        """
+        try:
+            st = os.stat(queue_path)
+        except OSError:
+            return 0
+        cursor = self._offsets.get(queue_path)
+        ino, offset, head, seen = cursor if cursor else (st.st_ino, 0, "", 0.0)
+        rewritten = offset > 0 and (
+            ino != st.st_ino
+            or st.st_size < offset
+            or (head and self._queue_head(queue_path, offset) != head)
+        )
+        if rewritten:
+            offset = 0
+        if st.st_size == offset:
+            return 0
+        entries, end = _read_queue_entries(queue_path, offset)
+        if entries is None:
+            return 0
+        folded = 0
+        for entry in entries:
+            try:
+                ts = float(entry.get("metadata", {}).get("session_time") or 0.0)
+            except (AttributeError, TypeError, ValueError):
+                ts = 0.0
+            if rewritten and ts <= seen:
+                continue
+            self.observe_entry(entry)
+            seen = max(seen, ts)
+            folded += 1
+        head = self._queue_head(queue_path, end)
+        with self._lock:
+            self._offsets[queue_path] = [st.st_ino, end, head, seen]
+        return folded
+
+    # -- queries ----------------------------------------------------------
+
+    def _decay_now(self, now: Optional[float]) -> float:
+        if self.t0 is None:
+            return 1.0
+        now = time.time() if now is None else now
+        return 2.0 ** (-(now - self.t0) / self.half_life)
+
+    def _row_for(self, recent_tools: List[str], now: Optional[float]):
+        """Longest context with enough decayed support (backs off to ``()``)."""
+        recent = [t for t in recent_tools if t not in self.skip_tools]
+        scale = self._decay_now(now)
+        for k in range(min(self.order, len(recent)), 0, -1):
+            row = self._rows.get(tuple(recent[-k:]))
+            if row is not None and row[0] * scale >= _MODEL_MIN_SUPPORT:
+                return row
+        return self._rows.get(())
+
+    def most_likely_next(
+        self, recent_tools: List[str], now: Optional[float] = None
+    ) -> Optional[Tuple[str, float]]:
+        """Return ``(tool, probability)`` for the single likeliest next tool."""
+        with self._lock:
+            row = self._row_for(recent_tools, now)
+            if row is None or row[0] <= 0:
+                return None
+            return row[2], row[1][row[2]] / row[0]
+
+    def predict(
+        self, recent_tools: List[str], top_k: int = 5, now: Optional[float] = None
+    ) -> List[Tuple[str, float]]:
+        """Top-k ``(tool, probability)`` from the best-supported context."""
+        with self._lock:
+            row = self._row_for(recent_tools, now)
+            if row is None or row[0] <= 0:
+                return []
+            total = row[0]
+            ranked = sorted(row[1].items(), key=lambda x: x[1], reverse=True)
+            return [(tool, count / total) for tool, count in ranked[:top_k]]
+
+    def count(
+        self, context: Tuple[str, ...], tool: str, now: Optional[float] = None
+    ) -> float:
+        """Decayed count of ``tool`` following ``context`` as of ``now``."""
+        with self._lock:
+            row = self._rows.get(tuple(context))
+            if row is None:
+                return 0.0
+            return row[1].get(tool, 0.0) * self._decay_now(now)
+
+    # -- persistence ------------------------------------------------------
+
+    def snapshot(self, path: str = _DEFAULT_MODEL_PATH) -> bool:
+        """Atomically write the model to ``path`` as JSON."""
+        # Copy the live containers under the lock; serializing happens
+        # outside it while observe() may keep mutating them.
+        with self._lock:
+            data = {
+                "version": 1,
+                "order": self.order,
+                "half_life": self.half_life,
+                "t0": self.t0,
+                "events": self.events,
+                "rows": [
+                    [list(ctx), row[0], dict(row[1]), row[2]]
+                    for ctx, row in self._rows.items()
+                ],
+                "sessions": {
+                    sid: [list(hist), ts] for sid, (hist, ts) in self._sessions.items()
+                },
+                "offsets": {p: list(cursor) for p, cursor in self._offsets.items()},
+            }
+        tmp = path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(tmp, "w") as fh:
+                json.dump(data, fh)
+            os.replace(tmp, path)
+            return True
+        except (OSError, TypeError, ValueError):
+            return False
+
+    @classmethod
+    def restore(
+        cls,
+        path: str = _DEFAULT_MODEL_PATH,
+        order: int = _MODEL_ORDER,
+        half_life_hours: float = _MODEL_HALF_LIFE_HOURS,
+    ) -> "TransitionModel":
+        """Load a snapshot; a missing, corrupt or differently-shaped one starts fresh."""
+        model = cls(order=order, half_life_hours=half_life_hours)
+        try:
+            with open(path) as fh:
+                data = json.load(fh)
+            if (
+                data.get("version") != 1
+                or data.get("order") != model.order
+                or data.get("half_life") != model.half_life
+            ):
+                return model
+            model.t0 = data.get("t0")
+            model.events = int(data.get("events", 0))
+            model._rows = {
+                tuple(ctx): [float(total), dict(counts), best]
+                for ctx, total, counts, best in data.get("rows", [])
+            }
+            model._sessions = {
+                sid: [list(hist), float(ts)]
+                for sid, (hist, ts) in data.get("sessions", {}).items()
+            }
+            # Snapshots from before the head/seen fields: trust the inode
+            # and treat everything up to the newest session event as seen
+            latest = max((ts for _hist, ts in model._sessions.values()), default=0.0)
+            model._offsets = {
+                p: [
+                    int(cursor[0]),
+                    int(cursor[1]),
+                    str(cursor[2]) if len(cursor) > 2 else "",
+                    float(cursor[3]) if len(cursor) > 3 else latest,
+                ]
+                for p, cursor in data.get("offsets", {}).items()
+            }
+        except (OSError, ValueError, TypeError, AttributeError):
+            return cls(order=order, half_life_hours=half_life_hours)
+        return model
+
+
+_model: Optional[TransitionModel] = None
+_model_saved_events = 0
+
+
+def get_transition_model(
+    queue_path: str = _DEFAULT_QUEUE_PATH,
+    model_path: str = _DEFAULT_MODEL_PATH,
+) -> TransitionModel:
+    """Process-wide TransitionModel, restored from ``model_path`` on first use.
+
+    Each call folds in queue lines appended since the previous one and
+    snapshots every ``_MODEL_SNAPSHOT_EVERY`` new events, so the cost does
+    not grow with accumulated history.
+    """
+    global _model, _model_saved_events
+    if _model is None:
+        _model = TransitionModel.restore(model_path)
+        _model_saved_events = _model.events
+    _model.ingest(queue_path)
+    if _model.events - _model_saved_events >= _MODEL_SNAPSHOT_EVERY:
+        if _model.snapshot(model_path):
+            _model_saved_events = _model.events
+    return _model
+
+
 # ---------------------------------------------------------------------------
 # Private lazy-loading helpers
 # ---------------------------------------------------------------------------
 
 
 def _get_sequences(queue_path: str = _DEFAULT_QUEUE_PATH) -> List[List[str]]:
-    """Return cached sequences, refreshing from disk if the queue has changed."""
-    global _sequences_cache, _cache_mtime, _chain_cache
+    """Return cached sequences, refreshing from disk if the queue has changed.
+
+    Appends are folded in incrementally (see _extend_from_tail); anything
+    else triggers a full reload.
+    """
+    global _sequences_cache, _cache_mtime, _chain_cache, _tail
 
     if _sequences_cache is None or _needs_refresh(queue_path):
-        _sequences_cache = load_sequences(queue_path)
+        if _sequences_cache is None or not _extend_from_tail(queue_path):
+            _full_reload(queue_path)
         _cache_mtime = _queue_mtime(queue_path)
-        # Downstream caches are stale too
-        _chain_cache = None
 
     return _sequences_cache
 
 
+def _full_reload(queue_path: str) -> None:
+    global _sequences_cache, _chain_cache, _tail
+    _tail = None
+    _chain_cache = None  # Downstream caches are stale too
+    entries, offset = (
+        _read_queue_entries(queue_path) if os.path.exists(queue_path) else (None, 0)
+    )
+    if entries is None:
+        _sequences_cache = []
+        return
+    entries.sort(key=_entry_time)
+    splitter = _SequenceSplitter({"UserPrompt", "PreCompact"})
+    splitter.feed(entries)
+    _sequences_cache = splitter.sequences
+    try:
+        ino = os.stat(queue_path).st_ino
+    except OSError:
+        return
+    _tail = {
+        "path": queue_path,
+        "ino": ino,
+        "offset": offset,
+        "max_time": max((_entry_time(e) for e in entries), default=0.0),
+        "splitter": splitter,
+    }
+
+
+def _extend_from_tail(queue_path: str) -> bool:
+    """Fold lines appended since the last read into the caches.
+
+    Returns False when an incremental update is not equivalent to a full
+    reload (different/replaced/truncated file, or entries older than what
+    was already consumed, which load_sequences() would have sorted earlier).
+    """
+    global _tail
+    if _tail is None or _tail["path"] != queue_path:
+        return False
+    try:
+        st = os.stat(queue_path)
+    except OSError:
+        return False
+    if st.st_ino != _tail["ino"] or st.st_size < _tail["offset"]:
+        return False
+    entries, offset = _read_queue_entries(queue_path, _tail["offset"])
+    if entries is None:
+        return False
+    entries.sort(key=_entry_time)
+    if entries and _entry_time(entries[0]) < _tail["max_time"]:
+        return False
+    _tail["splitter"].feed(entries, chain=_chain_cache)
+    _tail["offset"] = offset
+    if entries:
+        _tail["max_time"] = _entry_time(entries[-1])
+    return True
+
+
 def _get_chain(queue_path: str = _DEFAULT_QUEUE_PATH) -> MarkovChain:
     """Return the cached MarkovChain, rebuilding from sequences if needed."""
     global _chain_cache
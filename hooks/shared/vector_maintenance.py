@@ -0,0 +1,225 @@
+"""Vector Maintenance — local dedup and clustering over an embedding matrix.
+
+Maintenance sweeps (deduplicate_sweep, cluster_knowledge) used to re-embed
+every stored document and run one KNN query per memory, costing N NIM calls
+and N SurrealDB round-trips. The vectors are already stored in SurrealDB, so
+this module pages them out once, keeps them as a row-normalized float16/float32
+matrix, and answers all-pairs nearest-neighbor questions with blocked NumPy
+matrix products.
+
+Memory is bounded: the matrix itself (10k x 4096 float16 ~= 80 MB) plus one
+(block_size x N) float32 similarity block at a time.
+
+Distances follow SurrealDB's COSINE metric: distance = 1 - cosine similarity.
+
+Public API:
+    from shared.vector_maintenance import (
+        load_embedding_matrix, nearest_neighbors,
+        find_duplicate_pairs, find_clusters,
+    )
+"""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 500  # rows per collection.get() page
+DEFAULT_BLOCK_SIZE = 256  # query rows per similarity block
+
+
+def _normalize_rows(mat: np.ndarray) -> np.ndarray:
+    """L2-normalize rows in place; zero vectors stay zero (never match)."""
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms < 1e-10] = 1.0
+    mat /= norms
+    return mat
+
+
+def load_embedding_matrix(
+    collection,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dtype=np.float16,
+    total: Optional[int] = None,
+) -> Tuple[List[str], np.ndarray]:
+    """Page all stored vectors out of a SurrealCollection into one matrix.
+
+    Each page is converted to a normalized ``dtype`` block immediately so the
+    Python float lists for only one page are alive at a time. Rows without a
+    usable vector (missing, wrong dimension) are dropped.
+
+    Args:
+        collection: SurrealCollection (or anything with a compatible get()).
+        chunk_size: Rows fetched per get() call.
+        dtype: Storage dtype of the returned matrix (float16 or float32).
+        total: Optional known row count; pages stop early once reached.
+
+    Returns:
+        (ids, matrix) where matrix[i] is the unit vector for ids[i].
+    """
+    ids: List[str] = []
+    blocks: List[np.ndarray] = []
+    dim = 0
+    offset = 0
+    while True:
+        page = collection.get(limit=chunk_size, offset=offset, include=["embeddings"])
+        page_ids = page.get("ids") or []
+        if not page_ids:
+            break
+        page_vecs = page.get("embeddings") or []
+        keep_ids = []
+        keep_vecs = []
+        for mid, vec in zip(page_ids, page_vecs):
+            if not vec:
+                continue
+            if not dim:
+                dim = len(vec)
+            if len(vec) != dim:
+                continue
+            keep_ids.append(mid)
+            keep_vecs.append(vec)
+        if keep_vecs:
+            block = _normalize_rows(np.asarray(keep_vecs, dtype=np.float32))
+            blocks.append(block.astype(dtype, copy=False))
+            ids.extend(keep_ids)
+        offset += len(page_ids)
+        if len(page_ids) < chunk_size or (total is not None and offset >= total):
+            break
+
+    if not blocks:
+        return [], np.zeros((0, dim), dtype=dtype)
+    return ids, np.concatenate(blocks, axis=0)
+
+
+def nearest_neighbors(
+    matrix: np.ndarray,
+    k: int = 1,
+    max_distance: float = 1.0,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """Yield the k nearest other rows of every row, within max_distance.
+
+    Similarities are computed block by block in float32 regardless of the
+    storage dtype, so peak extra memory is block_size x N x 4 bytes (plus
+    two block_size x D float32 copies when the matrix is stored narrower).
+
+    Yields:
+        (row_index, neighbor_indices, distances) sorted by ascending distance.
+        Rows with no neighbor inside max_distance are skipped.
+    """
+    n = matrix.shape[0]
+    if n < 2 or k < 1:
+        return
+    k = min(k, n - 1)
+    min_sim = 1.0 - max_distance
+    upcast = matrix.dtype != np.float32
+
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        if upcast:
+            # BLAS only accelerates float32/float64: upcast one block of
+            # rows and one block of columns at a time, never the whole matrix.
+            block = matrix[start:stop].astype(np.float32)
+            sims = np.empty((stop - start, n), dtype=np.float32)
+            for col in range(0, n, block_size):
+                col_stop = min(col + block_size, n)
+                sims[:, col:col_stop] = block @ matrix[col:col_stop].astype(np.float32).T
+        else:
+            sims = matrix[start:stop] @ matrix.T
+        rows = np.arange(stop - start)
+        sims[rows, rows + start] = -np.inf  # exclude self
+
+        if k == 1:
+            top = np.argmax(sims, axis=1)[:, None]
+        elif k < n - 1:
+            top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(n), (stop - start, 1))
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_sims, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_sims = np.take_along_axis(top_sims, order, axis=1)
+
+        for r in range(stop - start):
+            mask = top_sims[r] >= min_sim
+            if not mask.any():
+                continue
+            yield (
+                start + r,
+                top[r][mask],
+                1.0 - top_sims[r][mask].astype(np.float64),
+            )
+
+
+def find_duplicate_pairs(
+    ids: List[str],
+    matrix: np.ndarray,
+    threshold: float,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> List[Dict]:
+    """Pair every memory with its nearest neighbor when closer than threshold.
+
+    Mirrors the old per-memory ``query(n_results=2)`` semantics: one nearest
+    neighbor per memory, strict ``distance < threshold``, each unordered pair
+    reported once.
+
+    Returns:
+        List of {"id_a", "id_b", "distance"} dicts, closest first.
+    """
+    pairs = []
+    seen = set()
+    for i, nbrs, dists in nearest_neighbors(
+        matrix, k=1, max_distance=threshold, block_size=block_size
+    ):
+        j, dist = int(nbrs[0]), float(dists[0])
+        if dist >= threshold:
+            continue
+        key = (min(i, j), max(i, j))
+        if key in seen:
+            continue
+        seen.add(key)
+        pairs.append({"id_a": ids[i], "id_b": ids[j], "distance": round(dist, 4)})
+    pairs.sort(key=lambda p: p["distance"])
+    return pairs
+
+
+def find_clusters(
+    matrix: np.ndarray,
+    distance_threshold: float,
+    neighbor_k: int = 30,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> List[List[int]]:
+    """Union-find clusters over each row's k nearest neighbors within threshold.
+
+    Returns:
+        List of member-index lists (singletons included), in first-seen order.
+    """
+    n = matrix.shape[0]
+    parent = list(range(n))
+    rank = [0] * n
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]  # path compression
+            x = parent[x]
+        return x
+
+    def union(a, b):
+        ra, rb = find(a), find(b)
+        if ra == rb:
+            return
+        if rank[ra] < rank[rb]:
+            ra, rb = rb, ra
+        parent[rb] = ra
+        if rank[ra] == rank[rb]:
+            rank[ra] += 1
+
+    for i, nbrs, _dists in nearest_neighbors(
+        matrix, k=neighbor_k, max_distance=distance_threshold, block_size=block_size
+    ):
+        for j in nbrs:
+            union(i, int(j))
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
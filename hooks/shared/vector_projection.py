@@ -0,0 +1,201 @@
+"""Vector Projection — reduced-dimension embeddings for candidate retrieval.
+
+nv-embed-v1 vectors are 4096-dim; storing and HNSW-indexing them costs
+~16 KB per row before graph overhead. In reduced mode each vector table also
+stores a 256/512-dim projection (``vector_r``), the HNSW index is built over
+that, and the full vector is only read back to rerank the top candidates.
+
+Two projection methods:
+- "pca": learned mean + principal components (fit once from stored vectors,
+  saved as an .npz file next to the database).
+- "matryoshka": keep the leading dims and renormalize. No file needed; only
+  sensible for models trained with Matryoshka loss.
+
+Public API:
+    from shared.vector_projection import (
+        Projection, fit_pca, load_projection, evaluate_projection,
+        cosine_distances,
+    )
+"""
+
+import hashlib
+import os
+import time
+from typing import Optional
+
+import numpy as np
+
+PROJECTION_METHODS = ("pca", "matryoshka")
+DEFAULT_FIT_SAMPLE = 5000
+
+
+def _unit_rows(mat: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms < 1e-10] = 1.0
+    return mat / norms
+
+
+class Projection:
+    """Maps full-dimension vectors to unit-norm reduced vectors."""
+
+    def __init__(self, method, dim, source_dim, mean=None, components=None):
+        if method not in PROJECTION_METHODS:
+            raise ValueError(f"unknown projection method: {method}")
+        self.method = method
+        self.dim = int(dim)
+        self.source_dim = int(source_dim)
+        self.mean = mean
+        self.components = components  # (dim, source_dim) for pca
+
+    def project(self, vectors) -> np.ndarray:
+        """Project a (n, source_dim) array or a single vector; rows unit-norm."""
+        mat = np.asarray(vectors, dtype=np.float32)
+        single = mat.ndim == 1
+        if single:
+            mat = mat[None, :]
+        if mat.shape[1] != self.source_dim:
+            raise ValueError(
+                f"expected {self.source_dim}-dim vectors, got {mat.shape[1]}"
+            )
+        if self.method == "matryoshka":
+            out = mat[:, : self.dim]
+        else:
+            out = (mat - self.mean) @ self.components.T
+        out = _unit_rows(out)
+        return out[0] if single else out
+
+    def fingerprint(self) -> str:
+        """Identifies the mapping: method, dims and (for pca) the fitted weights.
+
+        Reduced vectors written under one fingerprint are meaningless under
+        another, so a refit or a method/dim change must re-project every row.
+        """
+        h = hashlib.sha1()
+        for arr in (self.mean, self.components):
+            if arr is not None:
+                h.update(np.ascontiguousarray(arr, dtype=np.float32).tobytes())
+        return f"{self.method}:{self.dim}:{self.source_dim}:{h.hexdigest()[:16]}"
+
+    def project_list(self, vector) -> list:
+        """Project one vector and return a plain list (SurrealDB parameter)."""
+        return self.project(vector).tolist()
+
+    def save(self, path: str) -> None:
+        tmp = path + ".tmp.npz"
+        np.savez(
+            tmp,
+            method=self.method,
+            dim=self.dim,
+            source_dim=self.source_dim,
+            mean=self.mean if self.mean is not None else np.zeros(0),
+            components=self.components if self.components is not None else np.zeros(0),
+        )
+        os.replace(tmp, path)
+
+
+def matryoshka(dim: int, source_dim: int) -> Projection:
+    return Projection("matryoshka", dim, source_dim)
+
+
+def fit_pca(matrix, dim: int, sample: int = DEFAULT_FIT_SAMPLE, seed: int = 0):
+    """Learn a PCA projection from stored (normalized) vectors.
+
+    Args:
+        matrix: (n, source_dim) array of stored vectors (any float dtype).
+        dim: Target dimension (e.g. 256 or 512); must be <= min(n, source_dim).
+        sample: Max rows used for the fit.
+    """
+    n, source_dim = matrix.shape
+    if dim > min(n, source_dim):
+        raise ValueError(f"need at least {dim} vectors to fit a {dim}-dim PCA")
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(n, size=min(n, sample), replace=False))
+    data = _unit_rows(np.asarray(matrix[rows], dtype=np.float32))
+    mean = data.mean(axis=0)
+    # Right singular vectors of the centered sample = principal axes
+    _u, _s, vt = np.linalg.svd(data - mean, full_matrices=False)
+    return Projection("pca", dim, source_dim, mean=mean, components=vt[:dim].copy())
+
+
+def load_projection(path: str) -> Optional[Projection]:
+    """Load a saved projection; None when the file is missing or unreadable."""
+    try:
+        with np.load(path) as z:
+            method = str(z["method"])
+            mean = z["mean"] if z["mean"].size else None
+            comps = z["components"] if z["components"].size else None
+            return Projection(
+                method, int(z["dim"]), int(z["source_dim"]), mean=mean, components=comps
+            )
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def projection_path(directory: str, dim: int) -> str:
+    return os.path.join(directory, f"projection_{dim}.npz")
+
+
+def cosine_distances(query, vectors) -> list:
+    """Cosine distance from query to each vector (1.0 for missing/odd rows)."""
+    q = np.asarray(query, dtype=np.float32)
+    qn = float(np.linalg.norm(q)) or 1.0
+    out = [1.0] * len(vectors)
+    good = [i for i, v in enumerate(vectors) if v is not None and len(v) == len(q)]
+    if good:
+        mat = np.asarray([vectors[i] for i in good], dtype=np.float32)
+        norms = np.linalg.norm(mat, axis=1)
+        norms[norms < 1e-10] = 1.0
+        sims = (mat @ q) / (norms * qn)
+        for i, s in zip(good, sims):
+            out[i] = float(1.0 - s)
+    return out
+
+
+def evaluate_projection(
+    matrix, projection: Projection, n_queries: int = 200, k: int = 10,
+    rerank_k: int = 50, seed: int = 1,
+) -> dict:
+    """Measure recall@k of reduced retrieval (+ full-vector rerank) vs exact.
+
+    Queries are held-out stored vectors, each excluded from its own results.
+    Also reports the per-row storage footprint of full vs reduced vectors.
+    """
+    full = _unit_rows(np.asarray(matrix, dtype=np.float32))
+    n = full.shape[0]
+    rng = np.random.default_rng(seed)
+    qidx = rng.choice(n, size=min(n_queries, n), replace=False)
+
+    t0 = time.perf_counter()
+    reduced = projection.project(full)
+    project_ms = (time.perf_counter() - t0) * 1000
+
+    # Each query excludes itself, so at most n - 1 neighbors exist
+    kk = max(0, min(k, n - 1))
+    rk = max(kk, min(rerank_k, n - 1))
+
+    hits_reduced = hits_rerank = 0
+    for qi in qidx:
+        exact = full @ full[qi]
+        exact[qi] = -np.inf
+        truth = set(np.argpartition(-exact, kk)[:kk].tolist())
+
+        approx = reduced @ reduced[qi]
+        approx[qi] = -np.inf
+        cand = np.argpartition(-approx, rk)[:rk]
+        top_reduced = cand[np.argsort(-approx[cand])][:kk]
+        top_rerank = cand[np.argsort(-(full[cand] @ full[qi]))][:kk]
+        hits_reduced += len(truth & set(top_reduced.tolist()))
+        hits_rerank += len(truth & set(top_rerank.tolist()))
+
+    total = len(qidx) * kk
+    return {
+        "rows": n,
+        "source_dim": projection.source_dim,
+        "dim": projection.dim,
+        "method": projection.method,
+        f"recall@{k}_reduced": round(hits_reduced / total, 4) if total else 0.0,
+        f"recall@{k}_rerank{rerank_k}": round(hits_rerank / total, 4) if total else 0.0,
+        "full_vector_mb": round(n * projection.source_dim * 4 / 1048576, 2),
+        "reduced_vector_mb": round(n * projection.dim * 4 / 1048576, 2),
+        "project_ms": round(project_ms, 1),
+    }
@@ -6,6 +6,14 @@ quality score → dedup check → classify tier → store → side effects.
 Performance (session 506): embed-once cache, entity cache, background
 post-store work. Cuts remember_this from ~3min to seconds.
 
+Round trips: the memory count comes from a maintained counter (seeded once,
+resynced in the background every COUNT_RESYNC_S), the source session id is
+resolved once per process, and the background stages (retroactive
+interference, A-Mem linking, A-Mem evolution, hybrid linking) share one
+nearest-neighbor fetch and queue their metadata edits into a single batched
+collection.update. A remember is dedup query + upsert in the foreground and
+one query + one update in the background.
+
 Public API:
     from shared.write_pipeline import WritePipeline
 """
@@ -19,6 +27,62 @@ from datetime import datetime
 
 _log = logging.getLogger(__name__)
 
+COUNT_RESYNC_S = 300.0  # background refresh of the maintained memory count
+NEIGHBOR_FETCH = 6  # shared KNN depth (A-Mem linking uses all, RI 3, evolution 4)
+
+_session_id = None
+_session_id_lock = threading.Lock()
+
+
+def _resolve_session_id():
+    """Most recently modified session JSONL's stem, resolved once per process."""
+    global _session_id
+    if _session_id is None:
+        with _session_id_lock:
+            if _session_id is None:
+                _session_id = _scan_session_id()
+    return _session_id
+
+
+def _scan_session_id():
+    """Newest ~/.claude/projects/**/sessions/*.jsonl (one stat per file)."""
+    newest, newest_mtime = "", -1.0
+    try:
+        import glob as _glob
+
+        _sessions_pattern = os.path.join(
+            os.path.expanduser("~"), ".claude", "projects", "**", "sessions", "*.jsonl"
+        )
+        for path in _glob.iglob(_sessions_pattern, recursive=True):
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            if mtime > newest_mtime:
+                newest, newest_mtime = path, mtime
+    except Exception:
+        return ""
+    return os.path.splitext(os.path.basename(newest))[0] if newest else ""
+
+
+def _neighbor_rows(results, limit):
+    """Flatten a collection.query result into (id, distance, meta, doc) tuples."""
+    if not results or not results.get("ids") or not results["ids"][0]:
+        return []
+    ids = results["ids"][0][:limit]
+    dists = (results.get("distances") or [[]])[0]
+    metas = (results.get("metadatas") or [[]])[0]
+    docs = (results.get("documents") or [[]])[0]
+    return [
+        (
+            nid,
+            dists[i] if i < len(dists) else 1.0,
+            (metas[i] if i < len(metas) else None) or {},
+            (docs[i] if i < len(docs) else "") or "",
+        )
+        for i, nid in enumerate(ids)
+    ]
+
 
 class WritePipeline:
     """7-step write orchestrator (with A-Mem enrichment sub-step).
@@ -37,7 +101,7 @@ class WritePipeline:
                 normalize_tags, inject_project_tag, build_project_prefix,
                 check_dedup, classify_tier, extract_citations,
                 bridge_to_fix_outcomes, touch_memory_timestamp,
-                generate_id, embed_text,
+                generate_id, embed_text, invalidate_search_cache,
                 fix_outcomes, noise_regexes, min_content_length,
                 summary_length, server_project, server_subproject
         """
@@ -47,6 +111,44 @@ class WritePipeline:
         self.h = helpers or {}
         self._cached_session_id = None
         self._bg_semaphore = threading.Semaphore(1)  # queue bg threads, 1 at a time
+        self._count = None  # maintained collection.count()
+        self._count_synced = 0.0
+        self._count_lock = threading.Lock()
+
+    # ── Maintained memory count ───────────────────────────────────────────
+
+    def total_memories(self):
+        """Collection size without a round trip (seeded by one count() call)."""
+        with self._count_lock:
+            if self._count is None:
+                self._count = self.collection.count()
+                self._count_synced = time.monotonic()
+            return self._count
+
+    def note_stored(self, n=1):
+        """Called after a store; an unseeded counter reads count() (which includes it)."""
+        with self._count_lock:
+            if self._count is None:
+                self._count = self.collection.count()
+                self._count_synced = time.monotonic()
+            else:
+                self._count += n
+
+    def note_removed(self, n=1):
+        """Callers deleting from the collection outside the pipeline report it here."""
+        if self._count is None:
+            return
+        with self._count_lock:
+            self._count = max(0, self._count - n)
+
+    def _resync_count(self):
+        """Re-read count() if stale (absorbs overwrites and foreign deletes)."""
+        if time.monotonic() - self._count_synced < COUNT_RESYNC_S:
+            return
+        count = self.collection.count()
+        with self._count_lock:
+            self._count = count
+            self._count_synced = time.monotonic()
 
     def write(
         self,
@@ -65,7 +167,7 @@ class WritePipeline:
         collection = self.collection
         h = self.h
 
-        # Auto-detect source session ID (cached after first call)
+        # Auto-detect source session ID (resolved once per process)
         if not source_session_id:
             if self._cached_session_id is None:
                 self._cached_session_id = self._detect_session_id()
@@ -77,7 +179,7 @@ class WritePipeline:
             return {
                 "result": "Rejected: content too short (minimum 20 characters)",
                 "rejected": True,
-                "total_memories": collection.count(),
+                "total_memories": self.total_memories(),
             }
 
         max_content_length = 800
@@ -85,7 +187,7 @@ class WritePipeline:
             return {
                 "result": f"Rejected: content too long ({len(content.strip())} chars, max {max_content_length}). Distill to key facts only.",
                 "rejected": True,
-                "total_memories": collection.count(),
+                "total_memories": self.total_memories(),
             }
 
         # Cap metadata strings
@@ -118,7 +220,7 @@ class WritePipeline:
                     return {
                         "result": f"Rejected: matches noise pattern ('{noise_re.pattern}')",
                         "rejected": True,
-                        "total_memories": collection.count(),
+                        "total_memories": self.total_memories(),
                     }
 
         # ── Embed once, reuse everywhere ──
@@ -164,7 +266,7 @@ class WritePipeline:
                     "deduplicated": True,
                     "existing_id": dedup_result["existing_id"],
                     "distance": dedup_result["distance"],
-                    "total_memories": collection.count(),
+                    "total_memories": self.total_memories(),
                 }
             elif dedup_result.get("soft_dupe_tag"):
                 _soft_dupe_tag = dedup_result["soft_dupe_tag"]
@@ -251,11 +353,21 @@ class WritePipeline:
             _upsert_kwargs["vectors"] = [_cached_vec]
         collection.upsert(**_upsert_kwargs)
 
+        # Drop search-cache entries this memory can affect (fail-open)
+        _invalidate = h.get("invalidate_search_cache")
+        if _invalidate:
+            try:
+                _invalidate(ids=[doc_id], tags=tags, vector=_cached_vec)
+            except Exception:
+                pass
+
+        self.note_stored()
+
         # ── Build result and return immediately ──
         result = {
             "result": "Memory stored successfully!",
             "id": doc_id,
-            "total_memories": collection.count(),
+            "total_memories": self.total_memories(),
             "timestamp": timestamp,
             "quality_score": _q_score,
             "memory_type": memory_type,
@@ -308,6 +420,15 @@ class WritePipeline:
         tags = a["tags"]
         cached_vec = a["cached_vec"]
         cached_entities = a["cached_entities"]
+        pending = {}  # id -> metadata to write; flushed as one batched update
+
+        # Near-duplicate signature for consolidation (fail-open)
+        try:
+            from shared.minhash_index import get_memory_index
+
+            get_memory_index().upsert(doc_id, content)
+        except Exception:
+            pass
 
         # Entity extraction (moved from sync path)
         try:
@@ -321,27 +442,26 @@ class WritePipeline:
         # Update keywords metadata in background
         if cached_entities:
             try:
-                seen = set()
-                keyword_names = []
-                for ent in cached_entities:
-                    name_lower = ent["name"].lower()
-                    if name_lower not in seen:
-                        seen.add(name_lower)
-                        keyword_names.append(ent["name"])
-                keywords_str = ",".join(keyword_names[:10])
-                if len(keywords_str) > 500:
-                    keywords_str = keywords_str[:497] + "..."
+                keywords_str, _ = self._amem_enrich_cached("", "", cached_entities)
                 if keywords_str:
-                    collection.update(
-                        ids=[doc_id], metadatas=[{"keywords": keywords_str}]
-                    )
+                    pending[doc_id] = {"keywords": keywords_str}
             except Exception:
                 pass
 
+        # One nearest-neighbor fetch shared by every stage below
+        neighbors = self._fetch_neighbors(content, cached_vec, collection)
+
         # Retroactive interference (moved from sync path)
         try:
             self._retroactive_interference(
-                content, tags, False, collection, h, query_vector=cached_vec
+                content,
+                tags,
+                False,
+                collection,
+                h,
+                query_vector=cached_vec,
+                neighbors=neighbors,
+                pending=pending,
             )
         except Exception:
             pass
@@ -355,7 +475,7 @@ class WritePipeline:
                     self.graph.upsert_entity(ent["name"], ent["type"])
                 _kg_text = f"{content} {context}"
                 _kg_coocs = extract_cooccurrences(_kg_text)
-                _kg_total = collection.count()
+                _kg_total = self.total_memories()
                 for e1, e2 in _kg_coocs:
                     self.graph.add_edge(e1, e2, "co_occurs")
                     self.graph.update_pmi(e1, e2, "co_occurs", _kg_total)
@@ -364,35 +484,19 @@ class WritePipeline:
 
         # A-Mem linking
         try:
-            if self.graph and collection.count() > 1:
-                _amem_results = collection.query(
-                    query_texts=[content] if not cached_vec else None,
-                    query_vector=cached_vec if cached_vec else None,
-                    n_results=6,
-                    include=["metadatas", "distances"],
-                )
-                if (
-                    _amem_results
-                    and _amem_results.get("ids")
-                    and _amem_results["ids"][0]
-                ):
-                    _amem_threshold = 0.7
-                    for _amem_idx, _amem_id in enumerate(_amem_results["ids"][0]):
-                        if _amem_id == doc_id:
-                            continue
-                        _amem_dist = (
-                            _amem_results["distances"][0][_amem_idx]
-                            if _amem_results.get("distances")
-                            else 1.0
+            if self.graph and self.total_memories() > 1:
+                _amem_threshold = 0.7
+                for _amem_id, _amem_dist, _, _ in neighbors or ():
+                    if _amem_id == doc_id:
+                        continue
+                    _amem_sim = max(0.0, 1.0 - _amem_dist)
+                    if _amem_sim >= _amem_threshold:
+                        self.graph.add_edge(
+                            doc_id, _amem_id, "linked_memory", strength=_amem_sim
+                        )
+                        self.graph.add_edge(
+                            _amem_id, doc_id, "linked_memory", strength=_amem_sim
                         )
-                        _amem_sim = max(0.0, 1.0 - _amem_dist)
-                        if _amem_sim >= _amem_threshold:
-                            self.graph.add_edge(
-                                doc_id, _amem_id, "linked_memory", strength=_amem_sim
-                            )
-                            self.graph.add_edge(
-                                _amem_id, doc_id, "linked_memory", strength=_amem_sim
-                            )
         except Exception:
             pass
 
@@ -406,6 +510,8 @@ class WritePipeline:
                     collection,
                     cached_entities,
                     cached_vec=cached_vec,
+                    neighbors=neighbors,
+                    pending=pending,
                 )
             except Exception:
                 pass
@@ -420,7 +526,16 @@ class WritePipeline:
 
         # Hybrid memory linking
         try:
-            self._hybrid_linking(doc_id, tags, collection)
+            self._hybrid_linking(
+                doc_id, tags, collection, neighbors=neighbors, pending=pending
+            )
+        except Exception:
+            pass
+
+        self._flush_updates(collection, pending)
+
+        try:
+            self._resync_count()
         except Exception:
             pass
 
@@ -464,6 +579,37 @@ class WritePipeline:
 
         return keywords_str, context_description
 
+    @staticmethod
+    def _fetch_neighbors(content, cached_vec, collection, n_results=NEIGHBOR_FETCH):
+        """Nearest neighbors of the new memory as (id, distance, meta, doc) tuples.
+
+        Returns None if the query failed (stages then do nothing).
+        """
+        try:
+            kwargs = {
+                "n_results": n_results,
+                "include": ["metadatas", "documents", "distances"],
+            }
+            if cached_vec:
+                kwargs["query_vector"] = cached_vec
+            else:
+                kwargs["query_texts"] = [content]
+            return _neighbor_rows(collection.query(**kwargs), n_results)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _flush_updates(collection, pending):
+        """Apply queued metadata edits in one batched collection.update."""
+        if not pending:
+            return 0
+        try:
+            collection.update(ids=list(pending), metadatas=list(pending.values()))
+            return len(pending)
+        except Exception as e:
+            _log.debug("write-pipeline batched update failed: %s", e)
+            return 0
+
     def _evolve_neighbors_cached(
         self,
         doc_id,
@@ -472,8 +618,14 @@ class WritePipeline:
         collection,
         cached_entities,
         cached_vec=None,
+        neighbors=None,
+        pending=None,
     ):
-        """A-Mem evolution using pre-extracted entities for the new memory."""
+        """A-Mem evolution using pre-extracted entities for the new memory.
+
+        neighbors: shared fetch from _fetch_neighbors (queried here if None).
+        pending: batch to queue tag edits into (applied here if None).
+        """
         _MAX_UPDATES = 3
         _MIN_SIMILARITY = 0.3
         _TAG_CAP = 500
@@ -498,38 +650,27 @@ class WritePipeline:
         if not new_tag_set:
             return 0
 
-        try:
-            neighbors = collection.query(
-                query_texts=[content] if not cached_vec else None,
-                query_vector=cached_vec if cached_vec else None,
-                n_results=4,
-                include=["metadatas", "documents", "distances"],
-            )
-        except Exception:
-            return 0
-
-        if not neighbors or not neighbors.get("ids") or not neighbors["ids"][0]:
+        if neighbors is None:
+            neighbors = self._fetch_neighbors(content, cached_vec, collection, 4)
+        if not neighbors:
             return 0
 
+        own_batch = pending is None
+        if own_batch:
+            pending = {}
         updated = 0
-        for idx, neighbor_id in enumerate(neighbors["ids"][0]):
+        for neighbor_id, dist, fetched_meta, neighbor_doc in neighbors[:4]:
             if updated >= _MAX_UPDATES:
                 break
 
             if neighbor_id == doc_id:
                 continue
 
-            dist = neighbors["distances"][0][idx] if neighbors.get("distances") else 1.0
             similarity = max(0, 1.0 - dist)
             if similarity < _MIN_SIMILARITY:
                 continue
 
-            neighbor_meta = (
-                neighbors["metadatas"][0][idx] if neighbors.get("metadatas") else {}
-            )
-            neighbor_doc = (
-                neighbors["documents"][0][idx] if neighbors.get("documents") else ""
-            )
+            neighbor_meta = {**fetched_meta, **pending.get(neighbor_id, {})}
             neighbor_tags_str = neighbor_meta.get("tags", "") or ""
             neighbor_context = neighbor_meta.get("context", "") or ""
 
@@ -569,40 +710,19 @@ class WritePipeline:
 
             updated_meta = dict(neighbor_meta)
             updated_meta["tags"] = merged_tags
-            try:
-                collection.update(
-                    ids=[neighbor_id],
-                    metadatas=[updated_meta],
-                )
-                updated += 1
-            except Exception:
-                pass
+            pending[neighbor_id] = updated_meta
+            updated += 1
 
+        if own_batch and not self._flush_updates(collection, pending):
+            return 0
         return updated
 
     def _detect_session_id(self):
         """Auto-detect source session ID from most recent JSONL session file."""
         try:
-            import glob as _glob
-
-            _sessions_pattern = os.path.join(
-                os.path.expanduser("~"),
-                ".claude",
-                "projects",
-                "**",
-                "sessions",
-                "*.jsonl",
-            )
-            _jsonl_files = sorted(
-                _glob.glob(_sessions_pattern, recursive=True),
-                key=os.path.getmtime,
-                reverse=True,
-            )
-            if _jsonl_files:
-                return os.path.splitext(os.path.basename(_jsonl_files[0]))[0]
+            return _resolve_session_id()
         except Exception:
-            pass
-        return ""
+            return ""
 
     def _fallback_id(self, content):
         """Generate a simple ID if generate_id helper not available."""
@@ -611,7 +731,15 @@ class WritePipeline:
         return hashlib.md5(content.encode()).hexdigest()[:16]
 
     def _retroactive_interference(
-        self, content, tags, force, collection, h, query_vector=None
+        self,
+        content,
+        tags,
+        force,
+        collection,
+        h,
+        query_vector=None,
+        neighbors=None,
+        pending=None,
     ):
         """Corrections/fixes suppress similar existing memories."""
         try:
@@ -624,43 +752,37 @@ class WritePipeline:
 
                 _classify_tier = h.get("classify_tier")
 
-                _ri_kwargs = {"n_results": 3, "include": ["metadatas", "distances"]}
-                if query_vector is not None:
-                    _ri_kwargs["query_vector"] = query_vector
-                else:
-                    _ri_kwargs["query_texts"] = [content]
-                _ri_results = collection.query(**_ri_kwargs)
-                if _ri_results and _ri_results.get("ids") and _ri_results["ids"][0]:
-                    _new_tier = _classify_tier(content, tags) if _classify_tier else 2
-                    _new_mem = {"tier": _new_tier, "tags": tags}
-                    for _ri_idx, _ri_id in enumerate(_ri_results["ids"][0]):
-                        _ri_dist = (
-                            _ri_results["distances"][0][_ri_idx]
-                            if _ri_results.get("distances")
-                            else 1.0
-                        )
-                        _ri_sim = max(0, 1.0 - _ri_dist)
-                        _ri_meta = (
-                            _ri_results["metadatas"][0][_ri_idx]
-                            if _ri_results.get("metadatas")
-                            else {}
-                        )
-                        _old_mem = {
-                            "tier": _ri_meta.get("tier", 2),
-                            "tags": _ri_meta.get("tags", ""),
-                        }
-                        _ri_action = compute_interference(_new_mem, _old_mem, _ri_sim)
-                        if _ri_action.get("action") == "suppress":
-                            _new_tier_val = _ri_action.get("tier_change", 3)
-                            collection.update(
-                                ids=[_ri_id],
-                                metadatas=[{**_ri_meta, "tier": _new_tier_val}],
-                            )
+                if neighbors is None:
+                    neighbors = self._fetch_neighbors(content, query_vector, collection, 3)
+                if not neighbors:
+                    return
+                own_batch = pending is None
+                if own_batch:
+                    pending = {}
+                _new_tier = _classify_tier(content, tags) if _classify_tier else 2
+                _new_mem = {"tier": _new_tier, "tags": tags}
+                for _ri_id, _ri_dist, _ri_fetched, _ in neighbors[:3]:
+                    _ri_sim = max(0, 1.0 - _ri_dist)
+                    _ri_meta = {**_ri_fetched, **pending.get(_ri_id, {})}
+                    _old_mem = {
+                        "tier": _ri_meta.get("tier", 2),
+                        "tags": _ri_meta.get("tags", ""),
+                    }
+                    _ri_action = compute_interference(_new_mem, _old_mem, _ri_sim)
+                    if _ri_action.get("action") == "suppress":
+                        _new_tier_val = _ri_action.get("tier_change", 3)
+                        pending[_ri_id] = {**_ri_meta, "tier": _new_tier_val}
+                if own_batch:
+                    self._flush_updates(collection, pending)
         except Exception:
             pass
 
-    def _hybrid_linking(self, doc_id, tags, collection):
-        """Create bidirectional resolves:/resolved_by: links. Returns (resolves_id, linked_to, warning)."""
+    def _hybrid_linking(self, doc_id, tags, collection, neighbors=None, pending=None):
+        """Create bidirectional resolves:/resolved_by: links. Returns (resolves_id, linked_to, warning).
+
+        The target's metadata comes from the shared neighbor fetch when it is
+        among them; the back-link edit is queued into pending when given.
+        """
         resolves_id = None
         linked_to = None
         link_warning = None
@@ -685,14 +807,23 @@ class WritePipeline:
 
         if resolves_id:
             try:
-                target = collection.get(ids=[resolves_id], include=["metadatas"])
-                if not target or not target.get("ids") or len(target["ids"]) == 0:
+                target_meta = None
+                for nid, _, fetched_meta, _ in neighbors or ():
+                    if nid == resolves_id:
+                        target_meta = fetched_meta
+                        break
+                if target_meta is None:
+                    target = collection.get(ids=[resolves_id], include=["metadatas"])
+                    if target and target.get("ids") and len(target["ids"]) > 0:
+                        target_meta = (
+                            target["metadatas"][0] if target.get("metadatas") else {}
+                        ) or {}
+                if target_meta is None:
                     link_warning = f"resolves:{resolves_id} — target memory not found"
                     resolves_id = None
                 else:
-                    target_meta = (
-                        target["metadatas"][0] if target.get("metadatas") else {}
-                    )
+                    if pending is not None:
+                        target_meta = {**target_meta, **pending.get(resolves_id, {})}
                     target_tags = target_meta.get("tags", "") or ""
                     back_link = f"resolved_by:{doc_id}"
 
@@ -705,10 +836,13 @@ class WritePipeline:
                         else:
                             target_meta_updated = dict(target_meta)
                             target_meta_updated["tags"] = new_tags
-                            collection.update(
-                                ids=[resolves_id],
-                                metadatas=[target_meta_updated],
-                            )
+                            if pending is not None:
+                                pending[resolves_id] = target_meta_updated
+                            else:
+                                collection.update(
+                                    ids=[resolves_id],
+                                    metadatas=[target_meta_updated],
+                                )
                     linked_to = resolves_id
             except Exception as e:
                 link_warning = f"Linking error: {e}"
@@ -9,6 +9,10 @@ Line 2: ██████░░░░ 62% | 19.7k tok (1.2k>0.8k) | ⏱️ 15m
 
 Usage: Configured in settings.json as "statusLine" command.
 
+Renders are a fresh process each time, so RENDER_CACHE_FILE keeps subagent
+transcript byte offsets with running token totals (only appended lines are
+parsed) and gate/skill/hook counts keyed by file mtimes.
+
 Claude Code sends nested JSON via stdin:
   cost.total_cost_usd, cost.total_duration_ms, cost.total_lines_added,
   cost.total_lines_removed, context_window.used_percentage,
@@ -23,7 +27,7 @@ import sys
 import time
 
 sys.path.insert(0, os.path.dirname(__file__))
-from shared.memory_socket import is_worker_available
+from shared.health_snapshot import COMPONENT_MEMORY, COMPONENT_RAMDISK, refresh_snapshot
 
 CLAUDE_DIR = os.path.join(os.path.expanduser("~"), ".claude")
 HOOKS_DIR = os.path.join(CLAUDE_DIR, "hooks")
@@ -33,9 +37,6 @@ try:
     from shared.ramdisk import (
         get_state_dir,
         is_ramdisk_available,
-        RAMDISK_DIR,
-        TMPFS_AUDIT_DIR,
-        BACKUP_AUDIT_DIR,
     )
 
     STATE_FILE_DIR = get_state_dir()
@@ -75,9 +76,128 @@ COLOR_RESET = "\033[0m"
 
 DORMANT_GATES = {"gate_08_temporal.py"}
 
+# Render cache: per-transcript byte offsets + running token totals, and
+# file-backed counts keyed by mtime. Each render is a fresh process, so the
+# cache persists on disk; a transcript only has its new lines parsed.
+RENDER_CACHE_FILE = "/tmp/statusline-render-cache.json"
+_render_cache = None
+_render_cache_dirty = False
+
+
+def _get_render_cache():
+    """Load the render cache once per process ({} on any error)."""
+    global _render_cache
+    if _render_cache is None:
+        try:
+            with open(RENDER_CACHE_FILE) as f:
+                _render_cache = json.load(f)
+            if not isinstance(_render_cache, dict):
+                _render_cache = {}
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            _render_cache = {}
+    return _render_cache
+
+
+def save_render_cache():
+    """Persist the render cache if this render changed it (atomic replace)."""
+    global _render_cache_dirty
+    if not _render_cache_dirty or _render_cache is None:
+        return
+    tmp = RENDER_CACHE_FILE + ".tmp"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(_render_cache, f)
+        os.replace(tmp, RENDER_CACHE_FILE)
+        _render_cache_dirty = False
+    except OSError:
+        pass
+
+
+def _mtime_signature(paths):
+    """Return [mtime_ns or None, ...] for paths; a listing change bumps a dir's mtime."""
+    sig = []
+    for path in paths:
+        try:
+            sig.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            sig.append(None)
+    return sig
+
+
+def _cached_count(key, paths, compute):
+    """Return compute(), re-running it only when an mtime in paths changes.
+
+    Entries older than CACHE_TTL are also refreshed, catching edits one
+    level below a watched directory (e.g. a SKILL.md added to an existing
+    skill directory).
+    """
+    global _render_cache_dirty
+    counts = _get_render_cache().setdefault("counts", {})
+    sig = _mtime_signature(paths)
+    entry = counts.get(key)
+    if (
+        isinstance(entry, dict)
+        and entry.get("sig") == sig
+        and time.time() - entry.get("ts", 0) < CACHE_TTL
+    ):
+        return entry.get("value", 0)
+    value = compute()
+    counts[key] = {"sig": sig, "ts": time.time(), "value": value}
+    _render_cache_dirty = True
+    return value
+
+
+def _transcript_usage_tokens(path):
+    """Sum input+output usage tokens in a transcript JSONL, parsing only new lines.
+
+    Keeps {offset, tokens, ino} per transcript. A partial trailing line is
+    left for the next render; a replaced or truncated file is re-read from
+    the start.
+    """
+    global _render_cache_dirty
+    transcripts = _get_render_cache().setdefault("transcripts", {})
+    try:
+        st = os.stat(path)
+    except OSError:
+        return 0
+    entry = transcripts.get(path)
+    if (
+        not isinstance(entry, dict)
+        or entry.get("ino") != st.st_ino
+        or st.st_size < entry.get("offset", 0)
+    ):
+        entry = {"offset": 0, "tokens": 0, "ino": st.st_ino}
+    if st.st_size == entry["offset"]:
+        transcripts[path] = entry
+        return entry["tokens"]
+
+    tokens = entry["tokens"]
+    offset = entry["offset"]
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            chunk = f.read(st.st_size - offset)
+    except OSError:
+        return tokens
+    end = chunk.rfind(b"\n") + 1  # only consume complete lines
+    for line in chunk[:end].splitlines():
+        try:
+            usage = json.loads(line).get("message", {}).get("usage", {})
+            tokens += usage.get("input_tokens", 0)
+            tokens += usage.get("output_tokens", 0)
+        except (json.JSONDecodeError, UnicodeDecodeError, AttributeError, TypeError):
+            continue
+    transcripts[path] = {"offset": offset + end, "tokens": tokens, "ino": st.st_ino}
+    _render_cache_dirty = True
+    return tokens
+
 
 def count_gates():
     """Count active gate_*.py files in the gates directory (excludes dormant/merged)."""
+    return _cached_count("gates", [GATES_DIR], _count_gates_uncached)
+
+
+def _count_gates_uncached():
     if not os.path.isdir(GATES_DIR):
         return 0
     return len(
@@ -211,6 +331,12 @@ def get_project_name():
 
 def count_skills():
     """Count SKILL.md directories in both skill-library/ and skills/ (deduplicated)."""
+    return _cached_count(
+        "skills", [SKILL_LIBRARY_DIR, SKILLS_DIR], _count_skills_uncached
+    )
+
+
+def _count_skills_uncached():
     seen = set()
     for base_dir in (SKILL_LIBRARY_DIR, SKILLS_DIR):
         if not os.path.isdir(base_dir):
@@ -226,6 +352,10 @@ def count_skills():
 
 def count_hook_events():
     """Count registered hook events in settings.json."""
+    return _cached_count("hooks", [SETTINGS_FILE], _count_hook_events_uncached)
+
+
+def _count_hook_events_uncached():
     try:
         with open(SETTINGS_FILE) as f:
             settings = json.load(f)
@@ -334,8 +464,10 @@ def get_pending_count(state):
 def get_subagent_status(state):
     """Read active subagents from session state and sum their live token usage.
 
-    For each active subagent, reads its transcript JSONL and sums
-    usage.input_tokens + usage.output_tokens from all assistant messages.
+    For each active subagent, sums usage.input_tokens + usage.output_tokens
+    from all assistant messages in its transcript JSONL. Running totals are
+    kept in the render cache, so only lines appended since the last render
+    are parsed.
 
     Returns (active_list, total_completed_tokens) where active_list is
     [(agent_type, live_tokens), ...] and total_completed_tokens is the
@@ -344,31 +476,35 @@ def get_subagent_status(state):
     completed_tokens = state.get("subagent_total_tokens", 0)
     active = state.get("active_subagents", [])
     if not active:
+        _forget_transcripts(set())
         return ([], completed_tokens)
 
     # Read live token counts from each active subagent's transcript
     active_list = []
+    live_paths = set()
     for sa in active:
         agent_type = sa.get("agent_type", "?")
         transcript = sa.get("transcript_path", "")
         tokens = 0
-        if transcript and os.path.isfile(transcript):
-            try:
-                with open(transcript) as f:
-                    for line in f:
-                        try:
-                            entry = json.loads(line)
-                            usage = entry.get("message", {}).get("usage", {})
-                            tokens += usage.get("input_tokens", 0)
-                            tokens += usage.get("output_tokens", 0)
-                        except (json.JSONDecodeError, AttributeError):
-                            continue
-            except OSError:
-                pass
+        if transcript:
+            live_paths.add(transcript)
+            tokens = _transcript_usage_tokens(transcript)
         active_list.append((agent_type, tokens))
+    _forget_transcripts(live_paths)
     return (active_list, completed_tokens)
 
 
+def _forget_transcripts(live_paths):
+    """Drop cached tallies for subagents that are no longer active."""
+    global _render_cache_dirty
+    transcripts = _get_render_cache().get("transcripts", {})
+    stale = [p for p in transcripts if p not in live_paths]
+    for p in stale:
+        del transcripts[p]
+    if stale:
+        _render_cache_dirty = True
+
+
 def get_active_mode():
     """Read active behavioral mode from ~/.claude/modes/.active.
     Returns short mode name (e.g. 'code') or None if no mode active."""
@@ -430,46 +566,18 @@ def get_ramdisk_health():
     Used bytes: total size of files on tmpfs.
     Mirror lag: difference between tmpfs audit size and disk backup audit size.
     A lag > 0 means some audit data hasn't been mirrored to disk yet.
+
+    Both come from the ramdisk component of the shared health snapshot, so
+    the tmpfs walk runs on that component's cadence, not on every render.
     """
     if not _HAS_RAMDISK or not is_ramdisk_available():
         return None
 
     try:
-        # Total tmpfs usage
-        used = 0
-        for dirpath, _dirnames, filenames in os.walk(RAMDISK_DIR):
-            for f in filenames:
-                try:
-                    used += os.path.getsize(os.path.join(dirpath, f))
-                except OSError:
-                    pass
-
-        # Mirror lag: tmpfs audit size vs disk backup audit size
-        tmpfs_audit_size = 0
-        disk_audit_size = 0
-
-        if os.path.isdir(TMPFS_AUDIT_DIR):
-            for f in os.listdir(TMPFS_AUDIT_DIR):
-                try:
-                    tmpfs_audit_size += os.path.getsize(
-                        os.path.join(TMPFS_AUDIT_DIR, f)
-                    )
-                except OSError:
-                    pass
-
-        if os.path.isdir(BACKUP_AUDIT_DIR):
-            for f in os.listdir(BACKUP_AUDIT_DIR):
-                fp = os.path.join(BACKUP_AUDIT_DIR, f)
-                # Only count .jsonl files (not .gz archives) for fair comparison
-                if f.endswith(".jsonl"):
-                    try:
-                        disk_audit_size += os.path.getsize(fp)
-                    except OSError:
-                        pass
-
-        lag = max(0, tmpfs_audit_size - disk_audit_size)
-        return (used, lag)
-    except (OSError, IOError):
+        snap = refresh_snapshot(components=(COMPONENT_RAMDISK,))
+        data = snap["components"][COMPONENT_RAMDISK]["data"]
+        return (data["used_bytes"], data["mirror_lag_bytes"])
+    except Exception:
         return None
 
 
@@ -1210,12 +1318,14 @@ def main():
 
     # Ensure all display lines are flushed before slow snapshot I/O
     sys.stdout.flush()
+    save_render_cache()
 
     # ── SNAPSHOT: write bridge file for TUI ──
-    # Check UDS socket health
+    # UDS worker health from the shared snapshot (re-probed on its cadence)
     uds_ok = False
     try:
-        uds_ok = is_worker_available(retries=1, delay=0)
+        snap = refresh_snapshot(session_id or "default", components=(COMPONENT_MEMORY,))
+        uds_ok = bool(snap["components"][COMPONENT_MEMORY]["data"].get("worker_reachable"))
     except Exception:
         pass
 
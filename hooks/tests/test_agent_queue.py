@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Tests for agent_channel's batch claims, leases, tag/dep index and wakeups."""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import shared.agent_channel as ac
+
+
+@pytest.fixture(autouse=True)
+def channel_db(tmp_path, monkeypatch):
+    path = str(tmp_path / "channel.db")
+    monkeypatch.setattr(ac, "DB_PATH", path)
+    return path
+
+
+def _expire(task_id):
+    conn = ac._get_conn()
+    conn.execute("UPDATE tasks SET lease_expires = ? WHERE id = ?", (time.time() - 1, task_id))
+    conn.commit()
+    conn.close()
+
+
+def test_batch_claim_is_priority_ordered_and_exclusive():
+    ids = [ac.create_task(f"t{i}", created_by="lead", priority=i % 3, notify=False) for i in range(7)]
+    first = ac.claim_tasks("a", n=4)
+    second = ac.claim_tasks("b", n=4)
+    assert [t["priority"] for t in first] == [0, 0, 0, 1]
+    assert len(second) == 3
+    assert {t["id"] for t in first} | {t["id"] for t in second} == set(ids)
+    assert all(ac.get_task(t["id"])["assigned_to"] == "a" for t in first)
+
+
+def test_concurrent_claimers_never_share_a_task():
+    for i in range(60):
+        ac.create_task(f"t{i}", created_by="lead", notify=False)
+    claimed = []
+    lock = threading.Lock()
+
+    def worker(name):
+        while True:
+            got = ac.claim_tasks(name, n=3)
+            if not got:
+                return
+            with lock:
+                claimed.extend(t["id"] for t in got)
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(claimed) == 60 == len(set(claimed))
+
+
+def test_lapsed_lease_is_requeued_and_heartbeat_keeps_it():
+    kept = ac.create_task("kept", created_by="lead", notify=False)
+    lost = ac.create_task("lost", created_by="lead", notify=False)
+    ac.claim_tasks("dead-agent", n=2, lease_s=60)
+    assert ac.heartbeat(kept, "dead-agent", lease_s=60) == 1
+    assert ac.heartbeat(kept, "someone-else") == 0
+    _expire(lost)
+
+    reclaimed = ac.claim_tasks("live-agent", n=5)
+    assert [t["id"] for t in reclaimed] == [lost]
+    assert reclaimed[0]["attempts"] == 2
+    assert ac.get_task(kept)["assigned_to"] == "dead-agent"
+    # The old holder can no longer renew a task that moved on
+    assert ac.heartbeat(lost, "dead-agent") == 0
+
+
+def test_task_fails_after_max_lease_attempts():
+    tid = ac.create_task("poison", created_by="lead", notify=False)
+    for _ in range(ac.MAX_LEASE_ATTEMPTS):
+        assert ac.claim_tasks("w", lease_s=60)
+        _expire(tid)
+    assert ac.claim_tasks("w") == []
+    task = ac.get_task(tid)
+    assert task["status"] == "failed" and task["result"] == "lease expired"
+
+
+def test_unleased_claims_are_never_requeued():
+    tid = ac.create_task("legacy", created_by="lead", notify=False)
+    assert ac.claim_next_task("w")["lease_expires"] is None
+    assert ac.requeue_expired() == 0
+    assert ac.get_task(tid)["status"] == "assigned"
+
+
+def test_tag_and_dependency_index():
+    parent = ac.create_task("build", created_by="lead", tags=["ci", "build"], notify=False)
+    child = ac.create_task("deploy", created_by="lead", tags=["ci"], depends_on=parent, notify=False)
+    ac.create_task("cibuild-lookalike", created_by="lead", tags=["cibuild"], notify=False)
+
+    assert {t["id"] for t in ac.list_tasks(tag="ci")} == {parent, child}
+    assert [t["id"] for t in ac.claim_tasks("w", n=5, tag="ci")] == [parent]
+    assert ac.claim_tasks("w", tag="ci") == []
+    ac.complete_task(parent, "ok", broadcast=False)
+    assert [t["id"] for t in ac.claim_tasks("w", tag="ci")] == [child]
+
+
+def test_index_is_backfilled_for_existing_databases(channel_db):
+    conn = sqlite3.connect(channel_db)
+    conn.execute(
+        "CREATE TABLE tasks (id TEXT PRIMARY KEY, created_at REAL NOT NULL, "
+        "updated_at REAL NOT NULL, title TEXT NOT NULL, description TEXT DEFAULT '', "
+        "created_by TEXT NOT NULL, assigned_to TEXT DEFAULT NULL, "
+        "status TEXT NOT NULL DEFAULT 'pending', priority INTEGER DEFAULT 5, "
+        "tags TEXT DEFAULT '', result TEXT DEFAULT '', depends_on TEXT DEFAULT NULL, "
+        "required_role TEXT DEFAULT NULL, goal TEXT DEFAULT NULL, "
+        "parent_task_id TEXT DEFAULT NULL)"
+    )
+    conn.execute(
+        "INSERT INTO tasks (id, created_at, updated_at, title, created_by, tags, depends_on) "
+        "VALUES ('old', 1, 1, 'old task', 'lead', 'audit,gates', 'missing')"
+    )
+    conn.commit()
+    conn.close()
+
+    assert [t["id"] for t in ac.list_tasks(tag="gates")] == ["old"]
+    # Dependency on a task that does not exist keeps it blocked, as before
+    assert ac.claim_tasks("w") == []
+
+
+def test_waiter_wakes_on_create_instead_of_polling():
+    got = []
+    t = threading.Thread(target=lambda: got.extend(ac.wait_for_tasks("w", timeout=10)))
+    t0 = time.monotonic()
+    t.start()
+    time.sleep(0.2)
+    tid = ac.create_task("wake up", created_by="lead", notify=False)
+    t.join(5)
+    assert [x["id"] for x in got] == [tid]
+    assert time.monotonic() - t0 < 2.0
+    assert os.listdir(ac._wake_dir()) == []
+
+
+def test_wait_times_out_empty():
+    t0 = time.monotonic()
+    assert ac.wait_for_tasks("w", timeout=0.2) == []
+    assert time.monotonic() - t0 < 1.0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Tests for the rolling-window analytics rollups (shared/analytics_rollup.py)."""
+
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import shared.analytics_rollup as ar
+import shared.code_hotspot as ch
+import shared.session_analytics as sa
+
+_FILES = ["/p/a.py", "/p/b.py", "/p/c.py", "/p/d.md"]
+_GATES = ["gates.gate_01_read_before_edit", "gates.gate_16_code_quality", "gates.gate_02_no_destroy"]
+
+
+@pytest.fixture(autouse=True)
+def paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(ar, "_STORE_PATH", str(tmp_path / ".analytics_rollup.db"))
+    monkeypatch.setattr(ar, "_AUDIT_TRAIL", str(tmp_path / ".audit_trail.jsonl"))
+    monkeypatch.setattr(ar, "_CAPTURE_QUEUE", str(tmp_path / ".capture_queue.jsonl"))
+    monkeypatch.setattr(sa, "_CAPTURE_QUEUE_FILE", str(tmp_path / ".capture_queue.jsonl"))
+    monkeypatch.setattr(ch, "AUDIT_DIR", str(tmp_path / "audit"))
+    for name in ("ram", "disk"):
+        (tmp_path / name).mkdir()
+    monkeypatch.setattr(sa, "_STATE_DIR", str(tmp_path / "ram"))
+    monkeypatch.setattr(sa, "_HOOKS_DIR", str(tmp_path / "disk"))
+    monkeypatch.setattr(sa, "_GATE_EFFECTIVENESS_FILE", str(tmp_path / "missing.json"))
+    return tmp_path
+
+
+def _audit(rng, n, start, step):
+    out, t = [], start
+    for _ in range(n):
+        t += rng.uniform(0, step)
+        out.append(
+            {
+                "timestamp": datetime.fromtimestamp(t, tz=timezone.utc).isoformat(),
+                "gate": rng.choice(_GATES),
+                "tool": rng.choice(["Edit", "Write", "Read", "Bash"]),
+                "decision": rng.choice(["pass", "block", "block", "warn"]),
+                "session_id": "s1",
+                "file_path": rng.choice(_FILES + [""]),
+            }
+        )
+    return out
+
+
+def _append(path, rows):
+    with open(path, "a") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+
+
+def _scan(fn, *args):
+    """fn(*args) as computed from the raw audit-file scan."""
+    real = ch.file_rollup
+    ch.file_rollup = lambda days: None
+    try:
+        return fn(*args)
+    finally:
+        ch.file_rollup = real
+
+
+def test_file_rollup_matches_scan_incrementally(paths):
+    rng = random.Random(4)
+    os.makedirs(ch.AUDIT_DIR)
+    t = time.time() - 10 * 86400
+    for batch in range(4):
+        rows = _audit(rng, 120, t, 1800)
+        t = ar._entry_time(rows[-1])
+        _append(ar._AUDIT_TRAIL, rows)
+        _append(os.path.join(ch.AUDIT_DIR, f"2026-01-0{batch}.jsonl"), rows)
+        assert ch.analyze_file_blocks(30) == _scan(ch.analyze_file_blocks, 30)
+    assert ch.rank_files_by_risk(30) == _scan(ch.rank_files_by_risk, 30)
+    assert ch.analyze_file_blocks(30)["total_blocks"] > 0
+
+
+def test_ranking_reads_only_appended_lines(paths, monkeypatch):
+    now = time.time()
+    _append(ar._AUDIT_TRAIL, _audit(random.Random(2), 50, now - 3600, 60))
+    first = ch.rank_files_by_risk(7)
+    assert first
+
+    seen = []
+    real = ar.audit_event
+    monkeypatch.setattr(ar, "audit_event", lambda e: seen.append(e) or real(e))
+    assert ch.rank_files_by_risk(7) == first
+    assert seen == []
+    _append(ar._AUDIT_TRAIL, _audit(random.Random(3), 5, now - 60, 1))
+    ch.rank_files_by_risk(7)
+    assert len(seen) == 5
+
+
+def test_lookback_window_and_bucket_compaction(paths):
+    now = time.time()
+    old = {"timestamp": now - 10 * 86400, "tool": "Edit", "decision": "block", "gate": "g", "file_path": "/old.py"}
+    new = dict(old, timestamp=now - 600, file_path="/new.py")
+    _append(ar._AUDIT_TRAIL, [old, new, dict(new, decision="pass")])
+
+    assert set(ar.file_rollup(7, now)) == {"/new.py"}
+    assert set(ar.file_rollup(30, now)) == {"/old.py", "/new.py"}
+    assert ar.file_rollup(30, now)["/new.py"]["edit_count"] == 2
+
+    # Three days on, the hourly bucket of /new.py has merged into its day
+    later = ar.file_rollup(30, now + 3 * 86400)
+    assert later["/new.py"]["block_count"] == 1 and later["/new.py"]["edit_count"] == 2
+    assert later["/new.py"]["blocks_by_gate"] == {"g": 1}
+    conn = ar._connect()
+    assert {span for (span,) in conn.execute("SELECT span FROM file_buckets")} == {ar.DAY}
+    conn.close()
+
+    # Past retention everything expires
+    assert ar.file_rollup(30, now + 40 * 86400) == {}
+
+
+def _obs(rng, sid, tool=None, frustration=None):
+    tool = tool or rng.choice(["Bash", "Edit", "Read"])
+    meta = {
+        "tool_name": tool,
+        "session_id": sid,
+        "session_time": time.time(),
+        "has_error": rng.choice(["true", "false"]),
+        "sentiment": rng.choice(["", "neutral", "frustrated"]),
+    }
+    if frustration is not None:
+        meta["frustration_score"] = frustration
+    return {"id": f"obs_{rng.random()}", "document": "x", "metadata": meta}
+
+
+def test_queue_rollup_recorded_at_write_time(paths, monkeypatch):
+    rng = random.Random(8)
+    queued = [_obs(rng, "s1"), _obs(rng, "s2")]
+    _append(ar._CAPTURE_QUEUE, queued)
+    ar.record_observation(queued[-1])  # creates and seeds the store: no double count
+
+    for i in range(30):
+        score = round(i / 30, 2) if i % 3 == 0 else None
+        obs = _obs(rng, rng.choice(["s1", "s2"]), "UserPrompt" if score is not None else None, score)
+        queued.append(obs)
+        _append(ar._CAPTURE_QUEUE, [obs])
+        ar.record_observation(obs)
+
+    from_rollup = {sid: sa.get_session_summary(sid)["capture_queue_stats"] for sid in (None, "s1")}
+    frustration = sa.aggregate_frustration()
+    monkeypatch.setattr(sa, "queue_counts", lambda sid=None: None)
+    monkeypatch.setattr(sa, "frustration_scores", lambda sid=None: None)
+    for sid, stats in from_rollup.items():
+        assert stats == sa.get_session_summary(sid)["capture_queue_stats"]
+    assert from_rollup[None]["entry_count"] == len(queued)
+    assert frustration == sa.aggregate_frustration() and frustration["trend"] == "rising"
+
+    # The queue being drained or capped does not lose rolled-up counts
+    monkeypatch.setattr(sa, "queue_counts", ar.queue_counts)
+    os.remove(paths / ".capture_queue.jsonl")
+    assert sa.get_session_summary()["capture_queue_stats"]["entry_count"] == len(queued)
+
+
+def test_record_observation_skips_a_locked_store(paths):
+    import sqlite3
+
+    rng = random.Random(9)
+    first = _obs(rng, "s1")
+    _append(ar._CAPTURE_QUEUE, [first])
+    ar.record_observation(first)
+    conn = ar._connect()
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+    conn.execute("BEGIN IMMEDIATE")  # e.g. a file_rollup() rebuild in progress
+    try:
+        started = time.monotonic()
+        ar.record_observation(_obs(rng, "s1"))
+        assert time.monotonic() - started < ar.BUSY_TIMEOUT / 2
+    finally:
+        conn.execute("ROLLBACK")
+        conn.close()
+    ar.record_observation(_obs(rng, "s1"))
+    assert sum(row[3] for row in ar.queue_counts("s1")) == 2
+
+
+def _write_state(path, **fields):
+    state = {"session_start": time.time() - 120, "total_tool_calls": 3, "files_read": ["a"]}
+    state.update(fields)
+    path.write_text(json.dumps(state))
+
+
+def test_session_metrics_reparse_only_changed_files(paths, monkeypatch):
+    _write_state(paths / "ram" / "state_a.json", total_tool_calls=10)
+    _write_state(paths / "ram" / "state_b.json", total_tool_calls=4)
+    _write_state(paths / "disk" / "state_b.json", total_tool_calls=99)
+    _write_state(paths / "disk" / "state_test-x.json")
+
+    extracted = []
+    real = sa._state_session_metrics
+    monkeypatch.setattr(sa, "_state_session_metrics", lambda sid, st: extracted.append(sid) or real(sid, st))
+
+    summary = sa.get_session_summary()
+    assert sorted(m["session_id"] for m in summary["all_sessions"]) == ["a", "b"]
+    assert sorted(extracted) == ["a", "b", "test-x"]
+    assert summary["state"]["duration_minutes"] >= 2.0
+
+    extracted.clear()
+    _write_state(paths / "ram" / "state_b.json", total_tool_calls=7)
+    cmp = sa.compare_sessions("a", "b")
+    assert extracted == ["b"]
+    assert cmp["deltas"]["total_tool_calls"] == {"a": 10, "b": 7, "delta": -3.0}
+
+    os.remove(paths / "ram" / "state_a.json")
+    assert sa.compare_sessions("a", "b")["session_a_metrics"] is None
+    assert extracted == ["b"]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
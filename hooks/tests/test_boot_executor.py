@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Tests for boot_pkg.executor: concurrency, dependencies and deadlines."""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from boot_pkg.executor import BootStep, format_step_report, run_boot_steps
+
+
+def _sleep_then(value, seconds):
+    def fn(**_kw):
+        time.sleep(seconds)
+        return value
+
+    return fn
+
+
+def test_independent_steps_run_concurrently():
+    steps = [BootStep(f"s{i}", _sleep_then(i, 0.2)) for i in range(5)]
+    t0 = time.perf_counter()
+    results, report = run_boot_steps(steps, deadline=5)
+    elapsed = time.perf_counter() - t0
+    assert results == {f"s{i}": i for i in range(5)}
+    assert all(r["status"] == "ok" for r in report.values())
+    assert elapsed < 0.6
+
+
+def test_dependency_result_is_passed_as_kwarg():
+    order = []
+    lock = threading.Lock()
+
+    def probe():
+        time.sleep(0.05)
+        with lock:
+            order.append("probe")
+        return True
+
+    def inject(probe):
+        with lock:
+            order.append("inject")
+        return ["m1"] if probe else []
+
+    results, _ = run_boot_steps(
+        [BootStep("inject", inject, deps=("probe",)), BootStep("probe", probe)]
+    )
+    assert order == ["probe", "inject"]
+    assert results["inject"] == ["m1"]
+
+
+def test_step_budget_timeout_uses_default_and_skips_dependents():
+    steps = [
+        BootStep("slow", _sleep_then("late", 2.0), budget=0.1, default="fallback"),
+        BootStep("after", lambda slow: slow, deps=("slow",), default="none"),
+        BootStep("fast", _sleep_then("ok", 0.0)),
+    ]
+    t0 = time.perf_counter()
+    results, report = run_boot_steps(steps, deadline=5)
+    assert time.perf_counter() - t0 < 1.0
+    assert results == {"slow": "fallback", "after": "none", "fast": "ok"}
+    assert report["slow"]["status"] == "timeout"
+    assert report["after"]["status"] == "skipped"
+
+
+def test_overall_deadline_bounds_wall_time():
+    steps = [BootStep("a", _sleep_then(1, 3.0), budget=10, default=0)]
+    t0 = time.perf_counter()
+    results, report = run_boot_steps(steps, deadline=0.2)
+    assert time.perf_counter() - t0 < 1.0
+    assert results["a"] == 0
+    assert report["a"]["status"] == "timeout"
+
+
+def test_errors_fall_back_to_default():
+    def boom():
+        raise RuntimeError("x")
+
+    results, report = run_boot_steps([BootStep("b", boom, default=[])])
+    assert results["b"] == []
+    assert report["b"]["status"] == "error"
+
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(ValueError):
+        run_boot_steps([BootStep("x", lambda missing: 1, deps=("missing",))])
+
+
+def test_report_lists_slowest_first_and_flags_failures():
+    line = format_step_report(
+        {
+            "git": {"status": "ok", "ms": 40.0},
+            "tg": {"status": "timeout", "ms": 800.0},
+        },
+        812,
+    )
+    assert line == "[BOOT] Steps (812ms wall): tg 800ms [timeout], git 40ms"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Tests for shared.capture_ingest — streaming capture-queue ingestion."""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from shared.capture_ingest import CaptureIngestWorker, QueueCursor
+
+
+def _append(path, *ids, raw=None):
+    with open(path, "a") as f:
+        for oid in ids:
+            f.write(json.dumps({"id": oid, "document": f"doc {oid}"}) + "\n")
+        if raw is not None:
+            f.write(raw)
+
+
+class _Sink:
+    def __init__(self, fail=False):
+        self.ids = []
+        self.fail = fail
+
+    def __call__(self, docs, metas, ids):
+        if self.fail:
+            raise RuntimeError("db down")
+        self.ids.extend(ids)
+
+
+@pytest.fixture
+def queue():
+    with tempfile.TemporaryDirectory() as d:
+        yield os.path.join(d, "capture_queue.jsonl")
+
+
+class TestQueueCursor:
+    def test_reads_only_new_complete_lines(self, queue):
+        _append(queue, "a", "b", raw='{"id": "c", "docu')
+        cur = QueueCursor(queue)
+        entries, pos = cur.read()
+        assert [e["id"] for e in entries] == ["a", "b"]
+        cur.commit(pos)
+        _append(queue, raw='ment": "doc c"}\n')
+        entries, pos = cur.read()
+        assert [e["id"] for e in entries] == ["c"]
+
+    def test_offset_survives_restart(self, queue):
+        _append(queue, "a")
+        cur = QueueCursor(queue)
+        cur.commit(cur.read()[1])
+        _append(queue, "b")
+        assert [e["id"] for e in QueueCursor(queue).read()[0]] == ["b"]
+
+    def test_uncommitted_read_is_reread(self, queue):
+        _append(queue, "a")
+        cur = QueueCursor(queue)
+        cur.read()
+        assert [e["id"] for e in cur.read()[0]] == ["a"]
+
+    def test_rotation_keeps_late_appends(self, queue):
+        _append(queue, "a", "b")
+        cur = QueueCursor(queue, rotate_bytes=1, grace_seconds=3600)
+        cur.commit(cur.read()[1])
+        assert not os.path.exists(queue)  # sealed into a segment
+        (seg,) = cur._segments
+        # A writer that opened the file before the rename appends late
+        _append(seg, "late")
+        _append(queue, "new")
+        assert [e["id"] for e in cur.read()[0]] == ["late", "new"]
+
+    def test_drained_segment_removed_after_grace(self, queue):
+        _append(queue, "a")
+        cur = QueueCursor(queue, rotate_bytes=1, grace_seconds=0)
+        cur.commit(cur.read()[1])
+        cur.commit(cur.read()[1])
+        assert cur._segments == {}
+
+    def test_rewritten_file_is_reread_from_start(self, queue):
+        _append(queue, "a", "b", "c")
+        cur = QueueCursor(queue)
+        cur.commit(cur.read()[1])
+        with open(queue + ".tmp", "w") as f:
+            f.write(json.dumps({"id": "c", "document": "doc c"}) + "\n")
+        os.replace(queue + ".tmp", queue)
+        assert [e["id"] for e in cur.read()[0]] == ["c"]
+
+
+class TestCaptureIngestWorker:
+    def test_drain_batches_and_dedups(self, queue):
+        _append(queue, *[f"o{i}" for i in range(25)], "o3")
+        sink = _Sink()
+        worker = CaptureIngestWorker(QueueCursor(queue), sink, batch_size=10)
+        assert worker.drain() == 25
+        assert len(sink.ids) == 25
+
+    def test_rewrite_does_not_reingest_recent_ids(self, queue):
+        _append(queue, "a", "b")
+        sink = _Sink()
+        worker = CaptureIngestWorker(QueueCursor(queue), sink)
+        worker.drain()
+        os.remove(queue)
+        _append(queue, "b", "c")
+        worker.drain()
+        assert sink.ids == ["a", "b", "c"]
+
+    def test_failed_upsert_is_retried(self, queue):
+        _append(queue, "a")
+        sink = _Sink(fail=True)
+        worker = CaptureIngestWorker(QueueCursor(queue), sink)
+        assert worker.drain() == 0
+        assert worker.errors == 1
+        sink.fail = False
+        assert worker.drain() == 1
+        assert sink.ids == ["a"]
+
+    def test_concurrent_appends_are_not_lost(self, queue):
+        sink = _Sink()
+        worker = CaptureIngestWorker(
+            QueueCursor(queue, rotate_bytes=512, grace_seconds=0.05), sink, batch_size=7
+        )
+
+        def writer(prefix):
+            for i in range(200):
+                _append(queue, f"{prefix}{i}")
+
+        threads = [threading.Thread(target=writer, args=(p,)) for p in "xyz"]
+        for t in threads:
+            t.start()
+        while any(t.is_alive() for t in threads):
+            worker.drain()
+        for t in threads:
+            t.join()
+        worker.drain()
+        assert len(sink.ids) == 600
+        assert len(set(sink.ids)) == 600
+
+    def test_compaction_runs_on_schedule(self, queue):
+        calls = []
+        worker = CaptureIngestWorker(
+            QueueCursor(queue), _Sink(), compact=lambda: calls.append(1),
+            compact_interval=3600,
+        )
+        assert worker.maybe_compact()
+        assert not worker.maybe_compact()
+        assert worker.maybe_compact(force=True)
+        assert len(calls) == 2
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
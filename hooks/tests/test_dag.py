@@ -725,3 +725,91 @@ class TestOptimizeFts:
             dag2 = ConversationDAG(os.path.join(d, 'test.db'))
             assert dag2.get_head() != '' or True  # just verify it opens
             dag2.close()
+
+
+class TestAncestorIndex:
+    def _forked(self, dag):
+        # r - a1 - a2 - a3          (main line)
+        #       \- b1 - b2          (fork at a1)
+        #              \- c1        (fork at b1)
+        r = dag.add_node('', 'user', 'root')
+        a1 = dag.add_node(r, 'assistant', 'a1')
+        a2 = dag.add_node(a1, 'user', 'a2')
+        a3 = dag.add_node(a2, 'assistant', 'a3')
+        b1 = dag.add_node(a1, 'user', 'b1')
+        b2 = dag.add_node(b1, 'assistant', 'b2')
+        c1 = dag.add_node(b1, 'assistant', 'c1')
+        return r, a1, a2, a3, b1, b2, c1
+
+    def test_forks_open_segments(self):
+        with tempfile.TemporaryDirectory() as d:
+            dag = ConversationDAG(os.path.join(d, 'test.db'))
+            r, a1, a2, a3, b1, b2, c1 = self._forked(dag)
+            segs = dict(dag._db.execute("SELECT id, seg FROM nodes").fetchall())
+            assert segs[r] == segs[a1] == segs[a3]
+            assert segs[b1] == segs[b2] != segs[a1]
+            assert segs[c1] not in (segs[a1], segs[b1])
+            assert [n['content'] for n in dag.get_ancestors(c1)] == ['root', 'a1', 'b1', 'c1']
+            assert [n['content'] for n in dag.get_ancestors(a3)] == ['root', 'a1', 'a2', 'a3']
+            dag.close()
+
+    def test_ancestors_single_query(self):
+        with tempfile.TemporaryDirectory() as d:
+            dag = ConversationDAG(os.path.join(d, 'test.db'))
+            prev = ''
+            for i in range(50):
+                prev = dag.add_node(prev, 'user', f'turn {i}')
+            statements = []
+            dag._db.set_trace_callback(statements.append)
+            assert len(dag.get_ancestors(prev)) == 50
+            dag._db.set_trace_callback(None)
+            assert len(statements) == 2  # locate + one range query
+            dag.close()
+
+    def test_get_path_across_segments(self):
+        with tempfile.TemporaryDirectory() as d:
+            dag = ConversationDAG(os.path.join(d, 'test.db'))
+            r, a1, a2, a3, b1, b2, c1 = self._forked(dag)
+            assert [n['id'] for n in dag.get_path(c1, r)] == [c1, b1, a1, r]
+            assert [n['id'] for n in dag.get_path(r, b2)] == [r, a1, b1, b2]
+            assert dag.get_path(a3, b2) == []
+            assert dag.get_path(a2, c1) == []
+            dag.close()
+
+    def test_lowest_common_ancestor(self):
+        with tempfile.TemporaryDirectory() as d:
+            dag = ConversationDAG(os.path.join(d, 'test.db'))
+            r, a1, a2, a3, b1, b2, c1 = self._forked(dag)
+            assert dag.lowest_common_ancestor(a3, c1)['id'] == a1
+            assert dag.lowest_common_ancestor(b2, c1)['id'] == b1
+            assert dag.lowest_common_ancestor(a2, a3)['id'] == a2
+            assert dag.lowest_common_ancestor(c1, c1)['id'] == c1
+            other = dag.add_node('', 'user', 'second root')
+            assert dag.lowest_common_ancestor(other, a3) is None
+            dag.close()
+
+    def test_archived_gap_ends_chain(self):
+        with tempfile.TemporaryDirectory() as d:
+            dag = ConversationDAG(os.path.join(d, 'test.db'))
+            r, a1, a2, a3, b1, b2, c1 = self._forked(dag)
+            dag._db.execute("DELETE FROM nodes WHERE id = ?", (a2,))
+            assert [n['id'] for n in dag.get_ancestors(a3)] == [a3]
+            assert dag.get_path(a3, r) == []
+            dag.close()
+
+    def test_backfill_legacy_nodes(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'test.db')
+            dag = ConversationDAG(path)
+            r, a1, a2, a3, b1, b2, c1 = self._forked(dag)
+            dag._db.execute("UPDATE nodes SET seg = NULL, depth = NULL")
+            dag._db.execute("DELETE FROM dag_segments")
+            dag._db.commit()
+            dag.close()
+            dag = ConversationDAG(path)
+            assert dag._db.execute(
+                "SELECT COUNT(*) FROM nodes WHERE seg IS NULL"
+            ).fetchone()[0] == 0
+            assert [n['id'] for n in dag.get_ancestors(c1)] == [r, a1, b1, c1]
+            assert dag.lowest_common_ancestor(a3, b2)['id'] == a1
+            dag.close()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Tests for chain-refinement error clustering (shared/chain_refinement.py,
+shared/error_cluster_store.py)."""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import shared.chain_refinement as cr
+import shared.error_cluster_store as store
+
+_WORDS = ["error", "import", "module", "foo", "bar", "timeout", "key", "none", "type", "attr"]
+_STRATEGIES = ["", "retry", "pin_version", "add_guard", "rewrite"]
+_RESULTS = ["success", "failure", "fixed", "failed", ""]
+
+
+@pytest.fixture(autouse=True)
+def store_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "_STORE_PATH", str(tmp_path / ".error_clusters.db"))
+
+
+def _outcomes(rng, n):
+    out = []
+    for i in range(n):
+        error = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(0, 4)))
+        if rng.random() < 0.3:
+            error += f" at line {rng.randint(1, 99)} in /src/{rng.choice('ab')}.py"
+        out.append({
+            "id": f"o{i}",
+            "error": error,
+            "strategy": rng.choice(_STRATEGIES),
+            "result": rng.choice(_RESULTS),
+        })
+    return out
+
+
+def _scan_lesson(error, lessons, current_strategy):
+    """_find_lesson_for_error as a plain pairwise scan."""
+    best, best_score = None, 0.0
+    for lesson in lessons:
+        sim = 1.0 if error == lesson.error_pattern else cr._error_similarity(error, lesson.error_pattern)
+        if sim < cr.SIMILARITY_THRESHOLD:
+            continue
+        score = sim * lesson.confidence + (0.2 if current_strategy and lesson.failed_strategy == current_strategy else 0.0)
+        if score > best_score:
+            best, best_score = lesson, score
+    return best
+
+
+def test_signature_is_stable_and_shared_by_equivalent_errors():
+    a = cr.error_signature('File "/home/u/app.py", line 12: KeyError 0x7f00 at 2024-01-15T10:30:00')
+    b = cr.error_signature('File "/srv/x/other.py", line 99: KeyError 0xbeef at 2025-06-01 08:00:00')
+    assert a == b
+    assert a.normalized == cr._normalize_error('File "/a.py", line 1: KeyError 0x1 at 2020-01-01T00:00:00')
+    assert a.shingles == frozenset(a.normalized.split())
+    assert len(a.fingerprint) == 16 and a.fingerprint != cr.error_signature("ValueError").fingerprint
+    assert cr.error_signature("   ") is None and cr.error_signature(None) is None
+
+
+def test_index_probe_matches_pairwise_scan():
+    rng = random.Random(7)
+    outcomes = _outcomes(rng, 150)
+    index = cr.ErrorClusterIndex.from_outcomes(outcomes)
+    lessons = cr.generate_failure_lessons(outcomes, 1)
+    for _ in range(100):
+        error = cr._normalize_error(" ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 4))))
+        strategy = rng.choice(_STRATEGIES)
+        expected = _scan_lesson(error, lessons, strategy)
+        assert cr._find_lesson_for_error(error, lessons, strategy) == expected
+        assert index.find_lesson(error, strategy, min_failures=1) == expected
+
+        similar = {
+            cluster.fingerprint
+            for cluster in index.clusters.values()
+            if cr._error_similarity(error, cluster.error_pattern) >= cr.SIMILARITY_THRESHOLD
+        }
+        assert set(index.similar(error)) == similar
+
+
+def test_suggest_refinement_reuses_index():
+    outcomes = (
+        [{"error": "ImportError: no module named foo", "strategy": "pip_install", "result": "failure"}] * 4
+        + [{"error": "ImportError: no module named foo", "strategy": "fix_path", "result": "success"}] * 4
+        + [{"error": "KeyError: 'name'", "strategy": "add_guard", "result": "success"}] * 3
+    )
+    index = cr.ErrorClusterIndex.from_outcomes(outcomes)
+    assert len(index.clusters) == 2 and index.outcome_count == 11
+
+    refinement = cr.suggest_refinement("ImportError: No module named foo", outcomes, "pip_install")
+    assert refinement.suggested_strategy == "fix_path"
+    assert cr.suggest_refinement("ImportError: No module named foo", [], "pip_install", index=index) == refinement
+    assert [p.error_pattern for p in cr.detect_recurring_failures(outcomes)] == [
+        "importerror: no module named foo",
+        "keyerror: 'name'",
+    ]
+
+
+def test_store_ingests_each_outcome_once():
+    rng = random.Random(11)
+    outcomes = _outcomes(rng, 200)
+    assert store.ingest_outcomes(outcomes[:120]) == 120
+    assert store.ingest_outcomes(outcomes) == 80
+    assert store.ingest_outcomes(outcomes) == 0
+
+    index = cr.ErrorClusterIndex.from_outcomes(outcomes)
+    assert store.recurring_failures() == cr.detect_recurring_failures(outcomes)
+    assert store.recurring_failures(2) == index.recurring(2)
+    for _ in range(50):
+        error = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 4)))
+        strategy = rng.choice(_STRATEGIES)
+        assert store.find_lesson(error, strategy) == index.find_lesson(cr._normalize_error(error), strategy)
+
+
+def test_store_fails_open(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "_STORE_PATH", str(tmp_path / "missing" / "x.db"))
+    assert store.ingest_outcomes([{"error": "boom", "strategy": "s", "result": "failed"}]) is None
+    assert store.find_lesson("boom") is None
+    assert store.recurring_failures() is None
+    assert store.find_lesson("") is None
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
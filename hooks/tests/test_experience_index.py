@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Tests for the indexed experience archive (SQLite aggregates over the CSV)."""
+
+import csv
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import shared.experience_archive as ea
+
+_ERRORS = ["ImportError", "SyntaxError", "ModuleNotFoundError", "TypeError: bad", " KeyError "]
+_STRATS = ["add-import", "reinstall", "rewrite", "cast", "", "  pin-version "]
+_OUTCOMES = ["success", "failure", "partial"]
+
+
+@pytest.fixture(autouse=True)
+def archive(tmp_path, monkeypatch):
+    path = str(tmp_path / "archive.csv")
+    monkeypatch.setattr(ea, "ARCHIVE_PATH", path)
+    monkeypatch.setattr(ea, "_indexes", {})
+    return path
+
+
+def _record_random(rng, n):
+    for _ in range(n):
+        ea.record_fix(rng.choice(_ERRORS), rng.choice(_STRATS), rng.choice(_OUTCOMES))
+
+
+def _reference_best(rows, error_type):
+    needle = error_type.lower()
+    stats = {}
+    for row in rows:
+        if needle not in row["error_type"].lower():
+            continue
+        strat = row["fix_strategy"].strip()
+        if strat:
+            s = stats.setdefault(strat, [0, 0])
+            s[0] += 1
+            s[1] += row["outcome"] == "success"
+    if not stats:
+        return ""
+    return max(stats.items(), key=lambda kv: (kv[1][1] / kv[1][0], kv[1][0]))[0]
+
+
+def test_queries_match_full_scan():
+    rng = random.Random(11)
+    for _ in range(5):
+        _record_random(rng, rng.randint(5, 40))
+        rows = ea._read_rows(ea.ARCHIVE_PATH)
+        for needle in ["ImportError", "error", "ERROR", "keyerror", "", "nope"]:
+            assert ea.query_best_strategy(needle) == _reference_best(rows, needle)
+        for strat in ["add-import", "pin-version", "missing"]:
+            tried = [r for r in rows if r["fix_strategy"].strip() == strat]
+            want = sum(r["outcome"] == "success" for r in tried) / len(tried) if tried else 0.0
+            assert ea.get_success_rate(strat) == pytest.approx(want)
+        stats = ea.get_archive_stats()
+        assert stats["total_rows"] == len(rows)
+        assert stats["unique_errors"] == len({r["error_type"].strip() for r in rows})
+        assert stats["unique_strategies"] == len(
+            {r["fix_strategy"].strip() for r in rows if r["fix_strategy"].strip()}
+        )
+
+
+def test_existing_csv_is_imported_once_then_appended(archive):
+    with open(archive, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(ea._COLUMNS)
+        for outcome in ("success", "failure", "failure"):
+            w.writerow(["t", "ImportError", "", "add-import", outcome, "", "0.000"])
+    assert ea.get_success_rate("add-import") == pytest.approx(1 / 3)
+    assert os.path.exists(ea._index_path(archive))
+
+    ingested = []
+    real = ea._ingest_rows
+    ea._ingest_rows = lambda conn, rows, seq: ingested.append(len(rows)) or real(conn, rows, seq)
+    try:
+        ea.record_fix("ImportError", "add-import", "success")
+        # Another writer appending directly to the CSV
+        with open(archive, "a", newline="") as f:
+            csv.writer(f).writerow(["t", "ImportError", "", "reinstall", "success", "", "0"])
+        assert ea.get_success_rate("add-import") == pytest.approx(0.5)
+        assert ea.query_best_strategy("import") == "reinstall"
+    finally:
+        ea._ingest_rows = real
+    assert ingested == [1, 1]
+
+
+def test_index_survives_new_process(archive):
+    ea.record_fix("SyntaxError", "rewrite", "success")
+    ea.record_fix("SyntaxError", "rewrite", "failure")
+    ea._indexes.clear()
+    assert ea.get_archive_stats()["total_rows"] == 2
+    ea.record_fix("SyntaxError", "rewrite", "success")
+    assert ea.get_success_rate("rewrite") == pytest.approx(2 / 3)
+
+
+def test_repeated_lookups_are_memoized(monkeypatch):
+    ea.record_fix("ImportError", "add-import", "success")
+    calls = []
+    real = ea._strategy_counts
+    monkeypatch.setattr(ea, "_strategy_counts", lambda c, n: calls.append(n) or real(c, n))
+    for _ in range(5):
+        assert ea.query_best_strategy("ImportError") == "add-import"
+    assert calls == ["importerror"]
+    ea.record_fix("ImportError", "reinstall", "success")
+    ea.record_fix("ImportError", "reinstall", "success")
+    assert ea.query_best_strategy("ImportError") == "reinstall"
+    assert len(calls) == 2
+
+
+def test_rewritten_csv_is_reimported(archive):
+    for _ in range(3):
+        ea.record_fix("ImportError", "add-import", "failure")
+    os.remove(archive)
+    ea.record_fix("TypeError", "cast", "success")
+    stats = ea.get_archive_stats()
+    assert stats["total_rows"] == 1
+    assert ea.get_success_rate("add-import") == 0.0
+
+
+def test_breakdown_lists_strategies_in_first_seen_order():
+    ea.record_fix("ImportError", "reinstall", "failure")
+    ea.record_fix("ModuleNotFoundError", "add-import", "success")
+    ea.record_fix("ImportError", "reinstall", "success")
+    assert ea.get_strategy_breakdown("error") == {
+        "reinstall": {"total": 2, "successes": 1},
+        "add-import": {"total": 1, "successes": 1},
+    }
+    assert list(ea.get_strategy_breakdown("error")) == ["reinstall", "add-import"]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
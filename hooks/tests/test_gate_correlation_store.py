@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Tests for the incremental gate correlation store behind GateCorrelator."""
+
+import json
+import os
+import random
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import shared.gate_correlator as gc
+from shared.gate_correlator import GateCorrelator
+
+_GATES = [
+    "gates.gate_01_read_before_edit",
+    "gates.gate_02_no_destroy",
+    "gates.gate_04_memory_first",
+    "gates.gate_11_rate_limit",
+    "gates.gate_16_code_quality",
+    "",
+]
+
+
+@pytest.fixture(autouse=True)
+def trail(tmp_path, monkeypatch):
+    path = str(tmp_path / ".audit_trail.jsonl")
+    monkeypatch.setattr(gc, "_AUDIT_TRAIL", path)
+    monkeypatch.setattr(gc, "_AUDIT_DIR", str(tmp_path / "audit"))
+    monkeypatch.setattr(gc, "_STORE_PATH", str(tmp_path / ".gate_correlation.db"))
+    monkeypatch.setattr(gc, "_EFFECTIVENESS_FILE", str(tmp_path / "missing.json"))
+    return path
+
+
+def _entries(rng, n, start):
+    """n tool calls of 1-4 gate decisions each, in time order.
+
+    Steps are multiples of 1/8 s so chain gaps are exact in binary.
+    """
+    t, out = start, []
+    for _ in range(n):
+        t += rng.choice([0.5, 1.5, 3, 7])
+        session, tool = rng.choice(["s1", "s2"]), rng.choice(["Edit", "Bash", "Read"])
+        for gate in rng.sample(_GATES, rng.randint(1, 4)):
+            t += rng.choice([0, 0.125])
+            out.append(
+                {
+                    "timestamp": datetime.fromtimestamp(t, tz=timezone.utc).isoformat(),
+                    "gate": gate,
+                    "tool": tool,
+                    "decision": rng.choice(["pass", "pass", "block", "warn"]),
+                    "session_id": session,
+                }
+            )
+    return out, t
+
+
+def _append(path, entries, tail=""):
+    with open(path, "a") as f:
+        for e in entries:
+            f.write(json.dumps(e) + "\n")
+        f.write(tail)
+
+
+def _reference(entries, target_tool=None):
+    entries = [dict(e, gate=gc._normalize_gate(e["gate"])) for e in entries]
+    return {
+        "entries_analyzed": len(entries),
+        "cooccurrence": gc.cooccurrence_summary(gc.build_cooccurrence_matrix(entries)),
+        "gate_chains": gc.detect_gate_chains(entries),
+        "redundant_gates": gc.detect_redundant_gates(entries, jaccard_threshold=0.3),
+        "optimal_ordering": gc.optimize_gate_order(entries, {}, target_tool),
+    }
+
+
+def _report(target_tool=None):
+    corr = GateCorrelator()
+    corr.redundant_gates(jaccard_threshold=0.3)  # cached, so full_report reuses it
+    report = corr.full_report(target_tool=target_tool)
+    report.pop("summary")
+    return report
+
+
+def test_incremental_report_matches_full_scan(trail):
+    rng = random.Random(7)
+    seen, t = [], 1_700_000_000.0
+    for batch in range(6):
+        new, t = _entries(rng, rng.randint(1, 80), t)
+        _append(trail, new)
+        seen += new
+        tool = "Edit" if batch % 2 else None
+        assert _report(tool) == _reference(seen, tool)
+
+
+def test_only_appended_complete_lines_are_read(trail, monkeypatch):
+    rng = random.Random(3)
+    first, t = _entries(rng, 20, 1_700_000_000.0)
+    second, _ = _entries(rng, 5, t)
+    _append(trail, first, tail=json.dumps(second[0])[:15])
+    assert _report()["entries_analyzed"] == len(first)
+
+    parsed = []
+    real = gc._parse_entry
+    monkeypatch.setattr(gc, "_parse_entry", lambda raw: parsed.append(raw) or real(raw))
+    assert _report()["entries_analyzed"] == len(first)
+    assert parsed == []
+
+    with open(trail, "a") as f:
+        f.write(json.dumps(second[0])[15:] + "\n")
+    _append(trail, second[1:])
+    assert _report() == _reference(first + second)
+    assert len(parsed) == len(second)
+
+
+def test_rewritten_trail_is_reimported(trail):
+    rng = random.Random(5)
+    old, t = _entries(rng, 40, 1_700_000_000.0)
+    _append(trail, old)
+    _report()
+    os.remove(trail)
+    new, _ = _entries(rng, 10, t)
+    _append(trail, new)
+    assert _report() == _reference(new)
+
+
+def test_without_trail_falls_back_to_scan(tmp_path):
+    os.makedirs(gc._AUDIT_DIR)
+    entries, _ = _entries(random.Random(9), 30, 1_700_000_000.0)
+    _append(os.path.join(gc._AUDIT_DIR, "2026-01-01.jsonl"), entries)
+    assert _report() == _reference(entries)
+    assert not os.path.exists(gc._STORE_PATH)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Tests for the cached health snapshot producer (shared/health_snapshot.py)."""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import shared.health_monitor as hm
+import shared.health_snapshot as hs
+
+
+@pytest.fixture
+def checks(tmp_path, monkeypatch):
+    """Fake component checks; .ran lists the components run, .watched their paths."""
+    monkeypatch.setattr(hs, "SNAPSHOT_PATH", str(tmp_path / ".health_snapshot.json"))
+    monkeypatch.setattr(hs, "_memo", {"sig": None, "snapshot": {}})
+    monkeypatch.setattr(hm, "_last_report", {})
+    watched = {name: tmp_path / name for name in hs.COMPONENT_TTLS}
+    for path in watched.values():
+        path.mkdir()
+    monkeypatch.setattr(hs, "_watched_paths", lambda name, sid: [str(watched[name])])
+    ran = []
+    statuses = {name: "ok" for name in hs.COMPONENT_TTLS}
+    statuses[hm.COMPONENT_MEMORY] = "error"
+
+    def fake(name, session_id):
+        ran.append(name)
+        return {"status": statuses[name], "session": session_id}
+
+    monkeypatch.setattr(hs, "_run_check", fake)
+    return SimpleNamespace(ran=ran, watched=watched)
+
+
+def test_read_never_runs_checks(checks):
+    assert hs.read_snapshot() == {}
+    assert checks.ran == []
+
+
+def test_only_stale_components_rerun(checks):
+    snap = hs.get_snapshot("s1")
+    assert sorted(checks.ran) == sorted(hs.COMPONENT_TTLS)
+    assert snap["overall_score"] == 75 and snap["degraded_components"] == [hm.COMPONENT_MEMORY]
+    assert all(e["checked_at"] <= snap["ts"] for e in snap["components"].values())
+
+    checks.ran.clear()
+    assert hs.get_snapshot("s1") is hs.read_snapshot()
+    assert checks.ran == []
+
+    # A watched path change and a different session each re-run just their component
+    (checks.watched[hm.COMPONENT_GATES] / "gate_99_new.py").write_text("")
+    hs.get_snapshot("s2")
+    assert sorted(checks.ran) == sorted([hm.COMPONENT_GATES, hm.COMPONENT_STATE])
+    assert hs.read_snapshot()["components"][hm.COMPONENT_STATE]["data"]["session"] == "s2"
+
+
+def test_ttl_expiry_and_notify_change(checks):
+    snap = hs.get_snapshot()
+    checked_at = snap["components"][hm.COMPONENT_AUDIT]["checked_at"]
+    assert hs.stale_components(snap, now=checked_at + 1) == []
+    assert hs.stale_components(snap, now=checked_at + 60) == [
+        hm.COMPONENT_MEMORY,
+        hm.COMPONENT_STATE,
+        hm.COMPONENT_RAMDISK,
+        hm.COMPONENT_AUDIT,
+        hs.COMPONENT_GATE_PERF,
+    ]
+
+    checks.ran.clear()
+    hs.notify_change(hs.COMPONENT_GATE_PERF)
+    assert hs.stale_components(hs.read_snapshot()) == [hs.COMPONENT_GATE_PERF]
+    hs.refresh_snapshot()
+    assert checks.ran == [hs.COMPONENT_GATE_PERF]
+
+
+def test_partial_snapshot_is_unscored(checks):
+    snap = hs.refresh_snapshot(components=(hm.COMPONENT_RAMDISK,))
+    assert checks.ran == [hm.COMPONENT_RAMDISK]
+    assert snap["overall_score"] is None and snap["status"] == "unknown"
+
+
+def test_read_is_memoized_until_another_writer_publishes(checks, monkeypatch):
+    hs.get_snapshot()
+    loads = []
+    real = hs.json.load
+    monkeypatch.setattr(hs.json, "load", lambda f: loads.append(1) or real(f))
+    for _ in range(5):
+        hs.read_snapshot()
+    assert loads == []
+    # Simulate another process: the file changes behind the memo
+    hs._memo["sig"] = None
+    assert hs.read_snapshot()["overall_score"] == 75
+    assert loads == [1]
+
+
+def test_full_health_check_publishes(checks, monkeypatch):
+    for name in ("gates", "memory", "state", "ramdisk", "audit"):
+        monkeypatch.setattr(hm, f"check_{name}_health", lambda *a, _n=name: {"status": "ok"})
+    report = hm.full_health_check("s9")
+    snap = hs.read_snapshot()
+    assert snap["overall_score"] == report["overall_score"] == 100
+    assert snap["components"][hm.COMPONENT_STATE]["key"] == "s9"
+
+    # A reader in another process sees the published result without checking
+    hm._last_report = {}
+    monkeypatch.setattr(hm, "full_health_check", lambda *a: pytest.fail("re-checked"))
+    assert hm.get_degraded_components() == []
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
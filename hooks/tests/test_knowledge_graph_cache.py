@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Tests for KnowledgeGraph batched neighbors, adjacency cache and lazy decay."""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from shared.knowledge_graph import KnowledgeGraph
+
+
+@pytest.fixture
+def kg():
+    graph = KnowledgeGraph(":memory:")
+    yield graph
+    graph.close()
+
+
+def _star(kg):
+    for name in ("hub", "a", "b", "c"):
+        kg.upsert_entity(name)
+    for leaf in ("a", "b", "c"):
+        kg.add_edge("hub", leaf, "related", 0.5)
+
+
+def test_get_neighbors_many_matches_single_lookups(kg):
+    _star(kg)
+    many = kg.get_neighbors_many(["hub", "a", "missing", "hub"])
+    assert set(many) == {"hub", "a", "missing"}
+    assert {n for n, _ in many["hub"]} == {"a", "b", "c"}
+    [(name, weight)] = kg._get_neighbors("a")
+    assert many["a"][0][0] == name == "hub"
+    assert many["a"][0][1] == pytest.approx(weight)
+    assert many["missing"] == []
+
+
+def test_cache_serves_repeat_lookups(kg):
+    _star(kg)
+    kg.get_neighbors_many(["hub"])
+    queries = []
+    kg._conn.set_trace_callback(queries.append)
+    kg.get_neighbors_many(["hub"])
+    kg._conn.set_trace_callback(None)
+    assert not any("FROM edges" in q for q in queries)
+
+
+def test_own_writes_evict_touched_nodes(kg):
+    _star(kg)
+    kg.get_neighbors_many(["hub", "a"])
+    version = kg.edge_version
+    kg.upsert_entity("d")
+    kg.add_edge("hub", "d", "related", 0.5)
+    assert kg.edge_version > version
+    assert "d" in {n for n, _ in kg._get_neighbors("hub")}
+    assert "a" in kg._adj  # untouched node stays cached
+
+
+def test_raw_sql_writes_invalidate_cache(kg):
+    _star(kg)
+    kg.get_neighbors_many(["hub"])
+    kg._conn.execute("DELETE FROM edges WHERE to_id='a'")
+    kg._conn.commit()
+    assert {n for n, _ in kg._get_neighbors("hub")} == {"b", "c"}
+
+
+def test_deactivated_entity_hidden_until_boosted(kg):
+    _star(kg)
+    kg.get_neighbors_many(["hub"])
+    kg.deactivate_entity("b")
+    assert "b" not in {n for n, _ in kg._get_neighbors("hub")}
+    kg.boost_entity_salience(["b"], 0.2)
+    assert "b" in {n for n, _ in kg._get_neighbors("hub")}
+
+
+def test_decay_is_applied_at_read_time(kg):
+    _star(kg)
+    week_ago = time.time() - 168 * 3600
+    kg._conn.execute(
+        "UPDATE edges SET last_activated=? WHERE to_id='a'", (week_ago,)
+    )
+    kg._conn.commit()
+    stored = kg._conn.execute(
+        "SELECT strength FROM edges WHERE to_id='a'"
+    ).fetchone()[0]
+    assert kg.get_edge_strength("hub", "a") == pytest.approx(stored / 2, rel=1e-3)
+    weights = dict(kg._get_neighbors("hub"))
+    assert weights["a"] == pytest.approx(weights["b"] / 2, rel=1e-3)
+
+
+def test_strengthen_starts_from_decayed_value(kg):
+    _star(kg)
+    kg._conn.execute(
+        "UPDATE edges SET strength=0.8, last_activated=? WHERE to_id='a'",
+        (time.time() - 168 * 3600,),
+    )
+    kg._conn.commit()
+    kg.add_edge("hub", "a", "related", 0.1)
+    # 0.8 decays to 0.4, then 0.4 + 0.1 * 0.6 = 0.46
+    assert kg.get_edge_strength("hub", "a") == pytest.approx(0.46, rel=1e-3)
+
+
+def test_decay_edges_prunes_via_expiry_without_rewriting(kg):
+    _star(kg)
+    old = time.time() - 60 * 24 * 3600
+    kg._conn.execute(
+        "UPDATE edges SET last_activated=?, expires_at=NULL WHERE to_id='a'", (old,)
+    )
+    kg._conn.execute(
+        "UPDATE edges SET expires_at = kg_expiry(strength, last_activated) "
+        "WHERE expires_at IS NULL"
+    )
+    kg._conn.commit()
+    before = {r[0]: r[1] for r in kg._conn.execute("SELECT to_id, strength FROM edges")}
+    result = kg.decay_edges()
+    assert result == {"decayed": 2, "pruned": 1}
+    after = {r[0]: r[1] for r in kg._conn.execute("SELECT to_id, strength FROM edges")}
+    assert after == {k: v for k, v in before.items() if k != "a"}
+    assert {n for n, _ in kg._get_neighbors("hub")} == {"b", "c"}
+
+
+def test_migration_does_not_decay_legacy_edges_twice(tmp_path):
+    # A pre-lazy-decay table: strength already decayed in place, while
+    # last_activated still points at the original activation.
+    path = str(tmp_path / "kg.db")
+    import sqlite3
+
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE edges (
+            from_id TEXT NOT NULL, to_id TEXT NOT NULL,
+            relation_type TEXT NOT NULL DEFAULT 'co_retrieved',
+            strength REAL NOT NULL DEFAULT 0.0,
+            activation_count INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL DEFAULT (strftime('%s','now')),
+            last_activated REAL NOT NULL DEFAULT (strftime('%s','now')),
+            PRIMARY KEY (from_id, to_id, relation_type)
+        );
+    """)
+    four_weeks_ago = time.time() - 4 * 168 * 3600
+    conn.execute(
+        "INSERT INTO edges (from_id, to_id, relation_type, strength, last_activated) "
+        "VALUES ('a', 'b', 'related', 0.1, ?)",
+        (four_weeks_ago,),
+    )
+    conn.commit()
+    conn.close()
+
+    graph = KnowledgeGraph(path)
+    try:
+        [(name, weight)] = graph._get_neighbors("a")
+        assert name == "b" and weight == pytest.approx(0.1, rel=1e-3)
+        assert graph.decay_edges()["pruned"] == 0
+        (expires_at,) = graph._conn.execute("SELECT expires_at FROM edges").fetchone()
+        assert expires_at > time.time() + 167 * 3600  # one half-life to 0.05
+    finally:
+        graph.close()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""Tests for shared.local_ann — in-process ANN index beside SurrealDB."""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from shared.local_ann import LocalANNIndex, match_where
+
+
+def _clustered(n, dim, n_centers=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_centers, dim))
+    labels = rng.integers(0, n_centers, n)
+    data = centers[labels] + 0.3 * rng.standard_normal((n, dim))
+    return data.astype(np.float32)
+
+
+class TestMatchWhere:
+    def test_equality_and_ops(self):
+        meta = {"memory_type": "fix", "session_time": 10.0}
+        assert match_where(meta, {"memory_type": "fix"})
+        assert not match_where(meta, {"memory_type": "note"})
+        assert match_where(meta, {"session_time": {"$gt": 5}})
+        assert not match_where(meta, {"session_time": {"$lt": 5}})
+
+    def test_and_or(self):
+        meta = {"a": 1, "b": "x"}
+        assert match_where(meta, {"$and": [{"a": 1}, {"b": "x"}]})
+        assert match_where(meta, {"$or": [{"a": 2}, {"b": "x"}]})
+        assert not match_where(meta, {"$or": [{"a": 2}, {"b": "y"}]})
+
+    def test_incomparable_types_do_not_match(self):
+        assert not match_where({"t": "abc"}, {"t": {"$gt": 5}})
+        assert not match_where({}, {"t": {"$gt": 5}})
+
+
+class TestLocalANNIndex:
+    def test_flat_query_exact(self):
+        with tempfile.TemporaryDirectory() as d:
+            idx = LocalANNIndex(d, dim=8)
+            data = _clustered(50, 8)
+            ids = [f"m{i}" for i in range(50)]
+            idx.upsert(ids, data.tolist(), documents=[f"doc {i}" for i in ids])
+            q = data[7]
+            res = idx.query(q, n_results=3, include=["documents", "distances"])
+            assert res["ids"][0][0] == "m7"
+            assert res["documents"][0][0] == "doc m7"
+            assert res["distances"][0][0] < 1e-2
+            assert res["distances"][0] == sorted(res["distances"][0])
+
+    def test_where_filter(self):
+        with tempfile.TemporaryDirectory() as d:
+            idx = LocalANNIndex(d, dim=4)
+            idx.upsert(
+                ["a", "b", "c"],
+                [[1, 0, 0, 0], [1, 0.1, 0, 0], [0, 1, 0, 0]],
+                metadatas=[{"t": "x"}, {"t": "y"}, {"t": "y"}],
+            )
+            res = idx.query([1, 0, 0, 0], n_results=2, where={"t": "y"})
+            assert res["ids"][0] == ["b", "c"]
+
+    def test_upsert_replaces_and_delete_frees_slot(self):
+        with tempfile.TemporaryDirectory() as d:
+            idx = LocalANNIndex(d, dim=4)
+            idx.upsert(["a"], [[1, 0, 0, 0]])
+            idx.upsert(["a"], [[0, 1, 0, 0]])
+            assert len(idx) == 1
+            assert idx.search([0, 1, 0, 0], k=1)[0][0] == "a"
+            idx.delete(["a"])
+            assert len(idx) == 0
+            assert idx.search([0, 1, 0, 0], k=1) == []
+            idx.upsert(["b"], [[0, 0, 1, 0]])
+            assert idx._slot_of["b"] == 0
+
+    def test_ivf_recall(self):
+        with tempfile.TemporaryDirectory() as d:
+            data = _clustered(3000, 32)
+            ids = [str(i) for i in range(3000)]
+            idx = LocalANNIndex(d, dim=32, nprobe=8, train_threshold=1000)
+            idx.upsert(ids, data.tolist())
+            idx.wait_for_training()
+            assert idx.stats()["ivf_lists"] > 0
+            rng = np.random.default_rng(1)
+            hits = total = 0
+            for qi in rng.choice(3000, 50, replace=False):
+                q = data[qi] + 0.05 * rng.standard_normal(32).astype(np.float32)
+                truth = {i for i, _ in idx.search(q, k=10, exact=True)}
+                approx = {i for i, _ in idx.search(q, k=10)}
+                hits += len(truth & approx)
+                total += 10
+            assert hits / total >= 0.9
+
+    def test_retrain_runs_in_background_and_persists(self):
+        with tempfile.TemporaryDirectory() as d:
+            data = _clustered(600, 16)
+            idx = LocalANNIndex(d, dim=16, train_threshold=200)
+            started = threading.Event()
+            release = threading.Event()
+            real_labels = idx._labels
+
+            def slow_labels(*args):
+                started.set()
+                release.wait(5)
+                return real_labels(*args)
+
+            idx._labels = slow_labels
+            idx.upsert([str(i) for i in range(300)], data[:300].tolist())
+            assert started.wait(5)
+            # Writers and searches proceed while k-means is in flight
+            idx.upsert([str(i) for i in range(300, 400)], data[300:400].tolist())
+            idx.delete(["0"])
+            assert idx.search(data[350], k=1)[0][0] == "350"
+            release.set()
+            idx.wait_for_training(5)
+
+            stats = idx.stats()
+            assert stats["ivf_lists"] > 0
+            live = {s for lst in idx._lists.values() for s in lst}
+            assert live == set(idx._slot_of.values())
+            assert idx.search(data[350], k=1)[0][0] == "350"
+            # Trained centroids were flushed without waiting for exit
+            loaded = LocalANNIndex(d, dim=16, train_threshold=200)
+            assert loaded.load()
+            assert loaded.stats()["ivf_lists"] == stats["ivf_lists"]
+
+    def test_flush_and_load_roundtrip(self):
+        with tempfile.TemporaryDirectory() as d:
+            data = _clustered(40, 8)
+            ids = [f"m{i}" for i in range(40)]
+            idx = LocalANNIndex(d, dim=8)
+            idx.upsert(ids, data.tolist(), metadatas=[{"n": i} for i in range(40)])
+            idx.delete(["m3"])
+            idx.flush()
+
+            loaded = LocalANNIndex(d, dim=8)
+            assert loaded.load()
+            assert len(loaded) == 39
+            res = loaded.query(data[5], n_results=1, include=["metadatas"])
+            assert res["ids"][0] == ["m5"]
+            assert res["metadatas"][0][0] == {"n": 5}
+
+    def test_unflushed_changes_refuse_load(self):
+        with tempfile.TemporaryDirectory() as d:
+            idx = LocalANNIndex(d, dim=4)
+            idx.upsert(["a"], [[1, 0, 0, 0]])
+            idx.flush()
+            idx.upsert(["b"], [[0, 1, 0, 0]])  # crash before flush
+            assert not LocalANNIndex(d, dim=4).load()
+
+    def test_rebuild_skips_rows_written_during_build(self):
+        with tempfile.TemporaryDirectory() as d:
+            idx = LocalANNIndex(d, dim=4)
+
+            class _Coll:
+                def get(self, limit=None, offset=0, include=None):
+                    if offset:
+                        return {"ids": []}
+                    # A concurrent delete of "a" lands after this page is read
+                    idx.delete(["a"])
+                    return {
+                        "ids": ["a", "b"],
+                        "embeddings": [[1, 0, 0, 0], [0, 1, 0, 0]],
+                        "metadatas": [{}, {}],
+                        "documents": ["", ""],
+                    }
+
+            idx.build_from_collection(_Coll(), chunk_size=10)
+            assert idx.ready
+            assert set(idx._slot_of) == {"b"}
+
+
+class _FakeDB:
+    def __init__(self):
+        self.statements = []
+
+    def query(self, sql, params=None):
+        self.statements.append(sql)
+        return []
+
+
+def test_surreal_collection_mirrors_writes_and_serves_knn():
+    pytest.importorskip("surrealdb")
+    from shared.surreal_collection import SurrealCollection
+
+    with tempfile.TemporaryDirectory() as d:
+        db = _FakeDB()
+        coll = SurrealCollection(
+            db, "knowledge", fields={"text": "string", "tags": "string", "tier": "int"},
+            embedding_dim=4,
+        )
+        idx = LocalANNIndex(d, dim=4)
+        coll.attach_local_index(idx)
+        coll.upsert(
+            ids=["a", "b"],
+            documents=["alpha", "beta"],
+            metadatas=[{"tags": "x"}, {"tags": "y"}],
+            vectors=[[1, 0, 0, 0], [0, 1, 0, 0]],
+        )
+        assert len(idx) == 2
+        idx.ready = True
+
+        db.statements.clear()
+        res = coll.query(
+            query_vector=[1, 0, 0, 0], n_results=1, include=["documents", "metadatas"]
+        )
+        assert res["ids"][0] == ["a"]
+        assert res["documents"][0] == ["alpha"]
+        assert res["metadatas"][0][0] == {"tags": "x", "tier": 0}
+        assert db.statements == []  # no SurrealDB KNN round-trip
+
+        coll.update(ids=["a"], metadatas=[{"tags": "z"}])
+        assert coll.query(query_vector=[1, 0, 0, 0], n_results=1, where={"tags": "z"})[
+            "ids"
+        ][0] == ["a"]
+        coll.delete(ids=["a"])
+        assert coll.query(query_vector=[1, 0, 0, 0], n_results=1)["ids"][0] == ["b"]
+
+
+class _StampDB(_FakeDB):
+    """_FakeDB that also keeps the per-table write stamps."""
+
+    def __init__(self):
+        super().__init__()
+        self.stamps = {}
+
+    def query(self, sql, params=None):
+        self.statements.append(sql)
+        if sql.startswith("UPSERT ann_stamp:"):
+            self.stamps[sql.split("`")[1]] = params["tok"]
+        elif sql.startswith("SELECT token FROM ann_stamp:"):
+            tok = self.stamps.get(sql.split("`")[1])
+            return [{"token": tok}] if tok else []
+        return []
+
+
+def _stamped_collection(db, d):
+    from shared.surreal_collection import SurrealCollection
+
+    coll = SurrealCollection(db, "knowledge", fields={"text": "string"}, embedding_dim=4)
+    idx = LocalANNIndex(d, dim=4)
+    coll.attach_local_index(idx)
+    return coll, idx
+
+
+def test_failed_mirror_takes_index_offline_and_rebuilds():
+    pytest.importorskip("surrealdb")
+    with tempfile.TemporaryDirectory() as d:
+        db = _StampDB()
+        coll, idx = _stamped_collection(db, d)
+        assert coll.sync_local_index() == "rebuilt"
+        assert idx.ready and idx.stamp == db.stamps["knowledge"]
+
+        built = threading.Event()
+        real_build = idx.build_from_collection
+
+        def build(collection, chunk_size=500):
+            try:
+                return real_build(collection, chunk_size)
+            finally:
+                built.set()
+
+        def broken(*args, **kwargs):
+            raise OSError("disk full")
+
+        idx.build_from_collection = build
+        idx.upsert = broken
+        coll.upsert(ids=["a"], documents=["alpha"], vectors=[[1, 0, 0, 0]])
+        assert built.wait(5)
+        deadline = time.monotonic() + 5
+        while coll._rebuilding and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert idx.ready
+        assert idx.stamp == db.stamps["knowledge"]
+
+
+def test_sync_rebuilds_when_stamp_drifts_at_same_row_count():
+    pytest.importorskip("surrealdb")
+    from shared.surreal_collection import SurrealCollection
+
+    with tempfile.TemporaryDirectory() as d:
+        db = _StampDB()
+        coll, idx = _stamped_collection(db, d)
+        coll.sync_local_index()
+        coll.upsert(ids=["a"], documents=["alpha"], vectors=[[1, 0, 0, 0]])
+        assert idx.stamp == db.stamps["knowledge"]
+        idx.flush()
+
+        # A writer without the index (another process) changes a row in place.
+        other = SurrealCollection(db, "knowledge", fields={"text": "string"}, embedding_dim=4)
+        other.update(ids=["a"], metadatas=[{"tags": "changed"}])
+
+        _, fresh = _stamped_collection(db, d)
+        assert fresh.load() and len(fresh) == 1  # row count alone looks fine
+        coll2, idx2 = _stamped_collection(db, d)
+        assert coll2.sync_local_index() == "rebuilt"
+        assert idx2.stamp == db.stamps["knowledge"]
+
+
+def test_sync_loads_index_whose_stamp_matches():
+    pytest.importorskip("surrealdb")
+    with tempfile.TemporaryDirectory() as d:
+        db = _StampDB()
+        coll, idx = _stamped_collection(db, d)
+        coll.sync_local_index()
+        coll.upsert(ids=["a"], documents=["alpha"], vectors=[[1, 0, 0, 0]])
+        idx.flush()
+
+        coll2, idx2 = _stamped_collection(db, d)
+        assert coll2.sync_local_index() == "loaded"
+        assert idx2.ready and len(idx2) == 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Tests for shared.ltp_tracker SQLite storage, queries and compaction."""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from shared.ltp_tracker import LTPTracker
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "ltp_state.db")
+
+
+def _rows(path, sql):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def test_accesses_are_appended_in_batches(path):
+    tracker = LTPTracker(path, batch_size=3)
+    tracker.record_access("a")
+    tracker.record_access("b")
+    assert _rows(path, "SELECT COUNT(*) FROM access_log") == [(0,)]
+    tracker.record_access("c")
+    assert _rows(path, "SELECT COUNT(*) FROM access_log") == [(3,)]
+    tracker.record_access("a")
+    tracker.flush()
+    assert _rows(
+        path, "SELECT total_accesses FROM ltp_state WHERE memory_id='a'"
+    ) == [(2,)]
+
+
+def test_get_states_reads_only_requested_ids(path):
+    tracker = LTPTracker(path)
+    for _ in range(10):
+        tracker.record_access("hot")
+    tracker.record_access("cold")
+    tracker.flush()
+    fresh = LTPTracker(path)
+    states = fresh.get_states(["hot", "unknown"])
+    assert states["hot"] == {"status": "full", "decay_factor": 0.1, "total_accesses": 10}
+    assert states["unknown"]["status"] == "none"
+    assert "cold" not in fresh._entries
+
+
+def test_top_potentiated_orders_by_level(path):
+    tracker = LTPTracker(path)
+    for _ in range(12):
+        tracker.record_access("full")
+    for _ in range(5):
+        tracker.record_access("burst")
+    tracker.record_access("plain")
+    assert tracker.top_potentiated(5) == [("full", "full", 12), ("burst", "burst", 5)]
+    assert tracker.top_potentiated(1) == [("full", "full", 12)]
+
+
+def test_status_survives_restart_with_pending_history(path):
+    tracker = LTPTracker(path, batch_size=100)
+    for _ in range(4):
+        tracker.record_access("m")
+    tracker.flush()
+    reopened = LTPTracker(path, batch_size=100)
+    # History reloaded from access_log: 5th access in 24h is a burst
+    assert reopened.record_access("m") == "burst"
+
+
+def test_legacy_json_file_is_converted(tmp_path):
+    legacy = str(tmp_path / "ltp_state.json")
+    now = time.time()
+    with open(legacy, "w") as f:
+        json.dump(
+            {"old": {"access_timestamps": [now - 60], "status": "full", "total_accesses": 15}},
+            f,
+        )
+    tracker = LTPTracker(legacy)
+    assert tracker.get_status("old") == "full"
+    assert tracker.record_access("old") == "full"
+    assert tracker.get_states(["old"])["old"]["total_accesses"] == 16
+
+
+def test_compact_drops_old_events_and_prunes_only_on_request(path):
+    tracker = LTPTracker(path)
+    tracker.record_access("keep")
+    tracker.record_access("stale")
+    tracker.flush()
+    old = time.time() - 120 * 86400
+    tracker._conn.execute("UPDATE access_log SET ts=? WHERE memory_id='stale'", (old,))
+    tracker._conn.execute(
+        "UPDATE ltp_state SET last_access=? WHERE memory_id='stale'", (old,)
+    )
+    tracker._conn.commit()
+    tracker._entries.clear()
+    # Compaction only drops old events; entries are kept unless pruning is requested
+    assert tracker.compact() == {"events_dropped": 1, "entries_pruned": 0}
+    assert sorted(_rows(path, "SELECT memory_id FROM ltp_state")) == [("keep",), ("stale",)]
+    assert tracker.compact(prune_stale_days=90) == {"events_dropped": 0, "entries_pruned": 1}
+    assert _rows(path, "SELECT memory_id FROM ltp_state") == [("keep",)]
+
+
+def test_background_compaction_is_triggered(path):
+    tracker = LTPTracker(path, batch_size=1, compact_interval=0)
+    started = tracker._last_compact
+    tracker.record_access("a")
+    deadline = time.time() + 5
+    while tracker._last_compact == started and time.time() < deadline:
+        time.sleep(0.01)
+    assert tracker._last_compact > started
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Tests for the numpy metric ring buffers (shared/metric_ring.py)."""
+
+import os
+import random
+import statistics
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from shared.anomaly_detector import (
+    compute_baseline,
+    detect_anomalies,
+    detect_rate_of_change,
+    detect_trend,
+)
+from shared.drift_detector import DriftBaseline, cosine_similarity, gate_drift_report
+from shared.metric_ring import MetricRing
+
+_GATES = [f"gate_{i:02d}" for i in range(1, 9)]
+
+
+def _history(rng, n):
+    """Snapshots with sparse keys; a gate first appears part-way through."""
+    out = []
+    for i in range(n):
+        gates = rng.sample(_GATES[:-1], rng.randint(2, 6))
+        if i > n // 2:
+            gates.append(_GATES[-1])
+        out.append({g: float(rng.randint(0, 12)) for g in gates})
+    return out
+
+
+def _reference_per_gate(history):
+    gates = {g for snap in history for g in snap}
+    return {
+        g: (
+            statistics.fmean([s.get(g, 0.0) for s in history]),
+            statistics.pstdev([s.get(g, 0.0) for s in history]),
+        )
+        for g in gates
+    }
+
+
+def test_streaming_stats_match_full_recompute():
+    rng = random.Random(1)
+    history = _history(rng, 60)
+    ring = MetricRing(capacity=64, window=10)
+    for i, snap in enumerate(history, 1):
+        ring.push(snap)
+        assert ring.baseline() == pytest.approx(compute_baseline(history[:i], window=10))
+    for gate, (mean, std) in _reference_per_gate(history).items():
+        assert ring.stats()[gate] == pytest.approx((mean, std))
+    for gate, trend in ring.trends().items():
+        series = [s.get(gate, 0.0) for s in history]
+        assert trend == pytest.approx(detect_trend(series))
+
+
+def test_eviction_keeps_windowed_checks_exact():
+    rng = random.Random(2)
+    history = _history(rng, 300)
+    ring = MetricRing(capacity=16, window=10)
+    ring.extend(history)
+    assert ring.count == 300
+    assert ring.baseline() == pytest.approx(compute_baseline(history, window=10))
+    by_gate = lambda rows: sorted(rows, key=lambda r: r["gate"])  # ties come in set order
+    assert by_gate(ring.rate_of_change(5, 1.0)) == by_gate(detect_rate_of_change(history[-16:], 5, 1.0))
+    # Welford stats still cover every sample, not just the retained ones
+    assert ring.stats()["gate_01"] == pytest.approx(_reference_per_gate(history)["gate_01"])
+
+
+def test_batch_anomalies_match_history_api():
+    rng = random.Random(3)
+    history = _history(rng, 40)
+    ring = MetricRing.from_history(history)
+    current = dict(history[-1], gate_03=40.0, gate_05=0.0, gate_99=7.0)
+    baseline = compute_baseline(history)
+
+    expected = detect_anomalies(current, baseline, 2.0, history)
+    report = ring.evaluate(current)
+    assert report["anomalies"] == expected
+    assert expected[0]["gate"] == "gate_03" and expected[0]["detection_method"] == "both"
+    drift = gate_drift_report(current, baseline)
+    assert report["drift"]["drift_score"] == pytest.approx(drift["drift_score"])
+    assert report["drift"]["per_gate_deltas"] == pytest.approx(drift["per_gate_deltas"])
+    assert report["samples"] == 40
+
+    # A new gate in current is only judged against the global baseline
+    assert all(a["detection_method"] == "global" for a in expected if a["gate"] == "gate_99")
+
+
+def test_drift_baseline_is_cached_until_next_push():
+    base = {"g1": 3.0, "g2": 4.0, "g3": 0.0}
+    cached = DriftBaseline(base)
+    for current in ({"g1": 3.0, "g2": 4.0}, {"g4": 1.0}, {"g1": 1.0, "g3": 2.0}, {}):
+        assert cached.similarity(current) == pytest.approx(cosine_similarity(current, base))
+    assert DriftBaseline({}).similarity({}) == 1.0
+
+    ring = MetricRing()
+    ring.push(base)
+    ring.drift({"g1": 1.0})
+    first = ring._drift
+    ring.drift({"g2": 1.0})
+    assert ring._drift is first
+    ring.push(base)
+    ring.drift({"g1": 1.0})
+    assert ring._drift is not first
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "ring.npz")
+    history = _history(random.Random(4), 30)
+    ring = MetricRing(capacity=8, window=4, alpha=0.5)
+    ring.extend(history[:20])
+    ring.save(path)
+
+    loaded = MetricRing.load(path)
+    for snap in history[20:]:
+        ring.push(snap)
+        loaded.push(snap)
+    assert loaded.evaluate(history[-1]) == ring.evaluate(history[-1])
+    assert (loaded.capacity, loaded.window, loaded.alpha) == (8, 4, 0.5)
+
+    (tmp_path / "bad.npz").write_bytes(b"not an archive")
+    fresh = MetricRing.load(str(tmp_path / "bad.npz"), window=3)
+    assert fresh.count == 0 and fresh.window == 3
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Tests for MinHash/LSH merge-candidate search in memory consolidation."""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import shared.minhash_index as mh
+from shared.memory_consolidation import _jaccard, _word_set, find_merge_candidates
+from shared.minhash_index import (
+    MinHashIndex,
+    estimate_jaccard,
+    minhash_signature,
+    word_set,
+)
+
+_VOCAB = [f"word{i:04d}" for i in range(3000)]
+
+
+def _corpus(rng, n_topics=150, per_topic=4):
+    """Topics of near-duplicate memories (small edits) plus unrelated noise."""
+    entries = []
+    for t in range(n_topics):
+        base = rng.sample(_VOCAB, 20)
+        for k in range(per_topic):
+            words = list(base)
+            for _ in range(rng.randint(0, 3)):
+                words[rng.randrange(len(words))] = rng.choice(_VOCAB)
+            entries.append({"id": f"t{t}-{k}", "document": " ".join(words)})
+    rng.shuffle(entries)
+    return entries
+
+
+def _reference_groups(entries, threshold):
+    """The original greedy all-pairs grouping."""
+    sets = [(e, _word_set(e["document"])) for e in entries]
+    used, groups = set(), []
+    for i, (ei, wi) in enumerate(sets):
+        if ei["id"] in used or not wi:
+            continue
+        group = [ei["id"]]
+        used.add(ei["id"])
+        for j, (ej, wj) in enumerate(sets):
+            if i == j or ej["id"] in used or not wj:
+                continue
+            if _jaccard(wi, wj) >= threshold:
+                group.append(ej["id"])
+                used.add(ej["id"])
+                if len(group) >= 5:
+                    break
+        if len(group) >= 2:
+            groups.append(group)
+    return groups
+
+
+def test_signature_estimates_jaccard():
+    rng = random.Random(1)
+    a = set(rng.sample(_VOCAB, 60))
+    b = set(list(a)[:40]) | set(rng.sample(_VOCAB, 20))
+    exact = len(a & b) / len(a | b)
+    assert estimate_jaccard(minhash_signature(a), minhash_signature(b)) == pytest.approx(
+        exact, abs=0.12
+    )
+    assert (minhash_signature(a) == minhash_signature(set(a))).all()
+
+
+def test_lsh_groups_match_all_pairs_reference():
+    entries = _corpus(random.Random(7))
+    got = [a.memory_ids for a in find_merge_candidates(entries, threshold=0.5)]
+    want = _reference_groups(entries, 0.5)
+    # MAX_ACTIONS_PER_TYPE caps the action list, not the grouping
+    assert got == want[: len(got)]
+    assert len(got) == min(len(want), 50)
+
+
+def test_candidate_pairs_are_far_fewer_than_all_pairs():
+    entries = _corpus(random.Random(3))
+    index = MinHashIndex()
+    index.sync(entries)
+    pairs = index.candidate_pairs(0.5)
+    n = len(entries)
+    assert len(pairs) < n * (n - 1) // 2 // 20
+    # Every true near-duplicate pair within a topic is surfaced
+    ids = {e["id"]: word_set(e["document"]) for e in entries}
+    for e in entries:
+        topic = e["id"].split("-")[0]
+        for k in range(4):
+            other = f"{topic}-{k}"
+            if other != e["id"] and _jaccard(ids[e["id"]], ids[other]) >= 0.5:
+                assert tuple(sorted((e["id"], other))) in pairs
+
+
+def test_signatures_persist_and_are_reused(tmp_path, monkeypatch):
+    path = str(tmp_path / "sigs.db")
+    entries = _corpus(random.Random(2), n_topics=10)
+    MinHashIndex(path).sync(entries)
+
+    calls = []
+    real = mh.minhash_signature
+    monkeypatch.setattr(mh, "minhash_signature", lambda *a: calls.append(1) or real(*a))
+    reopened = MinHashIndex(path)
+    assert len(reopened) == len(entries)
+    entries[0] = dict(entries[0], document="edited memory text about gates")
+    updated, removed = reopened.sync(entries[:-3])
+    assert (updated, removed) == (1, 3)
+    assert len(calls) == 1
+    assert len(MinHashIndex(path)) == len(entries) - 3
+
+
+def test_persistent_index_is_used_for_small_inputs(tmp_path):
+    index = MinHashIndex(str(tmp_path / "sigs.db"))
+    entries = [
+        {"id": "a1", "document": "gate router uses Q-learning to reorder gates by block probability"},
+        {"id": "a2", "document": "gate router Q-learning reorders gates by block probability"},
+        {"id": "a3", "document": "pytest fixtures and parametrize decorators"},
+    ]
+    merges = find_merge_candidates(entries, threshold=0.4, index=index)
+    assert [m.memory_ids for m in merges] == [["a1", "a2"]]
+    assert sorted(index.ids()) == ["a1", "a2", "a3"]
+    assert index.remove("a3") and "a3" not in index
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Tests for shared.reranker — cached, deadline-bounded rerank stage."""
+
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from shared.reranker import Reranker, RerankScoreCache, lexical_scores
+
+
+def _cands(*texts):
+    return [{"id": f"m{i}", "preview": t} for i, t in enumerate(texts)]
+
+
+class _Remote:
+    """Scores by passage length; records what was sent."""
+
+    def __init__(self, delay=None):
+        self.calls = []
+        self.delay = delay
+
+    def __call__(self, query, passages):
+        self.calls.append(list(passages))
+        if self.delay is not None:
+            self.delay.wait(5)
+        return [float(len(p)) for p in passages]
+
+
+class TestLexicalScores:
+    def test_matching_doc_ranks_first(self):
+        s = lexical_scores(
+            "gate timeout", ["unrelated text", "gate timeout fixed", "gate only"]
+        )
+        assert s[1] > s[2] > s[0] == 0.0
+
+    def test_proximity_breaks_ties(self):
+        near = "the gate timeout was raised in config"
+        far = "the gate was raised and later the timeout in config"
+        s = lexical_scores("gate timeout", [far, near])
+        assert s[1] > s[0]
+
+    def test_empty_query(self):
+        assert lexical_scores("", ["a", "b"]) == [0.0, 0.0]
+
+
+class TestReranker:
+    def test_remote_scores_are_cached(self):
+        remote = _Remote()
+        rr = Reranker(remote, deadline=1.0)
+        cands = _cands("a", "bbb", "cc")
+        out = rr.rerank("Query ", cands, rerank_k=3)
+        assert [c["id"] for c in out] == ["m1", "m2", "m0"]
+        assert out[0]["rerank_source"] == "remote"
+        rr.rerank("  query", _cands("a", "bbb", "cc"), rerank_k=3)
+        assert len(remote.calls) == 1
+        assert rr.stats()["hits"] == 3
+
+    def test_only_unseen_pairs_are_sent(self):
+        remote = _Remote()
+        rr = Reranker(remote, deadline=1.0)
+        rr.rerank("q", _cands("a", "bbb"), rerank_k=2)
+        cands = _cands("a", "bbb") + [{"id": "m9", "preview": "dddd"}]
+        rr.rerank("q", cands, rerank_k=3)
+        assert remote.calls[-1] == ["dddd"]
+
+    def test_edited_document_is_rescored(self):
+        remote = _Remote()
+        rr = Reranker(remote, deadline=1.0)
+        rr.rerank("q", _cands("a", "bb"), rerank_k=2)
+        rr.rerank("q", _cands("a", "bb edited"), rerank_k=2)
+        assert remote.calls[-1] == ["bb edited"]
+
+    def test_slow_remote_falls_back_then_fills_cache(self):
+        release = threading.Event()
+        remote = _Remote(delay=release)
+        rr = Reranker(remote, deadline=0.05)
+        cands = _cands("nothing here", "gate timeout fix")
+        out = rr.rerank("gate timeout", cands, rerank_k=2)
+        assert out[0]["id"] == "m1"
+        assert out[0]["rerank_source"] == "lexical"
+        release.set()
+        rr._executor.shutdown(wait=True)
+        rr._executor = None  # no new remote calls should be needed
+        out = rr.rerank("gate timeout", _cands("nothing here", "gate timeout fix"), 2)
+        assert out[0]["rerank_source"] == "remote"
+
+    def test_remote_error_falls_back(self):
+        def boom(query, passages):
+            raise RuntimeError("503")
+
+        rr = Reranker(boom, deadline=1.0)
+        out = rr.rerank("alpha", _cands("beta", "alpha beta"), rerank_k=2)
+        assert out[0]["id"] == "m1"
+        assert rr.stats()["fallbacks"] == 1
+
+    def test_tail_and_empty_passages(self):
+        rr = Reranker(_Remote(), deadline=1.0)
+        cands = _cands("zz", "", "yyy", "tail")
+        out = rr.rerank("q", cands, rerank_k=3)
+        assert [c["id"] for c in out] == ["m2", "m0", "m1", "m3"]
+
+
+def test_cache_lru_and_ttl():
+    cache = RerankScoreCache(max_entries=2, ttl_seconds=60)
+    cache.put_many({("q", "a", "r"): 1.0, ("q", "b", "r"): 2.0})
+    cache.put_many({("q", "c", "r"): 3.0})
+    assert cache.get(("q", "a", "r")) is None
+    assert cache.get(("q", "c", "r")) == 3.0
+    cache.ttl_seconds = -1
+    assert cache.get(("q", "c", "r")) is None
+
+
+def test_pipeline_uses_cached_reranker(monkeypatch):
+    from shared.search_pipeline import SearchPipeline
+
+    sp = SearchPipeline(
+        collection=None, config={"nim_rerank": True, "nim_api_key": "k"}, helpers={}
+    )
+    calls = []
+
+    def fake_scores(query, passages):
+        calls.append(passages)
+        return [float(len(p)) for p in passages]
+
+    monkeypatch.setattr(sp, "_nim_rerank_scores", fake_scores)
+    cands = _cands("a", "bbbb", "cc", "ddd")
+    out = sp._rerank_nim("q", cands, top_k=2)
+    assert [c["id"] for c in out] == ["m1", "m3", "m2", "m0"]
+    sp._rerank_nim("q", _cands("a", "bbbb", "cc", "ddd"), top_k=2)
+    assert len(calls) == 1
+    assert sp.cache_stats()["rerank"]["remote_calls"] == 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,173 @@
+"""Tests for shared.search_cache — LRU, selective invalidation, semantic level."""
+
+import os
+import sys
+
+HOOKS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if HOOKS_DIR not in sys.path:
+    sys.path.insert(0, HOOKS_DIR)
+
+from shared.search_cache import SearchCache, SemanticSearchCache
+
+
+def _result(*entries):
+    return {"results": [{"id": i, "tags": t} for i, t in entries]}
+
+
+class TestSearchCacheLRU:
+    def test_evicts_least_recently_used(self):
+        c = SearchCache(ttl_seconds=60, max_entries=3)
+        for k in ("a", "b", "c"):
+            c.put(k, k)
+        c.get("a")  # a becomes most recent
+        c.put("d", "d")
+        assert c.get("b") is None
+        assert c.get("a") == "a"
+        assert len(c) == 3
+        assert c.stats()["evictions"] == 1
+
+    def test_selective_invalidation_by_id(self):
+        c = SearchCache()
+        c.put("q1", _result(("m1", "type:fix")))
+        c.put("q2", _result(("m2", "type:fix")))
+        assert c.invalidate(ids=["m1"]) == 1
+        assert c.get("q1") is None
+        assert c.get("q2") is not None
+
+    def test_selective_invalidation_by_tag_ignores_broad_tags(self):
+        c = SearchCache()
+        c.put("q1", _result(("m1", "type:fix,project:torus")))
+        c.put("q2", _result(("m2", "type:learning,project:torus")))
+        assert c.invalidate(tags="project:torus,area:framework") == 0
+        assert c.invalidate(tags="type:learning,project:torus") == 1
+        assert c.get("q1") is not None
+        assert c.get("q2") is None
+
+    def test_no_args_clears_everything(self):
+        c = SearchCache()
+        c.put("q1", _result(("m1", "")))
+        c.invalidate()
+        assert len(c) == 0
+        # Index is cleared too — a stale id no longer maps anywhere
+        assert c.invalidate(ids=["m1"]) == 0
+
+
+class TestSemanticSearchCache:
+    def test_paraphrase_hits_within_threshold(self):
+        c = SemanticSearchCache(similarity_threshold=0.95)
+        c.put([1.0, 0.0, 0.0], "cached", scope="semantic|15")
+        assert c.get([0.99, 0.05, 0.0], scope="semantic|15") == "cached"
+        assert c.get([0.0, 1.0, 0.0], scope="semantic|15") is None
+        assert c.stats()["hits"] == 1
+        assert c.stats()["misses"] == 1
+
+    def test_scope_must_match(self):
+        c = SemanticSearchCache()
+        c.put([1.0, 0.0], "cached", scope="semantic|15")
+        assert c.get([1.0, 0.0], scope="semantic|5") is None
+
+    def test_lru_eviction_reuses_slots(self):
+        c = SemanticSearchCache(similarity_threshold=0.99, max_entries=2)
+        c.put([1.0, 0.0, 0.0], "x")
+        c.put([0.0, 1.0, 0.0], "y")
+        c.get([1.0, 0.0, 0.0])
+        c.put([0.0, 0.0, 1.0], "z")
+        assert len(c) == 2
+        assert c.get([0.0, 1.0, 0.0]) is None
+        assert c.get([1.0, 0.0, 0.0]) == "x"
+        assert c.get([0.0, 0.0, 1.0]) == "z"
+
+    def test_invalidate_by_vector_proximity(self):
+        c = SemanticSearchCache(invalidation_similarity=0.8)
+        c.put([1.0, 0.0], _result(("m1", "")))
+        c.put([0.0, 1.0], _result(("m2", "")))
+        assert c.invalidate(vector=[0.95, 0.1]) == 1
+        assert c.get([1.0, 0.0]) is None
+        assert c.get([0.0, 1.0]) is not None
+
+    def test_invalidate_by_id(self):
+        c = SemanticSearchCache()
+        c.put([1.0, 0.0], _result(("m1", "")))
+        assert c.invalidate(ids=["m1"]) == 1
+        assert len(c) == 0
+
+    def test_zero_vector_is_ignored(self):
+        c = SemanticSearchCache()
+        c.put([0.0, 0.0], "x")
+        assert len(c) == 0
+        assert c.get([0.0, 0.0]) is None
+
+
+class _FakeCollection:
+    def __init__(self):
+        self.queries = 0
+
+    def count(self):
+        return 3
+
+    def query(self, **kwargs):
+        self.queries += 1
+        return {
+            "ids": [["m1"]],
+            "metadatas": [[{"tags": "type:fix"}]],
+            "distances": [[0.1]],
+        }
+
+    def tag_search(self, *a, **kw):
+        return []
+
+
+def _format(results):
+    return [
+        {"id": i, "tags": m.get("tags", ""), "relevance": 1 - d}
+        for i, m, d in zip(
+            results["ids"][0], results["metadatas"][0], results["distances"][0]
+        )
+    ]
+
+
+def test_pipeline_semantic_hit_skips_retrieval():
+    from shared.search_pipeline import SearchPipeline
+
+    vectors = {
+        "how do gates get reordered": [1.0, 0.0, 0.0],
+        "gate reordering mechanism": [0.98, 0.1, 0.0],
+    }
+    coll = _FakeCollection()
+    sp = SearchPipeline(
+        collection=coll,
+        config={},
+        helpers={
+            "format_summaries": _format,
+            "embed_text": lambda text: vectors.get(text, [0.0, 0.0, 1.0]),
+        },
+    )
+    first = sp.search("how do gates get reordered", mode="semantic")
+    assert coll.queries == 1
+    second = sp.search("gate reordering mechanism", mode="semantic")
+    assert coll.queries == 1
+    assert second is first
+    assert sp.cache_stats()["semantic"]["hits"] == 1
+
+    sp.invalidate_cache(ids=["m1"])
+    sp.search("gate reordering mechanism", mode="semantic")
+    assert coll.queries == 2
+
+
+def test_pipeline_embeds_once_per_miss_with_hyde():
+    from shared.search_pipeline import SearchPipeline
+
+    embedded = []
+    coll = _FakeCollection()
+    sp = SearchPipeline(
+        collection=coll,
+        config={"hyde": True},
+        helpers={
+            "format_summaries": _format,
+            "embed_text": lambda text: embedded.append(text) or [1.0, 0.0, 0.0],
+        },
+    )
+    sp._hyde_generate = lambda query: "a hypothetical answer"
+    sp.search("how do gates get reordered", mode="semantic")
+    assert embedded == ["a hypothetical answer"]
+    assert coll.queries == 1
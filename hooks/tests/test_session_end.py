@@ -20,7 +20,7 @@ import boot_pkg.util as _util
 _orig_load = _util.load_project_state
 _util.load_project_state = _mock_load_project_state
 
-from session_end import append_wiki_log
+from session_end import _fetch_consolidation_entries, append_wiki_log
 
 # Restore after import
 _util.load_project_state = _orig_load
@@ -164,6 +164,59 @@ def test_no_wiki_skips_silently():
     print("PASS: missing wiki skips silently")
 
 
+def _paged_store(n, calls):
+    """socket get() over n memories that records each (limit, offset)."""
+    ids = ["m%d" % i for i in range(n)]
+
+    def get(collection, limit=None, offset=0, include=None):
+        calls.append((limit, offset))
+        page = ids[offset : offset + limit]
+        return {
+            "ids": page,
+            "documents": ["doc " + i for i in page],
+            "metadatas": [{"tags": i} for i in page],
+        }
+
+    return get
+
+
+def test_consolidation_entries_are_fetched_in_pages():
+    """The knowledge store is read one bounded page per socket request."""
+    calls = []
+    entries = _fetch_consolidation_entries(_paged_store(2500, calls), page_size=1000)
+    assert calls == [(1000, 0), (1000, 1000), (1000, 2000)]
+    assert [e["id"] for e in entries] == ["m%d" % i for i in range(2500)]
+    assert entries[7] == {"tags": "m7", "id": "m7", "document": "doc m7"}
+
+    calls = []
+    entries = _fetch_consolidation_entries(
+        _paged_store(2500, calls), limit=1500, page_size=1000
+    )
+    assert calls == [(1000, 0), (500, 1000)] and len(entries) == 1500
+
+    calls = []
+    assert _fetch_consolidation_entries(_paged_store(2000, calls), page_size=1000)
+    assert calls == [(1000, 0), (1000, 1000), (1000, 2000)]
+    print("PASS: consolidation entries fetched in pages")
+
+
+def test_consolidation_fetch_failure_is_not_partial():
+    """A failed page raises instead of returning part of the store."""
+
+    def get(collection, limit=None, offset=0, include=None):
+        if offset:
+            raise RuntimeError("Response exceeded limit")
+        return {"ids": ["a"] * limit, "documents": [""] * limit}
+
+    try:
+        _fetch_consolidation_entries(get, page_size=10)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("partial store returned")
+    print("PASS: failed consolidation page raises")
+
+
 if __name__ == "__main__":
     failed = 0
     for name, fn in list(globals().items()):
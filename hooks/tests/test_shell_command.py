@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Tests for the shared shell-command parser and the gates built on it."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import shared.shell_command as sc
+from gates.gate_02_no_destroy import _strip_data_args
+from gates.gate_02_no_destroy import check as g02_check
+from gates.gate_03_test_before_deploy import check as g03_check
+from shared.shell_command import parse_command
+
+
+def _shape(command):
+    return [(c.depth, c.program, c.argv) for c in parse_command(command).commands]
+
+
+def test_lists_pipelines_and_substitutions_are_split():
+    parsed = parse_command("a -x | b && (cd sub; make) || echo \"$(rm -rf /d)\" `id`")
+    assert _shape(parsed.source) == [
+        (0, "a", ("a", "-x")),
+        (0, "b", ("b",)),
+        (1, "cd", ("cd", "sub")),
+        (1, "make", ("make",)),
+        (0, "echo", ("echo", "$(rm -rf /d)", "`id`")),
+        (1, "rm", ("rm", "-rf", "/d")),
+        (1, "id", ("id",)),
+    ]
+    first, second = parsed.commands[:2]
+    assert first.pipeline == second.pipeline and first.operator == "|"
+    assert parsed.substitutions == ("rm -rf /d", "id")
+    assert parsed.ok
+
+
+def test_redirects_heredocs_and_here_strings():
+    parsed = parse_command("cat <<-'EOF' > out.txt 2>&1\n\tline one\n\tEOF\nwc -w <<< \"a b\"")
+    cat, wc = parsed.commands
+    assert [(r.op, r.fd, r.target) for r in cat.redirects] == [
+        ("<<-", "", "EOF"),
+        (">", "", "out.txt"),
+        (">&", "2", "1"),
+    ]
+    assert cat.redirects[0].body == "\tline one"
+    assert wc.argv == ("wc", "-w") and wc.redirects[0].body == "a b"
+
+
+def test_program_skips_assignments_keywords_and_wrappers():
+    assert parse_command("A=1 B=2 sudo -u root nice -n 5 /usr/bin/rm x").commands[0].program == "rm"
+    assert parse_command("if true; then exit; fi").commands[1].program == "exit"
+    assert parse_command("X=$(date)").commands[0].program == ""
+
+
+def test_shell_payloads_are_parsed_as_nested_commands():
+    assert (1, "rm", ("rm", "-rf", "/")) in _shape("bash -lc 'cd / && rm -rf /'")
+    assert (2, "git", ("git", "push", "-f")) in _shape("sh -c \"bash -c 'git push -f'\"")
+    assert (1, "shred", ("shred", "x")) in _shape("eval shred x")
+
+
+def test_unterminated_quote_is_flagged_not_raised():
+    parsed = parse_command("echo 'oops")
+    assert not parsed.ok
+    assert parsed.commands[0].argv == ("echo", "oops")
+    assert parse_command(None).commands == ()
+
+
+def test_parse_is_memoized_per_command():
+    sc.parse_command.cache_clear()
+    cmd = "git status && rm -r -f build"
+    assert parse_command(cmd) is parse_command(cmd)
+    assert sc.parse_command.cache_info().misses == 1
+    # Every gate helper on the same tool call hits the cache
+    g02_check("Bash", {"command": cmd}, {})
+    g03_check("Bash", {"command": cmd}, {})
+    assert sc.parse_command.cache_info().misses == 1
+
+
+@pytest.mark.parametrize(
+    "cmd",
+    [
+        'echo "$(rm -rf /)"',
+        "git commit -m \"note `rm -rf ~`\"",
+        "git push -uf origin main",
+        "sudo git push -fu origin main",
+        "rm -R build -f",
+        "exec python3 app.py; exec bash -c 'id'",
+    ],
+)
+def test_gate_02_blocks_via_structured_fields(cmd):
+    assert g02_check("Bash", {"command": cmd}, {}).blocked
+
+
+@pytest.mark.parametrize(
+    "cmd",
+    [
+        'git commit -m "drop the exec wrapper; use source" && git log -1',
+        "rm -r build; ls -f",
+        "cat <<EOF > notes.txt\nplain text\nEOF",
+        'echo "a | b" | grep -c "a"',
+    ],
+)
+def test_gate_02_allows_data_and_separate_commands(cmd):
+    assert not g02_check("Bash", {"command": cmd}, {}).blocked
+
+
+@pytest.mark.parametrize(
+    "cmd",
+    [
+        'x="rm -rf /"; $x',
+        'c="git reset --hard"; $c',
+        'c="git clean -fdx"; $c',
+        'export C="rm -rf /"; $C',
+        'readonly c="rm -rf ~"; ${c}',
+        'declare c="rm -rf /"; "$c"',
+        'c="git push --force"; $c origin main',
+        'c="dd if=/dev/zero of=/dev/sda"; $c',
+        'x="DROP TABLE t"; $x',
+    ],
+)
+def test_gate_02_blocks_commands_stored_in_variables(cmd):
+    assert g02_check("Bash", {"command": cmd}, {}).blocked
+
+
+@pytest.mark.parametrize(
+    "cmd",
+    [
+        'git -c alias.x="!git reset --hard" x',
+        'git config alias.nuke "!git reset --hard"',
+        'awk "BEGIN{system(\\"git reset --hard\\")}"',
+        'xargs sh -c "rm -rf /"',
+        'echo x | xargs "rm -rf /tmp/a"',
+        'git bisect run sh -c "git reset --hard"',
+        'git bisect run "git reset --hard"',
+        'git rebase -x "git reset --hard" main',
+        'find . -name "a b" -exec sh -c "rm -rf /" \\;',
+        'timeout 5 sh -c "rm -rf /"',
+        'echo "$(rm -rf /) done"',
+    ],
+)
+def test_gate_02_blocks_args_that_get_executed(cmd):
+    assert g02_check("Bash", {"command": cmd}, {}).blocked
+
+
+def test_strip_keeps_substitutions_but_drops_their_data():
+    cmd = 'echo "$(date) rm -rf run" >> log'
+    assert _strip_data_args(cmd) == "echo __DATA__ $(date) >> log"
+    assert not g02_check("Bash", {"command": cmd}, {}).blocked
+    assert _strip_data_args('find . -name "a b" -exec rm {} \\;') == "find . -name __DATA__ -exec rm {} \\;"
+
+
+def test_strip_keeps_assignments_and_declarations():
+    for cmd in (
+        'x="rm -rf /"',
+        'export C="rm -rf /"',
+        'local -r c="git reset --hard"',
+        'make CMD="rm -rf /"',
+        'sudo "$c" --now',
+    ):
+        assert _strip_data_args(cmd) == cmd
+    assert _strip_data_args('FOO="a b" git commit -m "rm -rf /"') == 'FOO="a b" git commit -m __DATA__'
+
+
+def test_strip_leaves_pipelines_feeding_a_shell_untouched():
+    assert _strip_data_args("echo 'rm -rf /' | bash") == "echo 'rm -rf /' | bash"
+    assert _strip_data_args('git commit -m "a; b" && echo ok') == "git commit -m __DATA__ && echo ok"
+
+
+def test_gate_03_skips_commands_without_deploy_words():
+    stale = {"last_test_run": 0}
+    assert not g03_check("Bash", {"command": "ls -la && pytest -q # docker push later"}, stale).blocked
+    assert g03_check("Bash", {"command": "cd app && sudo docker push img:1"}, stale).blocked
+    assert g03_check("Bash", {"command": "bash -c 'terraform apply'"}, stale).blocked
+    assert g03_check("Bash", {"command": "python -m twine upload dist/*"}, stale).blocked
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Tests for the incremental, persistent skill search index."""
+
+import os
+import random
+import sqlite3
+import sys
+
+import numpy as np
+import pytest
+from rank_bm25 import BM25Okapi
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import shared.skill_search as ss
+from shared.skill_search import BM25Index, EmbeddingIndex, HybridSearch, tokenize
+
+_WORDS = "git commit test review deploy memory search gate skill debug plan code".split()
+
+
+def _corpus(rng, n):
+    return {
+        f"skill{i}": " ".join(rng.choice(_WORDS) for _ in range(rng.randint(3, 12)))
+        for i in range(n)
+    }
+
+
+def _reference(corpus, query):
+    names = list(corpus)
+    bm = BM25Okapi([tokenize(corpus[n]) for n in names])
+    scores = bm.get_scores(tokenize(query))
+    return {n: s for n, s in zip(names, scores) if s > 0}
+
+
+def test_scores_match_bm25okapi_after_updates_and_removes():
+    rng = random.Random(3)
+    corpus = _corpus(rng, 40)
+    index = BM25Index()
+    for name, text in corpus.items():
+        index.add(name, text)
+    for name in list(corpus)[:5]:
+        index.remove(name)
+        del corpus[name]
+    for name in list(corpus)[5:10]:
+        corpus[name] = "deploy debug plan " + corpus[name]
+        index.add(name, corpus[name])
+    corpus["late"] = "memory gate"
+    index.add("late", corpus["late"])
+
+    for query in ("git commit", "memory gate debug", "plan code review deploy"):
+        got = dict(index.search(query, top_k=100))
+        want = _reference(corpus, query)
+        assert got.keys() == want.keys()
+        for name in want:
+            assert got[name] == pytest.approx(want[name])
+
+
+def test_unchanged_text_is_not_reindexed():
+    index = BM25Index()
+    assert index.add("a", "git commit")
+    assert not index.add("a", "git commit")
+    assert index.add("a", "git push")
+    assert index.search("commit") == []
+
+
+def test_index_survives_restart(tmp_path):
+    path = str(tmp_path / "skills.db")
+    index = BM25Index(path)
+    index.add("commit", "Quick git commit with message")
+    index.add("test", "Run and debug tests")
+    index.add("plan", "Write an implementation plan")
+    index.add("gone", "temporary skill")
+    index.remove("gone")
+
+    reopened = BM25Index(path)
+    assert sorted(reopened.names()) == ["commit", "plan", "test"]
+    assert reopened.search("git commit")[0][0] == "commit"
+    assert not reopened.add("test", "Run and debug tests")
+
+
+def test_tokenize_keeps_non_ascii_words():
+    assert tokenize("Déploiement café naïve 部署 kubernetes") == [
+        "déploiement",
+        "café",
+        "naïve",
+        "部署",
+        "kubernetes",
+    ]
+    assert tokenize("wrap-up snake_case, end.") == ["wrap-up", "snake_case", "end"]
+    index = BM25Index()
+    index.add("deploy", "Déploiement en production")
+    index.add("cafe", "café au lait")
+    index.add("commit", "git commit")
+    assert index.search("déploiement")[0][0] == "deploy"
+    assert index.search("ploiement") == []
+
+
+def test_postings_from_older_tokenizer_are_rebuilt(tmp_path):
+    path = str(tmp_path / "skills.db")
+    index = BM25Index(path)
+    index.add("deploy", "Déploiement en production")
+    index.add("commit", "git commit")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+    reopened = BM25Index(path)
+    assert reopened.names() == []
+    assert reopened.add("deploy", "Déploiement en production")
+    reopened.add("commit", "git commit")
+    reopened.add("plan", "plan work")
+    assert BM25Index(path).search("déploiement")[0][0] == "deploy"
+
+
+def test_embeddings_are_cached_by_content_hash(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_embed(texts):
+        calls.append(list(texts))
+        return [np.array([len(t), 1.0, 0.0], dtype=np.float32) for t in texts]
+
+    monkeypatch.setattr(ss, "_nim_embed", fake_embed)
+    path = str(tmp_path / "skills.db")
+    emb = EmbeddingIndex(path)
+    emb.add("a", "alpha")
+    emb.add("b", "beta text")
+    assert len(emb.search("q")) == 2
+    assert sorted(calls[0]) == ["alpha", "beta text"]
+
+    calls.clear()
+    fresh = EmbeddingIndex(path)
+    fresh.add("a", "alpha")
+    fresh.add("b", "beta text")
+    fresh.add("c", "gamma")
+    fresh.search("q")
+    # Only the new skill and the query go to the API
+    assert calls == [["gamma"], ["q"]]
+
+
+def test_hybrid_sync_adds_updates_and_removes(tmp_path):
+    search = HybridSearch(index_path=str(tmp_path / "skills.db"))
+    search.sync(
+        {"commit": "git commit", "deploy": "ship to production", "plan": "plan work"}
+    )
+    search.sync(
+        {"commit": "git commit", "review": "code review diffs", "plan": "plan work"}
+    )
+    assert sorted(search.bm25.names()) == ["commit", "plan", "review"]
+    assert search.search("production") == []
+    assert search.search("review")[0][0] == "review"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Tests for the statusline render cache (transcript offsets, mtime counts)."""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import statusline as sl
+
+
+@pytest.fixture(autouse=True)
+def cache_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "render-cache.json")
+    monkeypatch.setattr(sl, "RENDER_CACHE_FILE", path)
+    monkeypatch.setattr(sl, "_render_cache", None)
+    monkeypatch.setattr(sl, "_render_cache_dirty", False)
+    return path
+
+
+def _line(inp, out):
+    return json.dumps({"message": {"usage": {"input_tokens": inp, "output_tokens": out}}}) + "\n"
+
+
+def _new_render():
+    """Persist the cache and drop in-process state, as between two renders."""
+    sl.save_render_cache()
+    sl._render_cache = None
+
+
+def _state(path):
+    return {"active_subagents": [{"agent_type": "builder", "transcript_path": path}]}
+
+
+def test_only_appended_lines_are_parsed(tmp_path, monkeypatch):
+    tp = str(tmp_path / "t.jsonl")
+    with open(tp, "w") as f:
+        f.write(_line(10, 5) * 3)
+    assert sl.get_subagent_status(_state(tp)) == ([("builder", 45)], 0)
+    _new_render()
+
+    with open(tp, "a") as f:
+        f.write(_line(1, 1))
+    sl._get_render_cache()
+    parsed = []
+    real_loads = json.loads
+    monkeypatch.setattr(
+        sl.json, "loads", lambda s, **kw: parsed.append(s) or real_loads(s, **kw)
+    )
+    assert sl.get_subagent_status(_state(tp)) == ([("builder", 47)], 0)
+    assert len(parsed) == 1
+
+
+def test_partial_trailing_line_waits_for_next_render(tmp_path):
+    tp = str(tmp_path / "t.jsonl")
+    full = _line(7, 3)
+    with open(tp, "w") as f:
+        f.write(full + full[:15])
+    assert sl.get_subagent_status(_state(tp))[0] == [("builder", 10)]
+    _new_render()
+    with open(tp, "a") as f:
+        f.write(full[15:])
+    assert sl.get_subagent_status(_state(tp))[0] == [("builder", 20)]
+
+
+def test_truncated_transcript_is_recounted(tmp_path):
+    tp = str(tmp_path / "t.jsonl")
+    with open(tp, "w") as f:
+        f.write(_line(100, 100) * 5)
+    sl.get_subagent_status(_state(tp))
+    with open(tp, "w") as f:
+        f.write(_line(1, 2))
+    assert sl.get_subagent_status(_state(tp))[0] == [("builder", 3)]
+
+
+def test_finished_subagents_are_forgotten(tmp_path):
+    tp = str(tmp_path / "t.jsonl")
+    with open(tp, "w") as f:
+        f.write(_line(1, 1))
+    sl.get_subagent_status(_state(tp))
+    assert tp in sl._get_render_cache()["transcripts"]
+    sl.get_subagent_status({})
+    assert sl._get_render_cache()["transcripts"] == {}
+
+
+def test_counts_recompute_only_on_mtime_change(tmp_path, monkeypatch):
+    settings = tmp_path / "settings.json"
+    settings.write_text(json.dumps({"hooks": {"A": [], "B": []}}))
+    monkeypatch.setattr(sl, "SETTINGS_FILE", str(settings))
+    assert sl.count_hook_events() == 2
+    _new_render()
+
+    calls = []
+    real = sl._count_hook_events_uncached
+    monkeypatch.setattr(sl, "_count_hook_events_uncached", lambda: calls.append(1) or real())
+    assert sl.count_hook_events() == 2
+    assert calls == []
+
+    settings.write_text(json.dumps({"hooks": {"A": [], "B": [], "C": []}}))
+    os.utime(settings, ns=(0, os.stat(settings).st_mtime_ns + 10**9))
+    assert sl.count_hook_events() == 3
+    assert calls == [1]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Tests for shared.telegram_search — in-process Telegram L3 FTS search."""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import shared.telegram_search as tg
+from shared.telegram_search import TelegramHit, TelegramSearcher, fts_query
+
+
+def _make_db(path, messages):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS tg_fts USING fts5("
+        "text, date, sender UNINDEXED, chat_id UNINDEXED, msg_id UNINDEXED)"
+    )
+    conn.executemany(
+        "INSERT INTO tg_fts (text, date, sender, chat_id, msg_id) VALUES (?, ?, ?, ?, ?)",
+        [(t, f"2026-01-0{i + 1}T10:00:00", "user", 1, f"m{i}") for i, t in enumerate(messages)],
+    )
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def db_path():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "msg_log.db")
+        _make_db(
+            path,
+            [
+                "surrealdb connection refused on port 8822",
+                "gate ordering discussion",
+                "surrealdb backup finished",
+            ],
+        )
+        yield path
+
+
+def test_fts_query_quotes_terms():
+    assert fts_query('fix "gate-17": NEAR') == '"fix" "gate" "17" "NEAR"'
+    assert fts_query("  ") == ""
+
+
+def test_search_returns_typed_rows(db_path):
+    searcher = TelegramSearcher(db_path)
+    hits = searcher.search("surrealdb connection", limit=5)
+    assert len(hits) == 1
+    hit = hits[0]
+    assert isinstance(hit, TelegramHit)
+    assert hit.msg_id == "m0" and hit.sender == "user" and hit.chat_id == 1
+    assert hit.bm25 < 0
+    assert len(searcher.search("surrealdb", limit=5)) == 2
+    assert searcher.search("surrealdb", limit=1)[0].msg_id in ("m0", "m2")
+
+
+def test_fts_syntax_in_query_does_not_fail(db_path):
+    searcher = TelegramSearcher(db_path)
+    assert searcher.search('"gate ordering', limit=5)[0].msg_id == "m1"
+
+
+def test_connections_are_pooled_and_read_only(db_path):
+    searcher = TelegramSearcher(db_path, pool_size=1)
+    searcher.search("gate")
+    searcher.search("gate")
+    assert searcher._opened == 1
+    conn = searcher._acquire()
+    with pytest.raises(sqlite3.Error):
+        conn.execute("DELETE FROM tg_fts")
+    searcher._release(conn, searcher._ino)
+
+
+def test_deadline_and_cancel_stop_search(db_path):
+    searcher = TelegramSearcher(db_path)
+    assert searcher.search("surrealdb", timeout=-1) == []
+    cancel = threading.Event()
+    cancel.set()
+    assert searcher.search("surrealdb", cancel=cancel) == []
+    # Interrupted searches hand their connection back to the pool
+    assert len(searcher.search("surrealdb")) == 2
+
+
+def test_replaced_file_reopens_pool(db_path):
+    searcher = TelegramSearcher(db_path)
+    assert searcher.search("backup")
+    tmp = db_path + ".new"
+    _make_db(tmp, ["fresh backup schedule", "another backup"])
+    os.replace(tmp, db_path)
+    assert {h.msg_id for h in searcher.search("backup")} == {"m0", "m1"}
+
+
+def test_missing_database(tmp_path):
+    assert tg.get_searcher(str(tmp_path / "absent.db")) is None
+    assert TelegramSearcher(str(tmp_path / "absent.db")).search("x") == []
+
+
+def test_pipeline_cascade_uses_in_process_search(db_path, monkeypatch):
+    from shared.search_pipeline import SearchPipeline
+
+    monkeypatch.setattr(tg, "get_searcher", lambda: TelegramSearcher(db_path))
+    sp = SearchPipeline(collection=None, config={}, helpers={})
+    formatted = [{"id": "k1", "relevance": 0.1}]
+    added = sp._cascade_telegram_l3(formatted, "surrealdb connection", {})
+    assert added == 1
+    assert formatted[-1]["id"] == "tg_m0"
+    assert formatted[-1]["source"] == "telegram_l3"
+    assert 0 < formatted[-1]["relevance"] <= 1.0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
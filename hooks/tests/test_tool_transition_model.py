@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""Tests for incremental tool_patterns caches and the streaming TransitionModel."""
+
+import json
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import shared.tool_patterns as tp
+from shared.tool_patterns import TransitionModel
+
+
+def _entry(tool, ts, session="s1"):
+    return {"metadata": {"tool_name": tool, "session_id": session, "session_time": ts}}
+
+
+def _append(path, entries):
+    with open(path, "a") as fh:
+        for e in entries:
+            fh.write(json.dumps(e) + "\n")
+    # Force an mtime change even within the filesystem's timestamp granularity
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    tp._invalidate_cache()
+    yield
+    tp._invalidate_cache()
+
+
+def _plain(chain):
+    return (
+        {k: dict(v) for k, v in chain.transitions.items() if v},
+        dict(chain.start_counts),
+        chain.sequence_count,
+        chain.vocabulary,
+    )
+
+
+def test_appends_are_folded_in_without_reload(tmp_path, monkeypatch):
+    q = str(tmp_path / "queue.jsonl")
+    rng = random.Random(5)
+    ts = 1000.0
+    tools = ["Read", "Edit", "Bash", "Grep", "UserPrompt"]
+
+    def batch(n):
+        nonlocal ts
+        out = []
+        for _ in range(n):
+            ts += rng.choice([2, 10, 400])
+            out.append(_entry(rng.choice(tools), ts, rng.choice(["a", "a", "b"])))
+        return out
+
+    _append(q, batch(30))
+    tp._get_chain(q)
+    reloads = []
+    real = tp._full_reload
+    monkeypatch.setattr(tp, "_full_reload", lambda p: reloads.append(p) or real(p))
+    for _ in range(10):
+        _append(q, batch(rng.randint(1, 15)))
+        chain = tp._get_chain(q)
+        reference = tp.load_sequences(q)
+        assert tp._get_sequences(q) == reference
+        assert _plain(chain) == _plain(tp.build_markov_chain(reference))
+    assert reloads == []
+
+
+def test_out_of_order_append_falls_back_to_full_reload(tmp_path):
+    q = str(tmp_path / "queue.jsonl")
+    _append(q, [_entry("Read", 100), _entry("Edit", 101), _entry("Bash", 102)])
+    tp._get_chain(q)
+    _append(q, [_entry("Grep", 50), _entry("Read", 51)])
+    assert tp._get_sequences(q) == tp.load_sequences(q)
+    assert tp._get_sequences(q)[0][:2] == ["Grep", "Read"]
+
+
+def test_most_likely_next_uses_longest_supported_context():
+    model = TransitionModel(order=2)
+    ts = 1000.0
+    for _ in range(5):
+        for tool in ("Grep", "Read", "Edit"):
+            ts += 1
+            model.observe(tool, "s", ts)
+        ts += 400  # session gap
+        for tool in ("Bash", "Read", "Write"):
+            ts += 1
+            model.observe(tool, "s", ts)
+        ts += 400
+    assert model.most_likely_next(["Grep", "Read"], now=ts)[0] == "Edit"
+    assert model.most_likely_next(["Bash", "Read"], now=ts)[0] == "Write"
+    tool, prob = model.most_likely_next(["Grep", "Read"], now=ts)
+    assert prob == pytest.approx(1.0)
+    # Unknown context backs off to overall tool frequency
+    assert model.most_likely_next(["Unknown"], now=ts)[0] == "Read"
+
+
+def test_counts_decay_with_half_life():
+    model = TransitionModel(order=1, half_life_hours=1.0)
+    model.observe("Read", "s", 0.0)
+    model.observe("Edit", "s", 1.0)
+    assert model.count(("Read",), "Edit", now=1.0) == pytest.approx(1.0, rel=1e-3)
+    assert model.count(("Read",), "Edit", now=3601.0) == pytest.approx(0.5, rel=1e-3)
+
+
+def test_recent_behaviour_overtakes_old_habits():
+    model = TransitionModel(order=1, half_life_hours=1.0)
+    ts = 0.0
+    for _ in range(4):
+        model.observe("Read", "old", ts)
+        model.observe("Edit", "old", ts + 1)
+        ts += 2
+    ts += 10 * 3600
+    for _ in range(2):
+        model.observe("Read", "new", ts)
+        model.observe("Write", "new", ts + 1)
+        ts += 2
+    assert model.most_likely_next(["Read"], now=ts)[0] == "Write"
+
+
+def test_snapshot_restore_and_incremental_ingest(tmp_path):
+    q = str(tmp_path / "queue.jsonl")
+    snap = str(tmp_path / "model.json")
+    _append(q, [_entry("Read", 1), _entry("Edit", 2), _entry("Bash", 3)])
+    model = TransitionModel()
+    assert model.ingest(q) == 3
+    assert model.ingest(q) == 0
+    assert model.snapshot(snap)
+
+    restored = TransitionModel.restore(snap)
+    assert restored.events == 3
+    assert restored.count(("Read",), "Edit", now=2) == pytest.approx(1.0)
+    _append(q, [_entry("Read", 4), _entry("Edit", 5)])
+    assert restored.ingest(q) == 2
+    assert restored.count(("Edit", "Bash", "Read"), "Edit", now=5) == pytest.approx(1.0)
+
+
+def _rewrite(path, entries):
+    """Replace the queue the way tracker_pkg.auto_remember._cap_queue_file does."""
+    with open(path + ".tmp", "w") as fh:
+        for e in entries:
+            fh.write(json.dumps(e) + "\n")
+    os.replace(path + ".tmp", path)
+
+
+def test_capped_queue_is_not_counted_twice(tmp_path):
+    q = str(tmp_path / "queue.jsonl")
+    entries = [_entry(("Read", "Edit", "Bash")[i % 3], 100 + i) for i in range(12)]
+    _append(q, entries)
+    model = TransitionModel()
+    assert model.ingest(q) == 12
+    before = model.count(("Bash",), "Read", now=111)
+
+    _rewrite(q, entries[-8:])
+    assert model.ingest(q) == 0
+    assert model.events == 12
+    assert model.count(("Bash",), "Read", now=111) == pytest.approx(before)
+
+    # Lines appended before the cap ran but not yet ingested still count
+    late = [_entry("Grep", 112), _entry("Read", 113)]
+    _rewrite(q, entries[-8:] + late)
+    _append(q, [_entry("Edit", 114)])
+    assert model.ingest(q) == 3
+    assert model.events == 15
+
+
+def test_in_place_rewrite_is_detected_by_leading_bytes(tmp_path):
+    q = str(tmp_path / "queue.jsonl")
+    _append(q, [_entry("Read", 1), _entry("Edit", 2)])
+    model = TransitionModel()
+    assert model.ingest(q) == 2
+    with open(q, "w") as fh:  # same inode, no shorter than the old offset
+        for e in [_entry("Edit", 2), _entry("Bash", 3), _entry("Grep", 4)]:
+            fh.write(json.dumps(e) + "\n")
+    assert model.ingest(q) == 2
+    assert model.count(("Read", "Edit"), "Bash", now=3) == pytest.approx(1.0)
+
+
+def test_snapshot_copies_state_under_lock(tmp_path, monkeypatch):
+    model = TransitionModel()
+    model.observe("Read", "s", 1.0)
+    real_dump = tp.json.dump
+
+    def dump_while_observing(data, fh):
+        model.observe("Edit", "s", 2.0)  # mutates rows after the copy was taken
+        model.observe("Bash", "other", 3.0)
+        real_dump(data, fh)
+
+    monkeypatch.setattr(tp.json, "dump", dump_while_observing)
+    snap = str(tmp_path / "model.json")
+    assert model.snapshot(snap)
+    monkeypatch.setattr(tp.json, "dump", real_dump)
+    restored = TransitionModel.restore(snap)
+    assert restored.events == 1
+    assert restored.count((), "Edit", now=2.0) == 0.0
+
+
+def test_restore_of_pre_fingerprint_offsets(tmp_path):
+    q = str(tmp_path / "queue.jsonl")
+    snap = str(tmp_path / "model.json")
+    entries = [_entry("Read", 1), _entry("Edit", 2), _entry("Bash", 3)]
+    _append(q, entries)
+    model = TransitionModel()
+    model.ingest(q)
+    model.snapshot(snap)
+    with open(snap) as fh:
+        data = json.load(fh)
+    data["offsets"] = {p: cursor[:2] for p, cursor in data["offsets"].items()}
+    with open(snap, "w") as fh:
+        json.dump(data, fh)
+
+    restored = TransitionModel.restore(snap)
+    _rewrite(q, entries[1:] + [_entry("Grep", 4)])
+    assert restored.ingest(q) == 1
+    assert restored.events == 4
+
+
+def test_restore_of_corrupt_snapshot_starts_fresh(tmp_path):
+    snap = tmp_path / "model.json"
+    snap.write_text("{not json")
+    assert TransitionModel.restore(str(snap)).events == 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
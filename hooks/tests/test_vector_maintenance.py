@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Tests for shared.vector_maintenance — blocked local KNN dedup/clustering."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from shared.vector_maintenance import (
+    find_clusters,
+    find_duplicate_pairs,
+    load_embedding_matrix,
+    nearest_neighbors,
+)
+
+
+class _FakeCollection:
+    """Minimal stand-in for SurrealCollection.get() paging."""
+
+    def __init__(self, ids, vectors):
+        self.ids = ids
+        self.vectors = vectors
+        self.calls = 0
+
+    def get(self, limit=None, offset=0, include=None, **_kw):
+        self.calls += 1
+        sl = slice(offset, offset + limit)
+        return {"ids": self.ids[sl], "embeddings": self.vectors[sl]}
+
+
+def _unit(vec):
+    v = np.asarray(vec, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+class TestLoadEmbeddingMatrix:
+    def test_pages_and_normalizes(self):
+        coll = _FakeCollection(
+            [f"m{i}" for i in range(7)], [[float(i + 1), 0.0, 1.0] for i in range(7)]
+        )
+        ids, mat = load_embedding_matrix(coll, chunk_size=3, dtype=np.float32)
+        assert ids == [f"m{i}" for i in range(7)]
+        assert mat.shape == (7, 3)
+        assert np.allclose(np.linalg.norm(mat, axis=1), 1.0, atol=1e-5)
+        assert coll.calls == 3
+
+    def test_skips_missing_and_wrong_dim(self):
+        coll = _FakeCollection(["a", "b", "c"], [[1.0, 0.0], [], [1.0, 0.0, 0.0]])
+        ids, mat = load_embedding_matrix(coll)
+        assert ids == ["a"]
+        assert mat.dtype == np.float16
+
+    def test_empty_collection(self):
+        ids, mat = load_embedding_matrix(_FakeCollection([], []))
+        assert ids == []
+        assert mat.shape[0] == 0
+
+
+class TestNearestNeighbors:
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        mat = rng.standard_normal((50, 16)).astype(np.float32)
+        mat /= np.linalg.norm(mat, axis=1, keepdims=True)
+        sims = mat @ mat.T
+        np.fill_diagonal(sims, -np.inf)
+        for i, nbrs, dists in nearest_neighbors(mat, k=3, block_size=7):
+            expected = np.argsort(-sims[i])[:3]
+            assert list(nbrs) == list(expected)
+            assert np.allclose(dists, 1.0 - sims[i][expected], atol=1e-5)
+
+    def test_float16_blocks_match_float32(self):
+        rng = np.random.default_rng(1)
+        mat = rng.standard_normal((40, 8)).astype(np.float32)
+        mat /= np.linalg.norm(mat, axis=1, keepdims=True)
+        half = mat.astype(np.float16)
+        expected = list(nearest_neighbors(half.astype(np.float32), k=2, block_size=40))
+        got = list(nearest_neighbors(half, k=2, block_size=6))
+        assert [(i, list(n)) for i, n, _ in got] == [(i, list(n)) for i, n, _ in expected]
+        for (_, _, d1), (_, _, d2) in zip(got, expected):
+            assert np.allclose(d1, d2, atol=1e-6)
+
+    def test_never_returns_self(self):
+        mat = np.eye(4, dtype=np.float32)
+        for i, nbrs, _ in nearest_neighbors(mat, k=3):
+            assert i not in nbrs
+
+    def test_zero_vectors_do_not_match(self):
+        mat = np.zeros((3, 4), dtype=np.float32)
+        assert list(nearest_neighbors(mat, k=2, max_distance=0.5)) == []
+
+
+class TestDuplicatesAndClusters:
+    def test_duplicate_pairs_reported_once(self):
+        vecs = np.stack(
+            [_unit([1, 0, 0]), _unit([1, 0.01, 0]), _unit([0, 1, 0]), _unit([0, 0, 1])]
+        )
+        pairs = find_duplicate_pairs(["a", "b", "c", "d"], vecs, threshold=0.05)
+        assert len(pairs) == 1
+        assert {pairs[0]["id_a"], pairs[0]["id_b"]} == {"a", "b"}
+        assert pairs[0]["distance"] < 0.05
+
+    def test_float16_storage_still_finds_pairs(self):
+        vecs = np.stack([_unit([1, 0, 0]), _unit([1, 0.01, 0])]).astype(np.float16)
+        pairs = find_duplicate_pairs(["a", "b"], vecs, threshold=0.05)
+        assert len(pairs) == 1
+
+    def test_clusters_are_transitive(self):
+        vecs = np.stack(
+            [
+                _unit([1, 0, 0]),
+                _unit([1, 0.3, 0]),
+                _unit([1, 0.6, 0]),
+                _unit([0, 0, 1]),
+            ]
+        )
+        groups = find_clusters(vecs, distance_threshold=0.1, neighbor_k=2)
+        sizes = sorted(len(g) for g in groups)
+        assert sizes == [1, 3]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""Tests for shared.vector_projection and SurrealCollection reduced mode."""
+
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from shared.vector_projection import (
+    cosine_distances,
+    evaluate_projection,
+    fit_pca,
+    load_projection,
+    matryoshka,
+    projection_path,
+)
+
+
+def _low_rank(n, dim, rank=12, seed=0):
+    """Vectors that live near a rank-`rank` subspace, like real embeddings."""
+    rng = np.random.default_rng(seed)
+    basis = rng.standard_normal((rank, dim))
+    data = rng.standard_normal((n, rank)) @ basis
+    data += 0.05 * rng.standard_normal((n, dim))
+    return (data / np.linalg.norm(data, axis=1, keepdims=True)).astype(np.float32)
+
+
+class TestProjection:
+    def test_pca_output_is_unit_norm(self):
+        data = _low_rank(300, 64)
+        proj = fit_pca(data, 16)
+        out = proj.project(data)
+        assert out.shape == (300, 16)
+        assert np.allclose(np.linalg.norm(out, axis=1), 1.0, atol=1e-4)
+        assert proj.project(data[0]).shape == (16,)
+
+    def test_pca_needs_enough_rows(self):
+        with pytest.raises(ValueError):
+            fit_pca(_low_rank(8, 64), 16)
+
+    def test_wrong_source_dim_rejected(self):
+        proj = matryoshka(4, 8)
+        with pytest.raises(ValueError):
+            proj.project([1.0, 2.0, 3.0])
+
+    def test_matryoshka_truncates(self):
+        proj = matryoshka(2, 4)
+        assert np.allclose(proj.project([3.0, 4.0, 9.0, 9.0]), [0.6, 0.8])
+
+    def test_save_load_roundtrip(self):
+        data = _low_rank(200, 32)
+        proj = fit_pca(data, 8)
+        with tempfile.TemporaryDirectory() as d:
+            path = projection_path(d, 8)
+            proj.save(path)
+            loaded = load_projection(path)
+            assert loaded.method == "pca" and loaded.dim == 8
+            assert np.allclose(loaded.project(data[:5]), proj.project(data[:5]))
+            assert load_projection(os.path.join(d, "missing.npz")) is None
+
+    def test_rerank_recovers_recall(self):
+        data = _low_rank(1500, 128)
+        report = evaluate_projection(data, fit_pca(data, 16), n_queries=50, k=10)
+        assert report["recall@10_rerank50"] >= 0.95
+        assert report["recall@10_rerank50"] >= report["recall@10_reduced"]
+        assert report["reduced_vector_mb"] < report["full_vector_mb"]
+
+    def test_small_store_clamps_k_and_rerank_k(self):
+        data = _low_rank(6, 16)
+        report = evaluate_projection(data, fit_pca(data, 4), n_queries=6, k=10, rerank_k=50)
+        assert report["recall@10_rerank50"] == 1.0
+        single = evaluate_projection(data[:1], fit_pca(data, 4), k=10)
+        assert single["recall@10_reduced"] == 0.0
+
+    def test_cosine_distances_handles_bad_rows(self):
+        d = cosine_distances([1, 0], [[1, 0], [0, 1], [], None])
+        assert d[0] == pytest.approx(0.0, abs=1e-6)
+        assert d[1] == pytest.approx(1.0, abs=1e-6)
+        assert d[2] == 1.0 and d[3] == 1.0
+
+
+class _FakeDB:
+    """Records statements; serves canned rows for reduced KNN / backfill."""
+
+    def __init__(self, rows=None, fingerprint=None):
+        self.statements = []
+        self.params = []
+        self.rows = rows or []
+        self.fingerprint = fingerprint
+
+    def query(self, sql, params=None):
+        self.statements.append(sql)
+        self.params.append(params or {})
+        if sql.startswith("SELECT fingerprint"):
+            return [{"fingerprint": self.fingerprint}] if self.fingerprint else []
+        if sql.startswith("UPSERT reduced_meta:"):
+            self.fingerprint = params["fp"]
+            return []
+        if sql.endswith("SET vector_r = NONE"):
+            for r in self.rows:
+                r.pop("vector_r", None)
+            return []
+        if "vector_r <|" in sql:
+            return [dict(r) for r in self.rows]
+        if "vector_r IS NONE" in sql:
+            return [r for r in self.rows if "vector_r" not in r]
+        if sql.startswith("UPDATE") and "vector_r" in sql:
+            rid = sql.split("`")[1]
+            for r in self.rows:
+                if r["id"] == f"knowledge:{rid}":
+                    r["vector_r"] = params["vr"]
+        return []
+
+
+def _collection(db, dim=2):
+    pytest.importorskip("surrealdb")
+    from shared.surreal_collection import SurrealCollection
+
+    coll = SurrealCollection(
+        db, "knowledge", fields={"text": "string", "tags": "string"}, embedding_dim=4
+    )
+    coll.attach_projection(matryoshka(dim, 4))
+    return coll
+
+
+def test_upsert_stores_reduced_vector_and_defines_index():
+    db = _FakeDB()
+    coll = _collection(db)
+    assert any("knowledge_vec_r" in s and "DIMENSION 2" in s for s in db.statements)
+    coll.upsert(ids=["a"], documents=["alpha"], vectors=[[3, 4, 0, 0]])
+    upsert_params = next(
+        p for s, p in zip(db.statements, db.params) if s.startswith("UPSERT knowledge:")
+    )
+    assert np.allclose(upsert_params["vec_r"], [0.6, 0.8])
+
+
+def test_reduced_query_reranks_with_full_vectors():
+    # Same reduced prefix; only the full vectors tell "b" is the true match
+    rows = [
+        {"id": "knowledge:a", "text": "a", "vector": [1, 0, 0, 1]},
+        {"id": "knowledge:b", "text": "b", "vector": [1, 0, 1, 0]},
+    ]
+    db = _FakeDB(rows)
+    coll = _collection(db)
+    coll.reduced_ready = True
+    res = coll.query(query_vector=[1, 0, 1, 0], n_results=1, include=["distances"])
+    assert res["ids"][0] == ["b"]
+    assert res["distances"][0][0] == pytest.approx(0.0, abs=1e-6)
+    assert "vector_r <|50, COSINE|>" in db.statements[-1]
+
+
+def test_backfill_fills_missing_and_skips_bad_rows():
+    rows = [
+        {"id": "knowledge:a", "vector": [1, 0, 0, 0]},
+        {"id": "knowledge:b", "vector": []},
+        {"id": "knowledge:c", "vector": [0, 1, 0, 0], "vector_r": [0.0, 1.0]},
+    ]
+    db = _FakeDB(rows, fingerprint=matryoshka(2, 4).fingerprint())
+    coll = _collection(db)
+    assert coll.backfill_reduced(batch=10) == 1
+    assert rows[0]["vector_r"] == [1.0, 0.0]
+    assert "vector_r" not in rows[1]
+
+
+def test_projection_change_reprojects_every_row():
+    rows = [
+        {"id": "knowledge:a", "vector": [1, 0, 0, 0], "vector_r": [1.0, 0.0]},
+        {"id": "knowledge:b", "vector": [0, 0, 1, 0], "vector_r": [0.0, 0.0]},
+    ]
+    db = _FakeDB(rows, fingerprint=matryoshka(2, 4).fingerprint())
+    coll = _collection(db, dim=3)  # dim change: old vector_r rows are stale
+    assert "REMOVE INDEX IF EXISTS knowledge_vec_r ON knowledge" in db.statements
+    assert any("knowledge_vec_r" in s and "DIMENSION 3" in s for s in db.statements)
+    assert db.fingerprint == matryoshka(3, 4).fingerprint()
+    assert coll.backfill_reduced(batch=10) == 2
+    assert rows[1]["vector_r"] == [0.0, 0.0, 1.0]
+
+    db.statements.clear()
+    _collection(db, dim=3)  # same projection: nothing to redo
+    assert not any(s.startswith("UPDATE") for s in db.statements)
+
+
+def test_fingerprint_tracks_pca_refit():
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((40, 8)).astype(np.float32)
+    a = fit_pca(matrix, 4, seed=0)
+    assert a.fingerprint() == fit_pca(matrix, 4, seed=0).fingerprint()
+    assert a.fingerprint() != fit_pca(matrix[:30], 4, seed=0).fingerprint()
+    assert a.fingerprint() != matryoshka(4, 8).fingerprint()
+
+
+def test_backfill_script_keeps_full_index_unless_server_is_reduced(tmp_path, monkeypatch):
+    pytest.importorskip("surrealdb")
+    monkeypatch.syspath_prepend(os.path.join(os.path.dirname(__file__), "..", "scripts"))
+    import reduce_vectors
+
+    config = tmp_path / "config.json"
+    monkeypatch.setattr(reduce_vectors, "CONFIG_PATH", str(config))
+    monkeypatch.setattr(reduce_vectors, "EMBEDDING_DIM", 4)
+    args = argparse.Namespace(dim=2, method="matryoshka", rebuild_index=False)
+
+    db = _FakeDB()
+    report = reduce_vectors.cmd_backfill(args, db)
+    assert not report["knowledge"]["reduced_ready"]
+    assert "REMOVE INDEX IF EXISTS knowledge_vec ON knowledge" not in db.statements
+
+    config.write_text('{"reduced_vector_dim": 2, "reduced_vector_method": "matryoshka"}')
+    report = reduce_vectors.cmd_backfill(args, db)
+    assert report["knowledge"]["reduced_ready"]
+    assert "REMOVE INDEX IF EXISTS knowledge_vec ON knowledge" in db.statements
+
+
+def test_full_index_dropped_once_reduced_ready():
+    db = _FakeDB()
+    coll = _collection(db)
+    coll.init_indexes(full_vector_index=False)
+    assert not any("knowledge_vec " in s for s in db.statements)
+    assert any("knowledge_fts" in s for s in db.statements)
+
+    coll.mark_reduced_ready()
+    assert coll.reduced_ready
+    assert db.statements[-1] == "REMOVE INDEX IF EXISTS knowledge_vec ON knowledge"
+
+
+def test_pending_reduced_counts_unprojected_rows():
+    db = _FakeDB()
+    db.query = lambda sql, params=None: db.statements.append(sql) or [{"count": 3}]
+    coll = _collection(db)
+    assert coll.pending_reduced() == 3
+    assert "array::len(vector) = 4" in db.statements[-1]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Tests for WritePipeline's round-trip budget (shared KNN fetch, batched update)."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import shared.minhash_index as mh
+import shared.write_pipeline as wp
+from shared.write_pipeline import WritePipeline
+
+
+class CountingCollection:
+    """In-memory stand-in that records every call the pipeline makes."""
+
+    def __init__(self, records=None, distances=None):
+        self.records = dict(records or {})  # id -> (doc, meta)
+        self.distances = dict(distances or {})  # id -> distance to any query
+        self.calls = []
+
+    def count(self):
+        self.calls.append("count")
+        return len(self.records)
+
+    def upsert(self, ids, documents, metadatas, vectors=None):
+        self.calls.append("upsert")
+        for i, doc, meta in zip(ids, documents, metadatas):
+            self.records[i] = (doc, dict(meta))
+
+    def query(self, query_texts=None, n_results=5, include=None, query_vector=None, where=None):
+        self.calls.append("query")
+        ranked = sorted(self.records, key=lambda i: self.distances.get(i, 0.0))[:n_results]
+        return {
+            "ids": [ranked],
+            "distances": [[self.distances.get(i, 0.0) for i in ranked]],
+            "metadatas": [[dict(self.records[i][1]) for i in ranked]],
+            "documents": [[self.records[i][0] for i in ranked]],
+        }
+
+    def get(self, ids=None, include=None):
+        self.calls.append("get")
+        found = [i for i in ids or [] if i in self.records]
+        return {"ids": found, "metadatas": [dict(self.records[i][1]) for i in found]}
+
+    def update(self, ids=None, metadatas=None, documents=None):
+        self.calls.append("update")
+        for i, meta in zip(ids, metadatas):
+            self.records[i][1].update(meta)
+
+
+class RecordingGraph:
+    def __init__(self):
+        self.edges = []
+
+    def upsert_entity(self, name, etype):
+        pass
+
+    def add_edge(self, a, b, kind, strength=None):
+        self.edges.append((a, b, kind))
+
+    def update_pmi(self, *args):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.setattr(wp, "_session_id", "sess-1")
+    monkeypatch.setattr(mh, "_memory_index", mh.MinHashIndex())
+
+
+def _bg_args(doc_id, content, tags):
+    return {
+        "doc_id": doc_id,
+        "content": content,
+        "context": "",
+        "tags": tags,
+        "cached_vec": [0.1, 0.2],
+        "cached_entities": None,
+    }
+
+
+def test_background_stages_share_one_query_and_one_update():
+    content = "Fixed the gate_router import error in enforcer.py by adding shared path"
+    coll = CountingCollection(
+        records={
+            "new": (content, {"tags": "type:fix", "tier": 2}),
+            "old-fix": ("gate_router import error in enforcer.py", {"tags": "type:error", "tier": 2}),
+            "near": ("gate_router in enforcer.py handles import ordering", {"tags": "area:gates", "tier": 2}),
+            "target": ("unrelated bug report", {"tags": "type:error", "tier": 2}),
+        },
+        distances={"new": 0.0, "old-fix": 0.1, "near": 0.2, "target": 0.9},
+    )
+    graph = RecordingGraph()
+    pipe = WritePipeline(coll, graph=graph, helpers={"classify_tier": lambda c, t: 1})
+    pipe.total_memories()
+    coll.calls.clear()
+
+    pipe._bg_inner(_bg_args("new", content, "type:fix,area:gates,resolves:target"))
+
+    assert coll.calls == ["query", "update"]
+    tags = coll.records["target"][1]["tags"]
+    assert "resolved_by:new" in tags
+    assert ("new", "old-fix", "linked_memory") in graph.edges
+    assert "area:gates" in coll.records["old-fix"][1]["tags"]
+    assert coll.records["new"][1].get("keywords")
+
+
+def test_each_stage_still_works_standalone():
+    coll = CountingCollection(
+        records={"target": ("doc", {"tags": "type:error"})}, distances={"target": 0.5}
+    )
+    pipe = WritePipeline(coll)
+    resolves, linked, warning = pipe._hybrid_linking("new", "resolves:target", coll)
+    assert (resolves, linked, warning) == ("target", "target", None)
+    assert coll.calls == ["get", "update"]
+    assert coll.records["target"][1]["tags"] == "type:error,resolved_by:new"
+
+
+def test_count_is_maintained_across_writes():
+    coll = CountingCollection()
+    pipe = WritePipeline(coll, helpers={"generate_id": lambda c: f"id-{len(c)}"})
+    totals = []
+    for n in range(4):
+        content = "memory about the write pipeline round trips " + "x" * n
+        totals.append(pipe.write(content)["total_memories"])
+    assert totals == [1, 2, 3, 4]
+    assert coll.calls.count("count") == 1
+    pipe.note_removed(2)
+    assert pipe.total_memories() == 2
+
+
+def test_session_id_is_resolved_once(monkeypatch):
+    scans = []
+    monkeypatch.setattr(wp, "_session_id", None)
+    monkeypatch.setattr(wp, "_scan_session_id", lambda: scans.append(1) or "abc")
+    coll = CountingCollection()
+    pipes = [WritePipeline(coll) for _ in range(3)]
+    assert [p._detect_session_id() for p in pipes] == ["abc"] * 3
+    assert scans == [1]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -2,6 +2,7 @@
 import json
 import os
 
+from shared.analytics_rollup import record_observation
 from shared.error_normalizer import fnv1a_hash
 from tracker_pkg import _log_debug
 from tracker_pkg.auto_remember import CAPTURABLE_TOOLS, CAPTURE_QUEUE, _cap_queue_file
@@ -100,6 +101,7 @@ def _capture_observation(tool_name, tool_input, tool_response, session_id, state
 
         with open(CAPTURE_QUEUE, "a") as f:
             f.write(json.dumps(obs) + "\n")
+        record_observation(obs)
         # Cap check every 50 calls
         if state.get("tool_call_count", 0) % 50 == 0:
             _cap_queue_file()
@@ -503,6 +503,10 @@ def main():
         obs["metadata"]["frustration_score"] = compute_frustration_score(prompt)
         with open(CAPTURE_QUEUE, "a") as f:
             f.write(json.dumps(obs) + "\n")
+
+        from shared.analytics_rollup import record_observation
+
+        record_observation(obs)
     except Exception:
         pass  # Capture failures must never crash the hook
 